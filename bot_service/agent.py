@@ -6,15 +6,24 @@
 2) Основной вызов — knowledge: только search_knowledge; calculator: search_materials + один calc_* по slug.
 
 Результат расчёта форматируется в Python (_format_calc_result).
+
+Основной API асинхронный (achat, aexecute_tool): бот ждёт его прямо в цикле aiogram,
+запросы к calc_service идут через один httpx.AsyncClient с keep-alive, к LLM —
+через AsyncOpenAI. chat/execute_tool — синхронные обёртки для скриптов и тестов.
 """
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import inspect
 import json
 import logging
 import math
 import os
+import random
 import re
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -43,7 +52,10 @@ def _load_env() -> None:
 
 _load_env()
 
+from async_clients import LoopBoundClient, run_sync
 from llm_provider import LLMProvider
+from pre_router import PRE_ROUTER_ENABLED, PRE_ROUTER_SHADOW_RATE, PreRoute, PreRouter
+from response_cache import ResponseCache, normalize_message, version_hash
 from knowledge_base import KnowledgeBase
 from prompts import (
     build_calculator_index,
@@ -57,12 +69,24 @@ from prompts import (
 logger = logging.getLogger(__name__)
 
 CALC_API_URL = os.getenv("CALC_API_URL", "http://localhost:8001").strip().rstrip("/")
+# Токен внутреннего клиента calc_service (приоритетная очередь, без лимита запросов по IP);
+# нужен, если бот ходит в calc_service не с localhost.
+CALC_INTERNAL_TOKEN = os.getenv("CALC_INTERNAL_TOKEN", "").strip()
+CALC_HEADERS: Dict[str, str] = {"X-Internal-Token": CALC_INTERNAL_TOKEN} if CALC_INTERNAL_TOKEN else {}
 
 AGENT_USE_ROUTER = os.getenv("AGENT_USE_ROUTER", "true").strip().lower() in ("1", "true", "yes", "on")
 
 MAX_HISTORY_MESSAGES = 20
 HTTP_TIMEOUT = 15.0
 CHOICES_SEARCH_LIMIT = max(10, min(2000, int(os.getenv("CHOICES_SEARCH_LIMIT", "500"))))
+# Сколько tool_calls одного ответа модели выполняются одновременно
+TOOL_CALLS_CONCURRENCY = max(1, int(os.getenv("TOOL_CALLS_CONCURRENCY", "4")))
+# Кэш решений роутера и ответов по базе знаний (response_cache.py), секунды; 0 — выключен
+ROUTER_CACHE_TTL = float(os.getenv("ROUTER_CACHE_TTL", "3600"))
+KNOWLEDGE_CACHE_TTL = float(os.getenv("KNOWLEDGE_CACHE_TTL", "21600"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+# Короче — реплика зависит от диалога («да», «а 4+4?») и в кэш не попадает
+RESPONSE_CACHE_MIN_WORDS = 3
 
 SEARCH_KNOWLEDGE_TOOL: Dict[str, Any] = {
     "type": "function",
@@ -129,10 +153,38 @@ class InsainAgent:
         self._calc_llm_prompts: Dict[str, str] = {}
         self._calculator_index: str = ""
         self._router_tool: Dict[str, Any] = {}
+        self._pre_router: Optional[PreRouter] = None
+        # Фоновые задачи (теневые вызовы роутера): ссылки держим до завершения
+        self._background_tasks: set[asyncio.Task] = set()
+        # Клиент calc_service: свой httpx.AsyncClient на каждый цикл событий (async_clients.py)
+        self._calc_client: LoopBoundClient[httpx.AsyncClient] = LoopBoundClient(
+            lambda: httpx.AsyncClient(timeout=HTTP_TIMEOUT, headers=CALC_HEADERS)
+        )
+        self._router_cache = ResponseCache(ROUTER_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
+        self._knowledge_cache = ResponseCache(KNOWLEDGE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES)
         # Последний успешный расчёт per user (для пересчёта и восстановления slug)
         self._user_calc_context: Dict[int, Dict[str, Any]] = {}
         self._load_calculators_and_tools()
 
+    @property
+    def _calc_http(self) -> httpx.AsyncClient:
+        """Клиент calc_service текущего цикла событий: один пул keep-alive соединений на все запросы."""
+        return self._calc_client.get()
+
+    async def aclose(self) -> None:
+        """Закрыть асинхронные клиенты (calc_service, LLM), созданные в текущем цикле событий."""
+        # Теневые вызовы роутера этого цикла ещё пользуются клиентом LLM — дождаться их
+        loop = asyncio.get_running_loop()
+        pending = [t for t in self._background_tasks if t.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self._calc_client.aclose()
+        close = getattr(getattr(self, "llm", None), "aclose", None)
+        if close is not None:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+
     @staticmethod
     def _enrich_tool_props_from_param_schema_inline_choices(
         props: Dict[str, Any], param_schema: Dict[str, Any]
@@ -212,7 +264,7 @@ class InsainAgent:
         found.sort(key=lambda x: x[0])
         return [t for _, t in found]
 
-    def _try_force_print_sheet_material_choice(
+    async def _try_force_print_sheet_material_choice(
         self,
         user_message: str,
         history: List[Dict[str, Any]],
@@ -243,7 +295,7 @@ class InsainAgent:
             return None
 
         chosen_title = titles[choice_idx]
-        r = self._execute_search_materials_single("print_sheet", chosen_title, "material")
+        r = await self._execute_search_materials_single("print_sheet", chosen_title, "material")
         if r.get("error"):
             return None
         items = r.get("items") or []
@@ -270,28 +322,91 @@ class InsainAgent:
             return None
 
         tool_name = "calc_print_sheet"
-        payload = self._normalize_print_sheet_calc_args(dict(merged))
+        payload = await self._normalize_print_sheet_calc_args(dict(merged))
         logger.info(
             "print_sheet: принудительный расчёт после выбора №%s → material_id=%s",
             um,
             mid,
         )
-        result = self.execute_tool(tool_name, payload)
-        display_args = self._calc_args_for_display_and_storage(tool_name, payload)
+        result = await self.aexecute_tool(tool_name, payload)
+        display_args = await self._calc_args_for_display_and_storage(tool_name, payload)
         if isinstance(result, dict) and "error" not in result:
             self._user_calc_context[user_id] = {
                 "slug": "print_sheet",
                 "tool_name": tool_name,
                 "params": dict(display_args),
             }
-        return self._format_calc_result(tool_name, display_args, result)
+        return await self._aformat_calc_result(tool_name, display_args, result)
+
+    def _fetch_bundle(self, client: httpx.Client) -> Optional[List[Dict[str, Any]]]:
+        """
+        Все схемы калькуляторов одним запросом (/api/v1/bundle, gzip).
+
+        None — бандл недоступен (старый calc_service без эндпоинта или ошибка ответа):
+        тогда схемы загружаются по отдельным эндпоинтам. Ошибки соединения пробрасываются.
+        """
+        r = client.get(f"{self.calc_api_url}/api/v1/bundle")
+        if r.status_code in (404, 405):
+            logger.info("Calc API без /api/v1/bundle — загрузка схем по калькуляторам")
+            return None
+        try:
+            r.raise_for_status()
+            entries = r.json()["calculators"]
+            if not isinstance(entries, list):
+                raise TypeError("calculators — не список")
+        except Exception as e:
+            logger.warning("Не удалось загрузить бандл схем, загрузка по калькуляторам: %s", e)
+            return None
+        return [e for e in entries if isinstance(e, dict)]
+
+    def _fetch_schemas_per_slug(self, client: httpx.Client) -> Dict[str, Dict[str, Any]]:
+        """
+        Схемы по отдельным эндпоинтам (1 + 4×N запросов) — для calc_service без бандла.
+
+        Возвращает slug → {param_schema, options, tool_schema, llm_prompt} в формате бандла;
+        часть, которую не удалось загрузить, — None.
+        """
+        schemas: Dict[str, Dict[str, Any]] = {}
+        for calc in self._calculators:
+            slug = calc.get("slug")
+            if not slug:
+                continue
+            entry: Dict[str, Any] = {"param_schema": None, "options": None, "tool_schema": None, "llm_prompt": None}
+            schemas[slug] = entry
+            try:
+                ps_r = client.get(f"{self.calc_api_url}/api/v1/param_schema/{slug}")
+                if ps_r.status_code == 200:
+                    entry["param_schema"] = ps_r.json()
+
+                opts_r = client.get(f"{self.calc_api_url}/api/v1/options/{slug}")
+                if opts_r.status_code == 200:
+                    entry["options"] = opts_r.json()
+
+                schema_r = client.get(f"{self.calc_api_url}/api/v1/tool_schema/{slug}")
+                schema_r.raise_for_status()
+                entry["tool_schema"] = schema_r.json()
+
+                prompt_r = client.get(f"{self.calc_api_url}/api/v1/llm_prompt/{slug}")
+                if prompt_r.status_code == 200:
+                    entry["llm_prompt"] = prompt_r.json().get("prompt")
+            except Exception as e:
+                logger.warning("Не удалось загрузить схемы для %s: %s", slug, e)
+        return schemas
 
     def _load_calculators_and_tools(self) -> None:
         try:
-            with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-                r = client.get(f"{self.calc_api_url}/api/v1/calculators")
-                r.raise_for_status()
-                self._calculators = r.json()
+            with httpx.Client(timeout=HTTP_TIMEOUT, headers=CALC_HEADERS) as client:
+                bundle = self._fetch_bundle(client)
+                if bundle is not None:
+                    self._calculators = [
+                        {k: e.get(k) for k in ("slug", "name", "description", "keywords")} for e in bundle
+                    ]
+                    schemas = {e["slug"]: e for e in bundle if e.get("slug")}
+                else:
+                    r = client.get(f"{self.calc_api_url}/api/v1/calculators")
+                    r.raise_for_status()
+                    self._calculators = r.json()
+                    schemas = self._fetch_schemas_per_slug(client)
         except (httpx.ConnectError, httpx.TimeoutException) as e:
             logger.warning("Calc API недоступен при инициализации: %s", e)
             self._reset_state()
@@ -302,110 +417,98 @@ class InsainAgent:
             return
 
         tools: List[Dict[str, Any]] = []
-        with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-            for calc in self._calculators:
-                slug = calc.get("slug")
-                if not slug:
-                    continue
-                try:
-                    ps_r = client.get(f"{self.calc_api_url}/api/v1/param_schema/{slug}")
-                    if ps_r.status_code == 200:
-                        self._param_schemas[slug] = ps_r.json()
-
-                    opts_r = client.get(f"{self.calc_api_url}/api/v1/options/{slug}")
-                    opts: Dict[str, Any] = {}
-                    if opts_r.status_code == 200:
-                        opts = opts_r.json()
-                        self._options_by_slug[slug] = opts
-                        self.calculator_materials[slug] = list(opts.get("materials") or [])
-                    else:
-                        self.calculator_materials[slug] = []
-
-                    schema_r = client.get(f"{self.calc_api_url}/api/v1/tool_schema/{slug}")
-                    schema_r.raise_for_status()
-                    schema = schema_r.json()
-
-                    prompt_r = client.get(f"{self.calc_api_url}/api/v1/llm_prompt/{slug}")
-                    if prompt_r.status_code == 200:
-                        self._calc_llm_prompts[slug] = (prompt_r.json().get("prompt") or "").strip()
-                except Exception as e:
-                    logger.warning("Не удалось загрузить схемы для %s: %s", slug, e)
-                    self.calculator_materials[slug] = []
-                    continue
+        for calc in self._calculators:
+            slug = calc.get("slug")
+            if not slug:
+                continue
+            entry = schemas.get(slug) or {}
+            if isinstance(entry.get("param_schema"), dict):
+                self._param_schemas[slug] = entry["param_schema"]
+            opts: Dict[str, Any] = entry.get("options") if isinstance(entry.get("options"), dict) else {}
+            if opts:
+                self._options_by_slug[slug] = opts
+            self.calculator_materials[slug] = list(opts.get("materials") or [])
+            if entry.get("llm_prompt") is not None:
+                self._calc_llm_prompts[slug] = (entry.get("llm_prompt") or "").strip()
+            schema = entry.get("tool_schema")
+            if not isinstance(schema, dict):
+                logger.warning("Нет tool_schema для %s — калькулятор пропущен", slug)
+                self.calculator_materials[slug] = []
+                continue
 
-                name = schema.get("name") or f"calc_{slug}"
-                params = dict(schema.get("parameters") or {"type": "object", "properties": {}})
-                props = params.get("properties") or {}
+            name = schema.get("name") or f"calc_{slug}"
+            params = dict(schema.get("parameters") or {"type": "object", "properties": {}})
+            props = params.get("properties") or {}
 
-                for param_key, param_hint in (("material_id", "material"), ("lamination_id", "lamination")):
-                    if param_key not in props:
-                        continue
-                    orig = props.get(param_key) or {}
-                    props[param_key] = {
-                        **orig,
+            for param_key, param_hint in (("material_id", "material"), ("lamination_id", "lamination")):
+                if param_key not in props:
+                    continue
+                orig = props.get(param_key) or {}
+                props[param_key] = {
+                    **orig,
+                    "type": "string",
+                    "description": orig.get("description") or (
+                        f"Код из результата search_materials(slug, query, param='{param_hint}'). Подставь поле id."
+                    ),
+                }
+
+            if slug in ("print_sheet", "print_laser") and "color" in props:
+                props["color"] = {
+                    **(props.get("color") or {}),
+                    "type": "string",
+                    "enum": ["1+0", "4+0", "1+1", "4+1", "4+4"],
+                    "description": "Цветность печати. 4+0 — односторонняя цветная, 4+4 — двусторонняя цветная. Обязательно передавай при вызове (по умолчанию 4+0).",
+                }
+
+            param_schema = self._param_schemas.get(slug)
+            if param_schema:
+                self._enrich_tool_props_from_param_schema_inline_choices(props, param_schema)
+
+            if slug == "metal_pins":
+                attachments = (opts or {}).get("attachments") or []
+                packs = (opts or {}).get("packs") or []
+
+                if "attachment_id" in props:
+                    choices = {a.get("code"): (a.get("name") or a.get("code")) for a in attachments if isinstance(a, dict)}
+                    desc = (
+                        props.get("attachment_id", {}).get("description")
+                        or "Крепление значка (игла-цанга, булавка, магнит и т.п.)."
+                    )
+                    if choices:
+                        human = ", ".join(f"{code} — {name}" for code, name in choices.items())
+                        desc = f"{desc} Доступные варианты: {human}."
+                    props["attachment_id"] = {
+                        **(props.get("attachment_id") or {}),
                         "type": "string",
-                        "description": orig.get("description") or (
-                            f"Код из результата search_materials(slug, query, param='{param_hint}'). Подставь поле id."
-                        ),
+                        "default": "BC",
+                        "enum": sorted(list(choices.keys()) or ["BC", "BC2", "PinMetal", "SafetyPin", "Screw", "TieClip", "Magnet17", "Magnet4513"]),
+                        "description": desc,
                     }
 
-                if slug in ("print_sheet", "print_laser") and "color" in props:
-                    props["color"] = {
-                        **(props.get("color") or {}),
+                if "pack_id" in props:
+                    pack_choices = {p.get("code"): (p.get("name") or p.get("code")) for p in packs if isinstance(p, dict)}
+                    desc_p = (
+                        props.get("pack_id", {}).get("description")
+                        or "Упаковка значков (пакетик, акриловая коробочка)."
+                    )
+                    if pack_choices:
+                        human_p = ", ".join(f"{code} — {name}" for code, name in pack_choices.items())
+                        desc_p = f"{desc_p} Доступные варианты: {human_p}."
+                    props["pack_id"] = {
+                        **(props.get("pack_id") or {}),
                         "type": "string",
-                        "enum": ["1+0", "4+0", "1+1", "4+1", "4+4"],
-                        "description": "Цветность печати. 4+0 — односторонняя цветная, 4+4 — двусторонняя цветная. Обязательно передавай при вызове (по умолчанию 4+0).",
+                        "enum": sorted(list(pack_choices.keys()) or ["PolyBag", "AcrylicBox30", "AcrylicBox40", "AcrylicBox50"]),
+                        "description": desc_p,
                     }
 
-                param_schema = self._param_schemas.get(slug)
-                if param_schema:
-                    self._enrich_tool_props_from_param_schema_inline_choices(props, param_schema)
-
-                if slug == "metal_pins":
-                    attachments = (opts or {}).get("attachments") or []
-                    packs = (opts or {}).get("packs") or []
-
-                    if "attachment_id" in props:
-                        choices = {a.get("code"): (a.get("name") or a.get("code")) for a in attachments if isinstance(a, dict)}
-                        desc = (
-                            props.get("attachment_id", {}).get("description")
-                            or "Крепление значка (игла-цанга, булавка, магнит и т.п.)."
-                        )
-                        if choices:
-                            human = ", ".join(f"{code} — {name}" for code, name in choices.items())
-                            desc = f"{desc} Доступные варианты: {human}."
-                        props["attachment_id"] = {
-                            **(props.get("attachment_id") or {}),
-                            "type": "string",
-                            "default": "BC",
-                            "enum": sorted(list(choices.keys()) or ["BC", "BC2", "PinMetal", "SafetyPin", "Screw", "TieClip", "Magnet17", "Magnet4513"]),
-                            "description": desc,
-                        }
-
-                    if "pack_id" in props:
-                        pack_choices = {p.get("code"): (p.get("name") or p.get("code")) for p in packs if isinstance(p, dict)}
-                        desc_p = (
-                            props.get("pack_id", {}).get("description")
-                            or "Упаковка значков (пакетик, акриловая коробочка)."
-                        )
-                        if pack_choices:
-                            human_p = ", ".join(f"{code} — {name}" for code, name in pack_choices.items())
-                            desc_p = f"{desc_p} Доступные варианты: {human_p}."
-                        props["pack_id"] = {
-                            **(props.get("pack_id") or {}),
-                            "type": "string",
-                            "enum": sorted(list(pack_choices.keys()) or ["PolyBag", "AcrylicBox30", "AcrylicBox40", "AcrylicBox50"]),
-                            "description": desc_p,
-                        }
-
-                tools.append({
-                    "type": "function",
-                    "function": {
-                        "name": name,
-                        "description": schema.get("description") or calc.get("description", ""),
-                        "parameters": {**params, "properties": props},
-                    },
-                })
+            tools.append({
+                "type": "function",
+                "function": {
+                    "name": name,
+                    "description": schema.get("description") or calc.get("description", ""),
+                    "parameters": {**params, "properties": props},
+                },
+            })
 
         self._tools = [SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL] + tools
         self._calc_tool_by_slug = {}
@@ -417,6 +520,7 @@ class InsainAgent:
         # Роутеру достаточно усечённого индекса (меньше токенов)
         self._calculator_index = build_calculator_index(self._calculators, max_chars=5000)
         self._router_tool = self._build_router_tool()
+        self._pre_router = PreRouter(c for c in self._calculators if c.get("slug") in self._calc_tool_by_slug)
         loaded_slugs = sorted(self._calc_tool_by_slug.keys())
         logger.info(
             "Загружено калькуляторов: %s, tools: %s, calc_slugs: %s",
@@ -432,6 +536,7 @@ class InsainAgent:
         self._calc_llm_prompts = {}
         self._calculator_index = ""
         self._router_tool = {}
+        self._pre_router = None
         self._param_schemas = {}
         self._options_by_slug = {}
         self.calculator_materials = {}
@@ -483,6 +588,14 @@ class InsainAgent:
 
     @staticmethod
     def _router_user_content(user_message: str, history: List[Dict[str, Any]]) -> str:
+        return (
+            f"Текущее сообщение пользователя:\n{user_message}\n\n"
+            f"Контекст диалога (последние реплики):\n{InsainAgent._router_history_block(history)}"
+        )
+
+    @staticmethod
+    def _router_history_block(history: List[Dict[str, Any]]) -> str:
+        """Последние реплики диалога в том виде, в каком их видит роутер."""
         lines: List[str] = []
         tail = history[-12:] if history else []
         for m in tail:
@@ -496,11 +609,7 @@ class InsainAgent:
                 c = c[:1500] + "…"
             label = "Пользователь" if role == "user" else "Ассистент"
             lines.append(f"{label}: {c}")
-        block = "\n".join(lines) if lines else "(история пуста)"
-        return (
-            f"Текущее сообщение пользователя:\n{user_message}\n\n"
-            f"Контекст диалога (последние реплики):\n{block}"
-        )
+        return "\n".join(lines) if lines else "(история пуста)"
 
     @staticmethod
     def _parse_router_result(llm_result: Dict[str, Any]) -> tuple[str, Optional[str]]:
@@ -561,19 +670,127 @@ class InsainAgent:
                 return "magnet_acrylic"
         return None
 
-    def _router_classify(
+    def _context_slug(self, user_id: int) -> Optional[str]:
+        """slug последнего успешного расчёта пользователя, если калькулятор загружен."""
+        ctx = self._user_calc_context.get(user_id) or {}
+        prev = str(ctx.get("slug") or "").strip()
+        return prev if prev in self._calc_tool_by_slug else None
+
+    @staticmethod
+    def _cache_message(user_message: str) -> Optional[str]:
+        """Нормализованный текст для ключа кэша ответов; None — реплика слишком короткая."""
+        text = normalize_message(user_message)
+        return text if len(text.split()) >= RESPONSE_CACHE_MIN_WORDS else None
+
+    def _log_cache_hit(self, kind: str, saved_tokens: int, user_id: int) -> None:
+        logger.info("Кэш ответов: %s, сэкономлено ≈ %s токенов", kind, saved_tokens)
+        try:
+            self.llm.analyzer.log_cache_hit(kind, saved_tokens, {"user_id": user_id})
+        except Exception as e:
+            logger.warning("Не удалось записать попадание в кэш: %s", e)
+
+    def _pre_route(self, user_message: str, user_id: int = 0) -> Optional[PreRoute]:
+        """Локальный пре-роутер (pre_router.py): intent/slug без LLM; None — решает LLM-роутер."""
+        if not PRE_ROUTER_ENABLED or self._pre_router is None:
+            return None
+        context_slug = self._context_slug(user_id)
+        route = self._pre_router.classify(
+            user_message,
+            context_slug=context_slug,
+            continuation=bool(context_slug) and self._router_context_continuation_message(user_message),
+        )
+        if route is None:
+            return None
+        logger.info(
+            "PreRouter: intent=%s slug=%s score=%.2f (%s), без LLM; %s",
+            route.intent,
+            route.slug,
+            route.score,
+            route.reason,
+            self._pre_router.stats(),
+        )
+        return route
+
+    def _log_pre_route(
+        self,
+        user_message: str,
+        route: Optional[PreRoute],
+        user_id: int,
+        llm: Optional[tuple[str, Optional[str]]] = None,
+    ) -> None:
+        """Решение пре-роутера (и ответ LLM-роутера в теневом режиме) — в лог токенов."""
+        try:
+            self.llm.analyzer.log_pre_route(
+                user_message,
+                dataclasses.asdict(route) if route is not None else None,
+                llm=llm,
+                metadata={"user_id": user_id},
+            )
+        except Exception as e:
+            logger.warning("Не удалось записать решение пре-роутера: %s", e)
+
+    async def _llm_route(
+        self, router_system: str, user_message: str, history: List[Dict[str, Any]]
+    ) -> tuple[tuple[str, Optional[str]], int]:
+        """Решение LLM-роутера и оценка потраченных токенов."""
+        messages = [
+            {"role": "system", "content": router_system},
+            {"role": "user", "content": self._router_user_content(user_message, history)},
+        ]
+        out = await self.llm.achat(messages, tools=[self._router_tool])
+        return self._parse_router_result(out), int(out.get("tokens_estimate") or 0)
+
+    async def _shadow_route(
+        self, route: PreRoute, user_message: str, history: List[Dict[str, Any]], user_id: int
+    ) -> None:
+        """Теневой режим: то же сообщение — LLM-роутеру; ответ пользователю не ждёт и не меняется."""
+        try:
+            llm, _ = await self._llm_route(
+                build_router_system_prompt(self._calculator_index), user_message, history
+            )
+        except Exception as e:
+            logger.warning("PreRouter: теневой вызов LLM-роутера не удался: %s", e)
+            llm = None
+        self._log_pre_route(user_message, route, user_id, llm=llm)
+
+    async def _router_classify(
         self, user_message: str, history: List[Dict[str, Any]], user_id: int = 0
     ) -> tuple[str, Optional[str]]:
         if not self._router_tool:
             return "calculator", None
+        local = self._pre_route(user_message, user_id)
+        if PRE_ROUTER_ENABLED and self._pre_router is not None:
+            if local is not None and random.random() < PRE_ROUTER_SHADOW_RATE:
+                task = asyncio.create_task(self._shadow_route(local, user_message, list(history), user_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            else:
+                self._log_pre_route(user_message, local, user_id)
+        if local is not None:
+            return local.intent, local.slug
         try:
             router_system = build_router_system_prompt(self._calculator_index)
-            messages = [
-                {"role": "system", "content": router_system},
-                {"role": "user", "content": self._router_user_content(user_message, history)},
-            ]
-            out = self.llm.chat(messages, tools=[self._router_tool])
-            intent, slug = self._parse_router_result(out)
+            # Роутер видит и хвост диалога: в ключе — он сам (хэш) и активный расчёт, чтобы решение,
+            # принятое в одном диалоге, не отдавалось в другом
+            text = self._cache_message(user_message)
+            key = (
+                (
+                    text,
+                    self._context_slug(user_id),
+                    version_hash(router_system, self._router_tool),
+                    version_hash(self._router_history_block(history)),
+                )
+                if text
+                else None
+            )
+            cached = self._router_cache.get(key) if key else None
+            if cached is not None:
+                (intent, slug), tokens = cached
+                self._log_cache_hit("router", tokens, user_id)
+            else:
+                (intent, slug), tokens = await self._llm_route(router_system, user_message, history)
+                if key:
+                    self._router_cache.put(key, (intent, slug), tokens)
             if intent == "calculator" and (
                 not slug or slug not in self._calc_tool_by_slug
             ):
@@ -863,7 +1080,7 @@ class InsainAgent:
                 return False
         return True
 
-    def _try_forced_calc(
+    async def _try_forced_calc(
         self,
         intent: str,
         slug: Optional[str],
@@ -888,8 +1105,8 @@ class InsainAgent:
             logger.warning("Forced calc: недостаточно параметров slug=%s keys=%s", slug, list(merged.keys()))
             return None
         logger.info("Forced calc: вызов %s с аргументами %s", tool_name, merged)
-        result = self.execute_tool(tool_name, merged)
-        display_args = self._calc_args_for_display_and_storage(tool_name, merged)
+        result = await self.aexecute_tool(tool_name, merged)
+        display_args = await self._calc_args_for_display_and_storage(tool_name, merged)
         if isinstance(result, dict) and "error" not in result:
             cslug = tool_name[5:] if tool_name.startswith("calc_") else tool_name
             self._user_calc_context[user_id] = {
@@ -897,7 +1114,7 @@ class InsainAgent:
                 "tool_name": tool_name,
                 "params": dict(display_args),
             }
-        return self._format_calc_result(tool_name, display_args, result)
+        return await self._aformat_calc_result(tool_name, display_args, result)
 
     def _tools_for_intent(
         self, intent: str, slug: Optional[str], full_tools: List[Dict[str, Any]]
@@ -942,54 +1159,35 @@ class InsainAgent:
                 return c
         return {}
 
-    def _load_calendar_overrides(self) -> Dict[str, set]:
-        if hasattr(self, "_calendar_overrides"):
-            return self._calendar_overrides  # type: ignore[attr-defined]
-
-        root = Path(__file__).resolve().parent.parent
-        common_path = root / "calc_service" / "data" / "common.json"
-        working_days: set[str] = set()
-        weekend_working: set[str] = set()
-        try:
-            text_lines: list[str] = []
-            with open(common_path, encoding="utf-8") as f:
-                for line in f:
-                    if "//" in line:
-                        line = line.split("//", 1)[0]
-                    if line.strip():
-                        text_lines.append(line)
-            data = json.loads("".join(text_lines))
-            calendar = data.get("calendar") or {}
-            working_days = set(calendar.get("workingDays") or [])
-            weekend_working = set(calendar.get("weekEnd") or [])
-        except Exception as e:
-            logger.warning("Не удалось загрузить календарь из common.json: %s", e)
-
-        self._calendar_overrides = {
-            "workingDays": working_days,
-            "weekEnd": weekend_working,
-        }
-        return self._calendar_overrides  # type: ignore[return-value]
-
-    def _is_business_day(self, dt: datetime) -> bool:
-        overrides = self._load_calendar_overrides()
-        working_days: set[str] = overrides["workingDays"]
-        weekend_working: set[str] = overrides["weekEnd"]
-        day_str = f"{dt.day}.{dt.month}"
-        weekday = dt.weekday()
-        if 0 <= weekday <= 4:
-            return day_str not in working_days
-        return day_str in weekend_working
-
-    def _add_business_days(self, start: datetime, days: int) -> datetime:
+    async def _add_business_days(self, start: datetime, days: int) -> datetime:
+        """
+        Дата через days рабочих дней после start по производственному календарю
+        calc_service (GET /api/v1/calendar/ready_date: праздники и рабочие выходные
+        из common.json). Если сервис недоступен — считаем только субботы и воскресенья.
+        """
         if days == 0:
             return start
+        try:
+            r = await self._calc_http.get(
+                f"{self.calc_api_url}/api/v1/calendar/ready_date",
+                params={"start": start.date().isoformat(), "days": days},
+            )
+            r.raise_for_status()
+            ready = datetime.fromisoformat(r.json()["ready_date"])
+            return datetime.combine(ready.date(), start.time())
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            logger.warning("Календарь calc_service недоступен, срок без учёта праздников: %s", e)
+        return self._add_weekdays(start, days)
+
+    @staticmethod
+    def _add_weekdays(start: datetime, days: int) -> datetime:
+        """Дата через days будних дней после start (без учёта праздников)."""
         step = 1 if days > 0 else -1
         remaining = abs(days)
         current = start
         while remaining > 0:
             current += timedelta(days=step)
-            if self._is_business_day(current):
+            if current.weekday() < 5:
                 remaining -= 1
         return current
 
@@ -1023,7 +1221,22 @@ class InsainAgent:
         new_item_price = round(new_item_price * 100) / 100.0
         return new_item_price * q
 
-    def _format_time_ready_label(self, time_ready_hours: float) -> str:
+    @staticmethod
+    def _ready_working_days(time_ready_hours: Any) -> int:
+        """Срок готовности в рабочих днях (по 8 ч); 0 — срок меньше дня или не определён."""
+        try:
+            hours = max(0.0, float(time_ready_hours))
+        except (TypeError, ValueError):
+            return 0
+        if hours < 8:
+            return 0
+        days = int(hours // 8)
+        if hours % 8:
+            days += 1
+        return days
+
+    def _format_time_ready_label(self, time_ready_hours: float, ready_date: Optional[datetime] = None) -> str:
+        """ready_date — дата готовности по календарю (_add_business_days); без неё — только будни."""
         try:
             hours = max(0.0, float(time_ready_hours))
         except (TypeError, ValueError):
@@ -1034,10 +1247,9 @@ class InsainAgent:
             h = int(round(hours)) or 1
             label = self._ru_plural(h, "рабочий час", "рабочих часа", "рабочих часов")
             return f"{h} {label}"
-        days = int(hours // 8)
-        if hours % 8:
-            days += 1
-        ready_date = self._add_business_days(datetime.now(), days)
+        days = self._ready_working_days(hours)
+        if ready_date is None:
+            ready_date = self._add_weekdays(datetime.now(), days)
         date_str = ready_date.strftime("%d.%m.%Y")
         day_label = self._ru_plural(days, "рабочий день", "рабочих дня", "рабочих дней")
         return f"≈ {days} {day_label} (до {date_str})"
@@ -1054,11 +1266,26 @@ class InsainAgent:
         except (TypeError, ValueError):
             return "стандарт"
 
+    async def _aformat_calc_result(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        result: Dict[str, Any],
+    ) -> str:
+        """_format_calc_result с датой готовности по производственному календарю calc_service."""
+        ready_date: Optional[datetime] = None
+        if "error" not in result:
+            days = self._ready_working_days(result.get("time_ready") or 0)
+            if days:
+                ready_date = await self._add_business_days(datetime.now(), days)
+        return self._format_calc_result(tool_name, args, result, ready_date=ready_date)
+
     def _format_calc_result(
         self,
         tool_name: str,
         args: Dict[str, Any],
         result: Dict[str, Any],
+        ready_date: Optional[datetime] = None,
     ) -> str:
         slug = tool_name
         if slug.startswith("calc_"):
@@ -1175,7 +1402,7 @@ class InsainAgent:
             lines.append("💰 Цена: 0 ₽")
         lines.append(f"💵 Себестоимость: {cost:.2f} ₽")
         lines.append(f"⏱ Время изготовления: {time_hours:.2f} ч")
-        time_ready_label = self._format_time_ready_label(time_ready)
+        time_ready_label = self._format_time_ready_label(time_ready, ready_date)
         lines.append(f"📅 Готовность: {time_ready_label}")
         lines.append(f"⚖️ Вес тиража: {weight_kg:.2f} кг")
 
@@ -1203,32 +1430,31 @@ class InsainAgent:
 
         return "\n".join(lines).strip()
 
-    def _execute_search_materials_single(
+    async def _execute_search_materials_single(
         self, slug: str, query: str, param: str = "material"
     ) -> Dict[str, Any]:
         """Один запрос к /choices без fallback (для внутренних повторов)."""
         param = self._normalize_choices_param(slug, param)
         try:
-            with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-                r = client.post(
-                    f"{self.calc_api_url}/api/v1/choices",
-                    json={
-                        "slug": slug,
-                        "param": param,
-                        "query": (query or "").strip(),
-                        "limit": CHOICES_SEARCH_LIMIT,
-                    },
-                )
-                r.raise_for_status()
-                data = r.json()
-                items = data.get("items") or []
-                hint = (
-                    "Подставь выбранный id в вызов calc_* (material_id / lamination_id). "
-                    "Пользователю показывай только title, без id. "
-                    "Если пользователь ответил одной цифрой на твой нумерованный список — "
-                    "сразу вызови search_materials с query равным полному title этого пункта."
-                )
-                return {"items": items, "hint": hint}
+            r = await self._calc_http.post(
+                f"{self.calc_api_url}/api/v1/choices",
+                json={
+                    "slug": slug,
+                    "param": param,
+                    "query": (query or "").strip(),
+                    "limit": CHOICES_SEARCH_LIMIT,
+                },
+            )
+            r.raise_for_status()
+            data = r.json()
+            items = data.get("items") or []
+            hint = (
+                "Подставь выбранный id в вызов calc_* (material_id / lamination_id). "
+                "Пользователю показывай только title, без id. "
+                "Если пользователь ответил одной цифрой на твой нумерованный список — "
+                "сразу вызови search_materials с query равным полному title этого пункта."
+            )
+            return {"items": items, "hint": hint}
         except httpx.HTTPStatusError as e:
             detail = (e.response.json() or {}).get("detail", str(e)) if e.response else str(e)
             return {"error": detail, "items": []}
@@ -1271,7 +1497,7 @@ class InsainAgent:
                 out.append(c)
         return out
 
-    def _execute_search_materials(self, slug: str, query: str, param: str = "material") -> Dict[str, Any]:
+    async def _execute_search_materials(self, slug: str, query: str, param: str = "material") -> Dict[str, Any]:
         param_norm = self._normalize_choices_param(slug, param)
         queries: List[str] = [(query or "").strip()]
         if slug == "print_sheet" and param_norm == "material":
@@ -1279,7 +1505,7 @@ class InsainAgent:
 
         last: Dict[str, Any] = {"items": [], "hint": ""}
         for i, q in enumerate(queries):
-            last = self._execute_search_materials_single(slug, q, param)
+            last = await self._execute_search_materials_single(slug, q, param)
             if last.get("error"):
                 return last
             items = last.get("items") or []
@@ -1309,10 +1535,10 @@ class InsainAgent:
             return True
         return False
 
-    def _resolve_print_sheet_material_id(self) -> Optional[str]:
+    async def _resolve_print_sheet_material_id(self) -> Optional[str]:
         """Подставить material_id из каталога, если LLM передал несуществующий код."""
         for q in ["меловка 115", "115", "меловка", "мел"]:
-            r = self._execute_search_materials_single("print_sheet", q, "material")
+            r = await self._execute_search_materials_single("print_sheet", q, "material")
             if r.get("error"):
                 continue
             items = r.get("items") or []
@@ -1337,7 +1563,7 @@ class InsainAgent:
             out["width_mm"] = hm
         return out
 
-    def _normalize_print_sheet_calc_args(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def _normalize_print_sheet_calc_args(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Сайт/LLM иногда шлют color_mode вместо color; material_id — выдуманный snake_case."""
         out = dict(arguments)
         if "color_mode" in out and not (out.get("color") or "").strip():
@@ -1352,13 +1578,13 @@ class InsainAgent:
                 out["color"] = cm
         mid = str(out.get("material_id") or "").strip()
         if self._material_id_looks_suspicious(mid):
-            resolved = self._resolve_print_sheet_material_id()
+            resolved = await self._resolve_print_sheet_material_id()
             if resolved:
                 logger.info("print_sheet: заменён подозрительный material_id %r → %r", mid, resolved)
                 out["material_id"] = resolved
         return out
 
-    def _calc_args_for_display_and_storage(
+    async def _calc_args_for_display_and_storage(
         self, calc_tool_name: str, raw_args: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Те же правки, что перед POST в calc, чтобы контекст и текст ответа не содержали выдуманный id."""
@@ -1366,22 +1592,31 @@ class InsainAgent:
             return dict(raw_args)
         cslug = calc_tool_name[5:]
         if cslug == "print_sheet":
-            return self._normalize_print_sheet_calc_args(dict(raw_args))
+            return await self._normalize_print_sheet_calc_args(dict(raw_args))
         if cslug == "metal_pins":
             return self._normalize_metal_pins_calc_args(dict(raw_args))
         return dict(raw_args)
 
     def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Синхронная обёртка над aexecute_tool (скрипты, тесты)."""
+        return run_sync(self.aexecute_tool(tool_name, arguments), self.aclose)
+
+    def _search_knowledge(self, query: str) -> Dict[str, Any]:
+        results = self.kb.search(query, limit=5)
+        if not results:
+            return {"message": "По запросу ничего не найдено в базе знаний.", "results": []}
+        context = self.kb.get_context(query, results=results)
+        return {"results": results, "context": context}
+
+    async def aexecute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         if tool_name == "search_knowledge":
             query = (arguments.get("query") or "").strip()
             if not query:
                 return {"error": "Укажи запрос для поиска в базе знаний.", "results": []}
             logger.info("execute_tool: search_knowledge query=%r", query)
-            results = self.kb.search(query, limit=5)
-            if not results:
-                return {"message": "По запросу ничего не найдено в базе знаний.", "results": []}
-            context = self.kb.get_context(query)
-            return {"results": results, "context": context}
+            # Пустая база при поиске загружается из Wiki API (сеть, файлы, threading.Lock) —
+            # не в цикле событий бота
+            return await asyncio.to_thread(self._search_knowledge, query)
 
         if tool_name == "search_materials":
             slug = (arguments.get("slug") or "").strip()
@@ -1390,7 +1625,7 @@ class InsainAgent:
             if not slug:
                 return {"error": "Укажи slug калькулятора", "items": []}
             logger.info("execute_tool: search_materials slug=%s query=%r param=%s", slug, query, param)
-            return self._execute_search_materials(slug, query, param)
+            return await self._execute_search_materials(slug, query, param)
 
         slug = tool_name
         if slug.startswith("calc_"):
@@ -1403,15 +1638,14 @@ class InsainAgent:
         try:
             payload = dict(arguments)
             if slug == "print_sheet":
-                payload = self._normalize_print_sheet_calc_args(payload)
+                payload = await self._normalize_print_sheet_calc_args(payload)
             elif slug == "metal_pins":
                 payload = self._normalize_metal_pins_calc_args(payload)
-            with httpx.Client(timeout=HTTP_TIMEOUT) as client:
-                r = client.post(f"{self.calc_api_url}/api/v1/calc/{slug}", json=payload)
-                r.raise_for_status()
-                result = r.json()
-                logger.info("tool result keys: %s", list(result.keys()))
-                return result
+            r = await self._calc_http.post(f"{self.calc_api_url}/api/v1/calc/{slug}", json=payload)
+            r.raise_for_status()
+            result = r.json()
+            logger.info("tool result keys: %s", list(result.keys()))
+            return result
         except httpx.HTTPStatusError as e:
             if e.response.status_code in (400, 422):
                 try:
@@ -1466,11 +1700,55 @@ class InsainAgent:
             logger.exception("execute_tool: %s", e)
             return {"error": str(e)}
 
+    async def _execute_tool_calls(
+        self, tool_calls: List[Dict[str, Any]]
+    ) -> List[tuple[str, str, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Выполнить tool_calls одного ответа модели одновременно (не больше
+        TOOL_CALLS_CONCURRENCY сразу): аргументы вызовов модель сформировала до
+        результатов, значит вызовы независимы. Возвращает (tool_call_id, имя,
+        аргументы, результат) в порядке tool_calls.
+        """
+        calls: List[tuple[str, str, Dict[str, Any]]] = []
+        for i, tc in enumerate(tool_calls):
+            name = tc["function"]["name"]
+            try:
+                args_str = tc["function"].get("arguments") or "{}"
+                args = json.loads(args_str) if isinstance(args_str, str) else args_str
+            except json.JSONDecodeError:
+                args = {}
+            calls.append((tc.get("id", f"tc_{i}"), name, args))
+
+        semaphore = asyncio.Semaphore(TOOL_CALLS_CONCURRENCY)
+
+        async def run(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.aexecute_tool(name, args)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(run(name, args) for _, name, args in calls))
+        logger.info(
+            "tool_calls: %s за %.0f мс (%s)",
+            len(calls),
+            (time.perf_counter() - started) * 1000,
+            ", ".join(name for _, name, _ in calls),
+        )
+        return [(tc_id, name, args, result) for (tc_id, name, args), result in zip(calls, results)]
+
     def chat(
         self,
         user_message: str,
         history: Optional[List[Dict[str, Any]]] = None,
         user_id: int = 0,
+    ) -> str:
+        """Синхронная обёртка над achat (скрипты, тесты); в цикле событий — await achat()."""
+        return run_sync(self.achat(user_message, history, user_id), self.aclose)
+
+    async def achat(
+        self,
+        user_message: str,
+        history: Optional[List[Dict[str, Any]]] = None,
+        user_id: int = 0,
     ) -> str:
         history = history or []
         if len(history) > MAX_HISTORY_MESSAGES:
@@ -1483,7 +1761,7 @@ class InsainAgent:
         intent = "calculator"
         slug: Optional[str] = None
         if AGENT_USE_ROUTER:
-            intent, slug = self._router_classify(user_message, history, user_id=user_id)
+            intent, slug = await self._router_classify(user_message, history, user_id=user_id)
             intent, slug = self._router_apply_context_override(
                 intent, slug, user_message, user_id, history
             )
@@ -1494,12 +1772,26 @@ class InsainAgent:
             system_prompt = build_calc_system_prompt_full(self._calculators)
 
         if AGENT_USE_ROUTER and intent == "calculator" and slug == "print_sheet":
-            forced_choice = self._try_force_print_sheet_material_choice(
+            forced_choice = await self._try_force_print_sheet_material_choice(
                 user_message, history, user_id
             )
             if forced_choice is not None:
                 return self.sanitize_llm_reply_for_display(forced_choice)
 
+        # Ответы по базе знаний кэшируются; расчёты — никогда (цены зависят от живых данных)
+        knowledge_key = None
+        if intent == "knowledge":
+            text = self._cache_message(user_message)
+            if text:
+                # LLM отвечает с учётом истории — она в ключе целиком (хэш), иначе ответ,
+                # данный внутри чужого диалога, ушёл бы другому пользователю
+                knowledge_key = (text, version_hash(system_prompt, tools), version_hash(history), self.kb.generation)
+                cached = self._knowledge_cache.get(knowledge_key)
+                if cached is not None:
+                    reply, tokens = cached
+                    self._log_cache_hit("knowledge", tokens, user_id)
+                    return reply
+
         messages: List[Dict[str, Any]] = [
             {"role": "system", "content": system_prompt},
             *history,
@@ -1507,16 +1799,18 @@ class InsainAgent:
         ]
 
         try:
-            result = self.llm.chat(messages, tools=tools)
+            result = await self.llm.achat(messages, tools=tools)
         except Exception as e:
             logger.exception("LLM error: %s", e)
             return "Произошла ошибка, попробуйте переформулировать запрос."
+        spent_tokens = int(result.get("tokens_estimate") or 0)
+        searched_knowledge = False
 
         content = result.get("content")
         tool_calls = result.get("tool_calls")
 
         if not tool_calls:
-            forced = self._try_forced_calc(intent, slug, user_message, user_id, history)
+            forced = await self._try_forced_calc(intent, slug, user_message, user_id, history)
             if forced is not None:
                 return self.sanitize_llm_reply_for_display(forced.strip())
             return self.sanitize_llm_reply_for_display(
@@ -1541,16 +1835,8 @@ class InsainAgent:
             calc_args: Dict[str, Any] = {}
             calc_result = None
 
-            for tc in tool_calls:
-                name = tc["function"]["name"]
-                try:
-                    args_str = tc["function"].get("arguments") or "{}"
-                    args = json.loads(args_str) if isinstance(args_str, str) else args_str
-                except json.JSONDecodeError:
-                    args = {}
-
-                tool_result = self.execute_tool(name, args)
-                tc_id = tc.get("id", f"tc_{tool_calls.index(tc)}")
+            for tc_id, name, args, tool_result in await self._execute_tool_calls(tool_calls):
+                searched_knowledge = searched_knowledge or (name == "search_knowledge" and "error" not in tool_result)
                 messages.append({
                     "role": "tool",
                     "tool_call_id": tc_id,
@@ -1563,7 +1849,7 @@ class InsainAgent:
                     calc_result = tool_result
 
             if calc_tool_name and calc_result is not None:
-                display_args = self._calc_args_for_display_and_storage(calc_tool_name, calc_args)
+                display_args = await self._calc_args_for_display_and_storage(calc_tool_name, calc_args)
                 if "error" not in calc_result:
                     cslug = calc_tool_name[5:] if calc_tool_name.startswith("calc_") else calc_tool_name
                     self._user_calc_context[user_id] = {
@@ -1572,21 +1858,26 @@ class InsainAgent:
                         "params": dict(display_args),
                     }
                 return self.sanitize_llm_reply_for_display(
-                    self._format_calc_result(calc_tool_name, display_args, calc_result)
+                    await self._aformat_calc_result(calc_tool_name, display_args, calc_result)
                 )
 
             try:
-                result = self.llm.chat(messages, tools=tools)
+                result = await self.llm.achat(messages, tools=tools)
             except Exception as e:
                 logger.exception("LLM follow-up error: %s", e)
                 return "Произошла ошибка при обработке ответа."
+            spent_tokens += int(result.get("tokens_estimate") or 0)
             content = result.get("content")
             tool_calls = result.get("tool_calls") or []
 
-        return self.sanitize_llm_reply_for_display(
+        reply = self.sanitize_llm_reply_for_display(
             (content or "").strip()
             or "Не удалось выполнить расчёт. Попробуйте уточнить параметры."
         )
+        # В кэш — только законченный ответ, опирающийся на результат search_knowledge
+        if knowledge_key is not None and searched_knowledge and (content or "").strip() and not tool_calls:
+            self._knowledge_cache.put(knowledge_key, reply, spent_tokens)
+        return reply
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""
+Доля решений пре-роутера и совпадение с LLM-роутером на записанном трафике.
+
+Живой трафик: записи pre_route из лога токенов (logs/token_usage.jsonl) — агент
+пишет решение пре-роутера по каждому сообщению; доля пропусков LLM-роутера считается
+по ним. Совпадение — по записям теневого режима (PRE_ROUTER_SHADOW_RATE > 0), где
+то же сообщение в фоне ушло и LLM-роутеру.
+
+Повтор: вызовы LLM-роутера из лога (единственный tool — route_request) прогоняются
+через текущий PreRouter и сравниваются с решением LLM из debug.response — для подбора
+порогов на логах до включения пре-роутера. Контекст расчёта пользователя в логе не
+хранится, поэтому продолжения расчёта («200 шт» с активным расчётом) здесь не
+засчитываются.
+
+Использование:
+    python analyze_pre_router.py logs/token_usage.jsonl
+    python analyze_pre_router.py logs/token_usage.jsonl --calculators calculators.json --show 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pre_router import PreRouter
+
+USER_MESSAGE_PREFIX = "Текущее сообщение пользователя:\n"
+USER_MESSAGE_END = "\n\nКонтекст диалога"
+
+Route = Tuple[str, Optional[str]]
+
+
+def _entries(logfile: Path) -> Iterator[Dict[str, Any]]:
+    with logfile.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def pre_routes(logfile: Path) -> Iterator[Dict[str, Any]]:
+    """Записи пре-роутера (TokenAnalyzer.log_pre_route)."""
+    for entry in _entries(logfile):
+        if isinstance(entry.get("pre_route"), dict):
+            yield entry["pre_route"]
+
+
+def router_calls(logfile: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(сообщение пользователя, ответ LLM) для каждого вызова роутера с ответом."""
+    for entry in _entries(logfile):
+        debug = entry.get("debug") or {}
+        tools = debug.get("tools") or []
+        names = [(t.get("function") or {}).get("name") for t in tools]
+        if names != ["route_request"] or "response" not in debug:
+            continue
+        messages = debug.get("messages") or []
+        content = str((messages[-1] if messages else {}).get("content") or "")
+        if not content.startswith(USER_MESSAGE_PREFIX):
+            continue
+        message = content[len(USER_MESSAGE_PREFIX) :].split(USER_MESSAGE_END, 1)[0]
+        yield message, debug["response"]
+
+
+def load_calculators(path: Optional[str]) -> List[Dict[str, Any]]:
+    if path:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    import httpx
+
+    from agent import CALC_API_URL, CALC_HEADERS
+
+    r = httpx.get(f"{CALC_API_URL}/api/v1/calculators", headers=CALC_HEADERS, timeout=15.0)
+    r.raise_for_status()
+    return r.json()
+
+
+def _print_disagreements(disagreements: List[Tuple[str, Route, Route]], show: int) -> None:
+    by_pair = Counter((local, llm) for _, local, llm in disagreements)
+    for (local, llm), n in by_pair.most_common(show):
+        example = next(m for m, lo, ll in disagreements if (lo, ll) == (local, llm))
+        print(f"  {n}× локально {local} ≠ LLM {llm}: {example[:80]!r}")
+
+
+def report_live(logfile: Path, show: int) -> None:
+    """Живой трафик: доля решённых локально и совпадение в теневом режиме."""
+    entries = list(pre_routes(logfile))
+    print(f"Сообщений через пре-роутер: {len(entries)}")
+    if not entries:
+        return
+    decided = [e for e in entries if e.get("decided")]
+    reasons = Counter(e.get("reason") for e in decided)
+    print(f"Решено локально: {len(decided)} ({100.0 * len(decided) / len(entries):.1f}%) {dict(reasons)}")
+    shadow = [e for e in decided if isinstance(e.get("llm"), dict)]
+    if not shadow:
+        print("Теневых проверок нет (PRE_ROUTER_SHADOW_RATE=0)")
+        return
+    disagreements: List[Tuple[str, Route, Route]] = []
+    for e in shadow:
+        local = (e.get("intent"), e.get("slug"))
+        llm = (e["llm"].get("intent"), e["llm"].get("slug"))
+        if local != llm:
+            disagreements.append((str(e.get("message") or ""), local, llm))
+    agreed = len(shadow) - len(disagreements)
+    print(f"Совпадение с LLM (теневой режим): {agreed}/{len(shadow)} ({100.0 * agreed / len(shadow):.1f}%)")
+    _print_disagreements(disagreements, show)
+
+
+def report_replay(logfile: Path, calculators: Optional[str], show: int) -> None:
+    """Повтор: текущий PreRouter на сообщениях, которые решал LLM-роутер."""
+    calls = list(router_calls(logfile))
+    print(f"Вызовов роутера: {len(calls)}")
+    if not calls:
+        return
+
+    from agent import InsainAgent
+
+    router = PreRouter(load_calculators(calculators))
+    agreed = 0
+    disagreements: List[Tuple[str, Route, Route]] = []
+    for message, response in calls:
+        route = router.classify(message)
+        if route is None:
+            continue
+        local = (route.intent, route.slug)
+        llm = InsainAgent._parse_router_result(response)
+        if local == llm:
+            agreed += 1
+        else:
+            disagreements.append((message, local, llm))
+
+    decided = len(calls) - router.deferred
+    print(f"Решено локально: {decided} ({100.0 * decided / len(calls):.1f}%) {dict(router.decided)}")
+    if decided:
+        print(f"Совпадение с LLM: {agreed}/{decided} ({100.0 * agreed / decided:.1f}%)")
+    _print_disagreements(disagreements, show)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Пре-роутер против LLM-роутера на логах.")
+    parser.add_argument("logfile", help="Путь к JSONL-файлу с логами (token_usage.jsonl)")
+    parser.add_argument(
+        "--calculators",
+        help="JSON со списком калькуляторов для повтора (по умолчанию — GET /api/v1/calculators)",
+    )
+    parser.add_argument("--show", type=int, default=10, help="Сколько расхождений показать")
+    args = parser.parse_args(argv)
+
+    logfile = Path(args.logfile)
+    print("== Живой трафик")
+    report_live(logfile, args.show)
+    print("== Повтор на вызовах LLM-роутера")
+    report_replay(logfile, args.calculators, args.show)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Долгоживущие асинхронные клиенты (httpx.AsyncClient, AsyncOpenAI) с пулом соединений.
+
+Клиент создаётся при первом обращении внутри цикла событий и переиспользуется
+всеми запросами этого цикла (keep-alive, без нового TCP-соединения на вызов).
+Соединения клиента привязаны к циклу, поэтому при обращении из другого цикла
+(синхронные обёртки — asyncio.run() на вызов) создаётся новый клиент.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LoopBoundClient(Generic[T]):
+    """Ленивый клиент на цикл событий: get() — текущий клиент, aclose() — закрыть его."""
+
+    def __init__(self, factory: Callable[[], T]) -> None:
+        self._factory = factory
+        self._client: Optional[T] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> T:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = self._factory()
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        """Закрыть клиент, если он создан в текущем цикле (клиент чужого цикла просто забывается)."""
+        client, loop = self._client, self._loop
+        self._client = self._loop = None
+        if client is None or loop is not asyncio.get_running_loop():
+            return
+        close: Callable[[], Any] = getattr(client, "aclose", None) or getattr(client, "close")
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+
+
+def run_sync(coro: Awaitable[T], *closers: Callable[[], Awaitable[None]]) -> T:
+    """
+    Выполнить корутину из синхронного кода (скрипты, тесты) в собственном цикле
+    событий; после неё вызвать closers — закрыть клиенты, созданные в этом цикле.
+    """
+
+    async def run() -> T:
+        try:
+            return await coro
+        finally:
+            for close in closers:
+                await close()
+
+    return asyncio.run(run())
@@ -148,16 +148,13 @@ async def handle_text(message: Message):
 
     await bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING)
 
-    # История диалога для LLM (используется agent.chat)
+    # История диалога для LLM (используется agent.achat)
     history = user_histories.get(user_id) or []
 
     try:
-        loop = asyncio.get_event_loop()
-        reply = await loop.run_in_executor(
-            None, lambda: agent.chat(text, history=history, user_id=user_id)
-        )
+        reply = await agent.achat(text, history=history, user_id=user_id)
     except Exception as e:
-        logger.exception("agent.chat error: %s", e)
+        logger.exception("agent.achat error: %s", e)
         await message.answer("Произошла ошибка, попробуйте ещё раз.", parse_mode="HTML")
         return
 
@@ -183,9 +180,14 @@ async def main():
     if not TELEGRAM_TOKEN:
         raise SystemExit("Задайте TELEGRAM_TOKEN в .env")
     logger.info("CALC_API_URL=%s ALLOWED_USERS=%s", CALC_API_URL, ALLOWED_USERS or "all")
-    await dp.start_polling(bot)
+    # База знаний загружается до приёма сообщений (свежий кэш — без запросов к Wiki),
+    # чтобы первый search_knowledge не ждал Wiki API
+    await asyncio.to_thread(agent.kb.refresh)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await agent.aclose()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
@@ -48,7 +48,7 @@ def main() -> int:
 
     sys.path.insert(0, str(calc_dir))
     try:
-        from calculators import CALCULATORS
+        from calculators import public_slugs
     except ImportError as e:
         print(f"Импорт calc_service: {e}", file=sys.stderr)
         return 1
@@ -62,11 +62,8 @@ def main() -> int:
     base = os.getenv("CALC_API_URL", "http://localhost:8001").strip().rstrip("/")
     print(f"CALC_API_URL = {base}\n")
 
-    local_public = {
-        slug
-        for slug, calc in CALCULATORS.items()
-        if getattr(calc, "is_public", True)
-    }
+    # Статический реестр: модули калькуляторов и справочники data/ не загружаются
+    local_public = set(public_slugs())
 
     try:
         r = httpx.get(f"{base}/api/v1/calculators", timeout=30.0)
@@ -1,9 +1,13 @@
 """
 База знаний: кэш статей Wiki + поиск по ключевым словам.
 
-Этап 1: простой keyword-based поиск по текстовым фрагментам.
+Этап 1: поиск BM25 по инвертированному индексу (заголовок и теги весят больше текста).
 Этап 2 (будущее): pgvector + эмбеддинги для семантического поиска.
 
+Индекс строится при загрузке статей (refresh(), _load_cache()) и сохраняется рядом
+с кэшем статей (kb_cache.index.json): после перезапуска он берётся из файла, если
+совпадает отпечаток статей. Запрос читает только списки статей по своим токенам.
+
 Источники данных (приоритет):
 1. Yandex Wiki API (если настроен WIKI_OAUTH_TOKEN)
 2. Локальные markdown-файлы из wiki_export/
@@ -15,14 +19,18 @@
 
 from __future__ import annotations
 
+import hashlib
+import heapq
 import json
 import logging
+import math
 import os
 import re
 import threading
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from wiki_parser import WikiArticle, YandexWikiParser
 
@@ -43,15 +51,26 @@ KB_CACHE_FILE = PROJECT_ROOT / "data" / "kb_cache.json"
 KB_REFRESH_HOURS = int(os.getenv("KB_REFRESH_HOURS", "6") or "6")
 KB_MAX_CONTEXT_CHARS = 6000
 
+# BM25: насыщение частоты термина и нормировка на длину статьи
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Вес вхождения токена по полям статьи (BM25F: взвешенная частота и длина)
+FIELD_BOOSTS = {"title": 3.0, "tags": 2.0, "content": 1.0}
+# Меняется при изменении формата индекса или токенизации — старый файл индекса игнорируется
+KB_INDEX_VERSION = 1
+
 
 def _tokenize(text: str) -> List[str]:
     """Простая токенизация: lowercase, слова >= 2 символов."""
     return [w for w in re.findall(r"[а-яёa-z0-9]+", text.lower()) if len(w) >= 2]
 
 
-def _snippet(text: str, query_tokens: List[str], max_len: int = 400) -> str:
-    """Извлечь фрагмент текста вокруг первого совпадения с query."""
-    text_lower = text.lower()
+def _snippet(
+    text: str, query_tokens: List[str], max_len: int = 400, text_lower: Optional[str] = None
+) -> str:
+    """Извлечь фрагмент текста вокруг первого совпадения с query (text_lower — готовый text.lower())."""
+    if text_lower is None:
+        text_lower = text.lower()
     best_pos = len(text)
     for tok in query_tokens:
         pos = text_lower.find(tok)
@@ -71,6 +90,91 @@ def _snippet(text: str, query_tokens: List[str], max_len: int = 400) -> str:
     return snippet
 
 
+def _fingerprint(articles: Iterable[WikiArticle]) -> str:
+    """Отпечаток статей: индекс из файла годится, только если статьи те же."""
+    h = hashlib.sha1(str(KB_INDEX_VERSION).encode())
+    for a in articles:
+        for part in (a.slug, a.title, "\x1f".join(a.tags), a.content):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x1e")
+    return h.hexdigest()
+
+
+class _BM25Index:
+    """
+    Инвертированный индекс статей: токен → [(номер статьи, взвешенная частота)].
+
+    Вместе со статьями хранит slug → статья и текст статей в нижнем регистре (для
+    сниппетов), поэтому подменяется одной ссылкой (KnowledgeBase._index).
+    """
+
+    def __init__(
+        self,
+        articles: List[WikiArticle],
+        postings: Dict[str, List[Tuple[int, float]]],
+        doc_len: List[float],
+        fingerprint: str,
+    ) -> None:
+        self.articles = articles
+        self.postings = postings
+        self.doc_len = doc_len
+        self.fingerprint = fingerprint
+        self.avgdl = (sum(doc_len) / len(doc_len)) if doc_len else 0.0
+        self.by_slug: Dict[str, WikiArticle] = {a.slug: a for a in articles}
+        self.content_lower: Dict[str, str] = {a.slug: a.content.lower() for a in articles}
+
+    @classmethod
+    def build(cls, articles: List[WikiArticle], fingerprint: Optional[str] = None) -> "_BM25Index":
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        doc_len: List[float] = []
+        for i, a in enumerate(articles):
+            tf: Counter = Counter()
+            length = 0.0
+            for field, text in (("title", a.title), ("tags", " ".join(a.tags)), ("content", a.content)):
+                tokens = _tokenize(text)
+                boost = FIELD_BOOSTS[field]
+                length += boost * len(tokens)
+                for tok in tokens:
+                    tf[tok] += boost
+            doc_len.append(length)
+            for tok, freq in tf.items():
+                postings.setdefault(tok, []).append((i, freq))
+        return cls(articles, postings, doc_len, fingerprint or _fingerprint(articles))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": KB_INDEX_VERSION,
+            "fingerprint": self.fingerprint,
+            "doc_len": self.doc_len,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], articles: List[WikiArticle], fingerprint: str) -> Optional["_BM25Index"]:
+        """Индекс из файла или None, если он от других статей или другой версии."""
+        if data.get("version") != KB_INDEX_VERSION or data.get("fingerprint") != fingerprint:
+            return None
+        doc_len = [float(x) for x in data.get("doc_len") or []]
+        if len(doc_len) != len(articles):
+            return None
+        postings = {tok: [(int(i), float(f)) for i, f in plist] for tok, plist in (data.get("postings") or {}).items()}
+        return cls(articles, postings, doc_len, fingerprint)
+
+    def search(self, query_tokens: Sequence[str], limit: int) -> List[Tuple[int, float]]:
+        """(номер статьи, балл BM25) лучших limit статей; читаются только списки токенов запроса."""
+        n = len(self.articles)
+        scores: Dict[int, float] = {}
+        for tok, qtf in Counter(query_tokens).items():
+            plist = self.postings.get(tok)
+            if not plist:
+                continue
+            idf = math.log(1.0 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+            for i, tf in plist:
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_len[i] / (self.avgdl or 1.0))
+                scores[i] = scores.get(i, 0.0) + qtf * idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        return heapq.nlargest(limit, scores.items(), key=lambda x: (x[1], -x[0]))
+
+
 class KnowledgeBase:
     """
     База знаний для LLM-агента.
@@ -78,7 +182,7 @@ class KnowledgeBase:
     Поддерживает:
     - Загрузка из Yandex Wiki API
     - Загрузка из локальных .md файлов
-    - Keyword-based поиск
+    - Поиск BM25 по инвертированному индексу
     - Генерация контекста для LLM
     """
 
@@ -91,15 +195,49 @@ class KnowledgeBase:
         self._parser = wiki_parser or YandexWikiParser()
         self._local_dir = Path(local_dir or KB_LOCAL_DIR)
         self._cache_file = cache_file or KB_CACHE_FILE
-        self._articles: List[WikiArticle] = []
+        self._index_file = self._cache_file.with_name(self._cache_file.stem + ".index.json")
+        self._index = _BM25Index.build([])
         self._last_refresh: Optional[datetime] = None
+        # Растёт при каждой замене статей (refresh) — часть ключа кэша ответов агента
+        self.generation = 0
         self._lock = threading.Lock()
         self._load_cache()
 
+    @property
+    def _articles(self) -> List[WikiArticle]:
+        return self._index.articles
+
+    @_articles.setter
+    def _articles(self, articles: List[WikiArticle]) -> None:
+        self._index = _BM25Index.build(list(articles))
+
     @property
     def article_count(self) -> int:
         return len(self._articles)
 
+    def _load_index(self, articles: List[WikiArticle]) -> _BM25Index:
+        """Индекс из файла рядом с кэшем; если его нет или он устарел — построить и сохранить."""
+        fingerprint = _fingerprint(articles)
+        if self._index_file.is_file():
+            try:
+                data = json.loads(self._index_file.read_text(encoding="utf-8"))
+                index = _BM25Index.from_dict(data, articles, fingerprint)
+                if index is not None:
+                    return index
+                logger.info("KB: индекс устарел, перестраивается.")
+            except Exception as e:
+                logger.warning("KB: ошибка загрузки индекса: %s", e)
+        index = _BM25Index.build(articles, fingerprint)
+        self._save_index(index)
+        return index
+
+    def _save_index(self, index: _BM25Index) -> None:
+        try:
+            self._index_file.parent.mkdir(parents=True, exist_ok=True)
+            self._index_file.write_text(json.dumps(index.to_dict(), ensure_ascii=False), encoding="utf-8")
+        except Exception as e:
+            logger.warning("KB: ошибка сохранения индекса: %s", e)
+
     def _load_cache(self) -> None:
         """Загрузить кэш из файла, если он свежий."""
         if not self._cache_file.is_file():
@@ -116,6 +254,7 @@ class KnowledgeBase:
                 self._last_refresh = refreshed_dt
 
             articles_raw = data.get("articles") or []
+            articles: List[WikiArticle] = []
             for a in articles_raw:
                 updated = a.get("updated_at")
                 updated_dt = None
@@ -124,13 +263,14 @@ class KnowledgeBase:
                         updated_dt = datetime.fromisoformat(updated)
                     except (ValueError, TypeError):
                         pass
-                self._articles.append(WikiArticle(
+                articles.append(WikiArticle(
                     slug=a.get("slug", ""),
                     title=a.get("title", ""),
                     content=a.get("content", ""),
                     updated_at=updated_dt,
                     tags=a.get("tags") or [],
                 ))
+            self._index = self._load_index(articles)
             logger.info("KB: загружено %d статей из кэша.", len(self._articles))
         except Exception as e:
             logger.warning("KB: ошибка загрузки кэша: %s", e)
@@ -147,6 +287,8 @@ class KnowledgeBase:
             logger.info("KB: кэш сохранён (%d статей).", len(self._articles))
         except Exception as e:
             logger.warning("KB: ошибка сохранения кэша: %s", e)
+            return
+        self._save_index(self._index)
 
     def _load_local_files(self) -> List[WikiArticle]:
         """Загрузить статьи из локальных .md файлов."""
@@ -206,6 +348,7 @@ class KnowledgeBase:
                     articles.append(la)
 
             self._articles = articles
+            self.generation += 1
             self._last_refresh = datetime.now(timezone.utc).replace(tzinfo=None)
             self._save_cache()
 
@@ -214,43 +357,27 @@ class KnowledgeBase:
 
     def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """
-        Keyword-based поиск по базе знаний.
+        Поиск BM25 по базе знаний (заголовок и теги весят больше текста).
 
         Возвращает список найденных статей с релевантностью.
         """
         if not self._articles:
             self.refresh()
 
-        if not self._articles:
+        index = self._index
+        if not index.articles:
             return []
 
         query_tokens = _tokenize(query)
         if not query_tokens:
-            return [{"slug": a.slug, "title": a.title, "score": 0} for a in self._articles[:limit]]
-
-        scored: List[tuple] = []
-        for article in self._articles:
-            text = f"{article.title} {article.content}".lower()
-            text_tokens = set(_tokenize(text))
-            score = 0
-            for qt in query_tokens:
-                if qt in text_tokens:
-                    score += 1
-                    count = text.count(qt)
-                    score += min(count, 5) * 0.2
-                if qt in article.title.lower():
-                    score += 2
-                for tag in article.tags:
-                    if qt in tag.lower():
-                        score += 1.5
-            if score > 0:
-                scored.append((article, score))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
+            return [{"slug": a.slug, "title": a.title, "score": 0} for a in index.articles[:limit]]
 
         results = []
-        for article, score in scored[:limit]:
-            snippet = _snippet(article.content, query_tokens, max_len=300)
+        for i, score in index.search(query_tokens, limit):
+            article = index.articles[i]
+            snippet = _snippet(
+                article.content, query_tokens, max_len=300, text_lower=index.content_lower.get(article.slug)
+            )
             results.append({
                 "slug": article.slug,
                 "title": article.title,
@@ -261,27 +388,36 @@ class KnowledgeBase:
 
         return results
 
-    def get_context(self, query: str, max_chars: int = KB_MAX_CONTEXT_CHARS) -> str:
+    def get_context(
+        self,
+        query: str,
+        max_chars: int = KB_MAX_CONTEXT_CHARS,
+        results: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
         """
         Сформировать контекст из базы знаний для LLM.
 
+        results — уже выполненный search(query), чтобы не искать второй раз.
         Возвращает текстовый блок с релевантными статьями.
         """
-        results = self.search(query, limit=5)
+        if results is None:
+            results = self.search(query, limit=5)
         if not results:
             return ""
 
+        index = self._index
+        query_tokens = _tokenize(query)
         chunks: List[str] = []
         total_chars = 0
 
         for r in results:
-            slug = r["slug"]
-            article = next((a for a in self._articles if a.slug == slug), None)
+            article = index.by_slug.get(r["slug"])
             if not article or not article.content:
                 continue
 
-            query_tokens = _tokenize(query)
-            snippet = _snippet(article.content, query_tokens, max_len=1200)
+            snippet = _snippet(
+                article.content, query_tokens, max_len=1200, text_lower=index.content_lower.get(article.slug)
+            )
             header = f"## {article.title}\n"
             chunk = header + snippet
 
@@ -12,10 +12,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
@@ -41,7 +42,9 @@ def _load_env() -> None:
 
 _load_env()
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from async_clients import LoopBoundClient
 
 from token_analyzer import TokenAnalyzer
 
@@ -108,19 +111,15 @@ class YandexGPTProvider:
         self.folder_id = (folder_id or YANDEX_FOLDER_ID).strip()
         self.model_uri = (model_uri or YANDEX_MODEL).strip()
         self.timeout = timeout
+        self._http: LoopBoundClient[httpx.AsyncClient] = LoopBoundClient(
+            lambda: httpx.AsyncClient(timeout=self.timeout)
+        )
 
     def _is_available(self) -> bool:
         return bool(self.api_key and self.model_uri)
 
-    def chat(
-        self,
-        messages: List[Dict[str, Any]],
-        tools: Optional[List[Dict[str, Any]]] = None,
-    ) -> Dict[str, Any]:
-        """
-        Запрос к YandexGPT. tools игнорируются (API не поддерживает их в том же формате).
-        Возвращает {"content": str|None, "tool_calls": None}.
-        """
+    def _request(self, messages: List[Dict[str, Any]]) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
+        """(тело, заголовки) запроса к YandexGPT; None — нечего отправлять."""
         if not self._is_available():
             raise ValueError(
                 "YandexGPT недоступен: задайте YANDEX_API_KEY, YANDEX_FOLDER_ID и YANDEX_MODEL в .env"
@@ -143,7 +142,7 @@ class YandexGPTProvider:
             yandex_messages.append({"role": role, "text": text})
 
         if not yandex_messages:
-            return {"content": None, "tool_calls": None}
+            return None
 
         body = {
             "modelUri": self.model_uri,
@@ -160,19 +159,10 @@ class YandexGPTProvider:
         }
 
         logger.info("YandexGPT request: messages=%s", len(yandex_messages))
+        return body, headers
 
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                r = client.post(YANDEX_COMPLETION_URL, json=body, headers=headers)
-                r.raise_for_status()
-                data = r.json()
-        except httpx.HTTPStatusError as e:
-            logger.warning("YandexGPT API error: %s", e)
-            raise RuntimeError(f"YandexGPT: {e.response.text or str(e)}") from e
-        except Exception as e:
-            logger.exception("YandexGPT request error: %s", e)
-            raise RuntimeError(f"YandexGPT: {e}") from e
-
+    @staticmethod
+    def _response(data: Dict[str, Any]) -> Dict[str, Any]:
         # result.alternatives[0].message.text
         result = data.get("result") or {}
         alternatives = result.get("alternatives") or []
@@ -182,6 +172,57 @@ class YandexGPTProvider:
         logger.info("YandexGPT response: content_len=%s", len(text))
         return {"content": text.strip() or None, "tool_calls": None}
 
+    @staticmethod
+    def _error(e: Exception) -> RuntimeError:
+        if isinstance(e, httpx.HTTPStatusError):
+            logger.warning("YandexGPT API error: %s", e)
+            return RuntimeError(f"YandexGPT: {e.response.text or str(e)}")
+        logger.exception("YandexGPT request error: %s", e)
+        return RuntimeError(f"YandexGPT: {e}")
+
+    def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Запрос к YandexGPT. tools игнорируются (API не поддерживает их в том же формате).
+        Возвращает {"content": str|None, "tool_calls": None}.
+        """
+        request = self._request(messages)
+        if request is None:
+            return {"content": None, "tool_calls": None}
+        body, headers = request
+        try:
+            with httpx.Client(timeout=self.timeout) as client:
+                r = client.post(YANDEX_COMPLETION_URL, json=body, headers=headers)
+                r.raise_for_status()
+                data = r.json()
+        except Exception as e:
+            raise self._error(e) from e
+        return self._response(data)
+
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Асинхронный chat() через общий httpx.AsyncClient (keep-alive)."""
+        request = self._request(messages)
+        if request is None:
+            return {"content": None, "tool_calls": None}
+        body, headers = request
+        try:
+            r = await self._http.get().post(YANDEX_COMPLETION_URL, json=body, headers=headers)
+            r.raise_for_status()
+            data = r.json()
+        except Exception as e:
+            raise self._error(e) from e
+        return self._response(data)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
 
 class LLMProvider:
     """
@@ -219,35 +260,46 @@ class LLMProvider:
             self.base_url = (base_url or GOOGLE_BASE_URL).rstrip("/") + "/"
         self.timeout = timeout
         self._client: Optional[OpenAI] = None
+        self._aclient: LoopBoundClient[AsyncOpenAI] = LoopBoundClient(
+            lambda: AsyncOpenAI(api_key=self._key(), base_url=self.base_url)
+        )
         self._fallback = fallback_provider if fallback_provider is not None else YandexGPTProvider()
         self.analyzer = TokenAnalyzer()
 
+    def _key(self) -> str:
+        key = self.api_key or os.getenv("GOOGLE_API_KEY", "").strip() or os.getenv("GEMINI_API_KEY", "").strip()
+        if not key:
+            raise ValueError(
+                "GOOGLE_API_KEY не задан. Добавьте в .env в корне проекта: GOOGLE_API_KEY=ваш_ключ"
+            )
+        return key
+
     @property
     def client(self) -> OpenAI:
         if self._client is None:
-            key = self.api_key or os.getenv("GOOGLE_API_KEY", "").strip() or os.getenv("GEMINI_API_KEY", "").strip()
-            if not key:
-                raise ValueError(
-                    "GOOGLE_API_KEY не задан. Добавьте в .env в корне проекта: GOOGLE_API_KEY=ваш_ключ"
-                )
             self._client = OpenAI(
-                api_key=key,
+                api_key=self._key(),
                 base_url=self.base_url,
             )
         return self._client
 
-    def chat(
+    @property
+    def aclient(self) -> AsyncOpenAI:
+        """AsyncOpenAI текущего цикла событий: один пул соединений на все запросы."""
+        return self._aclient.get()
+
+    async def aclose(self) -> None:
+        """Закрыть асинхронные клиенты, созданные в текущем цикле событий, и дописать лог токенов."""
+        await self._aclient.aclose()
+        await self._fallback.aclose()
+        await asyncio.to_thread(self.analyzer.flush)
+
+    def _request(
         self,
         messages: List[Dict[str, Any]],
-        tools: Optional[List[Dict[str, Any]]] = None,
-    ) -> Dict[str, Any]:
-        """
-        Один вызов chat completions.
-
-        :param messages: список {"role": "user"|"assistant"|"system", "content": "..."}
-        :param tools: опционально список tool definitions для function calling
-        :return: сообщение ответа: {"content": str|None, "tool_calls": list|None}
-        """
+        tools: Optional[List[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], str]:
+        """(kwargs для chat.completions.create, запись токен-аналитики, метка провайдера)."""
         kwargs: Dict[str, Any] = {
             "model": self.model,
             "messages": messages,
@@ -285,75 +337,141 @@ class LLMProvider:
                 "mode": self.mode,
             },
         )
+        return kwargs, request_log, provider_hint
+
+    @staticmethod
+    def _message(response: Any) -> Dict[str, Any]:
+        """Ответ OpenAI-совместимого API → {"content", "tool_calls"}."""
+        choice = (response.choices or [None])[0]
+        if not choice:
+            raise RuntimeError("Пустой ответ от модели")
+        msg = choice.message
+        out: Dict[str, Any] = {"content": None, "tool_calls": None}
+        if getattr(msg, "content", None):
+            out["content"] = msg.content
+        if getattr(msg, "tool_calls", None) and len(msg.tool_calls) > 0:
+            out["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": getattr(tc, "type", "function"),
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments,
+                    },
+                }
+                for tc in msg.tool_calls
+            ]
+        return out
+
+    def _use_fallback(self, e: Exception) -> bool:
+        # В смешанном режиме при любой ошибке Gemini пробуем YandexGPT
+        if self.mode == "mixed" and self._fallback._is_available():
+            logger.warning("Gemini error (mode=mixed), переключаюсь на YandexGPT: %s", e)
+            return True
+        return False
+
+    @staticmethod
+    def _error(e: Exception) -> Exception:
+        logger.exception("LLM API error: %s", e)
+        err_msg = str(e)
+        if "timeout" in err_msg.lower() or "timed out" in err_msg.lower():
+            return ConnectionError("Таймаут запроса к модели. Попробуйте позже.")
+        if "api_key" in err_msg.lower() or "401" in err_msg or "403" in err_msg:
+            return ValueError("Неверный или отсутствующий API-ключ LLM-провайдера (Gemini/AITunnel).")
+        return RuntimeError(f"Ошибка API: {err_msg}")
+
+    def _check_yandex(self, messages: List[Dict[str, Any]]) -> None:
+        logger.info("LLM request: mode=yandex, messages=%s", len(messages))
+        if not self._fallback._is_available():
+            raise ValueError("YandexGPT недоступен: проверьте YANDEX_API_KEY и YANDEX_FOLDER_ID в .env")
+
+    def _finish(
+        self,
+        out: Dict[str, Any],
+        request_log: Dict[str, Any],
+        used_provider: str,
+        save: Callable[[Dict[str, Any]], None],
+    ) -> Dict[str, Any]:
+        # обновляем провайдера в метаданных и логируем ответ (save — запись в файл сразу или в фоне)
+        request_log.setdefault("metadata", {})["provider"] = used_provider
+        full_log = self.analyzer.log_response(out, request_log)
+        save(full_log)
+        # Оценка токенов вызова — для кэша ответов агента (сколько сэкономит попадание)
+        out["tokens_estimate"] = int((full_log.get("total") or {}).get("total_tokens_estimate", 0))
+
+        logger.info(
+            "LLM response: provider=%s has_content=%s, tool_calls=%s",
+            used_provider,
+            out.get("content") is not None,
+            len(out.get("tool_calls") or []),
+        )
+        return out
 
-        used_provider = provider_hint
-        out: Dict[str, Any]
+    def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Один вызов chat completions.
 
+        :param messages: список {"role": "user"|"assistant"|"system", "content": "..."}
+        :param tools: опционально список tool definitions для function calling
+        :return: сообщение ответа: {"content": str|None, "tool_calls": list|None,
+                 "tokens_estimate": int}
+        """
+        kwargs, request_log, used_provider = self._request(messages, tools)
         try:
             # Режим "только Yandex" — сразу уходим в fallback
             if self.mode == "yandex":
-                logger.info("LLM request: mode=yandex, messages=%s", len(messages))
-                if not self._fallback._is_available():
-                    raise ValueError("YandexGPT недоступен: проверьте YANDEX_API_KEY и YANDEX_FOLDER_ID в .env")
+                self._check_yandex(messages)
                 out = self._fallback.chat(messages, tools=tools)
                 used_provider = "yandex"
             else:
                 logger.info("LLM request: mode=%s, model=%s, messages=%s", self.mode, self.model, len(messages))
                 try:
-                    response = self.client.chat.completions.create(**kwargs)
-                    choice = (response.choices or [None])[0]
-                    if not choice:
-                        raise RuntimeError("Пустой ответ от модели")
-                    msg = choice.message
-                    out = {"content": None, "tool_calls": None}
-                    if getattr(msg, "content", None):
-                        out["content"] = msg.content
-                    if getattr(msg, "tool_calls", None) and len(msg.tool_calls) > 0:
-                        out["tool_calls"] = [
-                            {
-                                "id": tc.id,
-                                "type": getattr(tc, "type", "function"),
-                                "function": {
-                                    "name": tc.function.name,
-                                    "arguments": tc.function.arguments,
-                                },
-                            }
-                            for tc in msg.tool_calls
-                        ]
+                    out = self._message(self.client.chat.completions.create(**kwargs))
                     used_provider = "gemini"
                 except Exception as e:
-                    # В смешанном режиме при любой ошибке Gemini пробуем YandexGPT
-                    if self.mode == "mixed" and self._fallback._is_available():
-                        logger.warning("Gemini error (mode=mixed), переключаюсь на YandexGPT: %s", e)
-                        out = self._fallback.chat(messages, tools=tools)
-                        used_provider = "yandex"
-                    else:
-                        logger.exception("LLM API error: %s", e)
-                        err_msg = str(e)
-                        if "timeout" in err_msg.lower() or "timed out" in err_msg.lower():
-                            raise ConnectionError("Таймаут запроса к модели. Попробуйте позже.") from e
-                        if "api_key" in err_msg.lower() or "401" in err_msg or "403" in err_msg:
-                            raise ValueError("Неверный или отсутствующий API-ключ LLM-провайдера (Gemini/AITunnel).") from e
-                        raise RuntimeError(f"Ошибка API: {err_msg}") from e
-
-            # обновляем провайдера в метаданных и логируем ответ
-            request_log.setdefault("metadata", {})["provider"] = used_provider
-            full_log = self.analyzer.log_response(out, request_log)
-            self.analyzer.save_to_file(full_log)
-
-            logger.info(
-                "LLM response: provider=%s has_content=%s, tool_calls=%s",
-                used_provider,
-                out.get("content") is not None,
-                len(out.get("tool_calls") or []),
-            )
-            return out
-
+                    if not self._use_fallback(e):
+                        raise self._error(e) from e
+                    out = self._fallback.chat(messages, tools=tools)
+                    used_provider = "yandex"
+            return self._finish(out, request_log, used_provider, self.analyzer.save_to_file)
         except Exception as e:
             request_log["error"] = str(e)
             self.analyzer.save_to_file(request_log)
             raise
 
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Асинхронный chat(): AsyncOpenAI и YandexGPT на долгоживущих клиентах с keep-alive."""
+        kwargs, request_log, used_provider = self._request(messages, tools)
+        try:
+            if self.mode == "yandex":
+                self._check_yandex(messages)
+                out = await self._fallback.achat(messages, tools=tools)
+                used_provider = "yandex"
+            else:
+                logger.info("LLM request: mode=%s, model=%s, messages=%s", self.mode, self.model, len(messages))
+                try:
+                    out = self._message(await self.aclient.chat.completions.create(**kwargs))
+                    used_provider = "gemini"
+                except Exception as e:
+                    if not self._use_fallback(e):
+                        raise self._error(e) from e
+                    out = await self._fallback.achat(messages, tools=tools)
+                    used_provider = "yandex"
+            # Лог (с отдельным файлом на запрос) пишется в фоне — не в цикле событий бота
+            return self._finish(out, request_log, used_provider, self.analyzer.save_in_background)
+        except Exception as e:
+            request_log["error"] = str(e)
+            self.analyzer.save_in_background(request_log)
+            raise
+
     def chat_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -0,0 +1,186 @@
+"""
+Локальный пре-роутер: intent и slug калькулятора без LLM для очевидных сообщений.
+
+Роутер (InsainAgent._router_classify) на каждое сообщение делает отдельный вызов LLM
+с индексом калькуляторов (~5000 символов) только ради intent и calculator_slug.
+PreRouter решает сам, если сообщение однозначно:
+
+- продолжение расчёта («200 шт», «а 4+4?») при активном расчёте пользователя →
+  calculator + slug из контекста (то же правило есть в промпте роутера);
+- запрос со сметой / тиражом / размерами («сколько стоят 100 визиток») и уверенным
+  совпадением с одним калькулятором → calculator + slug;
+- справочный вопрос («как подготовить макет») без признаков расчёта, не похожий
+  уверенно ни на один калькулятор, вне активного расчёта → knowledge.
+
+Похожесть — TF-IDF по символьным n-граммам слов (устойчиво к падежам: «визиток» ~
+«визитки») над name, keywords, slug и description из /api/v1/calculators; косинус
+через инвертированный индекс — для короткого сообщения доли миллисекунды. Уверенность:
+лучший балл не ниже PRE_ROUTER_THRESHOLD и выше второго не меньше чем в
+PRE_ROUTER_MARGIN раз. Всё остальное (None) решает LLM-роутер.
+
+Доля решённых локально — stats(). Каждое решение (и отказ) агент пишет в лог токенов
+(TokenAnalyzer.log_pre_route); долю PRE_ROUTER_SHADOW_RATE решённых локально он
+в фоне перепроверяет LLM-роутером (теневой режим) и пишет оба ответа. Доля пропусков
+и совпадение с LLM на живом трафике — analyze_pre_router.py.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+PRE_ROUTER_ENABLED = os.getenv("PRE_ROUTER_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+PRE_ROUTER_THRESHOLD = float(os.getenv("PRE_ROUTER_THRESHOLD", "0.18"))
+PRE_ROUTER_MARGIN = float(os.getenv("PRE_ROUTER_MARGIN", "1.5"))
+# Доля локальных решений, которые в фоне перепроверяются LLM-роутером (0 — теневой режим выключен)
+PRE_ROUTER_SHADOW_RATE = min(1.0, max(0.0, float(os.getenv("PRE_ROUTER_SHADOW_RATE", "0"))))
+
+NGRAM_SIZES = (3, 4, 5)
+
+# Веса полей калькулятора в документе
+FIELD_WEIGHTS = (("name", 3), ("keywords", 3), ("slug", 1), ("description", 1))
+
+_CALC_CUE = re.compile(
+    r"\d|сколько\s+(?:стои|буд|выйд)|стоимост|\bцен[аыуе]|прайс|посчита|рассчита|пересчита|"
+    r"расч[её]т|смет|тираж"
+)
+_KNOWLEDGE_CUE = re.compile(
+    r"^(?:как|что|где|кто|когда|почему|зачем|можно ли|есть ли|нужно ли|расскажи|объясни)\b|"
+    r"что такое|требовани|инструкц|регламент|правил"
+)
+_WORD = re.compile(r"[a-zа-я]+")
+
+
+def normalize(text: str) -> str:
+    return (text or "").lower().replace("ё", "е")
+
+
+def _features(text: str) -> Counter:
+    """Символьные n-граммы слов (с границами слова) и сами слова."""
+    feats: Counter = Counter()
+    for word in _WORD.findall(normalize(text)):
+        if len(word) < 2:
+            continue
+        feats["w:" + word] += 1
+        padded = f" {word} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                feats[padded[i : i + n]] += 1
+    return feats
+
+
+def _weights(counts: Counter, idf: Dict[str, float]) -> Dict[str, float]:
+    """TF-IDF (сублинейный tf), нормированный по L2; признаки вне словаря отбрасываются."""
+    vec = {f: (1.0 + math.log(c)) * idf[f] for f, c in counts.items() if f in idf}
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    if not norm:
+        return {}
+    return {f: w / norm for f, w in vec.items()}
+
+
+@dataclass
+class PreRoute:
+    intent: str
+    slug: Optional[str]
+    score: float
+    reason: str
+
+
+class PreRouter:
+    """TF-IDF-классификатор сообщения по калькуляторам (см. модуль)."""
+
+    def __init__(
+        self,
+        calculators: Iterable[Dict[str, Any]],
+        threshold: float = PRE_ROUTER_THRESHOLD,
+        margin: float = PRE_ROUTER_MARGIN,
+    ) -> None:
+        self.threshold = threshold
+        self.margin = margin
+        self.slugs: List[str] = []
+        docs: List[Counter] = []
+        for calc in calculators:
+            slug = str(calc.get("slug") or "").strip()
+            if not slug:
+                continue
+            doc: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS:
+                value = calc.get(field)
+                parts = value if isinstance(value, list) else [value]
+                text = " ".join(str(p) for p in parts if p)
+                if field == "slug":
+                    text = text.replace("_", " ")
+                for f, c in _features(text).items():
+                    doc[f] += c * weight
+            self.slugs.append(slug)
+            docs.append(doc)
+
+        df: Counter = Counter()
+        for doc in docs:
+            df.update(doc.keys())
+        n = len(docs)
+        self._idf: Dict[str, float] = {f: math.log((n + 1) / (d + 1)) + 1.0 for f, d in df.items()}
+        # признак → [(индекс калькулятора, вес)]
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, doc in enumerate(docs):
+            for f, w in _weights(doc, self._idf).items():
+                self._postings.setdefault(f, []).append((i, w))
+        self.decided: Counter = Counter()
+        self.deferred = 0
+
+    def scores(self, text: str) -> List[Tuple[str, float]]:
+        """(slug, косинус) по убыванию; калькуляторы без общих признаков не возвращаются."""
+        acc: Dict[int, float] = {}
+        for f, w in _weights(_features(text), self._idf).items():
+            for i, dw in self._postings.get(f, ()):
+                acc[i] = acc.get(i, 0.0) + w * dw
+        return sorted(((self.slugs[i], s) for i, s in acc.items()), key=lambda x: -x[1])
+
+    def classify(
+        self,
+        text: str,
+        context_slug: Optional[str] = None,
+        continuation: bool = False,
+    ) -> Optional[PreRoute]:
+        """
+        Решение без LLM или None (неоднозначно — решает LLM-роутер).
+
+        context_slug — slug последнего расчёта пользователя; continuation — сообщение
+        похоже на продолжение расчёта (InsainAgent._router_context_continuation_message).
+        """
+        route = self._classify(text, context_slug, continuation)
+        if route is None:
+            self.deferred += 1
+        else:
+            self.decided[route.reason] += 1
+        return route
+
+    def _classify(self, text: str, context_slug: Optional[str], continuation: bool) -> Optional[PreRoute]:
+        t = normalize(text).strip()
+        if not t:
+            return None
+        if context_slug and continuation:
+            return PreRoute("calculator", context_slug, 1.0, "context")
+        ranked = self.scores(t)
+        top_slug, top = ranked[0] if ranked else (None, 0.0)
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        if _CALC_CUE.search(t):
+            if top >= self.threshold and top >= second * self.margin:
+                return PreRoute("calculator", top_slug, top, "calculator")
+            return None
+        if context_slug is None and _KNOWLEDGE_CUE.search(t) and top < self.threshold:
+            return PreRoute("knowledge", None, top, "knowledge")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        decided = sum(self.decided.values())
+        total = decided + self.deferred
+        return {
+            "decided": dict(self.decided),
+            "deferred": self.deferred,
+            "skip_rate": round(decided / total, 4) if total else 0.0,
+        }
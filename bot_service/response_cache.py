@@ -0,0 +1,83 @@
+"""
+Кэш ответов LLM для повторяющихся сообщений: решения роутера и ответы по базе знаний.
+
+Менеджеры по многу раз в день спрашивают одно и то же («сроки изготовления визиток»,
+«как подготовить макет»); каждый такой вопрос — полный вызов LLM. Ключ кэша —
+нормализованный текст сообщения (регистр, ё, пунктуация, пробелы) плюс хэш версии
+промпта/tools, хэш истории диалога, которую видела LLM, и, для ответов по базе знаний,
+поколение KnowledgeBase: изменился промпт или обновилась Wiki — старые записи просто
+перестают находиться; ответ на уточнение внутри одного диалога не отдаётся в другом.
+
+Записи живут ttl секунд, не больше max_entries (вытесняются самые давние по
+использованию). Ответы калькуляторов не кэшируются: цены зависят от живых данных.
+Попадания пишутся в лог токенов (TokenAnalyzer.log_cache_hit) с оценкой
+сэкономленных токенов.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^0-9a-zа-я+]+")
+
+
+def normalize_message(text: str) -> str:
+    """«Сроки изготовления визиток?» и «сроки  изготовления визиток» — один ключ."""
+    return _NON_WORD.sub(" ", (text or "").lower().replace("ё", "е")).strip()
+
+
+def version_hash(*parts: Any) -> str:
+    """Короткий хэш промпта/tools: меняется при любом изменении их текста."""
+    blob = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+class ResponseCache:
+    """TTL + LRU кэш: ключ → (значение, оценка токенов, потраченных на его получение)."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = float(ttl)
+        self.max_entries = max_entries
+        self._clock = clock
+        # ключ → (истекает, значение, токены)
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[float, Any, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Tuple[Any, int]]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key: Tuple[Any, ...], value: Any, tokens: int = 0) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (self._clock() + self.ttl, value, int(tokens))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
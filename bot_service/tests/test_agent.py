@@ -1,5 +1,6 @@
 """Тесты для agent.py — базовые unit-тесты без реального API."""
 
+import json
 import sys
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -7,6 +8,19 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 
+def _bare_agent():
+    """InsainAgent без __init__ (без calc_service, LLM и Wiki); асинхронное состояние — как в __init__."""
+    import httpx
+    from agent import InsainAgent
+    from async_clients import LoopBoundClient
+
+    agent = InsainAgent.__new__(InsainAgent)
+    agent._background_tasks = set()
+    # httpx.AsyncClient ищется при создании клиента — тесты подменяют его через patch
+    agent._calc_client = LoopBoundClient(lambda: httpx.AsyncClient())
+    return agent
+
+
 class TestInsainAgentFormatResult:
     """Тесты форматирования результата _format_calc_result."""
 
@@ -21,8 +35,7 @@ class TestInsainAgentFormatResult:
             mock_response.raise_for_status = MagicMock()
             mock_instance.get.return_value = mock_response
 
-            from agent import InsainAgent
-            agent = InsainAgent.__new__(InsainAgent)
+            agent = _bare_agent()
             agent.calc_api_url = "http://test:8001"
             agent.llm = MagicMock()
             agent._calculators = [{"slug": "laser", "name": "Лазерная резка"}]
@@ -81,12 +94,11 @@ class TestInsainAgentExecuteTool:
     """Тесты execute_tool."""
 
     def _make_agent(self):
-        from agent import InsainAgent
         import tempfile
         from knowledge_base import KnowledgeBase
         from wiki_parser import WikiArticle, YandexWikiParser
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent.calc_api_url = "http://test:8001"
         agent.llm = MagicMock()
         agent._calculators = []
@@ -121,6 +133,23 @@ class TestInsainAgentExecuteTool:
         result = agent.execute_tool("search_knowledge", {"query": "xyznonexistent"})
         assert "results" in result
 
+    def test_search_knowledge_runs_off_event_loop(self):
+        """Загрузка пустой базы (Wiki API) не блокирует цикл событий бота."""
+        import threading
+
+        agent = self._make_agent()
+        search = agent.kb.search
+        threads = []
+
+        def spy(query, limit=5):
+            threads.append(threading.current_thread())
+            return search(query, limit=limit)
+
+        agent.kb.search = spy
+        result = agent.execute_tool("search_knowledge", {"query": "компания"})
+        assert result["results"][0]["slug"] == "about"
+        assert threads and threads[0] is not threading.main_thread()
+
 
 class TestInsainAgentModeLabel:
     def test_modes(self):
@@ -204,8 +233,8 @@ class TestRouterParsing:
 
 class TestToolsForIntent:
     def test_knowledge_returns_only_search_knowledge(self):
-        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL
+        agent = _bare_agent()
         calc_ps = {"type": "function", "function": {"name": "calc_print_sheet"}}
         agent._calc_tool_by_slug = {"print_sheet": calc_ps}
         full = [SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, calc_ps]
@@ -214,8 +243,8 @@ class TestToolsForIntent:
         assert result[0] == SEARCH_KNOWLEDGE_TOOL
 
     def test_calculator_with_slug_returns_narrow_set(self):
-        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL
+        agent = _bare_agent()
         calc_ps = {"type": "function", "function": {"name": "calc_print_sheet"}}
         agent._calc_tool_by_slug = {"print_sheet": calc_ps}
         full = [SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, calc_ps]
@@ -225,8 +254,8 @@ class TestToolsForIntent:
         assert narrow[1] == calc_ps
 
     def test_calculator_without_slug_returns_minimal(self):
-        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        from agent import SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL
+        agent = _bare_agent()
         calc_ps = {"type": "function", "function": {"name": "calc_print_sheet"}}
         agent._calc_tool_by_slug = {"print_sheet": calc_ps}
         full = [SEARCH_KNOWLEDGE_TOOL, SEARCH_MATERIALS_TOOL, calc_ps]
@@ -238,8 +267,7 @@ class TestToolsForIntent:
 
 class TestSystemPromptForIntent:
     def test_knowledge_prompt(self):
-        from agent import InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._user_calc_context = {}
         agent._calc_tool_by_slug = {}
         agent._calculators = []
@@ -249,8 +277,7 @@ class TestSystemPromptForIntent:
         assert "Wiki" in prompt or "база знаний" in prompt
 
     def test_calculator_with_slug_prompt(self):
-        from agent import InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._user_calc_context = {}
         agent._calc_tool_by_slug = {
             "laser": {"type": "function", "function": {"name": "calc_laser"}}
@@ -264,8 +291,7 @@ class TestSystemPromptForIntent:
         assert "Алгоритм лазера" in prompt
 
     def test_calculator_without_slug_uses_short_fallback(self):
-        from agent import InsainAgent
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._calc_tool_by_slug = {}
         agent._calculators = [{"slug": "laser", "name": "Лазерная резка"}]
         agent._calc_llm_prompts = {}
@@ -295,9 +321,8 @@ class TestRecalcHeuristics:
         assert InsainAgent._router_context_continuation_message("посчитай 500шт")
 
     def test_router_override_knowledge_to_calculator(self):
-        from agent import InsainAgent
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._calc_tool_by_slug = {"print_sheet": {}}
         agent._user_calc_context = {
             1: {"slug": "print_sheet", "tool_name": "calc_print_sheet", "params": {"quantity": 100}},
@@ -307,9 +332,8 @@ class TestRecalcHeuristics:
         assert slug == "print_sheet"
 
     def test_router_override_knowledge_material_density(self):
-        from agent import InsainAgent
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._calc_tool_by_slug = {"print_sheet": {}}
         agent._user_calc_context = {
             1: {"slug": "print_sheet", "tool_name": "calc_print_sheet", "params": {"quantity": 100}},
@@ -319,17 +343,15 @@ class TestRecalcHeuristics:
         assert slug == "print_sheet"
 
     def test_heuristic_magnet_slug_acrylic(self):
-        from agent import InsainAgent
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._calc_tool_by_slug = {"magnet_acrylic": {}, "magnet_laminated": {}}
         assert agent._heuristic_magnet_slug("посчитай магниты акриловые") == "magnet_acrylic"
         assert agent._heuristic_magnet_slug("ламинированные магниты 100 шт") == "magnet_laminated"
 
     def test_router_magnet_thread_override_blanks(self):
-        from agent import InsainAgent
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         agent._calc_tool_by_slug = {"magnet_acrylic": {}}
         agent._user_calc_context = {}
         history = [
@@ -346,9 +368,8 @@ class TestRecalcHeuristics:
         assert slug == "magnet_acrylic"
 
     def test_merge_params_prefers_url_and_user_quantity(self):
-        from agent import InsainAgent
 
-        agent = InsainAgent.__new__(InsainAgent)
+        agent = _bare_agent()
         ctx = {
             "quantity": 100,
             "width": 100.0,
@@ -488,3 +509,388 @@ class TestNormalizeChoicesParam:
         from agent import InsainAgent
         assert InsainAgent._normalize_choices_param("print_sheet", "lamination") == "lamination"
         assert InsainAgent._normalize_choices_param("print_sheet", "material") == "material"
+
+
+class TestLoadCalculatorsAndTools:
+    """Загрузка схем: бандл /api/v1/bundle и запасной путь по отдельным эндпоинтам."""
+
+    ENTRY = {
+        "slug": "laser",
+        "name": "Лазерная резка",
+        "description": "Резка",
+        "keywords": ["лазер"],
+        "param_schema": {"slug": "laser", "params": []},
+        "options": {"materials": [{"code": "Acryl3", "name": "Акрил 3 мм"}]},
+        "tool_schema": {"name": "calc_laser", "description": "Расчёт", "parameters": {"type": "object", "properties": {}}},
+        "llm_prompt": "  алгоритм  ",
+    }
+
+    def _load(self, with_bundle: bool):
+        import httpx
+
+        requested = []
+
+        def handler(request):
+            path = request.url.path
+            requested.append(path)
+            if path == "/api/v1/bundle":
+                if not with_bundle:
+                    return httpx.Response(404, json={"detail": "Not Found"})
+                return httpx.Response(200, json={"calculators": [self.ENTRY]})
+            if path == "/api/v1/calculators":
+                return httpx.Response(200, json=[{k: self.ENTRY[k] for k in ("slug", "name", "description", "keywords")}])
+            part, slug = path.rsplit("/", 2)[-2:]
+            assert slug == "laser"
+            if part == "llm_prompt":
+                return httpx.Response(200, json={"slug": slug, "prompt": self.ENTRY["llm_prompt"]})
+            return httpx.Response(200, json=self.ENTRY[part])
+
+        transport = httpx.MockTransport(handler)
+        real_client = httpx.Client
+        with patch("agent.httpx.Client", lambda **kw: real_client(transport=transport, **kw)):
+            agent = _bare_agent()
+            agent.calc_api_url = "http://test:8001"
+            agent._reset_state()
+            agent._load_calculators_and_tools()
+        return agent, requested
+
+    def test_bundle_single_request(self):
+        agent, requested = self._load(with_bundle=True)
+        assert requested == ["/api/v1/bundle"]
+        assert agent._calculators[0]["slug"] == "laser"
+        assert "laser" in agent._calc_tool_by_slug
+        assert agent._calc_llm_prompts["laser"] == "алгоритм"
+        assert agent.calculator_materials["laser"][0]["code"] == "Acryl3"
+
+    def test_fallback_to_per_slug_endpoints(self):
+        bundled, _ = self._load(with_bundle=True)
+        agent, requested = self._load(with_bundle=False)
+        assert requested[:2] == ["/api/v1/bundle", "/api/v1/calculators"]
+        assert len(requested) == 2 + 4
+        assert agent._tools == bundled._tools
+        assert agent._calculators == bundled._calculators
+        assert agent._param_schemas == bundled._param_schemas
+        assert agent._calc_llm_prompts == bundled._calc_llm_prompts
+
+
+class TestAddBusinessDays:
+    """Срок готовности по календарю calc_service и запасной расчёт без праздников."""
+
+    def _agent(self, handler):
+        import httpx
+
+        agent = _bare_agent()
+        agent.calc_api_url = "http://test:8001"
+        real_client = httpx.AsyncClient
+        transport = httpx.MockTransport(handler)
+        return agent, patch("agent.httpx.AsyncClient", lambda **kw: real_client(transport=transport, **kw))
+
+    @staticmethod
+    def _run(agent, coro):
+        from async_clients import run_sync
+
+        return run_sync(coro, agent.aclose)
+
+    def test_uses_calendar_endpoint(self):
+        import httpx
+        from datetime import datetime
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"start": "2025-12-31", "ready_date": "2026-01-12", "working_days": 3})
+
+        agent, client_patch = self._agent(handler)
+        with client_patch:
+            ready = self._run(agent, agent._add_business_days(datetime(2025, 12, 31, 10, 30), 3))
+        assert ready == datetime(2026, 1, 12, 10, 30)
+        assert requests[0].url.path == "/api/v1/calendar/ready_date"
+        assert dict(requests[0].url.params) == {"start": "2025-12-31", "days": "3"}
+
+    def test_fallback_skips_weekends_only(self):
+        import httpx
+        from datetime import datetime
+
+        def handler(request):
+            raise httpx.ConnectError("down", request=request)
+
+        agent, client_patch = self._agent(handler)
+        with client_patch:
+            # Пятница + 1 рабочий день → понедельник
+            assert self._run(agent, agent._add_business_days(datetime(2025, 3, 7), 1)) == datetime(2025, 3, 10)
+            assert self._run(agent, agent._add_business_days(datetime(2025, 3, 7), 0)) == datetime(2025, 3, 7)
+
+
+class TestAsyncChat:
+    """achat: tool_calls и календарь через один httpx.AsyncClient; chat — синхронная обёртка."""
+
+    def test_one_client_per_loop(self):
+        import httpx
+
+        requested = []
+        created = []
+
+        def handler(request):
+            requested.append(request.url.path)
+            if request.url.path == "/api/v1/choices":
+                return httpx.Response(200, json={"items": [{"id": "Acryl3", "title": "Акрил 3 мм"}]})
+            if request.url.path == "/api/v1/calc/laser":
+                return httpx.Response(200, json={"cost": 500.0, "price": 800.0, "time_ready": 16, "materials": []})
+            return httpx.Response(200, json={"start": "2025-03-07", "ready_date": "2025-03-11", "working_days": 2})
+
+        real_client = httpx.AsyncClient
+        transport = httpx.MockTransport(handler)
+
+        def make_client(**kw):
+            created.append(kw)
+            return real_client(transport=transport, **kw)
+
+        class FakeLLM:
+            async def achat(self, messages, tools=None):
+                return {
+                    "content": None,
+                    "tool_calls": [
+                        {"id": "a", "function": {"name": "search_materials", "arguments": '{"slug": "laser", "query": "акрил"}'}},
+                        {"id": "b", "function": {"name": "calc_laser", "arguments": '{"quantity": 10, "material_id": "Acryl3"}'}},
+                    ],
+                }
+
+        agent = _bare_agent()
+        agent.calc_api_url = "http://test:8001"
+        agent.llm = FakeLLM()
+        agent._calculators = [{"slug": "laser", "name": "Лазерная резка"}]
+        agent._tools = [{"type": "function", "function": {"name": "calc_laser", "parameters": {}}}]
+        agent._user_calc_context = {}
+
+        with patch("agent.AGENT_USE_ROUTER", False), patch("agent.httpx.AsyncClient", make_client):
+            reply = agent.chat("10 шт акрил", user_id=7)
+
+        assert sorted(requested[:2]) == ["/api/v1/calc/laser", "/api/v1/choices"]
+        assert requested[2] == "/api/v1/calendar/ready_date"
+        assert len(created) == 1
+        assert "800.00" in reply
+        assert "11.03.2025" in reply
+        assert agent._user_calc_context[7]["params"]["material_id"] == "Acryl3"
+
+    def test_tool_calls_run_concurrently_in_order(self):
+        import asyncio
+
+        agent = _bare_agent()
+        started = []
+
+        async def fake_execute(name, args):
+            started.append(name)
+            # Первый вызов завершится только после старта второго — значит, они идут одновременно
+            while len(started) < 2:
+                await asyncio.sleep(0)
+            if name == "search_materials":
+                await asyncio.sleep(0.01)
+            return {"name": name, "args": args}
+
+        agent.aexecute_tool = fake_execute
+        tool_calls = [
+            {"id": "m", "function": {"name": "search_materials", "arguments": '{"query": "мел"}'}},
+            {"function": {"name": "search_knowledge", "arguments": "не json"}},
+        ]
+        out = asyncio.run(asyncio.wait_for(agent._execute_tool_calls(tool_calls), 1))
+        assert [(tc_id, name) for tc_id, name, _, _ in out] == [("m", "search_materials"), ("tc_1", "search_knowledge")]
+        assert out[0][2] == {"query": "мел"} and out[1][2] == {}
+        assert out[0][3]["name"] == "search_materials"
+
+
+def _knowledge_agent(tmp_path):
+    """Агент без calc_service: роутер отвечает knowledge, ответ — через search_knowledge."""
+    from knowledge_base import KnowledgeBase
+    from response_cache import ResponseCache
+    from token_analyzer import TokenAnalyzer
+    from wiki_parser import WikiArticle, YandexWikiParser
+
+    calls = []
+
+    class FakeLLM:
+        analyzer = TokenAnalyzer(log_path=tmp_path / "token_usage.jsonl")
+
+        async def achat(self, messages, tools=None):
+            name = tools[0]["function"]["name"]
+            calls.append(name)
+            if name == "route_request":
+                args = '{"intent": "knowledge", "calculator_slug": ""}'
+                return {"tool_calls": [{"id": "r", "function": {"name": "route_request", "arguments": args}}], "tokens_estimate": 100}
+            if messages[-1]["role"] == "tool":
+                return {"content": "Макет — в PDF с вылетами 2 мм.", "tool_calls": None, "tokens_estimate": 300}
+            args = '{"query": "макет"}'
+            return {"content": None, "tool_calls": [{"id": "k", "function": {"name": "search_knowledge", "arguments": args}}], "tokens_estimate": 200}
+
+        async def aclose(self):
+            self.analyzer.flush()
+
+    agent = _bare_agent()
+    agent.llm = FakeLLM()
+    agent.kb = KnowledgeBase(
+        wiki_parser=YandexWikiParser(token="", org_id=""), local_dir=str(tmp_path), cache_file=tmp_path / "kb.json"
+    )
+    agent.kb._articles = [WikiArticle(slug="maket", title="Требования к макету", content="Макет в PDF, вылеты 2 мм.")]
+    agent._calculators = []
+    agent._tools = [{"type": "function", "function": {"name": "search_knowledge", "parameters": {}}}]
+    agent._calc_tool_by_slug = {}
+    agent._calculator_index = ""
+    agent._router_tool = {"type": "function", "function": {"name": "route_request", "parameters": {}}}
+    agent._pre_router = None
+    agent._user_calc_context = {}
+    agent._router_cache = ResponseCache(60)
+    agent._knowledge_cache = ResponseCache(60)
+    return agent, calls
+
+
+class TestResponseCache:
+    """Кэш решений роутера и ответов по базе знаний; расчёты в кэш не попадают."""
+
+    def test_ttl_and_lru(self):
+        from response_cache import ResponseCache, normalize_message
+
+        now = [0.0]
+        cache = ResponseCache(ttl=10, max_entries=2, clock=lambda: now[0])
+        cache.put(("a",), "A", 5)
+        cache.put(("b",), "B")
+        assert cache.get(("a",)) == ("A", 5)
+        cache.put(("c",), "C")  # вытесняет b — к нему дольше не обращались
+        assert cache.get(("b",)) is None
+        now[0] = 11
+        assert cache.get(("a",)) is None
+        assert normalize_message("Сроки  изготовления визиток?") == normalize_message("сроки изготовления визиток")
+
+    def _agent(self, tmp_path):
+        return _knowledge_agent(tmp_path)
+
+    def test_knowledge_answer_cached(self, tmp_path):
+        agent, calls = self._agent(tmp_path)
+        first = agent.chat("Как подготовить макет к печати?", user_id=1)
+        assert calls == ["route_request", "search_knowledge", "search_knowledge"]
+        second = agent.chat("как подготовить  макет к печати", user_id=2)
+        assert second == first
+        assert len(calls) == 3
+
+        hits = [json.loads(line) for line in (tmp_path / "token_usage.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert [(h["cache_hit"]["kind"], h["cache_hit"]["saved_tokens_estimate"]) for h in hits] == [
+            ("router", 100),
+            ("knowledge", 500),
+        ]
+        assert not list(tmp_path.glob("llm_request_*.json"))
+
+        # Обновление Wiki — новое поколение KB, ответ перезапрашивается (роутер — из кэша)
+        agent.kb.generation += 1
+        agent.chat("как подготовить макет к печати", user_id=3)
+        assert calls[3:] == ["search_knowledge", "search_knowledge"]
+
+    def test_answers_scoped_to_dialogue(self, tmp_path):
+        """Уточнение внутри диалога не отдаётся пользователю с другим диалогом."""
+        agent, calls = self._agent(tmp_path)
+        history_a = [
+            {"role": "user", "content": "Что такое УФ-печать?"},
+            {"role": "assistant", "content": "Печать УФ-чернилами по жёсткому материалу."},
+        ]
+        history_b = [
+            {"role": "user", "content": "Что такое шелкография?"},
+            {"role": "assistant", "content": "Печать через сетчатый трафарет."},
+        ]
+        agent.chat("а для него какие требования", history=history_a, user_id=1)
+        assert len(calls) == 3
+        agent.chat("а для него какие требования", history=history_b, user_id=2)
+        assert calls[3:] == ["route_request", "search_knowledge", "search_knowledge"]
+        # Тот же диалог — из кэша
+        agent.chat("а для него какие требования", history=list(history_a), user_id=3)
+        assert len(calls) == 6
+
+    def test_short_replies_not_cached(self, tmp_path):
+        agent, calls = self._agent(tmp_path)
+        agent.chat("а макет?", user_id=1)
+        agent.chat("а макет?", user_id=1)
+        assert calls.count("route_request") == 2
+        assert agent._knowledge_cache.stats()["entries"] == 0
+
+
+class TestPreRouteLogging:
+    """Решения пре-роутера — в лог токенов; теневой режим перепроверяет их LLM-роутером."""
+
+    def _log(self, tmp_path):
+        lines = (tmp_path / "token_usage.jsonl").read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def _run(self, agent, message):
+        import asyncio
+
+        async def run():
+            try:
+                return await agent._router_classify(message, [], user_id=7)
+            finally:
+                await agent.aclose()
+
+        return asyncio.run(run())
+
+    def _agent(self, tmp_path):
+        from pre_router import PreRouter
+
+        agent, calls = _knowledge_agent(tmp_path)
+        agent._pre_router = PreRouter([{"slug": "mug", "name": "Кружки", "keywords": ["кружки", "кружка"]}])
+        agent._calc_tool_by_slug = {"mug": {}}
+        return agent, calls
+
+    def test_decisions_logged_without_llm(self, tmp_path, monkeypatch):
+        import agent as agent_module
+
+        monkeypatch.setattr(agent_module, "PRE_ROUTER_SHADOW_RATE", 0.0)
+        agent, calls = self._agent(tmp_path)
+        assert self._run(agent, "кружки 20 штук") == ("calculator", "mug")
+        assert self._run(agent, "привет") == ("knowledge", None)  # решил LLM-роутер
+        assert calls == ["route_request"]
+
+        pre = [e["pre_route"] for e in self._log(tmp_path) if "pre_route" in e]
+        assert [(p["decided"], p.get("intent"), p.get("slug"), p.get("reason")) for p in pre] == [
+            (True, "calculator", "mug", "calculator"),
+            (False, None, None, None),
+        ]
+        assert pre[0]["message"] == "кружки 20 штук" and "llm" not in pre[0]
+
+    def test_shadow_mode_compares_with_llm_router(self, tmp_path, monkeypatch):
+        import agent as agent_module
+        import analyze_pre_router
+
+        monkeypatch.setattr(agent_module, "PRE_ROUTER_SHADOW_RATE", 1.0)
+        agent, calls = self._agent(tmp_path)
+        assert self._run(agent, "кружки 20 штук") == ("calculator", "mug")
+        assert calls == ["route_request"]  # теневой вызов; ответ — решение пре-роутера
+
+        entries = self._log(tmp_path)
+        pre = [e["pre_route"] for e in entries if "pre_route" in e]
+        assert pre[0]["llm"] == {"intent": "knowledge", "slug": None}
+
+        analyze_pre_router.report_live(tmp_path / "token_usage.jsonl", show=5)
+
+    def test_raw_response_logged_only_for_router_calls(self, tmp_path):
+        from token_analyzer import TokenAnalyzer
+
+        analyzer = TokenAnalyzer(log_path=tmp_path / "token_usage.jsonl")
+        response = {"content": "Ответ пользователю", "tool_calls": None}
+        router = analyzer.log_request([{"role": "user", "content": "x"}], tools=[{"function": {"name": "route_request"}}])
+        answer = analyzer.log_request([{"role": "user", "content": "x"}], tools=[{"function": {"name": "search_knowledge"}}])
+        assert "response" in analyzer.log_response(response, router)["debug"]
+        assert "response" not in analyzer.log_response(response, answer)["debug"]
+
+
+
+class TestTokenLogWriter:
+    def test_background_save_writes_snapshot(self, tmp_path):
+        from token_analyzer import TokenAnalyzer
+
+        analyzer = TokenAnalyzer(log_path=tmp_path / "token_usage.jsonl")
+        messages = [{"role": "user", "content": "x"}]
+        entry = analyzer.log_request(messages)
+        analyzer.save_in_background(entry)
+        messages.append({"role": "assistant", "content": "y"})  # агент дописывает диалог дальше
+        analyzer.flush()
+
+        lines = (tmp_path / "token_usage.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        assert len(json.loads(lines[0])["debug"]["messages"]) == 1
+        assert len(list(tmp_path.glob("llm_request_*.json"))) == 1
@@ -142,3 +142,63 @@ class TestKnowledgeBase:
         )
         assert kb2.article_count == 1
         assert kb2._articles[0].slug == "cached"
+
+
+class TestBM25Index:
+    ARTICLES = [
+        WikiArticle(slug="banner", title="Баннер", content="Печать на баннерной ткани, люверсы.", tags=["широкоформат"]),
+        WikiArticle(slug="cards", title="Визитки", content="Визитки печатаем на мелованной бумаге. Баннер не нужен."),
+        WikiArticle(slug="other", title="Доставка", content="Курьер доставляет заказы по Москве."),
+    ]
+
+    def _make_kb(self, tmp_path, articles=None):
+        kb = KnowledgeBase(
+            wiki_parser=YandexWikiParser(token="", org_id=""),
+            local_dir=str(tmp_path),
+            cache_file=tmp_path / "kb_cache.json",
+        )
+        if articles is not None:
+            kb._articles = articles
+            kb._save_cache()
+        return kb
+
+    def test_title_and_tags_boosted(self, tmp_path):
+        kb = self._make_kb(tmp_path, self.ARTICLES)
+        assert [r["slug"] for r in kb.search("баннер")] == ["banner", "cards"]
+        assert kb.search("широкоформат")[0]["slug"] == "banner"
+        assert kb.search("несуществующее слово") == []
+
+    def test_index_persisted_next_to_cache(self, tmp_path, monkeypatch):
+        import knowledge_base
+
+        self._make_kb(tmp_path, self.ARTICLES)
+        assert (tmp_path / "kb_cache.index.json").is_file()
+
+        build = knowledge_base._BM25Index.build
+
+        def no_rebuild(articles, *args, **kwargs):
+            assert not articles, "индекс должен загрузиться из файла"
+            return build(articles, *args, **kwargs)
+
+        monkeypatch.setattr(knowledge_base._BM25Index, "build", no_rebuild)
+        kb = self._make_kb(tmp_path)
+        assert kb.search("курьер")[0]["slug"] == "other"
+
+    def test_stale_index_rebuilt(self, tmp_path):
+        kb1 = self._make_kb(tmp_path, self.ARTICLES)
+        index_file = tmp_path / "kb_cache.index.json"
+        stale = index_file.read_text(encoding="utf-8")
+        kb1._articles = self.ARTICLES[:1] + [WikiArticle(slug="new", title="Новая", content="Курьер приедет завтра.")]
+        kb1._save_cache()
+        index_file.write_text(stale, encoding="utf-8")
+
+        kb2 = self._make_kb(tmp_path)
+        assert kb2.search("курьер")[0]["slug"] == "new"
+        assert index_file.read_text(encoding="utf-8") != stale
+
+    def test_get_context_reuses_results(self, tmp_path, monkeypatch):
+        kb = self._make_kb(tmp_path, self.ARTICLES)
+        results = kb.search("визитки")
+        monkeypatch.setattr(kb, "search", lambda *a, **kw: [])
+        context = kb.get_context("визитки", results=results)
+        assert "## Визитки" in context
@@ -0,0 +1,105 @@
+"""Тесты pre_router.py — локальный пре-роутер без LLM."""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pre_router import PreRouter
+
+CALCULATORS = [
+    {"slug": "print_sheet", "name": "Печать листовая", "description": "Расчёт листовой печати (листовки, визитки и т.п.).",
+     "keywords": ["листовки", "листовка", "визитки", "визитка", "флаеры"]},
+    {"slug": "mug", "name": "Кружки", "description": "Расчёт кружек с сублимационной печатью.", "keywords": []},
+    {"slug": "metal_pins", "name": "Металлические значки", "description": "Расчёт металлических значков.",
+     "keywords": ["значки", "значок"]},
+    {"slug": "magnet_acrylic", "name": "Акриловые магниты", "description": "Расчёт акриловых магнитов.",
+     "keywords": ["акриловые магниты"]},
+    {"slug": "magnet_laminated", "name": "Ламинированные магниты", "description": "Расчёт ламинированных магнитов.",
+     "keywords": ["ламинированные магниты", "магнитный винил"]},
+]
+
+
+class TestPreRouter:
+    def test_clear_calculator_requests(self):
+        router = PreRouter(CALCULATORS)
+        route = router.classify("сколько стоят 100 визиток 4+4")
+        assert (route.intent, route.slug) == ("calculator", "print_sheet")
+        assert router.classify("кружки 20 штук").slug == "mug"
+        assert router.classify("Ламинированные магниты 50х50, 200 шт").slug == "magnet_laminated"
+
+    def test_knowledge_question(self):
+        router = PreRouter(CALCULATORS)
+        route = router.classify("Как оформить заказ через сайт?")
+        assert (route.intent, route.slug) == ("knowledge", None)
+
+    def test_ambiguous_goes_to_llm(self):
+        router = PreRouter(CALCULATORS)
+        assert router.classify("магниты 100 шт") is None  # акриловые или ламинированные
+        assert router.classify("привет") is None
+        # Справочный вопрос про продукт — решает LLM
+        assert router.classify("какие сроки у кружек") is None
+        assert router.stats()["deferred"] == 3
+
+    def test_context_continuation(self):
+        router = PreRouter(CALCULATORS)
+        route = router.classify("а 500 шт?", context_slug="mug", continuation=True)
+        assert (route.intent, route.slug, route.reason) == ("calculator", "mug", "context")
+        # Вне продолжения расчёта справочный вопрос при активном расчёте — решает LLM
+        assert router.classify("как подготовить макет", context_slug="mug") is None
+        assert router.stats()["skip_rate"] == 0.5
+
+
+class TestAnalyzePreRouter:
+    def test_report_from_token_log(self, tmp_path, capsys):
+        import analyze_pre_router
+        from token_analyzer import TokenAnalyzer
+
+        analyzer = TokenAnalyzer(log_path=tmp_path / "token_usage.jsonl")
+        router_tool = [{"type": "function", "function": {"name": "route_request"}}]
+        for message, intent, slug in (
+            ("кружки 20 штук", "calculator", "mug"),
+            ("значки 100 шт", "calculator", "print_sheet"),
+            ("привет", "knowledge", ""),
+        ):
+            content = f"Текущее сообщение пользователя:\n{message}\n\nКонтекст диалога (последние реплики):\n(история пуста)"
+            log = analyzer.log_request([{"role": "user", "content": content}], tools=router_tool)
+            args = json.dumps({"intent": intent, "calculator_slug": slug})
+            response = {"content": None, "tool_calls": [{"id": "1", "function": {"name": "route_request", "arguments": args}}]}
+            analyzer.save_to_file(analyzer.log_response(response, log))
+        calculators = tmp_path / "calculators.json"
+        calculators.write_text(json.dumps(CALCULATORS, ensure_ascii=False), encoding="utf-8")
+
+        analyze_pre_router.main([str(tmp_path / "token_usage.jsonl"), "--calculators", str(calculators)])
+        out = capsys.readouterr().out
+        assert "Вызовов роутера: 3" in out
+        assert "Решено локально: 2 (66.7%)" in out
+        assert "Совпадение с LLM: 1/2 (50.0%)" in out
+        assert "'metal_pins'" in out
+
+    def test_live_report_from_pre_route_entries(self, tmp_path, capsys):
+        import analyze_pre_router
+        from token_analyzer import TokenAnalyzer, TokenUsageStats
+
+        logfile = tmp_path / "token_usage.jsonl"
+        analyzer = TokenAnalyzer(log_path=logfile)
+        mug = {"intent": "calculator", "slug": "mug", "score": 0.6, "reason": "calculator"}
+        analyzer.log_pre_route("кружки 20 штук", mug, llm=("calculator", "mug"))
+        analyzer.log_pre_route("кружки с печатью 5 шт", mug, llm=("calculator", "print_sheet"))
+        analyzer.log_pre_route("как оформить заказ", {"intent": "knowledge", "slug": None, "score": 0.0, "reason": "knowledge"})
+        analyzer.log_pre_route("привет", None)
+        analyzer.flush()
+        # Отдельные файлы на запрос — только у теневых записей
+        assert len(list(tmp_path.glob("llm_request_*.json"))) == 2
+
+        analyze_pre_router.report_live(logfile, show=5)
+        out = capsys.readouterr().out
+        assert "Сообщений через пре-роутер: 4" in out
+        assert "Решено локально: 3 (75.0%)" in out
+        assert "Совпадение с LLM (теневой режим): 1/2 (50.0%)" in out
+        assert "'print_sheet'" in out
+
+        stats = TokenUsageStats()
+        stats.load_from_file(str(logfile))
+        assert stats.get_total_stats()["requests"] == 0  # записи пре-роутера — не вызовы LLM
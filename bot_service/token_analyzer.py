@@ -29,6 +29,9 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -37,6 +40,8 @@ from typing import Any, Dict, Iterable, List, Optional, Tuple
 from rich.console import Console
 from rich.table import Table
 
+logger = logging.getLogger(__name__)
+
 
 def _ensure_text(content: Any) -> str:
     """Привести контент сообщения к строке."""
@@ -55,6 +60,17 @@ def _ensure_text(content: Any) -> str:
     return str(content)
 
 
+# Имя единственного tool вызова роутера (InsainAgent._build_router_tool)
+ROUTER_TOOL_NAME = "route_request"
+# Сколько символов сообщения пользователя хранить в записи пре-роутера
+PRE_ROUTE_MESSAGE_CHARS = 300
+
+
+def _is_router_call(request_log: Dict[str, Any]) -> bool:
+    tools = (request_log.get("debug") or {}).get("tools") or []
+    return [(t.get("function") or {}).get("name") for t in tools] == [ROUTER_TOOL_NAME]
+
+
 class TokenAnalyzer:
     """
     Анализ расхода токенов в запросах к LLM.
@@ -83,6 +99,9 @@ class TokenAnalyzer:
         self.pricing_rub_per_1m: Dict[str, float] = (
             pricing_rub_per_1m or self.DEFAULT_PRICING_RUB_PER_1M
         )
+        # Запись из цикла событий бота (save_in_background): один поток — записи идут по порядку
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-log")
+        self._write_lock = threading.Lock()
 
     # --- оценки токенов -------------------------------------------------
 
@@ -275,8 +294,79 @@ class TokenAnalyzer:
             "total_tokens_estimate": total_tokens,
             "cost_estimate_rub": cost_estimate_rub,
         }
+        # Сырой ответ только у вызовов роутера — для разбора его решений (analyze_pre_router.py);
+        # полные ответы пользователю в лог не пишутся
+        if _is_router_call(request_log):
+            request_log.setdefault("debug", {})["response"] = {"content": content, "tool_calls": tool_calls}
         return request_log
 
+    def log_pre_route(
+        self,
+        message: str,
+        route: Optional[Dict[str, Any]],
+        llm: Optional[Tuple[str, Optional[str]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Записать решение пре-роутера (pre_router.py) вместо вызова LLM-роутера.
+
+        route — intent/slug/score/reason или None (решение отдано LLM-роутеру);
+        llm — (intent, slug) LLM-роутера в теневом режиме.
+
+        Вызывается из цикла событий бота на каждое сообщение, поэтому запись идёт в фоне;
+        отдельный файл на запрос пишется только для теневых записей (есть что сравнивать).
+        """
+        pre_route: Dict[str, Any] = {"message": message[:PRE_ROUTE_MESSAGE_CHARS], "decided": route is not None}
+        if route is not None:
+            pre_route.update(route)
+        if llm is not None:
+            pre_route["llm"] = {"intent": llm[0], "slug": llm[1]}
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "metadata": {"provider": "pre_router", **(metadata or {})},
+            "pre_route": pre_route,
+            "total": {
+                "input_chars": 0,
+                "input_tokens_estimate": 0,
+                "output_tokens_estimate": 0,
+                "total_tokens_estimate": 0,
+                "cost_estimate_rub": 0.0,
+            },
+        }
+        self.save_in_background(entry, per_request=llm is not None)
+        return entry
+
+    def log_cache_hit(
+        self,
+        kind: str,
+        saved_tokens: int,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Записать ответ из кэша (response_cache.py) вместо вызова LLM.
+
+        saved_tokens — оценка токенов вызовов, которые дали закэшированный ответ.
+        Пишется в фоне и без отдельного файла на запрос — в записи нет messages.
+        """
+        saved_tokens = max(0, int(saved_tokens))
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "metadata": {"provider": "cache", **(metadata or {}), "cache": kind},
+            "cache_hit": {
+                "kind": kind,
+                "saved_tokens_estimate": saved_tokens,
+            },
+            "total": {
+                "input_chars": 0,
+                "input_tokens_estimate": 0,
+                "output_tokens_estimate": 0,
+                "total_tokens_estimate": 0,
+                "cost_estimate_rub": 0.0,
+            },
+        }
+        self.save_in_background(entry, per_request=False)
+        return entry
+
     def save_to_file(self, log_entry: Dict[str, Any], filepath: Optional[str] = None) -> None:
         """
         Сохранить запись в JSONL-файл (одна строка = один JSON).
@@ -284,20 +374,52 @@ class TokenAnalyzer:
         Формат:
         {"timestamp": "...", "breakdown": {...}, "total": {...}}
         """
+        self._write(json.dumps(log_entry, ensure_ascii=False), log_entry.get("timestamp"), filepath, True)
+
+    def save_in_background(
+        self,
+        log_entry: Dict[str, Any],
+        filepath: Optional[str] = None,
+        per_request: bool = True,
+    ) -> None:
+        """
+        save_to_file() в фоновом потоке — для кода в цикле событий: запись (с отдельным
+        файлом на запрос, десятки КБ) не задерживает ответы. Запись сериализуется сразу:
+        messages вызывающий код дальше дополняет.
+
+        per_request=False — только строка в JSONL, без файла llm_request_*.json.
+        """
+        line = json.dumps(log_entry, ensure_ascii=False)
+        self._writer.submit(self._write_logged, line, log_entry.get("timestamp"), filepath, per_request)
+
+    def flush(self) -> None:
+        """Дождаться записи всего, что передано в save_in_background()."""
+        self._writer.submit(lambda: None).result()
+
+    def _write_logged(self, line: str, timestamp: Any, filepath: Optional[str], per_request: bool) -> None:
+        try:
+            self._write(line, timestamp, filepath, per_request)
+        except Exception as e:
+            logger.warning("Не удалось записать лог токенов: %s", e)
+
+    def _write(self, line: str, timestamp: Any, filepath: Optional[str], per_request: bool) -> None:
         path = Path(filepath) if filepath is not None else self.log_path
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("a", encoding="utf-8") as f:
-            json.dump(log_entry, f, ensure_ascii=False)
-            f.write("\n")
+        with self._write_lock:
+            with path.open("a", encoding="utf-8") as f:
+                f.write(line)
+                f.write("\n")
+        if not per_request:
+            return
 
         # Дополнительно: отдельный подробный лог-файл на каждый запрос.
         # Удобно для анализа конкретного диалога (видно все messages, tools и метаданные).
-        ts = str(log_entry.get("timestamp") or datetime.utcnow().isoformat())
+        ts = str(timestamp or datetime.utcnow().isoformat())
         safe_ts = ts.replace(":", "-").replace(".", "-")
         per_request_path = path.parent / f"llm_request_{safe_ts}.json"
         try:
             with per_request_path.open("w", encoding="utf-8") as f_req:
-                json.dump(log_entry, f_req, ensure_ascii=False, indent=2)
+                json.dump(json.loads(line), f_req, ensure_ascii=False, indent=2)
         except Exception:
             # Логирование не должно ломать основной поток, поэтому ошибки здесь глотаем.
             pass
@@ -354,25 +476,38 @@ class TokenUsageStats:
                 "output_tokens": 0,
                 "total_tokens": 0,
                 "total_cost_rub": 0.0,
+                "cache_hits": 0,
+                "saved_tokens": 0,
                 "period": None,
             }
 
         input_tokens = 0
         output_tokens = 0
         total_cost = 0.0
+        cache_hits = 0
+        saved_tokens = 0
+        pre_routes = 0
         timestamps: List[datetime] = []
 
         for e in self.entries:
-            total = e.get("total") or {}
-            input_tokens += int(total.get("input_tokens_estimate", 0))
-            output_tokens += int(total.get("output_tokens_estimate", 0))
-            total_cost += float(total.get("cost_estimate_rub", 0.0))
             ts = e.get("timestamp")
             if ts:
                 try:
                     timestamps.append(datetime.fromisoformat(ts))
                 except ValueError:
-                    continue
+                    pass
+            hit = e.get("cache_hit")
+            if hit:
+                cache_hits += 1
+                saved_tokens += int(hit.get("saved_tokens_estimate", 0))
+                continue
+            if "pre_route" in e:
+                pre_routes += 1
+                continue
+            total = e.get("total") or {}
+            input_tokens += int(total.get("input_tokens_estimate", 0))
+            output_tokens += int(total.get("output_tokens_estimate", 0))
+            total_cost += float(total.get("cost_estimate_rub", 0.0))
 
         total_tokens = input_tokens + output_tokens
         period: Optional[Tuple[Optional[datetime], Optional[datetime]]] = None
@@ -380,11 +515,13 @@ class TokenUsageStats:
             period = (min(timestamps), max(timestamps))
 
         return {
-            "requests": len(self.entries),
+            "requests": len(self.entries) - cache_hits - pre_routes,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "total_tokens": total_tokens,
             "total_cost_rub": round(total_cost, 4),
+            "cache_hits": cache_hits,
+            "saved_tokens": saved_tokens,
             "period": period,
         }
 
@@ -479,6 +616,10 @@ class TokenUsageStats:
             )
         console.print(f"📨 Всего запросов: {stats['requests']}")
         console.print(f"💰 Общая стоимость: {stats['total_cost_rub']:.2f} ₽")
+        if stats["cache_hits"]:
+            console.print(
+                f"♻️ Ответов из кэша: {stats['cache_hits']}, сэкономлено ≈ {stats['saved_tokens']} токенов"
+            )
         console.print()
 
         table = Table(title="Разбивка по компонентам", show_header=True, header_style="bold")
@@ -0,0 +1,71 @@
+"""
+Бенчмарк calc_service: все калькуляторы и эндпоинты /options, /param_schema, /choices.
+
+Запуск (из каталога calc_service):
+
+    python -m bench                                   # таблица ops/s, p50/p95/p99, память
+    python -m bench --output bench/baseline.json      # сохранить базовый отчёт
+    python -m bench --compare bench/baseline.json     # сравнить; код 1 при регрессии
+    python -m bench --only calc --slugs laser badge --min-time 0.5
+
+Наборы параметров — bench/cases.json (обновить: python -m bench.mine_cases).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+
+_calc_service = Path(__file__).resolve().parent.parent
+if str(_calc_service) not in sys.path:
+    sys.path.insert(0, str(_calc_service))
+
+from bench import harness  # noqa: E402
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Бенчмарк калькуляторов и эндпоинтов")
+    parser.add_argument("--slugs", nargs="+", help="только эти калькуляторы (по умолчанию все CALCULATORS)")
+    parser.add_argument("--only", choices=("calc", "endpoints"), help="только расчёты или только эндпоинты")
+    parser.add_argument("--min-time", type=float, default=0.2, help="минимальное время замера на бенчмарк, с")
+    parser.add_argument("--output", type=Path, help="записать отчёт JSON (базовый для --compare)")
+    parser.add_argument("--compare", type=Path, help="базовый отчёт JSON для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост p50 (доля), по умолчанию 0.25")
+    args = parser.parse_args(argv)
+
+    benchmarks = []
+    if args.only != "endpoints":
+        benchmarks += harness.calculator_benchmarks(harness.load_cases(), args.slugs)
+    if args.only != "calc":
+        benchmarks += harness.endpoint_benchmarks(args.slugs)
+
+    results = harness.run(benchmarks, min_time=args.min_time, progress=lambda r: print(".", end="", flush=True))
+    print()
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print(harness.format_table(results, baseline))
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(harness.to_report(results), ensure_ascii=False, indent=1) + "\n", encoding="utf-8"
+        )
+        print(f"Отчёт записан: {args.output}")
+
+    if baseline is None:
+        return 1 if any(r.error for r in results) else 0
+    regressions, problems = harness.compare(baseline, results, args.threshold)
+    for problem in problems:
+        print(f"! {problem}")
+    if regressions:
+        print(f"Регрессии (p50 выше базы больше чем на {args.threshold:.0%}):")
+        for reg in regressions:
+            print(f"  {reg.name}: {reg.baseline_p50_us:.1f} → {reg.current_p50_us:.1f} мкс ({reg.ratio:.2f}x)")
+        return 1
+    print("Регрессий нет")
+    return 1 if any(r.error for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
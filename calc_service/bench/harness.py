@@ -0,0 +1,244 @@
+"""
+Бенчмарк калькуляторов и эндпоинтов метаданных.
+
+Что меряется:
+- calc:<slug> — BaseCalculator.execute(params, use_cache=False) для каждого из
+  CALCULATORS на наборах параметров из bench/cases.json (собраны из тестов
+  tests/test_calculators, см. bench/mine_cases.py); кэш результатов не читается,
+  т.е. меряется сам расчёт;
+- options:<slug>, param_schema:<slug>, choices:<slug>.<param> — эндпоинты через
+  TestClient (сериализация и HTTP-слой FastAPI включены).
+
+По каждому бенчмарку: ops/sec, задержка p50/p95/p99 (мкс) и пик выделенной
+памяти на вызов (tracemalloc, отдельным проходом — он замедляет вызовы).
+
+Сравнение с базовым отчётом: бенчмарк регрессировал, если его p50 вырос больше
+чем на threshold (доля) и больше чем на MIN_REGRESSION_US — мелкие колебания
+быстрых бенчмарков не считаются. Базовый отчёт снимается на той же машине.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+CASES_PATH = Path(__file__).resolve().parent / "cases.json"
+
+# Абсолютный порог роста p50, мкс: ниже — шум таймера, а не регрессия
+MIN_REGRESSION_US = 5.0
+
+Call = Callable[[], Any]
+
+
+@dataclass
+class BenchResult:
+    name: str
+    calls: int
+    ops_per_sec: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    alloc_peak_kib: float
+    error: Optional[str] = None
+
+
+@dataclass
+class Regression:
+    name: str
+    baseline_p50_us: float
+    current_p50_us: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current_p50_us / self.baseline_p50_us if self.baseline_p50_us else float("inf")
+
+
+def load_cases(path: Path = CASES_PATH) -> Dict[str, List[Dict[str, Any]]]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Перцентиль по ближайшему рангу (sorted_values отсортированы по возрастанию)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(name: str, calls: Sequence[Call], min_time: float = 0.2, min_calls: int = 20) -> BenchResult:
+    """
+    Вызывать calls по кругу не меньше min_time секунд и min_calls раз; первый
+    круг — прогрев (не меряется). Ошибка вызова — результат с error.
+    """
+    try:
+        for call in calls:
+            call()
+    except Exception as exc:  # noqa: BLE001
+        return BenchResult(name, 0, 0.0, 0.0, 0.0, 0.0, 0.0, error=f"{type(exc).__name__}: {exc}")
+
+    samples: List[float] = []
+    clock = time.perf_counter
+    started = clock()
+    deadline = started + min_time
+    while len(samples) < min_calls or clock() < deadline:
+        for call in calls:
+            t0 = clock()
+            call()
+            samples.append(clock() - t0)
+    total = sum(samples)
+    samples.sort()
+
+    peaks: List[int] = []
+    tracemalloc.start()
+    try:
+        for call in calls:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        name=name,
+        calls=len(samples),
+        ops_per_sec=round(len(samples) / total, 1) if total else 0.0,
+        p50_us=round(percentile(samples, 0.50) * 1e6, 2),
+        p95_us=round(percentile(samples, 0.95) * 1e6, 2),
+        p99_us=round(percentile(samples, 0.99) * 1e6, 2),
+        alloc_peak_kib=round(sum(peaks) / len(peaks) / 1024, 2),
+    )
+
+
+def calculator_benchmarks(
+    cases: Mapping[str, List[Dict[str, Any]]], slugs: Optional[Iterable[str]] = None
+) -> List[Tuple[str, List[Call]]]:
+    """calc:<slug> для всех калькуляторов (или slugs); калькулятор без наборов — ошибка."""
+    from calculators import CALCULATORS
+
+    benchmarks: List[Tuple[str, List[Call]]] = []
+    for slug in slugs or CALCULATORS:
+        calc = CALCULATORS[slug]
+        params_list = cases.get(slug)
+        if not params_list:
+            raise KeyError(f"Нет наборов параметров для {slug!r} в {CASES_PATH.name} (python -m bench.mine_cases)")
+        benchmarks.append(
+            (f"calc:{slug}", [lambda calc=calc, params=params: calc.execute(params, use_cache=False) for params in params_list])
+        )
+    return benchmarks
+
+
+def endpoint_benchmarks(slugs: Optional[Iterable[str]] = None) -> List[Tuple[str, List[Call]]]:
+    """options:<slug>, param_schema:<slug> и choices:<slug>.<param> через TestClient."""
+    from fastapi.testclient import TestClient
+
+    from calculators import CALCULATORS, schema_registry
+    from main import app
+
+    client = TestClient(app)
+
+    def request(method: str, url: str, **kwargs: Any) -> Call:
+        def call() -> Any:
+            response = client.request(method, url, **kwargs)
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url}: HTTP {response.status_code}")
+            return response
+
+        return call
+
+    benchmarks: List[Tuple[str, List[Call]]] = []
+    for slug in slugs or CALCULATORS:
+        benchmarks.append((f"options:{slug}", [request("GET", f"/api/v1/options/{slug}")]))
+        benchmarks.append((f"param_schema:{slug}", [request("GET", f"/api/v1/param_schema/{slug}")]))
+        for param, config in schema_registry.choices_by_param(CALCULATORS[slug]).items():
+            if "source" not in config and "inline" not in config:
+                continue
+            url = "/api/v1/choices"
+            body = {"slug": slug, "param": param, "limit": 20}
+            first = client.post(url, json=body).json().get("items") or []
+            # Запрос по первому слову первого варианта — поиск по индексу, а не только листинг
+            query = (first[0]["title"].split() or [""])[0] if first else ""
+            benchmarks.append(
+                (f"choices:{slug}.{param}", [request("POST", url, json=body), request("POST", url, json={**body, "query": query})])
+            )
+    return benchmarks
+
+
+def run(
+    benchmarks: Iterable[Tuple[str, List[Call]]],
+    min_time: float = 0.2,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> List[BenchResult]:
+    # Логи запросов (log_requests, choices) не должны попадать в замер
+    logging.disable(logging.INFO)
+    try:
+        results = []
+        for name, calls in benchmarks:
+            result = measure(name, calls, min_time=min_time)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+        return results
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def to_report(results: Sequence[BenchResult]) -> Dict[str, Any]:
+    import platform
+
+    from common import generation
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "data_version": generation.current().version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": {r.name: asdict(r) for r in results},
+    }
+
+
+def compare(
+    baseline: Mapping[str, Any], results: Sequence[BenchResult], threshold: float = 0.25
+) -> Tuple[List[Regression], List[str]]:
+    """
+    Регрессии относительно базового отчёта (p50 вырос > threshold и > MIN_REGRESSION_US)
+    и бенчмарки, которых нет в базовом отчёте или которые упали с ошибкой.
+    """
+    base_results = baseline.get("results", {})
+    regressions: List[Regression] = []
+    problems: List[str] = []
+    for result in results:
+        base = base_results.get(result.name)
+        if result.error:
+            problems.append(f"{result.name}: {result.error}")
+            continue
+        if base is None or base.get("error"):
+            problems.append(f"{result.name}: нет в базовом отчёте")
+            continue
+        base_p50 = float(base["p50_us"])
+        if result.p50_us > base_p50 * (1 + threshold) and result.p50_us - base_p50 > MIN_REGRESSION_US:
+            regressions.append(Regression(result.name, base_p50, result.p50_us))
+    return regressions, problems
+
+
+def format_table(results: Sequence[BenchResult], baseline: Optional[Mapping[str, Any]] = None) -> str:
+    base_results = (baseline or {}).get("results", {})
+    header = f"{'бенчмарк':<40} {'ops/s':>10} {'p50, мкс':>10} {'p95, мкс':>10} {'p99, мкс':>10} {'пик, КиБ':>9}"
+    if baseline is not None:
+        header += f" {'p50/база':>9}"
+    lines = [header]
+    for r in results:
+        if r.error:
+            lines.append(f"{r.name:<40} ОШИБКА: {r.error}")
+            continue
+        line = f"{r.name:<40} {r.ops_per_sec:>10.1f} {r.p50_us:>10.1f} {r.p95_us:>10.1f} {r.p99_us:>10.1f} {r.alloc_peak_kib:>9.1f}"
+        if baseline is not None:
+            base = base_results.get(r.name)
+            line += f" {r.p50_us / base['p50_us']:>8.2f}x" if base and base.get("p50_us") else f" {'—':>9}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,92 @@
+"""
+Сбор наборов параметров для бенчмарка из тестов калькуляторов.
+
+Плагин pytest: на время прогона tests/test_calculators перехватывает внешние
+(не вложенные) вызовы calculate()/execute() калькуляторов и сохраняет их
+параметры в bench/cases.json — по MAX_CASES различных наборов на калькулятор.
+Вызовы, закончившиеся ошибкой (тесты на валидацию), не сохраняются.
+
+Запуск (из каталога calc_service):
+
+    python -m bench.mine_cases
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+CASES_PATH = Path(__file__).resolve().parent / "cases.json"
+MAX_CASES = 5
+
+_cases: Dict[str, List[Dict[str, Any]]] = {}
+_seen: set[str] = set()
+_local = threading.local()
+
+
+def _record(slug: str, params: Any) -> None:
+    try:
+        encoded = json.dumps(dict(params), ensure_ascii=False, sort_keys=True)
+    except (TypeError, ValueError):
+        return
+    key = f"{slug}:{encoded}"
+    if key in _seen or len(_cases.get(slug, [])) >= MAX_CASES:
+        return
+    _seen.add(key)
+    _cases.setdefault(slug, []).append(json.loads(encoded))
+
+
+def _outermost(method):
+    def wrapper(self, params, *args, **kwargs):
+        depth = getattr(_local, "depth", 0)
+        _local.depth = depth + 1
+        try:
+            result = method(self, params, *args, **kwargs)
+        finally:
+            _local.depth = depth
+        if depth == 0:
+            _record(self.slug, params)
+        return result
+
+    wrapper.__wrapped__ = method  # type: ignore[attr-defined]
+    return wrapper
+
+
+def pytest_configure(config: Any) -> None:
+    from calculators import CALCULATORS
+
+    classes = {type(calc) for calc in CALCULATORS.values()}
+    for cls in classes:
+        for name in ("calculate", "execute"):
+            method = cls.__dict__.get(name)
+            if method is not None:
+                setattr(cls, name, _outermost(method))
+    from calculators.base import BaseCalculator
+
+    BaseCalculator.execute = _outermost(BaseCalculator.execute)  # type: ignore[method-assign]
+
+
+def pytest_unconfigure(config: Any) -> None:
+    from calculators import CALCULATORS
+
+    ordered = {slug: _cases[slug] for slug in CALCULATORS if slug in _cases}
+    CASES_PATH.write_text(json.dumps(ordered, ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+def main() -> int:
+    code = subprocess.call(
+        [sys.executable, "-m", "pytest", "-q", "-p", "bench.mine_cases", "tests/test_calculators"],
+        cwd=ROOT,
+    )
+    cases = json.loads(CASES_PATH.read_text(encoding="utf-8"))
+    print(f"{CASES_PATH}: {sum(map(len, cases.values()))} наборов для {len(cases)} калькуляторов")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,95 +2,122 @@
 Реестр калькуляторов сервиса.
 
 Используется API и ботом для вызова по slug.
+
+Реестр ленивый: slug → модуль и класс калькулятора описаны статически
+(CALCULATOR_INFO), модуль импортируется и калькулятор создаётся при первом
+обращении к CALCULATORS[slug] / get_calculator(slug). Поэтому списку slug
+(CALCULATORS.keys(), public_slugs()) не нужны ни модули калькуляторов, ни
+справочники data/. API загружает все калькуляторы при старте (прогрев схем).
 """
 
 from __future__ import annotations
 
-from typing import Dict
-
-from .base import BaseCalculator
-from .cut_guillotine import CutGuillotineCalculator
-from .cut_plotter import CutPlotterCalculator
-from .cut_roller import CutRollerCalculator
-from .lamination import LaminationCalculator
-from .laser import LaserCalculator
-from .milling import MillingCalculator
-from .print_inkjet import PrintInkjetCalculator
-from .print_laser import PrintLaserCalculator
-from .print_offset import PrintOffsetCalculator
-from .print_roll import PrintRollCalculator
-from .print_sheet import PrintSheetCalculator
-from .print_wide import PrintWideCalculator
-from .sticker import StickerCalculator
-from .poly_sticker import PolyStickerCalculator
-from .uv_print import UVPrintCalculator
-from .uv_badge import UVBadgeCalculator
-from .cards import CardsCalculator
-from .mug import MugCalculator
-from .keychain import KeychainCalculator
-from .flag import FlagCalculator
-from .pennant import PennantCalculator
-from .rollup import RollupCalculator
-from .puzzle import PuzzleCalculator
-from .design import DesignCalculator
-from .presswall import PresswallCalculator
-from .notebook import NotebookCalculator
-from .metal_pins import MetalPinsCalculator
-from .acrylic_prizes import AcrylicPrizesCalculator
-from .embossing import EmbossingCalculator
-from .pad_print import PadPrintCalculator
-from .magnets import MagnetAcrylicCalculator, MagnetLaminatedCalculator
-from .badge import BadgeCalculator
-from .calendar_calc import CalendarCalculator
-from .heat_press import HeatPressCalculator
-from .canvas import CanvasCalculator
-from .tablets import TabletsCalculator
-from .shild import ShildCalculator
-
-CALCULATORS: Dict[str, BaseCalculator] = {
-    "laser": LaserCalculator(),
-    "cut_plotter": CutPlotterCalculator(),
-    "cut_guillotine": CutGuillotineCalculator(),
-    "cut_roller": CutRollerCalculator(),
-    "milling": MillingCalculator(),
-    "lamination": LaminationCalculator(),
-    "print_sheet": PrintSheetCalculator(),
-    "print_laser": PrintLaserCalculator(),
-    "print_wide": PrintWideCalculator(),
-    "print_inkjet": PrintInkjetCalculator(),
-    "print_roll": PrintRollCalculator(),
-    "print_offset": PrintOffsetCalculator(),
-    "sticker": StickerCalculator(),
-    "poly_sticker": PolyStickerCalculator(),
-    "uv_print": UVPrintCalculator(),
-    "uv_badge": UVBadgeCalculator(),
-    "cards": CardsCalculator(),
-    "mug": MugCalculator(),
-    "keychain": KeychainCalculator(),
-    "flag": FlagCalculator(),
-    "pennant": PennantCalculator(),
-    "rollup": RollupCalculator(),
-    "puzzle": PuzzleCalculator(),
-    "design": DesignCalculator(),
-    "presswall": PresswallCalculator(),
-    "notebook": NotebookCalculator(),
-    "metal_pins": MetalPinsCalculator(),
-    "acrylic_prizes": AcrylicPrizesCalculator(),
-    "embossing": EmbossingCalculator(),
-    "pad_print": PadPrintCalculator(),
-    "magnet_acrylic": MagnetAcrylicCalculator(),
-    "magnet_laminated": MagnetLaminatedCalculator(),
-    "badge": BadgeCalculator(),
-    "calendar": CalendarCalculator(),
-    "heat_press": HeatPressCalculator(),
-    "canvas": CanvasCalculator(),
-    "tablets": TabletsCalculator(),
-    "shild": ShildCalculator(),
+import importlib
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple
+
+if TYPE_CHECKING:
+    from .base import BaseCalculator
+
+
+class CalculatorInfo(NamedTuple):
+    """Статическое описание калькулятора в реестре."""
+
+    module: str  # модуль в пакете calculators
+    class_name: str
+    # Совпадает с атрибутом is_public класса (проверяется в тестах)
+    is_public: bool = True
+
+
+CALCULATOR_INFO: Dict[str, CalculatorInfo] = {
+    "laser": CalculatorInfo("laser", "LaserCalculator"),
+    "cut_plotter": CalculatorInfo("cut_plotter", "CutPlotterCalculator"),
+    "cut_guillotine": CalculatorInfo("cut_guillotine", "CutGuillotineCalculator", is_public=False),
+    "cut_roller": CalculatorInfo("cut_roller", "CutRollerCalculator"),
+    "milling": CalculatorInfo("milling", "MillingCalculator"),
+    "lamination": CalculatorInfo("lamination", "LaminationCalculator"),
+    "print_sheet": CalculatorInfo("print_sheet", "PrintSheetCalculator"),
+    "print_laser": CalculatorInfo("print_laser", "PrintLaserCalculator", is_public=False),
+    "print_wide": CalculatorInfo("print_wide", "PrintWideCalculator"),
+    "print_inkjet": CalculatorInfo("print_inkjet", "PrintInkjetCalculator"),
+    "print_roll": CalculatorInfo("print_roll", "PrintRollCalculator"),
+    "print_offset": CalculatorInfo("print_offset", "PrintOffsetCalculator"),
+    "sticker": CalculatorInfo("sticker", "StickerCalculator"),
+    "poly_sticker": CalculatorInfo("poly_sticker", "PolyStickerCalculator"),
+    "uv_print": CalculatorInfo("uv_print", "UVPrintCalculator"),
+    "uv_badge": CalculatorInfo("uv_badge", "UVBadgeCalculator"),
+    "cards": CalculatorInfo("cards", "CardsCalculator"),
+    "mug": CalculatorInfo("mug", "MugCalculator"),
+    "keychain": CalculatorInfo("keychain", "KeychainCalculator"),
+    "flag": CalculatorInfo("flag", "FlagCalculator"),
+    "pennant": CalculatorInfo("pennant", "PennantCalculator"),
+    "rollup": CalculatorInfo("rollup", "RollupCalculator"),
+    "puzzle": CalculatorInfo("puzzle", "PuzzleCalculator"),
+    "design": CalculatorInfo("design", "DesignCalculator"),
+    "presswall": CalculatorInfo("presswall", "PresswallCalculator"),
+    "notebook": CalculatorInfo("notebook", "NotebookCalculator"),
+    "metal_pins": CalculatorInfo("metal_pins", "MetalPinsCalculator"),
+    "acrylic_prizes": CalculatorInfo("acrylic_prizes", "AcrylicPrizesCalculator"),
+    "embossing": CalculatorInfo("embossing", "EmbossingCalculator"),
+    "pad_print": CalculatorInfo("pad_print", "PadPrintCalculator"),
+    "magnet_acrylic": CalculatorInfo("magnets", "MagnetAcrylicCalculator"),
+    "magnet_laminated": CalculatorInfo("magnets", "MagnetLaminatedCalculator"),
+    "badge": CalculatorInfo("badge", "BadgeCalculator"),
+    "calendar": CalculatorInfo("calendar_calc", "CalendarCalculator"),
+    "heat_press": CalculatorInfo("heat_press", "HeatPressCalculator"),
+    "canvas": CalculatorInfo("canvas", "CanvasCalculator"),
+    "tablets": CalculatorInfo("tablets", "TabletsCalculator"),
+    "shild": CalculatorInfo("shild", "ShildCalculator"),
 }
 
 
+class CalculatorRegistry(Mapping[str, "BaseCalculator"]):
+    """slug → экземпляр калькулятора; создаётся при первом обращении, далее один на процесс."""
+
+    def __init__(self, info: Mapping[str, CalculatorInfo]) -> None:
+        self._info = info
+        self._instances: Dict[str, BaseCalculator] = {}
+        # RLock: конструктор калькулятора может сам обратиться к реестру
+        self._lock = threading.RLock()
+
+    def __getitem__(self, slug: str) -> BaseCalculator:
+        calc = self._instances.get(slug)
+        if calc is not None:
+            return calc
+        entry = self._info[slug]
+        with self._lock:
+            calc = self._instances.get(slug)
+            if calc is None:
+                module = importlib.import_module(f"{__name__}.{entry.module}")
+                calc = getattr(module, entry.class_name)()
+                self._instances[slug] = calc
+        return calc
+
+    def __contains__(self, slug: object) -> bool:
+        return slug in self._info
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._info)
+
+    def __len__(self) -> int:
+        return len(self._info)
+
+    def loaded(self) -> List[str]:
+        """slug уже созданных калькуляторов."""
+        return [slug for slug in self._info if slug in self._instances]
+
+
+CALCULATORS: CalculatorRegistry = CalculatorRegistry(CALCULATOR_INFO)
+
+
 def get_calculator(slug: str) -> BaseCalculator:
     """Получить калькулятор по slug."""
     if slug not in CALCULATORS:
         raise KeyError(f"Неизвестный калькулятор: {slug!r}")
     return CALCULATORS[slug]
+
+
+def public_slugs() -> List[str]:
+    """slug публичных калькуляторов (без импорта модулей калькуляторов)."""
+    return [slug for slug, info in CALCULATOR_INFO.items() if info.is_public]
@@ -21,13 +21,8 @@ from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight, find_in_table
 from common.holidays import add_working_hours, next_working_day
 from common.layout import layout_on_roll, layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MIN,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from materials.loader import load_catalog
 from equipment.loader import load_generic_catalog, load_laser_catalog
 
@@ -187,7 +182,7 @@ class TemplateCalculator(BaseCalculator):
             "price": 0.0,
             "unit_price": 0.0,
             "time_hours": 0.0,
-            "time_ready": BASE_TIME_READY[1] if BASE_TIME_READY else 0.0,
+            "time_ready": markups.BASE_TIME_READY[1] if markups.BASE_TIME_READY else 0.0,
             "weight_kg": 0.0,
             "materials": [],
         }
@@ -16,7 +16,8 @@ from calculators.laser import LaserCalculator
 from calculators.uv_print import UVPrintCalculator
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import BASE_TIME_READY, MARGIN_MATERIAL, MARGIN_OPERATION, get_margin, get_time_ready
+from common import markups
+from common.markups import get_margin, get_time_ready
 from common.process_tools import calc_attachment, calc_packing
 from equipment import laminator as laminator_catalog
 from materials import hardsheet as hardsheet_catalog, sheet as sheet_catalog
@@ -56,7 +57,7 @@ def _calc_lamination_roll(num_sheet: int, size_sheet: List[float], mode: int) ->
 
     cost = cost_roll + cost_operator
     margin_lam = get_margin("marginLamination") or 0
-    price = (cost_roll + cost_operator) * (1 + MARGIN_OPERATION + margin_lam)
+    price = (cost_roll + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_lam)
 
     return {
         "cost": cost,
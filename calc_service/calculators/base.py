@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import functools
 from abc import ABC, abstractmethod
 from enum import IntEnum
-from typing import Any, Dict, Mapping, TypedDict, Literal, List
+from time import perf_counter
+from typing import Any, Dict, Mapping, TypedDict, Literal, List, Sequence
 
 from urllib.parse import urlencode
 
+from calculators import schema_registry
+from common import calc_context, generation, metrics, trace
+from common.result_cache import RESULT_CACHE, canonicalize, expand_list_params
+from common.single_flight import SINGLE_FLIGHT
 from config import SITE_URL
 
 
@@ -47,6 +53,33 @@ class ProductionMode(IntEnum):
     EXPRESS = 2
 
 
+def _memoized_calculate(calculate):
+    """
+    Обёртка calculate(): внутри контекста расчёта (common.calc_context) одинаковые
+    вложенные вызовы калькулятора с теми же параметрами считаются один раз.
+    Вызов верхнего уровня не мемоизируется — его кэширует RESULT_CACHE.
+    """
+
+    @functools.wraps(calculate)
+    def wrapper(self: "BaseCalculator", params: Mapping[str, Any]) -> Dict[str, Any]:
+        context = calc_context.active()
+        if context is None:
+            return calculate(self, params)
+        with trace.stage(f"calculator:{self.slug or type(self).__name__}"):
+            if context.depth:
+                key = (type(self), calculate, canonicalize(params))
+                result = context.cached(f"calc:{self.slug or type(self).__name__}", key, lambda: calculate(self, params))
+                return dict(result)
+            context.depth += 1
+            try:
+                return calculate(self, params)
+            finally:
+                context.depth -= 1
+
+    wrapper.request_memoized = True  # type: ignore[attr-defined]
+    return wrapper
+
+
 class BaseCalculator(ABC):
     """
     Базовый класс калькулятора.
@@ -68,6 +101,13 @@ class BaseCalculator(ABC):
     # чтобы они не светились менеджеру, но оставались доступны по slug для внутренних вызовов.
     is_public: bool = True
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Вложенные вызовы calculate() мемоизируются в пределах одного запроса
+        calculate = cls.__dict__.get("calculate")
+        if calculate is not None and not getattr(calculate, "request_memoized", False):
+            cls.calculate = _memoized_calculate(calculate)  # type: ignore[method-assign]
+
     @abstractmethod
     def calculate(self, params: Mapping[str, Any]) -> Dict[str, Any]:
         """
@@ -142,25 +182,75 @@ class BaseCalculator(ABC):
         query = urlencode(flat)
         return f"{base}/calculator/{slug}/?{query}" if query else f"{base}/calculator/{slug}/"
 
-    def execute(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+    def execute(self, params: Mapping[str, Any], use_cache: bool = True) -> Dict[str, Any]:
         """
         Выполнить расчёт и добавить share_url к результату.
+
+        Результат calculate() кэшируется (common.result_cache) по канонической
+        форме params и версии данных; share_url строится по фактическим params.
+        use_cache=False — посчитать заново, не читая кэш (трассировка ?trace=1).
+        Расчёт целиком идёт на одном поколении данных (common.generation), даже
+        если справочники перезагрузили во время расчёта. Одинаковые вложенные
+        расчёты внутри запроса считаются один раз (common.calc_context), одинаковые
+        одновременные запросы — один раз на всех (common.single_flight). Время
+        расчёта попадает в метрики, доля расчётов трассируется (common.trace).
         """
-        result = dict(self.calculate(params))
+        list_keys = self._list_param_names()
+        slug = self.slug or self.__class__.__name__
+        started = perf_counter()
+        with generation.pinned(), calc_context.request_context(), trace.tracing():
+            key = RESULT_CACHE.make_key(slug, params, list_keys)
+            result = RESULT_CACHE.get(key) if use_cache else None
+            cache = "hit" if result is not None else ("miss" if use_cache else "bypass")
+            if result is None:
+
+                def compute() -> Dict[str, Any]:
+                    computed = dict(self.calculate(expand_list_params(params, list_keys)))
+                    RESULT_CACHE.put(key, computed)
+                    return computed
+
+                if use_cache:
+                    # Одинаковый расчёт уже идёт в другом потоке — дождаться его результата
+                    result, coalesced = SINGLE_FLIGHT.do(key, compute)
+                    if coalesced:
+                        cache = "coalesced"
+                else:
+                    result = compute()
+        metrics.CALCULATION_SECONDS.observe(perf_counter() - started, slug, cache)
         # Добавляем share_url только если его ещё нет
         if "share_url" not in result:
             result["share_url"] = self.make_share_url(params)
         return result
 
+    def _list_param_names(self) -> frozenset[str]:
+        """
+        Имена параметров-массивов из get_tool_schema() (type == "array").
+        Для них строка "30,40" из share_url трактуется как [30, 40].
+        """
+        return schema_registry.list_param_names(self)
+
+    def calculate_ladder(
+        self, params: Mapping[str, Any], quantities: Sequence[int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Расчёт одного изделия для нескольких тиражей (ценовая лестница).
+
+        Возвращает по результату calculate() на каждый тираж из quantities
+        (параметр "quantity" в params подменяется). Базовая реализация просто
+        вызывает calculate() для каждого тиража; калькуляторы с дорогой
+        тиражонезависимой частью (подбор формата, раскладка, поиск оборудования)
+        переопределяют метод и считают эту часть один раз.
+        """
+        return [self.calculate({**params, "quantity": int(q)}) for q in quantities]
+
     def get_required_params(self) -> List[str]:
         """
         Вернуть список обязательных параметров калькулятора.
 
-        Базируется на поле required в схемe, возвращаемой get_param_schema().
+        Базируется на поле required в схемe, возвращаемой get_param_schema()
+        (схема берётся из реестра, см. calculators.schema_registry).
         """
-        schema = self.get_param_schema()
-        params: List[ParamDef] = schema.get("params", [])  # type: ignore[assignment]
-        return [p["name"] for p in params if p.get("required")]
+        return list(schema_registry.required_params(self))
 
     def get_default_values(self) -> Dict[str, Any]:
         """
@@ -168,13 +258,7 @@ class BaseCalculator(ABC):
 
         Полезно для инициализации форм и автодополнения параметров агента.
         """
-        schema = self.get_param_schema()
-        params: List[ParamDef] = schema.get("params", [])  # type: ignore[assignment]
-        defaults: Dict[str, Any] = {}
-        for p in params:
-            if "default" in p and p["default"] is not None:
-                defaults[p["name"]] = p["default"]
-        return defaults
+        return dict(schema_registry.default_values(self))
 
     def get_llm_prompt(self) -> str:
         """
@@ -13,7 +13,7 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_sheet import PrintSheetCalculator
-from common.markups import BASE_TIME_READY, get_margin, get_time_ready
+from common.markups import get_margin, get_time_ready
 from common.process_tools import (
     calc_binding,
     calc_eyelet_sheet,
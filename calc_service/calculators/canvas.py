@@ -14,12 +14,8 @@ from typing import Any, Dict, List, Mapping
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_roll import PrintRollCalculator
 from common.helpers import calc_weight
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_cut_profile, calc_set_canvas_frame
 from materials import profile as profile_catalog, roll as roll_catalog
 
@@ -177,11 +173,11 @@ class CanvasCalculator(BaseCalculator):
             time_assembly = (num_corners / 2 * 480) / 3600
             from common.markups import COST_OPERATOR
             cost_assembly = time_assembly * COST_OPERATOR
-            price_assembly = cost_assembly * (1 + MARGIN_OPERATION)
+            price_assembly = cost_assembly * (1 + markups.MARGIN_OPERATION)
 
             cost_frame = cost_material_frame + cut_result.cost + cost_assembly
             price_frame = (
-                cost_material_frame * (1 + MARGIN_MATERIAL)
+                cost_material_frame * (1 + markups.MARGIN_MATERIAL)
                 + cut_result.price
                 + price_assembly
             )
@@ -197,7 +193,7 @@ class CanvasCalculator(BaseCalculator):
             price_total += price_frame
             time_total += time_frame
             weight_total += weight_frame
-            time_ready_frame = time_frame + float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)])
+            time_ready_frame = time_frame + float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)])
             time_ready_max = max(time_ready_max, time_ready_frame)
 
             materials_out.append({
@@ -211,7 +207,7 @@ class CanvasCalculator(BaseCalculator):
         margin_canvas = get_margin("marginCanvas")
         price_total = price_total * (1 + margin_canvas)
         time_hours = math.ceil(time_total * 100) / 100.0
-        time_ready = max(time_ready_max, time_hours + float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)]))
+        time_ready = max(time_ready_max, time_hours + float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)]))
 
         return {
             "cost": float(math.ceil(cost_total)),
@@ -7,39 +7,28 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
-from common.markups import MARGIN_MATERIAL, get_margin, get_time_ready
-
-CARDS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "cards.json"
+from common.data_store import load_json
+from common.helpers import ThresholdTable, cached_table
+from common import markups
+from common.markups import get_margin, get_time_ready
 
 
 def _load_cards_config() -> Dict[str, Any]:
     """Загрузить конфигурацию пластиковых карт из cards.json."""
-    with open(CARDS_JSON, "r", encoding="utf-8") as f:
-        data = json5.load(f)
+    data = load_json("equipment/cards.json")
     return data.get("PlasticCards", {})
 
 
-def _find_cost_tier(cost_table: List[List[float]], n: int) -> float:
+def _find_cost_tier(cost_table: ThresholdTable, n: int) -> float:
     """
     Найти цену за штуку по таблице [[порог, цена], ...].
     idx = findIndex(item => item[0] > n); if idx==-1 idx=len-1 else idx-=1
+    (тираж меньше первого порога, как и в JS, даёт последнюю строку).
     """
-    if not cost_table:
-        return 0.0
-    idx = -1
-    for i, row in enumerate(cost_table):
-        if row[0] > n:
-            idx = i - 1
-            break
-    if idx == -1:
-        idx = len(cost_table) - 1
-    return float(cost_table[idx][1])
+    return cost_table.find_floor(n, cost_table.values[-1])
 
 
 class CardsCalculator(BaseCalculator):
@@ -245,7 +234,7 @@ class CardsCalculator(BaseCalculator):
         if not cost_table:
             raise ValueError(f"Нет таблицы цен для карт {material_id!r}")
 
-        cost_per_piece = _find_cost_tier(cost_table, quantity)
+        cost_per_piece = _find_cost_tier(cached_table(f"cards.{material_id}.cost", cost_table), quantity)
         cost_material = cost_per_piece * quantity
 
         weight_per_piece = float(card.get("weight", default_card.get("weight", 5.0)))
@@ -276,7 +265,7 @@ class CardsCalculator(BaseCalculator):
 
         cost = cost_material + cost_options + cost_shipment
         margin_cards = get_margin("marginCards")
-        price = cost * (1 + MARGIN_MATERIAL + margin_cards)
+        price = cost * (1 + markups.MARGIN_MATERIAL + margin_cards)
 
         time_prepare = float(tool.get("timePrepare", 0.5))
         base_time_ready = tool.get("baseTimeReady")
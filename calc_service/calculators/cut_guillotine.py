@@ -13,12 +13,8 @@ from typing import Any, Dict, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import cutter as cutter_catalog
 from materials import get_material
 
@@ -234,11 +230,11 @@ class CutGuillotineCalculator(BaseCalculator):
         cost = math.ceil(cost_dep + cost_process + cost_operator)
 
         margin_extra = get_margin("marginCutGuillotine")
-        effective_margin = max(MARGIN_OPERATION + margin_extra, MARGIN_MIN)
+        effective_margin = max(markups.MARGIN_OPERATION + margin_extra, markups.MARGIN_MIN)
         price = math.ceil(cost * (1 + effective_margin))
 
         time_hours = math.ceil(time_cut * 100) / 100.0
-        base_ready = cutter.base_time_ready if cutter.base_time_ready else BASE_TIME_READY
+        base_ready = cutter.base_time_ready if cutter.base_time_ready else markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, int(mode.value)))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -9,16 +9,13 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Mapping, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
 from calculators.base import BaseCalculator, ProductionMode
-from common.layout import layout_on_roll, layout_on_roll_with_orientation, layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.layout import layout_on_roll_batch, layout_on_sheet
+from common import markups
+from common.markups import get_margin
 from equipment import plotter as plotter_catalog
 
 PLOTTER_CODE = "GraphtecCE5000-60"
@@ -26,6 +23,29 @@ SHEET_CATEGORIES = ("sheet", "roll")
 INTERVAL_DEFAULT = 4.0
 
 
+@dataclass
+class _CutPlotterPlan:
+    """
+    Тиражонезависимые промежуточные данные расчёта (см. CutPlotterCalculator._prepare).
+    plotter = None — плоттер не найден, результат пустой.
+    """
+
+    params: Mapping[str, Any]
+    size: List[float]
+    material_id: str
+    interval: float
+    mode: ProductionMode
+    plotter: Any = None
+    material: Any = None
+    margins: Optional[List[float]] = None
+    process_per_hour: float = 120.0
+    len_cut: float = 0.0
+    max_plotter: Optional[List[float]] = None
+    is_roll: bool = False
+    # Изделий на листе плоттера (только для листового материала).
+    num_on_plotter: int = 0
+
+
 def _find_material(material_id: str):
     """Найти материал в sheet или roll."""
     from materials import get_material
@@ -168,14 +188,26 @@ class CutPlotterCalculator(BaseCalculator):
 
     def calculate(self, params: Mapping[str, Any]) -> Dict[str, Any]:
         quantity = int(params.get("quantity", 1))
+        return self._calculate_quantity(self._prepare(params), quantity)
+
+    def calculate_ladder(
+        self, params: Mapping[str, Any], quantities: Sequence[int]
+    ) -> List[Dict[str, Any]]:
+        """Ценовая лестница: плоттер, материал, длина реза и раскладка листа считаются один раз."""
+        plan = self._prepare(params)
+        return [self._calculate_quantity(plan, int(q)) for q in quantities]
+
+    def _prepare(self, params: Mapping[str, Any]) -> _CutPlotterPlan:
+        """
+        Тиражонезависимая часть расчёта: плоттер, материал, скорость резки,
+        длина реза одного изделия и раскладка на листе плоттера.
+        """
         w = float(params.get("width", 0))
         h = float(params.get("height", 0))
         size = [w, h]
         material_id = str(params.get("material_id", "") or "").strip()
         plotter_code = str(params.get("plotter_code", "") or PLOTTER_CODE).strip() or PLOTTER_CODE
         interval = float(params.get("interval", INTERVAL_DEFAULT) or INTERVAL_DEFAULT)
-        is_find_mark = bool(params.get("is_find_mark", False))
-        is_del_film = bool(params.get("is_del_film", True))
         len_cut_param = params.get("len_cut")
         len_cut = float(len_cut_param) if len_cut_param is not None else 0.0
         density = float(params.get("density", 0) or 0)
@@ -183,22 +215,20 @@ class CutPlotterCalculator(BaseCalculator):
         size_item = float(params.get("size_item", 0) or 0)
         mode = ProductionMode(int(params.get("mode", 1)))
 
+        plan = _CutPlotterPlan(params=params, size=size, material_id=material_id, interval=interval, mode=mode)
+
         try:
             plotter = plotter_catalog.get(plotter_code)
         except KeyError:
             plotter = plotter_catalog.get(PLOTTER_CODE) if plotter_catalog._items else None
         if not plotter:
-            return self._empty_result(size, quantity, mode)
+            return plan
 
         material = _find_material(material_id) if material_id else None
         margins = list(plotter.margins or [30, 10, 10, 10])
         if len(margins) < 4:
             margins = [30, 10, 10, 10]
         # TODO: marginsMark from plotter when is_find_mark
-        defects = plotter.get_defect_rate(float(quantity))
-        if mode.value >= 2:
-            defects += defects * (mode.value - 1)
-        num_with_defects = math.ceil(quantity * (1 + defects))
 
         thickness_um = 80.0
         if material:
@@ -220,7 +250,42 @@ class CutPlotterCalculator(BaseCalculator):
             len_cut *= difficulty
 
         max_plotter = plotter.max_size or [603, 5000]
-        is_roll = material and getattr(material, "is_roll", False)
+
+        plan.plotter = plotter
+        plan.material = material
+        plan.margins = margins
+        plan.process_per_hour = process_per_hour
+        plan.len_cut = len_cut
+        plan.max_plotter = max_plotter
+        plan.is_roll = bool(material and getattr(material, "is_roll", False))
+        if not (plan.is_roll and material.sizes):
+            plan.num_on_plotter = layout_on_sheet(size, max_plotter, margins, interval)["num"]
+        return plan
+
+    def _calculate_quantity(self, plan: _CutPlotterPlan, quantity: int) -> Dict[str, Any]:
+        """Тиражозависимая часть: брак, раскрой рулона или число листов, время и цена."""
+        size = plan.size
+        mode = plan.mode
+        plotter = plan.plotter
+        if plotter is None:
+            return self._empty_result(size, quantity, mode)
+
+        params = plan.params
+        material = plan.material
+        material_id = plan.material_id
+        margins = plan.margins
+        interval = plan.interval
+        process_per_hour = plan.process_per_hour
+        len_cut = plan.len_cut
+        max_plotter = plan.max_plotter
+        is_roll = plan.is_roll
+        is_find_mark = bool(params.get("is_find_mark", False))
+
+        defects = plotter.get_defect_rate(float(quantity))
+        if mode.value >= 2:
+            defects += defects * (mode.value - 1)
+        num_with_defects = math.ceil(quantity * (1 + defects))
+
         len_material_mm: Optional[float] = None
 
         if is_roll and material and material.sizes:
@@ -232,17 +297,17 @@ class CutPlotterCalculator(BaseCalculator):
             len_material_mm = None
             num_sheet = None
 
-            for roll_size in roll_sizes:
+            # Полезная ширина рулона (JS: sizeMaterial[0] - margins[0] - margins[2])
+            roll_effs = [float(roll_size[0]) - margins[0] - margins[2] for roll_size in roll_sizes]
+            # Проверка: изделие помещается на плоттер (JS: layoutOnPlotter) — от рулона не зависит
+            fits_plotter = layout_on_roll_batch(num_with_defects, [size], [max_plotter[0]], interval)[0][0] > 0
+            # Способы 1 и 2 (поперёк рулона) для всех рулонов — одним пакетом (common.layout)
+            lengths_way1 = layout_on_roll_batch(num_with_defects, [size], roll_effs, interval, -1)[0]
+            lengths_way2 = layout_on_roll_batch(num_with_defects, [size], roll_effs, interval, 1)[0]
+
+            for roll_size, roll_eff, length_way1, length_way2 in zip(roll_sizes, roll_effs, lengths_way1, lengths_way2):
                 roll_w = float(roll_size[0])
-                # Полезная ширина рулона (JS: sizeMaterial[0] - margins[0] - margins[2])
-                roll_eff = roll_w - margins[0] - margins[2]
-                if roll_eff <= 0:
-                    continue
-                # Проверка: изделие помещается на плоттер (JS: layoutOnPlotter)
-                layout_plotter_check = layout_on_roll(
-                    num_with_defects, size, [max_plotter[0], 0.0], interval
-                )
-                if layout_plotter_check["length"] <= 0:
+                if roll_eff <= 0 or not fits_plotter:
                     continue
 
                 cur_len = 0.0
@@ -250,9 +315,6 @@ class CutPlotterCalculator(BaseCalculator):
 
                 # Способ 1: поперёк рулона, короткой стороной по ширине (JS: if maxSize <= plotter.maxSize[0])
                 if max_size <= max_plotter[0]:
-                    length_way1 = layout_on_roll_with_orientation(
-                        num_with_defects, size, roll_eff, interval, -1
-                    )
                     if length_way1 > 0:
                         num_sheet_far = math.ceil(length_way1 / max_plotter[0])
                         l1 = length_way1 + num_sheet_far * (margins[1] + margins[3])
@@ -261,9 +323,6 @@ class CutPlotterCalculator(BaseCalculator):
                             cur_num_sheet = num_sheet_far
 
                 # Способ 2: поперёк рулона, длинной стороной по ширине
-                length_way2 = layout_on_roll_with_orientation(
-                    num_with_defects, size, roll_eff, interval, 1
-                )
                 if length_way2 > 0:
                     num_sheet_far = math.ceil(length_way2 / max_plotter[0])
                     l2 = length_way2 + num_sheet_far * (margins[1] + margins[3])
@@ -332,14 +391,14 @@ class CutPlotterCalculator(BaseCalculator):
             if num_sheet is None:
                 num_sheet = math.ceil(len_material_mm / max_plotter[0])
         else:
-            layout_plotter = layout_on_sheet(size, max_plotter, margins, interval)
-            if layout_plotter["num"] == 0:
+            num_on_plotter = plan.num_on_plotter
+            if num_on_plotter == 0:
                 return self._empty_result(size, quantity, mode)
-            num_sheet = math.ceil(num_with_defects / layout_plotter["num"])
+            num_sheet = math.ceil(num_with_defects / num_on_plotter)
             len_cut_with_defects = (
                 len_cut * num_with_defects
                 if num_sheet <= 1
-                else len_cut * layout_plotter["num"] * num_sheet
+                else len_cut * num_on_plotter * num_sheet
             )
 
         # В JS: lenCut в метрах, timeCut = lenCutWithDefects/processPerHour (без /1000), costCut += lenCutWithDefects*costProcess
@@ -358,10 +417,10 @@ class CutPlotterCalculator(BaseCalculator):
         cost = cost_depreciation + cost_process + cost_operator
 
         margin_extra = get_margin("marginPlotter")
-        effective_margin = max(MARGIN_OPERATION + margin_extra, MARGIN_MIN)
+        effective_margin = max(markups.MARGIN_OPERATION + margin_extra, markups.MARGIN_MIN)
         price = math.ceil(cost * (1 + effective_margin))
 
-        base_ready = plotter.base_time_ready or BASE_TIME_READY
+        base_ready = plotter.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, mode.value))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -413,7 +472,7 @@ class CutPlotterCalculator(BaseCalculator):
         }
 
     def _empty_result(self, size: List[float], quantity: int, mode: ProductionMode) -> Dict[str, Any]:
-        base = BASE_TIME_READY
+        base = markups.BASE_TIME_READY
         idx = max(0, min(len(base) - 1, mode.value))
         return {
             "cost": 0.0,
@@ -18,14 +18,9 @@ from typing import Any, Dict, List, Mapping, Optional, Sequence
 
 from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight
-from common.layout import layout_on_roll, layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.layout import layout_on_roll_batch, layout_on_sheet_batch
+from common import markups
+from common.markups import get_margin
 from equipment import cutter as cutter_catalog
 from materials import get_material
 
@@ -206,8 +201,21 @@ class CutRollerCalculator(BaseCalculator):
 
         thickness = getattr(material, "thickness", None) or 0.0
 
-        for sz in sizes_material:
-            size_w, size_h = float(sz[0]), float(sz[1])
+        # Раскладка на всех форматах материала — одним пакетом (common.layout)
+        formats = [(float(sz[0]), float(sz[1])) for sz in sizes_material]
+        sheets = [fmt for fmt in formats if fmt[1] != 0]
+        on_sheets = layout_on_sheet_batch([size], sheets, [0, 0, 0, 0], interval)
+        min_size = getattr(material, "min_size", None)
+        on_sheets_min = layout_on_sheet_batch([min_size], sheets).num[0] if min_size else on_sheets.num[0]
+        sheet_layouts = iter(zip(on_sheets.num[0], on_sheets.cols[0], on_sheets.rows[0], on_sheets_min))
+        roll_lengths = iter(layout_on_roll_batch(quantity, [size], [w for w, h in formats if h == 0], interval)[0])
+
+        for size_w, size_h in formats:
+            # Раскладку своего вида берём до любых пропусков формата
+            if size_h == 0:
+                len_roll = next(roll_lengths)
+            else:
+                num_on_sheet, cols, rows, layout_min_num = next(sheet_layouts)
             cutter_max_w = (cutter.max_size or [1520, 0])[0] if cutter.max_size else 1520
 
             if min(size_w, size_h) > cutter_max_w:
@@ -219,10 +227,9 @@ class CutRollerCalculator(BaseCalculator):
             len_mat = 0.0
 
             if size_h == 0:
-                layout = layout_on_roll(quantity, size, [size_w, size_h], interval)
-                if layout["num"] == 0:
+                if len_roll == 0.0:
                     continue
-                len_mat = layout["length"]
+                len_mat = len_roll
                 min_side = min(size[0], size[1])
                 step = min_side + interval if interval else min_side
                 num_wide = int((size_w + interval) // step) if step > 0 else 1
@@ -234,19 +241,19 @@ class CutRollerCalculator(BaseCalculator):
                 else:
                     cost_mat = base_cost * len_mat * size_w / 1e6
             else:
-                layout = layout_on_sheet(size, [size_w, size_h], [0, 0, 0, 0], interval)
-                if layout["num"] == 0:
+                if num_on_sheet == 0:
                     continue
-                num_cut_1 = (layout.get("cols", 1) or 1) + (layout.get("cols", 1) or 1) * (layout.get("rows", 1) or 1)
-                num_cut_2 = (layout.get("rows", 1) or 1) + (layout.get("rows", 1) or 1) * (layout.get("cols", 1) or 1)
+                cols = cols or 1
+                rows = rows or 1
+                num_cut_1 = cols + cols * rows
+                num_cut_2 = rows + rows * cols
                 if max(size_w, size_h) > cutter_max_w:
                     num_cut = num_cut_2
                 else:
                     num_cut = min(num_cut_1, num_cut_2)
-                num_cut = math.ceil(num_cut * quantity / layout["num"])
-                layout_min = layout_on_sheet(material.min_size or [size[0], size[1]], [size_w, size_h]) if getattr(material, "min_size", None) else layout
-                layout_min_num = max(1, (layout_min.get("num") or 1))
-                num_sheet = math.ceil(quantity / layout["num"] * layout_min_num) / layout_min_num
+                num_cut = math.ceil(num_cut * quantity / num_on_sheet)
+                layout_min_num = max(1, layout_min_num or 1)
+                num_sheet = math.ceil(quantity / num_on_sheet * layout_min_num) / layout_min_num
                 cost_mat = material.get_cost(num_sheet) * num_sheet * size_w * size_h / 1e6
 
             if thickness > 0:
@@ -282,14 +289,14 @@ class CutRollerCalculator(BaseCalculator):
         cost = math.ceil(cost_material + cost_dep + cost_process + cost_operator)
 
         margin_extra = get_margin("marginCutRoller")
-        effective_margin = max(MARGIN_OPERATION + margin_extra, MARGIN_MIN)
+        effective_margin = max(markups.MARGIN_OPERATION + margin_extra, markups.MARGIN_MIN)
         price = math.ceil(
-            cost_material * (1 + MARGIN_MATERIAL)
+            cost_material * (1 + markups.MARGIN_MATERIAL)
             + (cost_dep + cost_process + cost_operator) * (1 + effective_margin)
         )
 
         time_hours = math.ceil(time_cut * 100) / 100.0
-        base_ready = cutter.base_time_ready if cutter.base_time_ready else BASE_TIME_READY
+        base_ready = cutter.base_time_ready if cutter.base_time_ready else markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, int(mode.value)))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -9,21 +9,17 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
-from common.markups import BASE_TIME_READY, COST_OPERATOR, MARGIN_OPERATION, get_margin
-
-DESIGN_JSON = Path(__file__).parent.parent / "data" / "equipment" / "design.json"
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
 
 
 def _load_design_data() -> Dict[str, Any]:
     """Загрузить данные дизайна из design.json."""
-    with open(DESIGN_JSON, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json("equipment/design.json")
 
 
 def _get_design_tool(design_id: str) -> Dict[str, Any]:
@@ -114,8 +110,8 @@ class DesignCalculator(BaseCalculator):
 
         time_prepare = float(tool.get("timePrepare", 0.05))
         time_process_arr = tool.get("timeProcess", [0.25, 1, 2])
-        cost_operator = float(tool.get("costOperator", 0.0)) or COST_OPERATOR
-        base_time_ready = tool.get("baseTimeReady") or BASE_TIME_READY
+        cost_operator = float(tool.get("costOperator", 0.0)) or markups.COST_OPERATOR
+        base_time_ready = tool.get("baseTimeReady") or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode.value)))
         ready_hours = float(base_time_ready[idx])
 
@@ -129,7 +125,7 @@ class DesignCalculator(BaseCalculator):
         cost_operator_total = time_operator * cost_operator
 
         cost = cost_operator_total
-        price = cost * (1 + MARGIN_OPERATION + get_margin("marginDesign"))
+        price = cost * (1 + markups.MARGIN_OPERATION + get_margin("marginDesign"))
         time_hours = math.ceil(time_operator * 100) / 100
         time_ready = time_hours + ready_hours
 
@@ -7,37 +7,24 @@
 
 from __future__ import annotations
 
-import json5
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
-from common.markups import (
-    BASE_TIME_READY,
-    COST_OPERATOR,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.data_store import load_json
+from common.helpers import ThresholdTable, cached_table
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_shipment
 
-_TOOLS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "tools.json"
-
 
 def _load_tools_raw() -> Dict[str, Any]:
-    with open(_TOOLS_JSON, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json("equipment/tools.json")
 
 
-def _find_cost_for_quantity(cost_table: List[List[float]], n: int) -> float:
+def _find_cost_for_quantity(cost_table: ThresholdTable, n: int) -> float:
     """Найти стоимость за штуку по таблице [[порог, руб/шт], ...]."""
-    if not cost_table:
-        return 0.0
-    for threshold, cost_per_unit in sorted(cost_table, key=lambda x: x[0]):
-        if n <= threshold:
-            return float(cost_per_unit)
-    return float(cost_table[-1][1]) if cost_table else 0.0
+    return cost_table.find(n)
 
 
 def _calc_cliche(size: List[float], mode: int) -> Dict[str, Any]:
@@ -57,7 +44,7 @@ def _calc_cliche(size: List[float], mode: int) -> Dict[str, Any]:
 
     area_cm2 = size[0] * size[1] / 100.0
     cost_material = max(cost_per_cm2 * area_cm2, min_cost)
-    cost_operator = time_prepare * COST_OPERATOR
+    cost_operator = time_prepare * markups.COST_OPERATOR
     weight_kg = weight_per_cm2 * area_cm2 / 1000.0
 
     size_3d = [size[0], size[1], 20]
@@ -66,11 +53,11 @@ def _calc_cliche(size: List[float], mode: int) -> Dict[str, Any]:
     cost = cost_material + cost_ship.cost + cost_operator
     price = (
         cost_ship.price
-        + cost_material * (1 + MARGIN_MATERIAL)
-        + cost_operator * (1 + MARGIN_OPERATION)
+        + cost_material * (1 + markups.MARGIN_MATERIAL)
+        + cost_operator * (1 + markups.MARGIN_OPERATION)
     )
 
-    base_time_ready = tool.get("baseTimeReady") or BASE_TIME_READY
+    base_time_ready = tool.get("baseTimeReady") or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode)))
     time_ready = time_prepare + float(base_time_ready[idx])
 
@@ -263,16 +250,21 @@ class EmbossingCalculator(BaseCalculator):
 
         emb_cost_data = tool_emb.get("cost", {}).get(embossing_type)
         if not emb_cost_data:
+            embossing_type = "foil"
             emb_cost_data = tool_emb.get("cost", {}).get("foil", {})
         cost_table = emb_cost_data.get("cost", [[2000, 11.0]])
         min_cost = float(emb_cost_data.get("minCost", 2000))
 
         time_prepare = float(tool_emb.get("timePrepare", 0)) * max(1, mode.value)
-        cost_operator = time_prepare * COST_OPERATOR
+        cost_operator = time_prepare * markups.COST_OPERATOR
 
-        cost_per_unit = _find_cost_for_quantity(cost_table, quantity)
+        cost_per_unit = (
+            _find_cost_for_quantity(cached_table(f"tools.Embossing.{embossing_type}.cost", cost_table), quantity)
+            if cost_table
+            else 0.0
+        )
         cost_embossing = max(min_cost, cost_per_unit * quantity) + cost_operator
-        price_embossing = cost_embossing * (1 + MARGIN_MATERIAL) + cost_operator * (1 + MARGIN_OPERATION)
+        price_embossing = cost_embossing * (1 + markups.MARGIN_MATERIAL) + cost_operator * (1 + markups.MARGIN_OPERATION)
 
         item_sizes = {
             "diary": ([150, 210, 20], 0.1),
@@ -287,7 +279,7 @@ class EmbossingCalculator(BaseCalculator):
         price_total = (cost_cliche["price"] + price_embossing + cost_ship.price) * (1 + margin_emb)
 
         time_total = cost_cliche["time"] + time_prepare + cost_ship.time_hours
-        base_time_ready = tool_emb.get("baseTimeReady") or BASE_TIME_READY
+        base_time_ready = tool_emb.get("baseTimeReady") or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode.value)))
         time_ready = time_total + max(cost_cliche["time_ready"], float(base_time_ready[idx]))
         weight_kg = cost_cliche["weight"]
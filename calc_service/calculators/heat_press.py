@@ -8,18 +8,16 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_sheet import PrintSheetCalculator
-from common.markups import MARGIN_MATERIAL, MARGIN_OPERATION, get_margin
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_silk_print
 from equipment import heatpress as heatpress_catalog
 
-HEATPRESS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "heatpress.json"
 SUBLIMATION_MATERIAL = "PaperSublimation128"
 SUBLIMATION_PRINTER = "EPSONWF7610"
 DTF_MATERIAL = "PaperDTFTransfer"
@@ -36,8 +34,7 @@ ITEM_DIFFICULTY = {"clothes": 1, "bag": 1}
 
 
 def _load_heatpress_raw(code: str) -> Dict[str, Any]:
-    with open(HEATPRESS_JSON, "r", encoding="utf-8") as f:
-        data = json5.load(f)
+    data = load_json("equipment/heatpress.json")
     return data.get(code, {})
 
 
@@ -226,8 +223,8 @@ class HeatPressCalculator(BaseCalculator):
         cost_total = cost_operator + cost_press + cost_transfer
         margin_heatpress = get_margin("marginHeatPress")
         price_total = (
-            cost_operator * (1 + MARGIN_OPERATION)
-            + cost_press * (1 + MARGIN_MATERIAL)
+            cost_operator * (1 + markups.MARGIN_OPERATION)
+            + cost_press * (1 + markups.MARGIN_MATERIAL)
             + price_transfer
         ) * (1 + margin_heatpress)
 
@@ -11,7 +11,8 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.sticker import StickerCalculator
-from common.markups import MARGIN_MATERIAL, MARGIN_OPERATION, get_margin
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_packing, calc_set_insert
 
 
@@ -154,7 +155,7 @@ class KeychainCalculator(BaseCalculator):
 
         # 1. Заготовка брелока
         cost_blank = float(keychain.cost or 0) * quantity
-        price_blank = cost_blank * (1 + MARGIN_MATERIAL)
+        price_blank = cost_blank * (1 + markups.MARGIN_MATERIAL)
         weight_blank = float(raw.get("weight", 10)) * quantity / 1000
 
         mat_blank = {
@@ -19,13 +19,8 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from common.layout import layout_on_roll
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import laminator as laminator_catalog
 from materials import get_material
 
@@ -213,8 +208,8 @@ class LaminationCalculator(BaseCalculator):
             cost = cost_material + cost_lamination + cost_operator
             margin_extra = get_margin("marginLamination")
             price = (
-                cost_material * (1 + MARGIN_MATERIAL + margin_extra)
-                + (cost_lamination + cost_operator) * (1 + MARGIN_OPERATION + margin_extra)
+                cost_material * (1 + markups.MARGIN_MATERIAL + margin_extra)
+                + (cost_lamination + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_extra)
             )
             time_hours = round(time_lamination * 100) / 100.0
             weight_kg = (
@@ -245,8 +240,8 @@ class LaminationCalculator(BaseCalculator):
             cost = cost_material + cost_lamination + cost_operator
             margin_extra = get_margin("marginLamination")
             price = (
-                cost_material * (1 + MARGIN_MATERIAL + margin_extra)
-                + (cost_lamination + cost_operator) * (1 + MARGIN_OPERATION + margin_extra)
+                cost_material * (1 + markups.MARGIN_MATERIAL + margin_extra)
+                + (cost_lamination + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_extra)
             )
             time_hours = round(time_lamination * 100) / 100.0
             weight_kg = (
@@ -262,10 +257,10 @@ class LaminationCalculator(BaseCalculator):
                 }
             ]
 
-        price = max(price, cost * (1 + MARGIN_MIN))
+        price = max(price, cost * (1 + markups.MARGIN_MIN))
         price = math.ceil(price)
 
-        base_ready = laminator.base_time_ready or BASE_TIME_READY
+        base_ready = laminator.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, mode.value))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -280,7 +275,7 @@ class LaminationCalculator(BaseCalculator):
         }
 
     def _empty_result(self, mode: ProductionMode) -> Dict[str, Any]:
-        base = BASE_TIME_READY
+        base = markups.BASE_TIME_READY
         idx = max(0, min(len(base) - 1, mode.value))
         return {
             "cost": 0.0,
@@ -1,17 +1,14 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Mapping, Optional, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from calculators.base import BaseCalculator, ProductionMode
-from common.helpers import calc_weight
-from common.layout import layout_on_roll, layout_on_sheet
-from common.markups import (
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.helpers import cached_table, calc_weight
+from common.layout import layout_on_roll_batch, layout_on_sheet, layout_on_sheet_batch
+from common import markups
+from common.markups import get_margin
 from equipment import laser as laser_catalog, tools as tools_catalog
 from materials import hardsheet, misc
 
@@ -19,6 +16,26 @@ from materials import hardsheet, misc
 LASER_CODE = "Qualitech11G1290"
 
 
+@dataclass
+class _LaserPlan:
+    """Тиражонезависимые промежуточные данные расчёта (см. LaserCalculator._prepare)."""
+
+    params: Mapping[str, Any]
+    size: List[float]
+    mode: ProductionMode
+    laser: Any
+    material: Any
+    margins: List[float]
+    interval: float = 5.0
+    grave_per_hour: float = 0.0
+    len_cut: float = 0.0
+    # 0 — у материала нет форматов, резка и расход материала не считаются.
+    num_on_laser: int = 0
+    # (ширина, высота, изделий на листе, кратность минимального размера); для рулона — (w, 0, 0, 0).
+    formats: List[Tuple[float, float, int, int]] = field(default_factory=list)
+    cut_speed: float = 1.0
+
+
 class LaserCalculator(BaseCalculator):
     """
     Калькулятор лазерной резки и гравировки.
@@ -299,6 +316,20 @@ class LaserCalculator(BaseCalculator):
         описанными в `get_tool_schema()`.
         """
         quantity = int(params.get("quantity", 1))
+        return self._calculate_quantity(self._prepare(params), quantity)
+
+    def calculate_ladder(
+        self, params: Mapping[str, Any], quantities: Sequence[int]
+    ) -> List[Dict[str, Any]]:
+        """Ценовая лестница: раскладка по форматам материала считается один раз."""
+        plan = self._prepare(params)
+        return [self._calculate_quantity(plan, int(q)) for q in quantities]
+
+    def _prepare(self, params: Mapping[str, Any]) -> _LaserPlan:
+        """
+        Тиражонезависимая часть расчёта: параметры, оборудование, материал,
+        длина реза и раскладка изделия на лазере и на каждом листовом формате.
+        """
         width = float(params.get("width", 0))
         height = float(params.get("height", 0))
         if width <= 0 or height <= 0:
@@ -311,11 +342,85 @@ class LaserCalculator(BaseCalculator):
         # Оборудование и материал (явно Qualitech11G1290)
         laser = laser_catalog.get(LASER_CODE)
 
-        material = None
-        if material_id:
-            material = hardsheet.get(material_id)
-        else:
+        if not material_id:
             raise ValueError("параметр material_id обязателен для лазерного калькулятора")
+        material = hardsheet.get(material_id)
+
+        # Отступы берем из лазера; это массив [top, right, bottom, left]
+        margins = (laser.margins or [0.0, 0.0, 0.0, 0.0])[:4]
+        plan = _LaserPlan(params=params, size=size, mode=mode, laser=laser, material=material, margins=margins)
+
+        # Гравировка
+        is_grave = params.get("is_grave")
+        if is_grave is not None:
+            plan.grave_per_hour = laser.get_grave_speed(int(is_grave))
+
+        sizes_material = material.sizes or []
+        if not sizes_material:
+            return plan
+
+        # Параметры резки
+        is_cut = params.get("is_cut_laser")
+        len_cut = 0.0
+        if isinstance(is_cut, Mapping):
+            len_cut = float(is_cut.get("len_cut", 0.0))
+            size_item = float(is_cut.get("size_item", 0.0))
+            density = float(is_cut.get("density", 0.0))
+            difficulty = float(is_cut.get("difficulty", 1.0))
+        else:
+            size_item = 0.0
+            density = 0.0
+            difficulty = 1.0
+
+        if len_cut == 0.0:
+            len_cut = (size[0] + size[1]) * 2.0
+            if size_item:
+                len_cut += 4.0 * size[0] * size[1] * density / size_item
+            len_cut *= difficulty
+        plan.len_cut = len_cut
+
+        # Проверяем, помещается ли в лазер (используем только первые две координаты max_size)
+        laser_size_xy = (laser.max_size or sizes_material[0])[:2]
+        layout_on_laser = layout_on_sheet(
+            item_size=size,
+            sheet_size=laser_size_xy,
+            margins=margins,
+            gap=plan.interval,
+        )
+        if layout_on_laser["num"] == 0:
+            raise ValueError("Изделие не помещается в лазер")
+        plan.num_on_laser = layout_on_laser["num"]
+
+        # Раскладка на листовых форматах от тиража не зависит: (w, h, на листе, кратность мин. размера).
+        # Для рулонов (h == 0) длина отреза зависит от тиража и считается в _calculate_quantity().
+        # Все листовые форматы раскладываются одним пакетом (common.layout.layout_on_sheet_batch).
+        formats = [(float(sz[0]), float(sz[1])) for sz in sizes_material]
+        sheets = [fmt for fmt in formats if fmt[1] != 0.0]
+        on_sheet = layout_on_sheet_batch([size], sheets, margins, plan.interval).num[0]
+        on_sheet_min = layout_on_sheet_batch([material.min_size], sheets).num[0] if material.min_size else None
+        sheet_index = 0
+        for size_w, size_h in formats:
+            if size_h == 0.0:
+                plan.formats.append((size_w, size_h, 0, 0))
+                continue
+            num_on_sheet = on_sheet[sheet_index]
+            layout_min_num = max(1, on_sheet_min[sheet_index]) if on_sheet_min is not None else 1
+            sheet_index += 1
+            if num_on_sheet == 0:
+                continue
+            plan.formats.append((size_w, size_h, num_on_sheet, layout_min_num))
+
+        plan.cut_speed = laser.get_cut_speed(material.thickness or 0.0) or 1.0
+        return plan
+
+    def _calculate_quantity(self, plan: _LaserPlan, quantity: int) -> Dict[str, Any]:
+        """Тиражозависимая часть расчёта: брак, подбор формата по стоимости, время и цена."""
+        params = plan.params
+        size = plan.size
+        mode = plan.mode
+        laser = plan.laser
+        material = plan.material
+        interval = plan.interval
 
         # Брак
         defect_rate = laser.get_defect_rate(quantity)
@@ -324,180 +429,118 @@ class LaserCalculator(BaseCalculator):
         # Округление как в JS: Math.round(x) — «половина вверх»; в Python round(52.5)==52 (banker's)
         num_with_defects = int(quantity * (1 + defect_rate) + 0.5)
 
-        interval = 5.0
-        # Отступы берем из лазера; это массив [top, right, bottom, left]
-        margins = (laser.margins or [0.0, 0.0, 0.0, 0.0])[:4]
-
         time_cut = 0.0
         time_grave = 0.0
         cost_material = 0.0
         materials: List[Dict[str, Any]] = []
 
         # Гравировка
-        is_grave = params.get("is_grave")
-        if is_grave is not None:
-            resolution = int(is_grave)
-            grave_per_hour = laser.get_grave_speed(resolution)
-            if grave_per_hour > 0:
-                if "is_grave_fill" in params:
-                    size_grave = params["is_grave_fill"]  # type: ignore[index]
-                    area_grave = float(size_grave[0]) * float(size_grave[1]) / 1_000_000.0
-                    area_grave_with_defects = area_grave * num_with_defects
-                    time_grave += area_grave_with_defects / grave_per_hour
-
-                if "is_grave_contur" in params:
-                    size_grave_contur = params["is_grave_contur"]  # type: ignore[index]
-                    num_contur = math.ceil(float(size_grave_contur[0]) / 0.1)
-                    len_grave_contur = (
-                        num_with_defects * num_contur * float(size_grave_contur[1])
-                    )  # мм
-                    cut_per_hour_for_grave = laser.get_cut_speed(0.0) or 1.0
-                    time_grave += len_grave_contur / cut_per_hour_for_grave / 1000.0
+        grave_per_hour = plan.grave_per_hour
+        if grave_per_hour > 0:
+            if "is_grave_fill" in params:
+                size_grave = params["is_grave_fill"]  # type: ignore[index]
+                area_grave = float(size_grave[0]) * float(size_grave[1]) / 1_000_000.0
+                area_grave_with_defects = area_grave * num_with_defects
+                time_grave += area_grave_with_defects / grave_per_hour
+
+            if "is_grave_contur" in params:
+                size_grave_contur = params["is_grave_contur"]  # type: ignore[index]
+                num_contur = math.ceil(float(size_grave_contur[0]) / 0.1)
+                len_grave_contur = (
+                    num_with_defects * num_contur * float(size_grave_contur[1])
+                )  # мм
+                cut_per_hour_for_grave = laser.get_cut_speed(0.0) or 1.0
+                time_grave += len_grave_contur / cut_per_hour_for_grave / 1000.0
 
         # Резка и материал
-        is_cut = params.get("is_cut_laser")
         len_material = 0.0
         num_sheet = 0.0
 
-        if material is not None:
-            sizes_material = material.sizes or []
-            if sizes_material:
-                # Параметры резки
-                len_cut = 0.0
-                if isinstance(is_cut, Mapping):
-                    len_cut = float(is_cut.get("len_cut", 0.0))
-                    size_item = float(is_cut.get("size_item", 0.0))
-                    density = float(is_cut.get("density", 0.0))
-                    difficulty = float(is_cut.get("difficulty", 1.0))
-                else:
-                    size_item = 0.0
-                    density = 0.0
-                    difficulty = 1.0
-
-                if len_cut == 0.0:
-                    len_cut = (size[0] + size[1]) * 2.0
-                    if size_item:
-                        len_cut += 4.0 * size[0] * size[1] * density / size_item
-                    len_cut *= difficulty
-
-                # Проверяем, помещается ли в лазер (используем только первые две координаты max_size)
-                laser_size_xy = (laser.max_size or sizes_material[0])[:2]
-                layout_on_laser = layout_on_sheet(
-                    item_size=size,
-                    sheet_size=laser_size_xy,
-                    margins=margins,
-                    gap=interval,
-                )
-                if layout_on_laser["num"] == 0:
-                    raise ValueError("Изделие не помещается в лазер")
-
-                num_load = math.ceil(num_with_defects / layout_on_laser["num"])
-                is_find_mark = bool(params.get("is_find_mark", False))
-
-                min_cost_material: Optional[float] = None
-                best_size_material: Optional[Sequence[float]] = None
-                best_num_sheet = 0.0
-                best_len_material = 0.0
-
-                for size_material in sizes_material:
-                    size_w, size_h = float(size_material[0]), float(size_material[1])
-                    len_cut_with_defects = len_cut * num_with_defects
-
-                    if size_h == 0.0:
-                        # Рулон
-                        layout_roll = layout_on_roll(
-                            quantity=num_with_defects,
-                            item_size=size,
-                            roll_size=[size_w, size_h],
-                            gap=interval,
-                        )
-                        if layout_roll["num"] == 0:
-                            continue
-                        len_mat = layout_roll["length"]
-                        base_cost = material.get_cost(len_mat / 1000.0)
-                        if material.length_min and material.length_min > 0:
-                            cost_mat = (
-                                base_cost
-                                * math.ceil(len_mat / material.length_min)
-                                * material.length_min
-                                / 1_000_000.0
-                                * size_w
-                            )
-                        else:
-                            cost_mat = base_cost * len_mat * size_w / 1_000_000.0
-                        num_sheets = 0.0
-                    else:
-                        # Лист
-                        layout_sheet = layout_on_sheet(
-                            item_size=size,
-                            sheet_size=[size_w, size_h],
-                            margins=margins,
-                            gap=interval,
-                        )
-                        if layout_sheet["num"] == 0:
-                            continue
-
-                        if material.min_size:
-                            layout_min = layout_on_sheet(
-                                item_size=material.min_size,
-                                sheet_size=[size_w, size_h],
-                            )
-                            layout_min_num = max(1, layout_min["num"])
-                        else:
-                            layout_min_num = 1
-
-                        num_sheets = math.ceil(
-                            num_with_defects / layout_sheet["num"] * layout_min_num
-                        ) / layout_min_num
-
-                        base_cost = material.get_cost(num_sheets)
+        if plan.num_on_laser:
+            len_cut = plan.len_cut
+            num_load = math.ceil(num_with_defects / plan.num_on_laser)
+            is_find_mark = bool(params.get("is_find_mark", False))
+
+            min_cost_material: Optional[float] = None
+            best_size_material: Optional[Sequence[float]] = None
+            best_num_sheet = 0.0
+            best_len_material = 0.0
+
+            # Длины отреза на всех рулонах — одним пакетом
+            roll_widths = [size_w for size_w, size_h, _, _ in plan.formats if size_h == 0.0]
+            roll_lengths = iter(layout_on_roll_batch(num_with_defects, [size], roll_widths, interval)[0])
+
+            for size_w, size_h, num_on_sheet, layout_min_num in plan.formats:
+                if size_h == 0.0:
+                    # Рулон
+                    len_mat = next(roll_lengths)
+                    if len_mat == 0.0:
+                        continue
+                    base_cost = material.get_cost(len_mat / 1000.0)
+                    if material.length_min and material.length_min > 0:
                         cost_mat = (
-                            base_cost * num_sheets * size_w * size_h / 1_000_000.0
+                            base_cost
+                            * math.ceil(len_mat / material.length_min)
+                            * material.length_min
+                            / 1_000_000.0
+                            * size_w
                         )
-                        len_mat = 0.0
-
-                    if min_cost_material is None or cost_mat < min_cost_material:
-                        min_cost_material = cost_mat
-                        best_size_material = [size_w, size_h]
-                        best_num_sheet = num_sheets
-                        best_len_material = len_mat
-
-                if min_cost_material is None:
-                    raise ValueError("изделие не помещается ни на один доступный размер материала")
-
-                cost_material = min_cost_material
-                size_material = best_size_material or sizes_material[0]
-                num_sheet = best_num_sheet
-                len_material = best_len_material
-
-                cut_speed = laser.get_cut_speed(material.thickness or 0.0) or 1.0
-                len_cut_with_defects = len_cut * num_with_defects
-                time_cut = len_cut_with_defects / cut_speed / 1000.0 + num_load * (
-                    laser.time_load or 0.0
-                )
-                if is_find_mark:
-                    time_cut += num_load * (laser.time_load or 0.0)
-
-                # Расход материала
-                material_qty: float
-                material_unit: str
-                if size_material[1] == 0.0:
-                    material_qty = len_material
-                    material_unit = "mm"
+                    else:
+                        cost_mat = base_cost * len_mat * size_w / 1_000_000.0
+                    num_sheets = 0.0
                 else:
-                    material_qty = num_sheet
-                    material_unit = "sheet"
-
-                materials.append(
-                    {
-                        "code": material.code,
-                        "name": material.description,
-                        "title": material.title,
-                        "size_mm": size_material,
-                        "quantity": material_qty,
-                        "unit": material_unit,
-                    }
-                )
+                    # Лист
+                    num_sheets = math.ceil(
+                        num_with_defects / num_on_sheet * layout_min_num
+                    ) / layout_min_num
+
+                    base_cost = material.get_cost(num_sheets)
+                    cost_mat = (
+                        base_cost * num_sheets * size_w * size_h / 1_000_000.0
+                    )
+                    len_mat = 0.0
+
+                if min_cost_material is None or cost_mat < min_cost_material:
+                    min_cost_material = cost_mat
+                    best_size_material = [size_w, size_h]
+                    best_num_sheet = num_sheets
+                    best_len_material = len_mat
+
+            if min_cost_material is None:
+                raise ValueError("изделие не помещается ни на один доступный размер материала")
+
+            cost_material = min_cost_material
+            size_material = best_size_material or material.sizes[0]
+            num_sheet = best_num_sheet
+            len_material = best_len_material
+
+            len_cut_with_defects = len_cut * num_with_defects
+            time_cut = len_cut_with_defects / plan.cut_speed / 1000.0 + num_load * (
+                laser.time_load or 0.0
+            )
+            if is_find_mark:
+                time_cut += num_load * (laser.time_load or 0.0)
+
+            # Расход материала
+            material_qty: float
+            material_unit: str
+            if size_material[1] == 0.0:
+                material_qty = len_material
+                material_unit = "mm"
+            else:
+                material_qty = num_sheet
+                material_unit = "sheet"
+
+            materials.append(
+                {
+                    "code": material.code,
+                    "name": material.description,
+                    "title": material.title,
+                    "size_mm": size_material,
+                    "quantity": material_qty,
+                    "unit": material_unit,
+                }
+            )
 
         # Нанесение клеевого слоя (через ManualRoll)
         cost_adhesive_cost = 0.0
@@ -506,7 +549,7 @@ class LaserCalculator(BaseCalculator):
         cost_adhesive_weight = 0.0
 
         adhesive_layer = params.get("is_adhesive_layer")
-        if adhesive_layer and material is not None:
+        if adhesive_layer:
             if adhesive_layer == "AdhesiveLayer130":
                 adhesive_id = "Sheet3M7955"
             else:
@@ -531,9 +574,9 @@ class LaserCalculator(BaseCalculator):
             roll_per_hour_val = 1.0
             edge_per_hour_val = 1.0
             if "rollPerHour" in raw:
-                from equipment.base import LookupTable
-
-                roll_per_hour_val = LookupTable(raw["rollPerHour"]).find(area * num_adh_sheets)  # type: ignore[arg-type]
+                roll_per_hour_val = cached_table("tools.ManualRoll.rollPerHour", raw["rollPerHour"]).find(
+                    area * num_adh_sheets
+                )
             if "edgePerHour" in raw:
                 edge_per_hour_val = float(raw["edgePerHour"])
 
@@ -549,7 +592,7 @@ class LaserCalculator(BaseCalculator):
             cost_operator_tool = time_operator * tool.operator_cost_per_hour
             cost_manual = cost_process + cost_operator_tool
             margin_extra_manual = get_margin("marginProcessManual")
-            margin_manual = max(MARGIN_OPERATION + margin_extra_manual, MARGIN_MIN)
+            margin_manual = max(markups.MARGIN_OPERATION + margin_extra_manual, markups.MARGIN_MIN)
             price_manual = cost_manual * (1 + margin_manual)
 
             cost_adhesive_cost = cost_manual
@@ -574,7 +617,7 @@ class LaserCalculator(BaseCalculator):
             # Себестоимость и цена клеевого слоя (материал)
             cost_adhesive_cost += num_adh_sheets * mat_adh.get_cost(1.0)
             cost_adhesive_price += num_adh_sheets * mat_adh.get_cost(1.0) * (
-                1 + MARGIN_MATERIAL
+                1 + markups.MARGIN_MATERIAL
             )
 
         # Время
@@ -595,9 +638,9 @@ class LaserCalculator(BaseCalculator):
             cost *= 1 + defect_rate
 
         margin_extra = get_margin("marginLaser")
-        effective_margin = max(MARGIN_OPERATION + margin_extra, MARGIN_MIN)
+        effective_margin = max(markups.MARGIN_OPERATION + margin_extra, markups.MARGIN_MIN)
         price = math.ceil(
-            cost_material * (1 + MARGIN_MATERIAL)
+            cost_material * (1 + markups.MARGIN_MATERIAL)
             + (cost_cut + cost_grave + cost_operator) * (1 + effective_margin)
             + cost_adhesive_price
         )
@@ -607,15 +650,13 @@ class LaserCalculator(BaseCalculator):
         ) / 100.0
         time_ready = time_hours + laser.get_time_ready(mode.value + 1)
 
-        weight_kg = 0.0
-        if material is not None:
-            weight_kg = calc_weight(
-                quantity=quantity,
-                density=material.density or 0.0,
-                thickness=material.thickness or 0.0,
-                size=size,
-                density_unit=material.density_unit,
-            )
+        weight_kg = calc_weight(
+            quantity=quantity,
+            density=material.density or 0.0,
+            thickness=material.thickness or 0.0,
+            size=size,
+            density_unit=material.density_unit,
+        )
         weight_kg += cost_adhesive_weight
 
         result: Dict[str, Any] = {
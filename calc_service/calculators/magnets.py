@@ -14,7 +14,8 @@ from typing import Any, Dict, List, Mapping
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_sheet import PrintSheetCalculator
 from calculators.cut_guillotine import CutGuillotineCalculator
-from common.markups import BASE_TIME_READY, MARGIN_MATERIAL, get_margin
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_packing, calc_set_insert
 from materials import get_material
 from materials import magnet as magnet_catalog
@@ -80,7 +81,7 @@ def calc_acrylic_magnets(params: Mapping[str, Any]) -> Dict[str, Any]:
     color_str = "4+4" if color >= 2 else "4+0"
 
     cost_blank = float(magnet.cost or 0) * quantity
-    price_blank = cost_blank * (1 + MARGIN_MATERIAL)
+    price_blank = cost_blank * (1 + markups.MARGIN_MATERIAL)
     weight_blank = float(raw.get("weight", 20)) * quantity / 1000.0
 
     mat_blank = {
@@ -216,7 +217,7 @@ def calc_laminated_magnets(params: Mapping[str, Any]) -> Dict[str, Any]:
     sheet_h = size_vinyl[1] if len(size_vinyl) > 1 and size_vinyl[1] > 0 else 450.0
     area_m2 = (sheet_w / 1000.0) * (sheet_h / 1000.0) * num_sheets
     cost_vinyl = float(magnet_vinyl.cost or 0) * area_m2
-    price_vinyl = cost_vinyl * (1 + MARGIN_MATERIAL)
+    price_vinyl = cost_vinyl * (1 + markups.MARGIN_MATERIAL)
 
     cut_calc = CutGuillotineCalculator()
     cut_params = {
@@ -257,7 +258,7 @@ def calc_laminated_magnets(params: Mapping[str, Any]) -> Dict[str, Any]:
 
     time_hours = time_print + time_cut + time_pack
     time_ready = time_hours + max(
-        time_ready_print, float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)])
+        time_ready_print, float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)])
     )
     weight_kg = weight_print + weight_pack
 
@@ -9,45 +9,35 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
-from typing import Any, Dict, List, Mapping, Optional
-
-import json5
+from bisect import bisect_left
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from calculators.base import BaseCalculator, ProductionMode
-from common.markups import COST_OPERATOR, get_margin
-from common.currencies import USD_RATE
+from common.data_store import load_json
+from common.helpers import ThresholdTable, cached_table
+from common import currencies, markups
+from common.markups import get_margin
 
-_METALPINS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "metalpins.json"
 
-_metalpins_cache: Optional[Dict[str, Any]] = None
+def _load_metalpins() -> Dict[str, Any]:
+    return load_json("equipment/metalpins.json")
 
 
-def _load_metalpins() -> Dict[str, Any]:
-    global _metalpins_cache
-    if _metalpins_cache is None:
-        with open(_METALPINS_JSON, "r", encoding="utf-8") as f:
-            _metalpins_cache = json5.load(f)
-    return _metalpins_cache
+def _table(name: str, rows: List[List[float]]) -> Optional[ThresholdTable]:
+    """Таблица [порог, ...] из metalpins.json, скомпилированная один раз на поколение данных."""
+    return cached_table(f"metalpins.{name}", rows) if rows else None
 
 
-def _find_in_table(table: List[List[float]], value: float, col: int = 1) -> float:
+def _find_in_table(table: Optional[ThresholdTable], value: float, col: int = 1) -> float:
     """Найти значение в таблице [порог, ...] по первому порогу >= value."""
-    for row in table:
-        if len(row) > 0 and value <= row[0]:
-            return float(row[col]) if col < len(row) else float(row[0])
-    if table:
-        last = table[-1]
-        return float(last[col]) if col < len(last) else float(last[0])
-    return 0.0
+    if table is None:
+        return 0.0
+    return table.find(value, col)
 
 
-def _find_scale_index(scale: List[float], n: int) -> int:
+def _find_scale_index(scale: Tuple[float, ...], n: int) -> int:
     """Индекс в ScalePCS для тиража n (1-based)."""
-    for i, thresh in enumerate(scale):
-        if n <= thresh:
-            return i + 1
-    return len(scale) + 1
+    return bisect_left(scale, n) + 1
 
 
 class MetalPinsCalculator(BaseCalculator):
@@ -260,7 +250,7 @@ class MetalPinsCalculator(BaseCalculator):
             raise ValueError(
                 "Укажите ширину и высоту значка в мм: width_mm и height_mm (или width и height)."
             ) from None
-        thickness = _find_in_table(standart_t, math.sqrt((width**2 + height**2) / 2), 1)
+        thickness = _find_in_table(_table("StandartT", standart_t), math.sqrt((width**2 + height**2) / 2), 1)
 
         process_id = self._resolve_process_id(params.get("process", "2d"))
         num_enamels = int(params.get("num_enamels", 0))
@@ -299,18 +289,18 @@ class MetalPinsCalculator(BaseCalculator):
         base_ready = float(base_time_ready[idx])
         defects = float(tool.get("defects", 0.05))
         tool_margin = float(tool.get("margin", 0.35))
-        cost_operator_hr = float(tool.get("costOperator", 0)) or COST_OPERATOR
-        usd = USD_RATE
+        cost_operator_hr = float(tool.get("costOperator", 0)) or markups.COST_OPERATOR
+        usd = currencies.USD_RATE
 
         cost_pins = 0.0
         weight_pins = 0.0
         materials_out: List[Dict[str, Any]] = []
 
-        scale_pcs = tool.get("ScalePCS", [50, 100, 200, 300, 500, 1000, 10000])
-        cost_pins_table = tool.get("CostPins", [])
-        standart_t = tool.get("StandartT", [[30, 1.2], [40, 1.4], [60, 2.0], [80, 2.5], [100, 3.0]])
-        cost_stamp_table = tool.get("CostStamp", [])
-        cost_enamels_table = tool.get("CostEnamels", [[30, 0.02], [40, 0.027], [50, 0.033], [60, 0.04], [65, 0.044], [70, 0.047], [75, 0.05], [80, 0.054], [90, 0.06], [100, 0.067]])
+        scale_pcs = tuple(tool.get("ScalePCS", [50, 100, 200, 300, 500, 1000, 10000]))
+        cost_pins_table = _table("CostPins", tool.get("CostPins", []))
+        standart_t = _table("StandartT", tool.get("StandartT", [[30, 1.2], [40, 1.4], [60, 2.0], [80, 2.5], [100, 3.0]]))
+        cost_stamp_table = _table("CostStamp", tool.get("CostStamp", []))
+        cost_enamels_table = _table("CostEnamels", tool.get("CostEnamels", [[30, 0.02], [40, 0.027], [50, 0.033], [60, 0.04], [65, 0.044], [70, 0.047], [75, 0.05], [80, 0.054], [90, 0.06], [100, 0.067]]))
         cost_plating = tool.get("CostPlating", {})
         cost_epoxy_arr = tool.get("CostEpoxy", [0.01, 0.0025])
         min_cost_stamp = float(tool.get("minCostStamp", 15))
@@ -427,10 +417,6 @@ class MetalPinsCalculator(BaseCalculator):
             "materials": materials_out,
         }
 
-    def execute(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+    def execute(self, params: Mapping[str, Any], use_cache: bool = True) -> Dict[str, Any]:
         """Нормализуем имена полей до share_url (width → width_mm), чтобы ссылка совпадала с сайтом."""
-        norm = self._normalize_input_params(params)
-        result = dict(self.calculate(norm))
-        if "share_url" not in result:
-            result["share_url"] = self.make_share_url(norm)
-        return result
+        return super().execute(self._normalize_input_params(params), use_cache=use_cache)
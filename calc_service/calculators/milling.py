@@ -9,38 +9,26 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
-from common.helpers import calc_weight, find_in_table
-from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.data_store import load_json
+from common.helpers import calc_weight, cached_table
+from common.layout import layout_on_sheet, layout_on_sheet_batch
+from common import markups
+from common.markups import get_margin
 from equipment import milling as milling_catalog
 from materials import get_material
 
 MILLING_CODE = "MillingMachine"
-DATA_EQUIPMENT = Path(__file__).resolve().parent.parent / "data" / "equipment"
 MIN_COST = 500.0
 INTERVAL_DEFAULT = 8.0
 
 
 def _load_milling_raw() -> Dict[str, Any]:
     """Загрузить сырые данные milling.json для costCut, discountCostCut, costShipment."""
-    path = DATA_EQUIPMENT / "milling.json"
-    if not path.is_file():
-        return {}
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json5.load(f)
+        data = load_json("equipment/milling.json")
         return data.get(MILLING_CODE, {}) or {}
     except Exception:
         return {}
@@ -53,9 +41,9 @@ def _cost_cut_per_meter(material_id: str, thickness_mm: float, raw: Dict[str, An
         return 0.0
     for key, table in cost_cut.items():
         if material_id.startswith(key) and isinstance(table, (list, tuple)) and table:
-            tiers = [(float(x[0]), float(x[1])) for x in table if len(x) >= 2]
-            if tiers:
-                return find_in_table(sorted(tiers, key=lambda p: p[0]), thickness_mm)
+            if any(len(x) >= 2 for x in table):
+                tiers = cached_table(f"milling.costCut.{key}", (x for x in table if len(x) >= 2))
+                return tiers.find(thickness_mm)
     return 0.0
 
 
@@ -64,15 +52,10 @@ def _discount_for_length(length_m: float, raw: Dict[str, Any]) -> float:
     discount_table = raw.get("discountCostCut") or []
     if not isinstance(discount_table, (list, tuple)):
         return 0.0
-    tiers = [(float(x[0]), float(x[1])) for x in discount_table if len(x) >= 2]
-    if not tiers:
+    if not any(len(x) >= 2 for x in discount_table):
         return 0.0
-    sorted_tiers = sorted(tiers, key=lambda p: p[0])
-    discount = 0.0
-    for threshold, val in sorted_tiers:
-        if threshold <= length_m:
-            discount = val
-    return discount
+    tiers = cached_table("milling.discountCostCut", (x for x in discount_table if len(x) >= 2))
+    return tiers.find_floor(length_m, 0.0)
 
 
 def _cost_shipment(size: List[float], raw: Dict[str, Any]) -> float:
@@ -277,15 +260,15 @@ class MillingCalculator(BaseCalculator):
                 best_cost = None
                 best_sheets = 0
                 best_size_mat = None
-                for sz in sizes:
-                    if len(sz) < 2:
-                        continue
+                sizes = [sz for sz in sizes if len(sz) >= 2]
+                # Раскладка на всех листах материала — одним пакетом (common.layout)
+                on_sheets = layout_on_sheet_batch([size], sizes, margins, interval).num[0]
+                for sz, num_on_sheet in zip(sizes, on_sheets):
                     sheet_w, sheet_h = sz[0], sz[1]
-                    layout_sheet = layout_on_sheet(size, [sheet_w, sheet_h], margins, interval)
-                    if layout_sheet.get("num", 0) == 0:
+                    if num_on_sheet == 0:
                         continue
-                    n_sheet = quantity // layout_sheet["num"]
-                    frac = quantity / layout_sheet["num"] - n_sheet
+                    n_sheet = quantity // num_on_sheet
+                    frac = quantity / num_on_sheet - n_sheet
                     if frac > 0:
                         n_sheet += 1
                     cost_per_sheet = material.get_cost(n_sheet)
@@ -320,17 +303,17 @@ class MillingCalculator(BaseCalculator):
         if cost_total < MIN_COST:
             cost_total = (MIN_COST + cost_ship) * (1 + equipment_margin)
             margin_extra = get_margin("marginMilling")
-            price = math.ceil((MIN_COST + cost_ship) * (1 + MARGIN_OPERATION + margin_extra))
+            price = math.ceil((MIN_COST + cost_ship) * (1 + markups.MARGIN_OPERATION + margin_extra))
         else:
             margin_extra = get_margin("marginMilling")
             price = (
-                cost_material * (1 + defects + MARGIN_MATERIAL)
-                + (cost_cut + cost_ship + cost_operator) * (1 + defects + MARGIN_OPERATION + margin_extra)
+                cost_material * (1 + defects + markups.MARGIN_MATERIAL)
+                + (cost_cut + cost_ship + cost_operator) * (1 + defects + markups.MARGIN_OPERATION + margin_extra)
             )
-            price = max(price, cost_total * (1 + MARGIN_MIN))
+            price = max(price, cost_total * (1 + markups.MARGIN_MIN))
             price = math.ceil(price)
 
-        base_ready = milling.base_time_ready or BASE_TIME_READY
+        base_ready = milling.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, mode.value))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -368,7 +351,7 @@ class MillingCalculator(BaseCalculator):
         }
 
     def _empty_result(self, mode: ProductionMode) -> Dict[str, Any]:
-        base = BASE_TIME_READY
+        base = markups.BASE_TIME_READY
         idx = max(0, min(len(base) - 1, mode.value))
         return {
             "cost": 0.0,
@@ -8,21 +8,14 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_sheet import PrintSheetCalculator
-from common.markups import (
-    COST_OPERATOR,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
-
-HEATPRESS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "heatpress.json"
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
+
 MUG_PRINT_SIZE = [214, 82]  # размер нанесения для кружки, мм
 SUBLIMATION_MATERIAL = "PaperSublimation128"
 SUBLIMATION_PRINTER = "EPSONWF7610"
@@ -30,8 +23,7 @@ SUBLIMATION_PRINTER = "EPSONWF7610"
 
 def _load_heatpress_raw(code: str = "EconopressMUGH") -> Dict[str, Any]:
     """Загрузить сырые данные термопресса для кружек."""
-    with open(HEATPRESS_JSON, "r", encoding="utf-8") as f:
-        data = json5.load(f)
+    data = load_json("equipment/heatpress.json")
     return data.get(code, {})
 
 
@@ -94,8 +86,8 @@ def _calc_heatpress_sublimation(
     cost_total = cost_operator + cost_press + cost_transfer
     margin_heatpress = get_margin("marginHeatPress")
     price_total = (
-        cost_operator * (1 + MARGIN_OPERATION)
-        + cost_press * (1 + MARGIN_MATERIAL)
+        cost_operator * (1 + markups.MARGIN_OPERATION)
+        + cost_press * (1 + markups.MARGIN_MATERIAL)
         + price_transfer
     ) * (1 + margin_heatpress)
 
@@ -246,14 +238,14 @@ class MugCalculator(BaseCalculator):
         time_packing = 0.006 * quantity if params.get("is_packing") else 0.0
         time_prepare_extra = (1 / 60) * quantity if params.get("is_different") else 0.0
         time_operator_extra = time_packing + time_prepare_extra
-        cost_operator_extra = time_operator_extra * COST_OPERATOR
+        cost_operator_extra = time_operator_extra * markups.COST_OPERATOR
 
         cost = heatpress_result["cost"] + cost_mug
         margin_mug = get_margin("marginMug")
         price = (
             heatpress_result["price"]
-            + cost_mug * (1 + MARGIN_MATERIAL)
-            + (cost_shipment + cost_operator_extra) * (1 + MARGIN_OPERATION)
+            + cost_mug * (1 + markups.MARGIN_MATERIAL)
+            + (cost_shipment + cost_operator_extra) * (1 + markups.MARGIN_OPERATION)
         ) * (1 + margin_mug)
 
         time_hours = math.ceil(
@@ -7,31 +7,24 @@
 
 from __future__ import annotations
 
-import json5
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
+from common.data_store import load_json
+from common.helpers import ThresholdTable, cached_table
 from common.currencies import parse_currency, usd_to_rub
-from common.markups import COST_OPERATOR, MARGIN_MATERIAL, MARGIN_OPERATION, get_margin
-
-_TOOLS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "tools.json"
+from common import markups
+from common.markups import get_margin
 
 
 def _load_tools_raw() -> Dict[str, Any]:
-    with open(_TOOLS_JSON, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json("equipment/tools.json")
 
 
-def _find_defect(defects_table: List[List[float]], n: int) -> float:
+def _find_defect(defects_table: ThresholdTable, n: int) -> float:
     """Найти процент брака по таблице [[порог, доля], ...]."""
-    if not defects_table:
-        return 0.0
-    for threshold, rate in sorted(defects_table, key=lambda x: x[0]):
-        if n <= threshold:
-            return float(rate)
-    return float(defects_table[-1][1]) if defects_table else 0.0
+    return defects_table.find(n)
 
 
 class PadPrintCalculator(BaseCalculator):
@@ -232,7 +225,7 @@ class PadPrintCalculator(BaseCalculator):
         )
 
         defects_table = tool.get("defects", [[10000000, 0.01]])
-        defects = _find_defect(defects_table, quantity)
+        defects = _find_defect(cached_table("tools.TIC177.defects", defects_table), quantity) if defects_table else 0.0
         if mode.value > 1:
             defects += defects * (mode.value - 1)
 
@@ -285,7 +278,7 @@ class PadPrintCalculator(BaseCalculator):
 
         cost_process = cost_print + cost_dry
         time_operator = time_prepare_cliche + time_prepare_paint + time_print
-        cost_operator = time_operator * COST_OPERATOR
+        cost_operator = time_operator * markups.COST_OPERATOR
 
         if material_mode == "isMaterialCustomer":
             defects += 0.25
@@ -293,8 +286,8 @@ class PadPrintCalculator(BaseCalculator):
         cost_total = math.ceil((cost_material + cost_process + cost_operator) * (1 + defects))
         margin_pad = get_margin("marginPadPrint")
         price_total = math.ceil(
-            (cost_process + cost_operator) * (1 + defects + MARGIN_OPERATION + margin_pad)
-            + cost_material * (1 + defects + MARGIN_MATERIAL + margin_pad)
+            (cost_process + cost_operator) * (1 + defects + markups.MARGIN_OPERATION + margin_pad)
+            + cost_material * (1 + defects + markups.MARGIN_MATERIAL + margin_pad)
         )
 
         time_hours = math.ceil((time_operator + time_dry) * 100) / 100.0
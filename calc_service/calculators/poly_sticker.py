@@ -12,7 +12,8 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.sticker import StickerCalculator
-from common.markups import BASE_TIME_READY, get_margin
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_epoxy
 from equipment import tools as tools_catalog
 
@@ -84,7 +85,7 @@ class PolyStickerCalculator(BaseCalculator):
             defects += defects * (mode.value - 1)
         n_stickers = math.ceil(n * (1 + defects))
 
-        base_time_ready = BASE_TIME_READY
+        base_time_ready = markups.BASE_TIME_READY
         try:
             epoxy_tool = tools_catalog.get("EpoxyCoating")
             if epoxy_tool.base_time_ready:
@@ -8,19 +8,17 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_roll import PrintRollCalculator
-from common.markups import MARGIN_MATERIAL, get_margin
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_cut_profile, calc_sewing_covers
 from materials import presswall as presswall_catalog
 from materials import roll as roll_catalog
 
-PRESSWALL_JSON = Path(__file__).parent.parent / "data" / "materials" / "presswall.json"
 TOOL_CUT = "DWE4257"
 PRINTER_DEFAULT = "TechnojetXR720"
 COVER_MATERIAL = "Oxford600D"
@@ -28,8 +26,7 @@ RENT_PER_DAY = 400
 
 
 def _load_presswall_data() -> Dict[str, Any]:
-    with open(PRESSWALL_JSON, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json("materials/presswall.json")
 
 
 def _get_presswall_config(presswall_id: str) -> Tuple[Dict[str, Any], Dict[str, float], List[List[float]], Optional[List[float]]]:
@@ -268,7 +265,7 @@ class PresswallCalculator(BaseCalculator):
         cost = cost_cut + cost_banner + cost_materials + cost_bag + cost_rent
         price = (
             (cost_cut + price_banner + price_bag) * (1 + margin_pw)
-            + (cost_materials + cost_rent) * (1 + MARGIN_MATERIAL + margin_pw)
+            + (cost_materials + cost_rent) * (1 + markups.MARGIN_MATERIAL + margin_pw)
         )
         time_hours = math.ceil((time_cut + time_banner + time_bag) * 100) / 100
         time_ready = time_hours + max(time_ready_cut, time_ready_banner, time_ready_bag)
@@ -13,12 +13,8 @@ from typing import Any, Dict, List, Mapping
 from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import printer as printer_catalog
 from materials import sheet as sheet_catalog
 
@@ -125,7 +121,7 @@ class PrintInkjetCalculator(BaseCalculator):
         if not material:
             return self._empty(mode)
 
-        base_time_ready = printer.base_time_ready or BASE_TIME_READY
+        base_time_ready = printer.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, mode.value))
         base_ready = float(base_time_ready[idx])
         time_prepare = (printer.time_prepare or 0) * max(1, mode.value)
@@ -167,8 +163,8 @@ class PrintInkjetCalculator(BaseCalculator):
         cost = cost_print + cost_operator
         margin_extra = get_margin("marginPrintLaser")
         price = (
-            cost_print * (1 + MARGIN_MATERIAL + margin_extra)
-            + cost_operator * (1 + MARGIN_OPERATION + margin_extra)
+            cost_print * (1 + markups.MARGIN_MATERIAL + margin_extra)
+            + cost_operator * (1 + markups.MARGIN_OPERATION + margin_extra)
         )
 
         time_hours = math.ceil(time_print * 100) / 100.0
@@ -202,7 +198,7 @@ class PrintInkjetCalculator(BaseCalculator):
         }
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
@@ -14,12 +14,8 @@ from typing import Any, Dict, List, Mapping, Optional
 from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import printer as printer_catalog
 from materials import sheet as sheet_catalog
 
@@ -250,10 +246,10 @@ class PrintLaserCalculator(BaseCalculator):
 
         cost = cost_print + cost_operator
         margin_extra = get_margin("marginPrintLaser")
-        effective_margin = max(MARGIN_OPERATION + margin_extra, MARGIN_MIN)
+        effective_margin = max(markups.MARGIN_OPERATION + margin_extra, markups.MARGIN_MIN)
         # JS: result.price = costPrint * (1 + marginMaterial + marginPrintLaser) + costOperator * (1 + marginOperation + marginPrintLaser)
-        price_print = cost_print * (1 + MARGIN_MATERIAL + margin_extra)
-        price_operator = cost_operator * (1 + MARGIN_OPERATION + margin_extra)
+        price_print = cost_print * (1 + markups.MARGIN_MATERIAL + margin_extra)
+        price_operator = cost_operator * (1 + markups.MARGIN_OPERATION + margin_extra)
         price = math.ceil(price_print + price_operator)
 
         time_hours = round(time_print * 100) / 100.0
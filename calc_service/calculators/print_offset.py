@@ -13,13 +13,8 @@ from typing import Any, Dict, List, Mapping
 from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-    get_time_ready,
-)
+from common import markups
+from common.markups import get_margin, get_time_ready
 from equipment import printer as printer_catalog
 from materials import sheet as sheet_catalog
 
@@ -103,7 +98,7 @@ class PrintOffsetCalculator(BaseCalculator):
         except KeyError:
             return self._empty(mode)
 
-        base_time_ready = printer.base_time_ready or BASE_TIME_READY
+        base_time_ready = printer.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, mode.value))
         base_ready = float(base_time_ready[idx])
 
@@ -150,9 +145,9 @@ class PrintOffsetCalculator(BaseCalculator):
         cost = cost_operator + cost_paper + cost_offset_form + cost_prepare + cost_print + cost_cut
         margin_offset = get_margin("marginPrintOffset")
         price = (
-            cost_operator * (1 + MARGIN_OPERATION + margin_offset)
+            cost_operator * (1 + markups.MARGIN_OPERATION + margin_offset)
             + (cost_paper + cost_offset_form + cost_prepare + cost_print + cost_cut)
-            * (1 + MARGIN_MATERIAL + margin_offset)
+            * (1 + markups.MARGIN_MATERIAL + margin_offset)
         )
 
         time_hours = math.ceil(time_operator * 100) / 100.0
@@ -197,7 +192,7 @@ class PrintOffsetCalculator(BaseCalculator):
         return last[2], last[0]
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
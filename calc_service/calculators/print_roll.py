@@ -10,18 +10,15 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Mapping, Optional
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_wide import PrintWideCalculator
 from common.helpers import calc_weight, find_in_table
-from common.layout import layout_on_roll
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common.layout import layout_on_roll_batch
+from common import markups
+from common.markups import get_margin
 from common.process_tools import (
     calc_cutting_edge,
     calc_eyelet,
@@ -33,6 +30,25 @@ from materials import roll as roll_catalog
 DEFAULT_PRINTER = "Technojet160ECO"
 
 
+@dataclass
+class _PrintRollPlan:
+    """
+    Тиражонезависимые промежуточные данные расчёта (см. PrintRollCalculator._prepare).
+    printer/material = None — расчёт невозможен, результат пустой.
+    """
+
+    params: Mapping[str, Any]
+    size: List[float]
+    material_id: str
+    printer_code: str
+    mode: ProductionMode
+    printer: Any = None
+    material: Any = None
+    margins: Optional[List[float]] = None
+    # (ширина, высота, полезная ширина) форматов, которые помещаются в принтер.
+    formats: List[Tuple[float, float, float]] = field(default_factory=list)
+
+
 class PrintRollCalculator(BaseCalculator):
     """Рулонная печать (баннеры, постеры, плёнки) с постпечатной обработкой."""
 
@@ -128,6 +144,20 @@ class PrintRollCalculator(BaseCalculator):
 
     def calculate(self, params: Mapping[str, Any]) -> Dict[str, Any]:
         n = int(params.get("quantity", 1))
+        return self._calculate_quantity(self._prepare(params), n)
+
+    def calculate_ladder(
+        self, params: Mapping[str, Any], quantities: Sequence[int]
+    ) -> List[Dict[str, Any]]:
+        """Ценовая лестница: принтер, материал и подходящие форматы рулона отбираются один раз."""
+        plan = self._prepare(params)
+        return [self._calculate_quantity(plan, int(q)) for q in quantities]
+
+    def _prepare(self, params: Mapping[str, Any]) -> _PrintRollPlan:
+        """
+        Тиражонезависимая часть расчёта: принтер, материал, поля печати и
+        форматы рулона, которые помещаются в принтер (с полезной шириной).
+        """
         width = float(params.get("width", 0))
         height = float(params.get("height", 0))
         size = [width, height]
@@ -135,12 +165,13 @@ class PrintRollCalculator(BaseCalculator):
         printer_code = str(params.get("printer_code", "") or DEFAULT_PRINTER).strip() or DEFAULT_PRINTER
         mode = ProductionMode(int(params.get("mode", 1)))
 
-        is_cutting = self._parse_edge(params.get("is_cutting"))
-        is_gluing = self._parse_edge(params.get("is_gluing"))
-        is_pocket = self._parse_edge(params.get("is_pocket"))
-        is_eyelet = self._parse_edge_float(params.get("is_eyelet"))
-        is_joining = bool(params.get("is_joining", False))
-        is_lamination = bool(params.get("is_lamination", False))
+        plan = _PrintRollPlan(
+            params=params,
+            size=size,
+            material_id=material_id,
+            printer_code=printer_code,
+            mode=mode,
+        )
 
         try:
             printer = printer_catalog.get(printer_code)
@@ -148,45 +179,79 @@ class PrintRollCalculator(BaseCalculator):
             try:
                 printer = printer_catalog.get(DEFAULT_PRINTER)
             except KeyError:
-                return self._empty(mode)
+                return plan
 
         try:
             material = roll_catalog.get(material_id)
         except KeyError:
-            return self._empty(mode)
+            return plan
 
         margins = list(printer.margins or [200, 20, 50, 20])
         if len(margins) < 4:
             margins = [200, 20, 50, 20]
 
-        # Подбор оптимального размера рулона
+        # Форматы рулона, которые помещаются в принтер
         all_sizes = material.sizes if material.sizes else [[1700, 0]]
         max_printer = printer.max_size or [1700, 0]
 
-        best_vol = -1.0
-        best_size_material = all_sizes[0]
-        best_len_material = 0.0
-        best_size_print = [0.0, 0.0]
-
-        for sz in all_sizes:
-            sz_w = float(sz[0]) if len(sz) > 0 else 0
-            sz_h = float(sz[1]) if len(sz) > 1 else 0
+        formats = [
+            (float(sz[0]) if len(sz) > 0 else 0, float(sz[1]) if len(sz) > 1 else 0) for sz in all_sizes
+        ]
+        # Листовые форматы: помещается ли лист в принтер — одним пакетом (common.layout)
+        sheets_fit = iter(
+            row[0] for row in layout_on_roll_batch(1, [fmt for fmt in formats if fmt[1] != 0], [float(max_printer[0])])
+        )
 
+        for sz_w, sz_h in formats:
             # Проверка: помещается ли рулон в принтер
             if sz_h == 0:
                 if sz_w > max_printer[0]:
                     continue
-            else:
-                check = layout_on_roll(1, [sz_w, sz_h], max_printer)
-                if check["length"] == 0:
-                    continue
+            elif next(sheets_fit) == 0:
+                continue
 
             usable_w = sz_w - margins[1] - margins[3]
             if usable_w <= 0:
                 continue
+            plan.formats.append((sz_w, sz_h, usable_w))
+
+        plan.printer = printer
+        plan.material = material
+        plan.margins = margins
+        return plan
+
+    def _calculate_quantity(self, plan: _PrintRollPlan, n: int) -> Dict[str, Any]:
+        """Тиражозависимая часть: подбор рулона по расходу, печать, брак, постобработка."""
+        mode = plan.mode
+        printer = plan.printer
+        material = plan.material
+        if printer is None or material is None:
+            return self._empty(mode)
+
+        params = plan.params
+        size = plan.size
+        material_id = plan.material_id
+        printer_code = plan.printer_code
+        margins = plan.margins
+
+        is_cutting = self._parse_edge(params.get("is_cutting"))
+        is_gluing = self._parse_edge(params.get("is_gluing"))
+        is_pocket = self._parse_edge(params.get("is_pocket"))
+        is_eyelet = self._parse_edge_float(params.get("is_eyelet"))
+        is_joining = bool(params.get("is_joining", False))
+
+        # Подбор оптимального размера рулона
+        all_sizes = material.sizes if material.sizes else [[1700, 0]]
+
+        best_vol = -1.0
+        best_size_material = all_sizes[0]
+        best_len_material = 0.0
+        best_size_print = [0.0, 0.0]
+
+        # Длины отреза на всех рулонах — одним пакетом
+        lengths = layout_on_roll_batch(n, [size], [usable_w for _, _, usable_w in plan.formats])[0]
 
-            roll = layout_on_roll(n, size, [usable_w, 0])
-            len_mat = roll["length"]
+        for (sz_w, sz_h, usable_w), len_mat in zip(plan.formats, lengths):
 
             if is_joining and len_mat == 0:
                 max_side = max(size[0], size[1])
@@ -281,7 +346,7 @@ class PrintRollCalculator(BaseCalculator):
         margin_roll = get_margin("marginPrintRoll")
         cost = math.ceil(cost_print_val + cost_material + cost_opt)
         price = math.ceil(
-            cost_material * (1 + MARGIN_MATERIAL + margin_roll)
+            cost_material * (1 + markups.MARGIN_MATERIAL + margin_roll)
             + (price_print_val + price_opt) * (1 + margin_roll)
         )
 
@@ -335,7 +400,7 @@ class PrintRollCalculator(BaseCalculator):
         return None
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
@@ -11,20 +11,16 @@
 from __future__ import annotations
 
 import math
-from typing import Any, Dict, List, Mapping, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.cut_guillotine import CutGuillotineCalculator
 from calculators.lamination import LaminationCalculator, LAMINATOR_CODE
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    MARGIN_MATERIAL,
-    MARGIN_MIN,
-    MARGIN_OPERATION,
-    get_margin,
-    get_time_ready,
-)
+from common import markups
+from common.markups import get_margin, get_time_ready
 from equipment import printer as printer_catalog
 from equipment import laminator as laminator_catalog
 from materials import sheet as sheet_catalog
@@ -33,6 +29,32 @@ from materials import get_material as get_material_any
 PRINTER_CODE = "KMBizhubC220"
 
 
+@dataclass
+class _PrintSheetPlan:
+    """
+    Тиражонезависимые промежуточные данные расчёта (см. PrintSheetCalculator._prepare).
+    printer/material = None — расчёт невозможен, результат пустой.
+    """
+
+    params: Mapping[str, Any]
+    size: List[float]
+    color: str
+    interval: float
+    material_id: str
+    lamination_id: str
+    mode: ProductionMode
+    printer: Any = None
+    material: Any = None
+    laminator: Any = None
+    size_sheet: Optional[List[float]] = None
+    sum_margins: Optional[List[float]] = None
+    num_on_sheet: int = 0
+    num_on_material: int = 1
+    coeff_size: float = 1.0
+    sheets_per_hour: float = 250.0
+    cost_per_sheet: float = 0.0
+
+
 def _cost_per_sheet_laser(color: str, cost_list: Optional[List[float]]) -> float:
     """Себестоимость одного листа печати по цветности."""
     if not cost_list:
@@ -237,6 +259,20 @@ class PrintSheetCalculator(BaseCalculator):
 
     def calculate(self, params: Mapping[str, Any]) -> Dict[str, Any]:
         quantity = int(params.get("quantity", 1))
+        return self._calculate_quantity(self._prepare(params), quantity)
+
+    def calculate_ladder(
+        self, params: Mapping[str, Any], quantities: Sequence[int]
+    ) -> List[Dict[str, Any]]:
+        """Ценовая лестница: принтер, материал и раскладка на листе считаются один раз."""
+        plan = self._prepare(params)
+        return [self._calculate_quantity(plan, int(q)) for q in quantities]
+
+    def _prepare(self, params: Mapping[str, Any]) -> _PrintSheetPlan:
+        """
+        Тиражонезависимая часть расчёта: принтер, материал, поля и раскладка
+        изделия на печатном листе, скорость и себестоимость печати листа.
+        """
         width = float(params.get("width", 0))
         height = float(params.get("height", 0))
         size = [width, height]
@@ -250,11 +286,20 @@ class PrintSheetCalculator(BaseCalculator):
         material_id = str(params.get("material_id", "") or "").strip()
         printer_code = str(params.get("printer_code", "") or PRINTER_CODE).strip() or PRINTER_CODE
         lamination_id = str(params.get("lamination_id", "") or "").strip()
-        lamination_double_side = bool(params.get("lamination_double_side", True))
         mode = ProductionMode(int(params.get("mode", 1)))
 
+        plan = _PrintSheetPlan(
+            params=params,
+            size=size,
+            color=color,
+            interval=interval,
+            material_id=material_id,
+            lamination_id=lamination_id,
+            mode=mode,
+        )
+
         if color == "0+0":
-            return self._empty_result(size, quantity, mode)
+            return plan
 
         try:
             printer = printer_catalog.get(printer_code)
@@ -262,7 +307,7 @@ class PrintSheetCalculator(BaseCalculator):
             printer = printer_catalog.get(PRINTER_CODE) if printer_catalog._items else None
         if not printer:
             # TODO: оборудование не найдено
-            return self._empty_result(size, quantity, mode)
+            return plan
 
         material = None
         if material_id:
@@ -272,7 +317,7 @@ class PrintSheetCalculator(BaseCalculator):
                 pass
         if not material:
             # TODO: материал не найден
-            return self._empty_result(size, quantity, mode)
+            return plan
 
         size_sheet = material.sizes[0] if material.sizes else [320, 450]
         size_sheet = [float(size_sheet[0]), float(size_sheet[1])]
@@ -294,24 +339,70 @@ class PrintSheetCalculator(BaseCalculator):
             layout_on_material = layout_on_sheet(size_sheet, size_sheet, None, 0.0)
             layout_sheet = layout_on_sheet(size, size_sheet, sum_margins, interval)
             if layout_sheet["num"] == 0:
-                return self._empty_result(size, quantity, mode)
-            num_sheet = math.ceil(quantity / layout_sheet["num"])
+                return plan
             # TODO: доп. резка (гильотина/роликовый) — не реализовано
         else:
             layout_sheet = layout_on_sheet(size, size_sheet, sum_margins, interval)
             if layout_sheet["num"] == 0:
-                return self._empty_result(size, quantity, mode)
-            num_sheet = math.ceil(quantity / layout_sheet["num"])
+                return plan
             layout_on_material = {"num": 1}
 
-        num_sheet_to_print = num_sheet
-        # Если есть ламинация, сначала учитываем брак ламинатора, как в JS calcPrintSheet:
-        # defectsLaminator → numSheetToPrint = ceil(numSheetToPrint * (1 + defectsLaminator)).
+        laminator = None
         if lamination_id:
             try:
                 laminator = laminator_catalog.get(LAMINATOR_CODE)
             except Exception:
                 laminator = None
+
+        # Печать (лазерная логика как в calcPrintLaser)
+        coeff_size = 1.0
+        half_sheet = [max_printer[0], max_printer[1] / 2.0]
+        layout_half = layout_on_sheet(size_sheet, half_sheet, None, 0.0)
+        if layout_half["num"] > 0:
+            coeff_size = 0.5
+        sheets_per_hour = printer.get_sheets_per_hour(getattr(material, "density", 80) or 80)
+        if sheets_per_hour <= 0:
+            sheets_per_hour = 250.0
+
+        cost_print_sheet_list = getattr(printer, "cost_print_sheet", None) or [4.0, 12.0]
+
+        plan.printer = printer
+        plan.material = material
+        plan.laminator = laminator
+        plan.size_sheet = size_sheet
+        plan.sum_margins = sum_margins
+        plan.num_on_sheet = layout_sheet["num"]
+        plan.num_on_material = layout_on_material.get("num", 1)
+        plan.coeff_size = coeff_size
+        plan.sheets_per_hour = sheets_per_hour
+        plan.cost_per_sheet = _cost_per_sheet_laser(color, cost_print_sheet_list)
+        return plan
+
+    def _calculate_quantity(self, plan: _PrintSheetPlan, quantity: int) -> Dict[str, Any]:
+        """Тиражозависимая часть: листы с учётом брака, печать, резка, ламинация, цена."""
+        if plan.printer is None or plan.material is None:
+            return self._empty_result(plan.size, quantity, plan.mode)
+
+        params = plan.params
+        size = plan.size
+        color = plan.color
+        interval = plan.interval
+        material_id = plan.material_id
+        lamination_id = plan.lamination_id
+        lamination_double_side = bool(params.get("lamination_double_side", True))
+        mode = plan.mode
+        printer = plan.printer
+        material = plan.material
+        size_sheet = plan.size_sheet
+        sum_margins = plan.sum_margins
+
+        num_sheet = math.ceil(quantity / plan.num_on_sheet)
+
+        num_sheet_to_print = num_sheet
+        # Если есть ламинация, сначала учитываем брак ламинатора, как в JS calcPrintSheet:
+        # defectsLaminator → numSheetToPrint = ceil(numSheetToPrint * (1 + defectsLaminator)).
+        if lamination_id:
+            laminator = plan.laminator
             if laminator:
                 try:
                     defects_laminator = laminator.get_defect_rate(float(num_sheet))
@@ -325,21 +416,14 @@ class PrintSheetCalculator(BaseCalculator):
         num_with_defects = math.ceil(num_sheet_to_print * (1 + defects_printer))
 
         # Печать (лазерная логика как в calcPrintLaser)
-        coeff_size = 1.0
-        half_sheet = [max_printer[0], max_printer[1] / 2.0]
-        layout_half = layout_on_sheet(size_sheet, half_sheet, None, 0.0)
-        if layout_half["num"] > 0:
-            coeff_size = 0.5
-        sheets_per_hour = printer.get_sheets_per_hour(getattr(material, "density", 80) or 80)
-        if sheets_per_hour <= 0:
-            sheets_per_hour = 250.0
+        coeff_size = plan.coeff_size
+        sheets_per_hour = plan.sheets_per_hour
         double_side = 2 if color in ("1+1", "4+1", "4+4") else 1
         time_prepare = (printer.time_prepare or 0.1) * max(1, mode.value)
         time_print = num_with_defects / sheets_per_hour * coeff_size * double_side + time_prepare
         time_operator = time_print * 0.5 * (1 + defects_printer) + time_prepare
 
-        cost_print_sheet_list = getattr(printer, "cost_print_sheet", None) or [4.0, 12.0]
-        cost_per_sheet_val = _cost_per_sheet_laser(color, cost_print_sheet_list)
+        cost_per_sheet_val = plan.cost_per_sheet
         cost_depreciation = printer.depreciation_per_hour * time_print
         cost_consumables = cost_per_sheet_val * coeff_size * num_with_defects
         cost_print = cost_depreciation + cost_consumables
@@ -347,7 +431,7 @@ class PrintSheetCalculator(BaseCalculator):
         cost_print_total = cost_print + cost_operator
 
         # Материал: costMaterial = material.cost * ceil(numSheetToPrint*(1+defectsPrinter)) / layoutOnMaterial.num
-        layout_num = max(1, layout_on_material.get("num", 1))
+        layout_num = max(1, plan.num_on_material)
         num_sheets_physical = math.ceil(num_sheet_to_print * (1 + defects_printer) / layout_num)
         cost_material = float(material.get_cost(1)) * num_sheets_physical
 
@@ -428,10 +512,10 @@ class PrintSheetCalculator(BaseCalculator):
         cost = cost_material + cost_cut + cost_print_total + cost_lamination + cost_cut_guillotine
         # JS: result.price = (costMaterial*(1+marginMaterial) + costCut.price + costPrint.price + costLamination.price + costCutGuillotine.price + costOptions.price) * (1+marginPrintSheet)
         # costPrint.price (calcPrintLaser): costPrint*(1+marginMaterial+marginPrintLaser) + costOperator*(1+marginOperation+marginPrintLaser)
-        price_material = cost_material * (1 + MARGIN_MATERIAL)
+        price_material = cost_material * (1 + markups.MARGIN_MATERIAL)
         margin_print_laser = get_margin("marginPrintLaser")
-        price_print = cost_print * (1 + MARGIN_MATERIAL + margin_print_laser) + cost_operator * (
-            1 + MARGIN_OPERATION + margin_print_laser
+        price_print = cost_print * (1 + markups.MARGIN_MATERIAL + margin_print_laser) + cost_operator * (
+            1 + markups.MARGIN_OPERATION + margin_print_laser
         )
         margin_print_sheet = get_margin("marginPrintSheet")
         price = (price_material + price_print + price_cut_guillotine + price_lamination) * (1 + margin_print_sheet)
@@ -12,11 +12,8 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from common.helpers import calc_weight
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import printer as printer_catalog
 from materials import roll as roll_catalog
 
@@ -102,7 +99,7 @@ class PrintWideCalculator(BaseCalculator):
         if not material:
             return self._empty(mode)
 
-        base_time_ready = printer.base_time_ready or BASE_TIME_READY
+        base_time_ready = printer.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, mode.value))
         base_ready = float(base_time_ready[idx])
 
@@ -126,7 +123,7 @@ class PrintWideCalculator(BaseCalculator):
 
         cost = math.ceil(cost_print + cost_operator)
         margin_wide = get_margin("marginPrintWide")
-        price = math.ceil(cost * (1 + MARGIN_OPERATION + margin_wide))
+        price = math.ceil(cost * (1 + markups.MARGIN_OPERATION + margin_wide))
 
         time_hours = math.ceil(time_print * 100) / 100.0
         time_ready = time_hours + base_ready
@@ -184,7 +181,7 @@ class PrintWideCalculator(BaseCalculator):
             return None
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
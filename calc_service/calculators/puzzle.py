@@ -9,25 +9,22 @@
 from __future__ import annotations
 
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
-import json5
-
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_sheet import PrintSheetCalculator
-from common.markups import BASE_TIME_READY, COST_OPERATOR, MARGIN_MATERIAL, MARGIN_OPERATION, get_margin
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
 from materials import puzzle as puzzle_catalog
 
-PUZZLE_JSON = Path(__file__).parent.parent / "data" / "materials" / "puzzle.json"
 SUBLIMATION_PAPER = "PaperSublimation128"
 TIME_PRESS_PER_ITEM = 35 / 3600  # 35 сек в часах
 
 
 def _load_puzzle_raw() -> Dict[str, Any]:
     """Загрузить сырые данные пазлов (sizePrint, applicationID)."""
-    with open(PUZZLE_JSON, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json("materials/puzzle.json")
 
 
 def _get_puzzle_config(puzzle_id: str) -> Dict[str, Any]:
@@ -123,7 +120,7 @@ class PuzzleCalculator(BaseCalculator):
 
         # Стоимость заготовок
         cost_puzzle = puzzle_cost * n
-        price_puzzle = cost_puzzle * (1 + MARGIN_MATERIAL)
+        price_puzzle = cost_puzzle * (1 + markups.MARGIN_MATERIAL)
         weight_kg = puzzle_weight * n
 
         materials_out: List[Dict[str, Any]] = [{
@@ -137,8 +134,8 @@ class PuzzleCalculator(BaseCalculator):
 
         # Упаковка: 0.006 ч на изделие
         time_packing = 0.006 * n
-        cost_packing = time_packing * COST_OPERATOR
-        price_packing = cost_packing * (1 + MARGIN_OPERATION)
+        cost_packing = time_packing * markups.COST_OPERATOR
+        price_packing = cost_packing * (1 + markups.MARGIN_OPERATION)
 
         # Сублимация: печать на бумаге + термоперенос
         print_calc = PrintSheetCalculator()
@@ -159,7 +156,7 @@ class PuzzleCalculator(BaseCalculator):
 
         # Время термопереноса: 35 сек на изделие
         time_press = n * TIME_PRESS_PER_ITEM
-        cost_press = time_press * COST_OPERATOR
+        cost_press = time_press * markups.COST_OPERATOR
         price_press = cost_press * (1 + get_margin("marginHeatPress"))
         cost_application += cost_press
         price_application += price_press
@@ -171,7 +168,7 @@ class PuzzleCalculator(BaseCalculator):
         cost = cost_puzzle + cost_packing + cost_application
         price = (price_puzzle + price_packing + price_application) * (1 + get_margin("marginPuzzle"))
         time_hours = time_packing + time_application
-        time_ready = time_hours + max(time_ready_application, float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)]))
+        time_ready = time_hours + max(time_ready_application, float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)]))
 
         return {
             "cost": math.ceil(cost),
@@ -7,27 +7,25 @@
 
 from __future__ import annotations
 
-import json5
 import math
-from pathlib import Path
 from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.print_roll import PrintRollCalculator
-from common.markups import COST_OPERATOR, MARGIN_MATERIAL, MARGIN_OPERATION, get_margin
+from common.data_store import load_json
+from common import markups
+from common.markups import get_margin
 from materials import presswall as presswall_catalog
 from materials import roll as roll_catalog
 from common.process_tools import calc_shipment
 
 DEFAULT_PRINTER = "TechnojetXR720"
 ROLLUP_BASE_TIME_READY = [40, 24, 8]  # как в JS calcRollup
-_PRESSWALL_PATH = Path(__file__).parent.parent / "data" / "materials" / "presswall.json"
 
 
 def _get_rollup_raw(rollup_id: str) -> Dict[str, Any]:
     """Получить сырые данные роллапа (sizeBanner, size, cost, weight) из presswall.json."""
-    with open(_PRESSWALL_PATH, "r", encoding="utf-8") as f:
-        data = json5.load(f)
+    data = load_json("materials/presswall.json")
     rollup_group = data.get("Rollup", {})
     default = rollup_group.get("Default", {}) or {}
     raw = rollup_group.get(rollup_id)
@@ -215,8 +213,8 @@ class RollupCalculator(BaseCalculator):
             except (KeyError, ValueError):
                 pass
 
-            cost_install = time_install * COST_OPERATOR
-            price_install = cost_install * (1 + MARGIN_OPERATION)
+            cost_install = time_install * markups.COST_OPERATOR
+            price_install = cost_install * (1 + markups.MARGIN_OPERATION)
 
         cost_ship = calc_shipment(n, size_ship, rollup_weight, "Own")
 
@@ -224,7 +222,7 @@ class RollupCalculator(BaseCalculator):
         margin_rollup = get_margin("marginRollup")
         price = (
             (price_install + price_banner + cost_ship.price) * (1 + margin_rollup)
-            + cost_materials * (1 + MARGIN_MATERIAL + margin_rollup)
+            + cost_materials * (1 + markups.MARGIN_MATERIAL + margin_rollup)
         )
         price = math.ceil(price)
 
@@ -0,0 +1,252 @@
+"""
+Реестр схем калькуляторов.
+
+get_param_schema() / get_tool_schema() / get_options() / get_llm_prompt()
+собирают большие вложенные словари (часть — по каталогам материалов), поэтому
+вызывать их на каждый запрос дорого. Реестр строит каждую схему один раз на
+поколение данных (common.generation) и хранит:
+
+- замороженное значение (MappingProxyType / tuple) — для чтения в коде;
+- готовые JSON-байты ответа API — эндпоинты отдают их без сериализации;
+- строгий ETag из версии данных, версии кода и содержимого ответа.
+
+Там же собирается бандл /api/v1/bundle — все схемы публичных калькуляторов
+одним ответом (и его gzip-вариант), чтобы агенту не нужно было делать по
+четыре запроса на калькулятор при старте.
+
+После перезагрузки справочников схемы строятся заново по новому поколению.
+Методы калькуляторов остаются источником схем: реестр только кэширует их результат.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Mapping, Tuple
+
+from common import generation
+from config import CODE_VERSION
+
+if TYPE_CHECKING:
+    from calculators.base import BaseCalculator
+
+logger = logging.getLogger(__name__)
+
+PARTS = ("param_schema", "tool_schema", "options", "llm_prompt")
+
+
+@dataclass(frozen=True)
+class FrozenSchema:
+    """Схема калькулятора: замороженное значение, сериализованный ответ API и его ETag."""
+
+    value: Any
+    json: bytes
+    etag: str
+
+
+def freeze(value: Any) -> Any:
+    """Рекурсивно сделать структуру неизменяемой: dict → MappingProxyType, list → tuple."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def render_json(content: Any) -> bytes:
+    """JSON-байты в том же виде, что отдаёт FastAPI (JSONResponse)."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """CODE_VERSION из конфига или хэш исходников calc_service (*.py), считается один раз."""
+    if CODE_VERSION:
+        return CODE_VERSION
+    root = Path(__file__).resolve().parent.parent
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(root.rglob("*.py")):
+        if "tests" in path.relative_to(root).parts:
+            continue
+        digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def make_etag(body: bytes) -> str:
+    """Строгий ETag ответа: версия данных + версия кода + содержимое."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{generation.current().version}:{code_version()}:".encode("utf-8"))
+    digest.update(body)
+    return f'"{digest.hexdigest()}"'
+
+
+def _frozen(value: Any, content: Any) -> FrozenSchema:
+    body = render_json(content)
+    return FrozenSchema(freeze(value), body, make_etag(body))
+
+
+def _key(calc: BaseCalculator, part: str) -> str:
+    return f"schema:{calc.slug or type(calc).__name__}:{part}"
+
+
+def _build(calc: BaseCalculator, part: str) -> FrozenSchema:
+    if part == "llm_prompt":
+        prompt = calc.get_llm_prompt()
+        return _frozen(prompt, {"slug": calc.slug, "prompt": prompt})
+    value = getattr(calc, f"get_{part}")()
+    return _frozen(value, value)
+
+
+def get_schema(calc: BaseCalculator, part: str) -> FrozenSchema:
+    """Схема part ("param_schema", "tool_schema", "options", "llm_prompt") текущего поколения."""
+    if part not in PARTS:
+        raise ValueError(f"Неизвестная схема калькулятора: {part!r}")
+    return generation.current().memo(_key(calc, part), lambda: _build(calc, part))
+
+
+def calculator_list(calculators: Iterable[BaseCalculator]) -> FrozenSchema:
+    """Список публичных калькуляторов для /api/v1/calculators (slug, name, description, keywords)."""
+
+    def build() -> FrozenSchema:
+        items: List[Dict[str, Any]] = [
+            {
+                "slug": calc.slug,
+                "name": calc.name,
+                "description": calc.description,
+                # Ключевые слова используются агентом/фронтом как подсказки при выборе калькулятора.
+                # Поле опциональное, поэтому возвращаем только строковые значения.
+                "keywords": list(getattr(calc, "keywords", []) or []),
+            }
+            for calc in calculators
+            if getattr(calc, "is_public", True)
+        ]
+        return _frozen(items, items)
+
+    return generation.current().memo("schema:calculators", build)
+
+
+def bundle(calculators: Iterable[BaseCalculator]) -> FrozenSchema:
+    """
+    Бандл для /api/v1/bundle: {"calculators": [...]} — для каждого публичного
+    калькулятора slug, name, description, keywords и части PARTS
+    (llm_prompt — строкой). Часть, которую не удалось построить, равна null.
+    """
+
+    def build() -> FrozenSchema:
+        items: List[Dict[str, Any]] = []
+        for calc in calculators:
+            if not getattr(calc, "is_public", True):
+                continue
+            entry: Dict[str, Any] = {
+                "slug": calc.slug,
+                "name": calc.name,
+                "description": calc.description,
+                "keywords": list(getattr(calc, "keywords", []) or []),
+            }
+            for part in PARTS:
+                try:
+                    content = json.loads(get_schema(calc, part).json)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Схема %s:%s не попала в бандл: %s", calc.slug, part, exc)
+                    entry[part] = None
+                    continue
+                entry[part] = content["prompt"] if part == "llm_prompt" else content
+            items.append(entry)
+        content = {"calculators": items}
+        return _frozen(content, content)
+
+    return generation.current().memo("schema:bundle", build)
+
+
+def bundle_gzip(calculators: Iterable[BaseCalculator]) -> FrozenSchema:
+    """Бандл, сжатый gzip (сжимается один раз на поколение); ETag отличается суффиксом -gzip."""
+
+    def build() -> FrozenSchema:
+        plain = bundle(calculators)
+        return FrozenSchema(plain.value, gzip.compress(plain.json, mtime=0), f'{plain.etag[:-1]}-gzip"')
+
+    return generation.current().memo("schema:bundle:gzip", build)
+
+
+def param_schema(calc: BaseCalculator) -> Mapping[str, Any]:
+    return get_schema(calc, "param_schema").value
+
+
+def tool_schema(calc: BaseCalculator) -> Mapping[str, Any]:
+    return get_schema(calc, "tool_schema").value
+
+
+def required_params(calc: BaseCalculator) -> Tuple[str, ...]:
+    """Имена обязательных параметров (поле required в param_schema)."""
+    return generation.current().memo(
+        _key(calc, "required"),
+        lambda: tuple(p["name"] for p in param_schema(calc).get("params", ()) if p.get("required")),
+    )
+
+
+def default_values(calc: BaseCalculator) -> Mapping[str, Any]:
+    """name → default для параметров с заданным значением по умолчанию."""
+    return generation.current().memo(
+        _key(calc, "defaults"),
+        lambda: MappingProxyType(
+            {
+                p["name"]: p["default"]
+                for p in param_schema(calc).get("params", ())
+                if "default" in p and p["default"] is not None
+            }
+        ),
+    )
+
+
+def choices_by_param(calc: BaseCalculator) -> Mapping[str, Mapping[str, Any]]:
+    """name → описание choices ({} если у параметра их нет)."""
+    return generation.current().memo(
+        _key(calc, "choices"),
+        lambda: MappingProxyType(
+            {p.get("name"): (p.get("choices") or MappingProxyType({})) for p in param_schema(calc).get("params", ())}
+        ),
+    )
+
+
+def list_param_names(calc: BaseCalculator) -> FrozenSet[str]:
+    """Имена параметров-массивов из tool_schema (type == "array")."""
+    return generation.current().memo(
+        _key(calc, "list_params"),
+        lambda: frozenset(
+            name
+            for name, prop in ((tool_schema(calc).get("parameters") or {}).get("properties") or {}).items()
+            if isinstance(prop, Mapping) and prop.get("type") == "array"
+        ),
+    )
+
+
+def warm(calculators: Iterable[BaseCalculator]) -> Dict[str, str]:
+    """
+    Построить все схемы текущего поколения заранее (при старте и после перезагрузки).
+
+    Ошибки не прерывают прогрев: возвращается {slug:part: ошибка}, эндпоинт
+    такой схемы вернёт ошибку при обращении, как и раньше.
+    """
+    calculators = list(calculators)
+    errors: Dict[str, str] = {}
+    calculator_list(calculators)
+    for calc in calculators:
+        for part in PARTS:
+            try:
+                get_schema(calc, part)
+            except Exception as exc:  # noqa: BLE001
+                errors[f"{calc.slug}:{part}"] = f"{type(exc).__name__}: {exc}"
+                logger.warning("Схема %s:%s не построена: %s", calc.slug, part, exc)
+    bundle_gzip(calculators)
+    return errors
@@ -15,11 +15,8 @@ from calculators.print_wide import PrintWideCalculator
 from calculators.uv_print import UVPrintCalculator
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_packing
 from materials import hardsheet as hardsheet_catalog, roll as roll_catalog
 
@@ -125,7 +122,7 @@ class ShildCalculator(BaseCalculator):
         num_sheet = math.ceil(n / layout["num"])
         cost_mat = float(material.cost or 0) * num_sheet
         cost_total += cost_mat
-        price_total += cost_mat * (1 + MARGIN_MATERIAL)
+        price_total += cost_mat * (1 + markups.MARGIN_MATERIAL)
         weight_total += calc_weight(
             quantity=n,
             density=material.density or 0,
@@ -212,7 +209,7 @@ class ShildCalculator(BaseCalculator):
         margin_shild = get_margin("marginShild")
         price_total = price_total * (1 + margin_shild)
         time_hours = math.ceil(time_total * 100) / 100.0
-        time_ready = max(time_ready_max, time_hours + float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)]))
+        time_ready = max(time_ready_max, time_hours + float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)]))
 
         return {
             "cost": float(math.ceil(cost_total)),
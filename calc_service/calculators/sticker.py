@@ -15,7 +15,8 @@ from calculators.cut_plotter import CutPlotterCalculator
 from calculators.lamination import LaminationCalculator
 from calculators.print_laser import PrintLaserCalculator
 from common.helpers import calc_weight
-from common.markups import BASE_TIME_READY, MARGIN_MATERIAL, get_margin
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_manual_roll
 from equipment import plotter as plotter_catalog
 from materials import get_material
@@ -364,7 +365,7 @@ class StickerCalculator(BaseCalculator):
                 sum_area = quantity * (w + 20) * (h + 20) / 1_000_000
                 cost_film_mat = float(film.get_cost(1)) * sum_area
                 cost_film = cost_film_mat + roll_result.cost
-                price_film = cost_film_mat * (1 + MARGIN_MATERIAL) + roll_result.price
+                price_film = cost_film_mat * (1 + markups.MARGIN_MATERIAL) + roll_result.price
                 time_film = roll_result.time_hours
                 weight_film = calc_weight(
                     quantity=quantity,
@@ -388,7 +389,7 @@ class StickerCalculator(BaseCalculator):
         cost_total = cost_material + cost_cut + cost_print + cost_lam + cost_film
         margin_sticker = get_margin("marginSticker")
         price_total = (
-            cost_material * (1 + MARGIN_MATERIAL)
+            cost_material * (1 + markups.MARGIN_MATERIAL)
             + (price_cut + price_print + price_lam + price_film) * (1 + margin_sticker)
         )
         price_total = math.ceil(price_total)
@@ -396,9 +397,9 @@ class StickerCalculator(BaseCalculator):
         time_hours = math.ceil((time_cut + time_print + time_lam + time_film) * 100) / 100.0
         try:
             plotter = plotter_catalog.get(PLOTTER_CODE)
-            base_ready = getattr(plotter, "base_time_ready", None) or BASE_TIME_READY
+            base_ready = getattr(plotter, "base_time_ready", None) or markups.BASE_TIME_READY
         except (KeyError, AttributeError):
-            base_ready = BASE_TIME_READY
+            base_ready = markups.BASE_TIME_READY
         idx = max(0, min(len(base_ready) - 1, mode.value))
         time_ready = time_hours + float(base_ready[idx])
 
@@ -15,12 +15,8 @@ from calculators.laser import LaserCalculator
 from calculators.uv_print import UVPrintCalculator
 from common.helpers import calc_weight
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_cut_profile, calc_pocket, calc_set_profile
 from materials import hardsheet as hardsheet_catalog, pocket as pocket_catalog, profile as profile_catalog
 
@@ -180,7 +176,7 @@ class TabletsCalculator(BaseCalculator):
             num_sheet = math.ceil(n / layout["num"])
             cost_mat = float(material.cost or 0) * num_sheet
             cost_total += cost_mat
-            price_total += cost_mat * (1 + MARGIN_MATERIAL)
+            price_total += cost_mat * (1 + markups.MARGIN_MATERIAL)
             area_m2 = n * width * height / 1_000_000
             weight_total += calc_weight(
                 quantity=n,
@@ -246,7 +242,7 @@ class TabletsCalculator(BaseCalculator):
 
             cost_frame = cost_mat_frame + cut_res.cost + set_res.cost
             price_frame = (
-                cost_mat_frame * (1 + MARGIN_MATERIAL)
+                cost_mat_frame * (1 + markups.MARGIN_MATERIAL)
                 + cut_res.price
                 + set_res.price
             )
@@ -257,7 +253,7 @@ class TabletsCalculator(BaseCalculator):
             price_total += price_frame
             time_total += time_frame
             weight_total += weight_frame
-            time_ready_list.append(time_frame + float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)]))
+            time_ready_list.append(time_frame + float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)]))
 
             materials_out.append({
                 "code": frame_profile_id,
@@ -271,7 +267,7 @@ class TabletsCalculator(BaseCalculator):
         margin_tablet = get_margin("marginTablets")
         price_total = price_total * (1 + margin_tablet)
         time_hours = math.ceil(time_total * 100) / 100.0
-        time_ready = max(time_ready_list) if time_ready_list else time_hours + float(BASE_TIME_READY[min(mode.value, len(BASE_TIME_READY) - 1)])
+        time_ready = max(time_ready_list) if time_ready_list else time_hours + float(markups.BASE_TIME_READY[min(mode.value, len(markups.BASE_TIME_READY) - 1)])
 
         return {
             "cost": float(math.ceil(cost_total)),
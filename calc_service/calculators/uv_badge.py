@@ -13,7 +13,8 @@ from typing import Any, Dict, List, Mapping
 from calculators.base import BaseCalculator, ProductionMode
 from calculators.laser import LaserCalculator
 from calculators.uv_print import UVPrintCalculator
-from common.markups import BASE_TIME_READY, get_margin
+from common import markups
+from common.markups import get_margin
 from common.process_tools import calc_attachment, calc_pocket, calc_packing
 from equipment import printer as printer_catalog
 
@@ -100,7 +101,7 @@ class UVBadgeCalculator(BaseCalculator):
         except KeyError:
             return self._empty(mode)
 
-        base_time_ready = printer.base_time_ready or BASE_TIME_READY
+        base_time_ready = printer.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, mode.value))
         base_ready = float(base_time_ready[idx])
 
@@ -211,7 +212,7 @@ class UVBadgeCalculator(BaseCalculator):
         }
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
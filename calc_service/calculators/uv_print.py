@@ -13,11 +13,8 @@ from typing import Any, Dict, List, Mapping
 
 from calculators.base import BaseCalculator, ProductionMode
 from common.layout import layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
 from equipment import printer as printer_catalog
 
 DEFAULT_PRINTER = "RimalSuvUV"
@@ -123,7 +120,7 @@ class UVPrintCalculator(BaseCalculator):
             except KeyError:
                 return self._empty(mode)
 
-        base_time_ready = printer.base_time_ready or BASE_TIME_READY
+        base_time_ready = printer.base_time_ready or markups.BASE_TIME_READY
         idx = max(0, min(len(base_time_ready) - 1, mode.value))
         base_ready = float(base_time_ready[idx])
 
@@ -207,7 +204,7 @@ class UVPrintCalculator(BaseCalculator):
         cost = math.ceil(cost_print + cost_operator) * coeff_customer
 
         margin_uv = get_margin("marginUVPrint")
-        price = math.ceil(cost * (1 + MARGIN_OPERATION + margin_uv))
+        price = math.ceil(cost * (1 + markups.MARGIN_OPERATION + margin_uv))
 
         time_hours = math.ceil(time_print * 100) / 100.0
         time_ready = time_hours + base_ready
@@ -223,7 +220,7 @@ class UVPrintCalculator(BaseCalculator):
         }
 
     def _empty(self, mode: ProductionMode) -> Dict[str, Any]:
-        btr = BASE_TIME_READY
+        btr = markups.BASE_TIME_READY
         idx = max(0, min(len(btr) - 1, mode.value))
         return {
             "cost": 0.0, "price": 0.0, "unit_price": 0.0,
@@ -0,0 +1,284 @@
+"""
+Допуск запросов к API: лимит по IP клиента и ограниченная очередь с приоритетами.
+
+Сервис открыт сайту (CORS) и работает на небольшом VPS: без ограничений краулер
+или сломанная форма занимают весь пул потоков, и бот ждёт вместе со всеми.
+AdmissionMiddleware стоит перед /api/v1/*:
+
+- токен-бакет на IP клиента (RateLimiter, CALC_RATE_LIMIT / CALC_RATE_BURST):
+  пустой бакет → 429 с Retry-After; внутренние клиенты не ограничиваются;
+- не больше CALC_MAX_CONCURRENT запросов обрабатываются одновременно
+  (AdmissionQueue); остальные ждут слот в очереди своей полосы:
+  internal (бот: IP из CALC_INTERNAL_IPS или заголовок X-Internal-Token) и
+  public (сайт). Освободившийся слот получает сначала внутренняя очередь;
+  CALC_INTERNAL_RESERVED слотов публичным запросам не выдаются никогда;
+- переполненная очередь или ожидание дольше CALC_QUEUE_TIMEOUT → 503 сразу,
+  без расчёта.
+
+IP клиента за доверенным прокси (CALC_TRUSTED_PROXIES) берётся из
+X-Forwarded-For. Полоса запроса сохраняется в request.state (LANE_STATE) — по ней
+служебные эндпоинты пускают только внутренних клиентов. Метрики: calc_admission_in_flight, calc_admission_queue_depth,
+calc_admission_wait_seconds, calc_admission_rejected_total (GET /metrics).
+
+Состояние живёт в цикле событий воркера (под server.py — у каждого воркера своё)
+и не потокобезопасно: middleware вызывается только из цикла событий.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from common import metrics
+
+INTERNAL = "internal"
+PUBLIC = "public"
+LANES = (INTERNAL, PUBLIC)
+
+INTERNAL_TOKEN_HEADER = b"x-internal-token"
+# Ключ request.state с полосой запроса (INTERNAL / PUBLIC)
+LANE_STATE = "admission_lane"
+
+# Число IP, для которых хранятся бакеты (самые давние вытесняются)
+MAX_TRACKED_CLIENTS = 10_000
+
+
+class Rejected(Exception):
+    """Запрос не допущен: HTTP-статус, причина (для метрик) и Retry-After, сек."""
+
+    def __init__(self, status: int, reason: str, detail: str, retry_after: int = 1) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Токен-бакеты по ключу (IP): rate токенов в секунду, не больше burst."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_clients: int = MAX_TRACKED_CLIENTS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_clients = max_clients
+        self._clock = clock
+        # ключ → [токены, время обновления]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def acquire(self, key: str) -> float:
+        """Взять токен: 0.0 — взят, иначе через сколько секунд появится следующий."""
+        if not self.enabled:
+            return 0.0
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        return (1.0 - bucket[0]) / self.rate
+
+
+class AdmissionQueue:
+    """
+    Слоты обработки и очереди ожидания по полосам (internal, public).
+
+    Публичные запросы занимают не больше max_concurrent - reserved слотов;
+    свободный слот выдаётся сначала внутренней очереди, внутри полосы — по порядку.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        reserved: int = 0,
+        queue_sizes: Optional[Mapping[str, int]] = None,
+        timeout: float = 10.0,
+    ) -> None:
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.reserved = min(max(0, int(reserved)), self.max_concurrent - 1)
+        self.queue_sizes = {lane: int((queue_sizes or {}).get(lane, 0)) for lane in LANES}
+        self.timeout = float(timeout)
+        self.active: Dict[str, int] = {lane: 0 for lane in LANES}
+        self._waiting: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+
+    def _limit(self, lane: str) -> int:
+        return self.max_concurrent if lane == INTERNAL else self.max_concurrent - self.reserved
+
+    def _has_room(self, lane: str) -> bool:
+        return sum(self.active.values()) < self._limit(lane)
+
+    def _start(self, lane: str) -> None:
+        self.active[lane] += 1
+        metrics.ADMISSION_IN_FLIGHT.inc(lane)
+
+    def _update_depth(self, lane: str) -> None:
+        metrics.ADMISSION_QUEUE_DEPTH.set(len(self._waiting[lane]), lane)
+
+    async def acquire(self, lane: str) -> float:
+        """Занять слот (подождав в очереди); возвращает время ожидания, сек. Не допущен → Rejected."""
+        waiting = self._waiting[lane]
+        if not waiting and self._has_room(lane):
+            self._start(lane)
+            return 0.0
+        if len(waiting) >= self.queue_sizes[lane]:
+            raise Rejected(503, "queue_full", "Сервис перегружен, повторите запрос позже")
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        waiting.append(future)
+        self._update_depth(lane)
+        try:
+            await asyncio.wait_for(future, self.timeout or None)
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                # Слот уже выдан, но запрос отменён (клиент отключился) — вернуть слот
+                self.release(lane)
+            else:
+                try:
+                    waiting.remove(future)
+                except ValueError:
+                    pass
+                self._update_depth(lane)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise Rejected(503, "queue_timeout", "Сервис перегружен, повторите запрос позже") from None
+            raise
+        return time.perf_counter() - started
+
+    def release(self, lane: str) -> None:
+        self.active[lane] -= 1
+        metrics.ADMISSION_IN_FLIGHT.dec(lane)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for lane in LANES:
+            waiting = self._waiting[lane]
+            while waiting and self._has_room(lane):
+                future = waiting.popleft()
+                if future.done():
+                    continue
+                self._start(lane)
+                future.set_result(None)
+            self._update_depth(lane)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "reserved": self.reserved,
+            "active": dict(self.active),
+            "waiting": {lane: len(q) for lane, q in self._waiting.items()},
+        }
+
+
+def _split(value: str) -> FrozenSet[str]:
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+Scope = Dict[str, Any]
+ASGIApp = Callable[[Scope, Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]], Awaitable[None]]
+
+
+class AdmissionMiddleware:
+    """ASGI-middleware: лимит по IP и очередь для путей с префиксом prefix."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        queue: AdmissionQueue,
+        internal_ips: Iterable[str] | str = (),
+        internal_token: str = "",
+        trusted_proxies: Iterable[str] | str = (),
+        prefix: str = "/api/v1/",
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.queue = queue
+        self.internal_ips = _split(internal_ips) if isinstance(internal_ips, str) else frozenset(internal_ips)
+        self.internal_token = internal_token.encode("utf-8")
+        self.trusted_proxies = (
+            _split(trusted_proxies) if isinstance(trusted_proxies, str) else frozenset(trusted_proxies)
+        )
+        self.prefix = prefix
+
+    def client_ip(self, scope: Scope) -> str:
+        """IP клиента; за доверенным прокси — ближайший недоверенный адрес из X-Forwarded-For."""
+        client = scope.get("client")
+        ip = client[0] if client else ""
+        if ip not in self.trusted_proxies:
+            return ip
+        forwarded = [
+            value.decode("latin-1") for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"
+        ]
+        hops = [hop.strip() for line in forwarded for hop in line.split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if hop not in self.trusted_proxies:
+                return hop
+        return ip
+
+    def lane(self, scope: Scope, ip: str) -> str:
+        if ip in self.internal_ips:
+            return INTERNAL
+        if self.internal_token:
+            for name, value in scope.get("headers", ()):
+                if name == INTERNAL_TOKEN_HEADER and hmac.compare_digest(value, self.internal_token):
+                    return INTERNAL
+        return PUBLIC
+
+    async def __call__(self, scope: Scope, receive: Callable[[], Awaitable[Any]], send: Callable[[Any], Awaitable[None]]) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        ip = self.client_ip(scope)
+        lane = self.lane(scope, ip)
+        scope.setdefault("state", {})[LANE_STATE] = lane
+        try:
+            if lane == PUBLIC:
+                wait = self.limiter.acquire(ip)
+                if wait:
+                    raise Rejected(429, "rate_limited", "Слишком много запросов, повторите позже", math.ceil(wait))
+            waited = await self.queue.acquire(lane)
+        except Rejected as exc:
+            metrics.ADMISSION_REJECTED.inc(lane, exc.reason)
+            await _reject(exc, scope, receive, send)
+            return
+        metrics.ADMISSION_WAIT_SECONDS.observe(waited, lane)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.queue.release(lane)
+
+
+def request_lane(request: Any) -> Optional[str]:
+    """Полоса запроса, назначенная AdmissionMiddleware; None — запрос прошёл мимо неё."""
+    return getattr(request.state, LANE_STATE, None)
+
+
+async def _reject(exc: Rejected, scope: Scope, receive: Any, send: Any) -> None:
+    from fastapi.responses import JSONResponse
+
+    response = JSONResponse(
+        status_code=exc.status,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(max(1, exc.retry_after))},
+    )
+    await response(scope, receive, send)
+
@@ -0,0 +1,118 @@
+"""
+Контекст одного расчёта (запроса): мемоизация вложенных вызовов.
+
+Составные калькуляторы создают вложенные калькуляторы и вызывают их calculate()
+по нескольку раз за запрос (badge → laser дважды, calendar → print_sheet на
+каждый блок, print_sheet → cut_guillotine/lamination, ...). Внутри контекста
+одинаковые вложенные вызовы (тот же калькулятор и те же параметры) считаются
+один раз; результат общий и только для чтения.
+
+Контекст открывает BaseCalculator.execute() (и прочие точки входа через
+request_context()); вложенные calculate() находят его через ContextVar, явно
+передавать его не нужно. Вне контекста (прямой вызов calculate() в тестах и
+скриптах) мемоизация выключена. Контекст живёт один запрос и закреплён за
+одним поколением данных, поэтому сбрасывать его не нужно.
+
+Счётчики: CalcContext.hits/misses по видам вызовов за запрос и общие STATS
+процесса (отдаются в /api/v1/cache/stats).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CalcContext:
+    """Мемо одного расчёта: вид вызова + ключ → результат."""
+
+    __slots__ = ("_memo", "depth", "hits", "misses")
+
+    def __init__(self) -> None:
+        self._memo: Dict[Hashable, Any] = {}
+        # Глубина вложенности calculate(): 0 — вызов верхнего уровня запроса
+        self.depth = 0
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def cached(self, kind: str, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Результат factory() для (kind, key), посчитанный в этом контексте один раз.
+
+        Результат общий для всех вызывающих, его нельзя изменять (как и данные
+        поколения). Исключения не кэшируются.
+        """
+        full_key = (kind, key)
+        try:
+            value = self._memo[full_key]
+        except KeyError:
+            pass
+        else:
+            self.hits[kind] += 1
+            return value
+        self.misses[kind] += 1
+        value = factory()
+        self._memo[full_key] = value
+        return value
+
+
+class ContextStats:
+    """Накопленные по процессу счётчики контекстов расчёта (потокобезопасно)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.contexts = 0
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def add(self, context: CalcContext) -> None:
+        with self._lock:
+            self.contexts += 1
+            if context.misses:  # попадания бывают только после промахов
+                self.hits.update(context.hits)
+                self.misses.update(context.misses)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = sorted(set(self.hits) | set(self.misses))
+            return {
+                "contexts": self.contexts,
+                "hits": sum(self.hits.values()),
+                "misses": sum(self.misses.values()),
+                "by_kind": {kind: {"hits": self.hits[kind], "misses": self.misses[kind]} for kind in kinds},
+            }
+
+
+STATS = ContextStats()
+
+_active: ContextVar[Optional[CalcContext]] = ContextVar("calc_context", default=None)
+
+
+def active() -> Optional[CalcContext]:
+    """Контекст текущего расчёта или None."""
+    return _active.get()
+
+
+@contextmanager
+def request_context() -> Iterator[CalcContext]:
+    """
+    Открыть контекст расчёта; если он уже открыт (вложенный execute()) — использовать его.
+
+    По закрытии внешнего контекста его счётчики добавляются в STATS.
+    """
+    context = _active.get()
+    if context is not None:
+        yield context
+        return
+    context = CalcContext()
+    token = _active.set(context)
+    try:
+        yield context
+    finally:
+        _active.reset(token)
+        STATS.add(context)
@@ -0,0 +1,138 @@
+"""
+Поисковый индекс вариантов для /api/v1/choices.
+
+Индекс строится один раз на поколение данных для каждого источника
+(каталог материалов с секцией или inline-список параметра): текст заранее
+нормализован (нижний регистр, ё → е), по title и по title+description
+построены инвертированные индексы n-грамм (длиной 1–3), поэтому поиск не
+просматривает весь каталог.
+
+Семантика отбора как раньше: каждый токен запроса должен входить подстрокой
+в title; если таких вариантов нет — в title или description. Найденные
+варианты сортируются по релевантности (совпадение слова целиком, затем
+по началу слова, затем подстрокой; title важнее description), при равенстве —
+в порядке каталога.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+GRAM_SIZE = 3
+
+_WORD_RE = re.compile(r"[\w.,]+")
+_EMPTY: FrozenSet[int] = frozenset()
+
+
+def normalize(text: Any) -> str:
+    """Нормализованный текст для поиска: нижний регистр, ё → е."""
+    return str(text or "").lower().replace("ё", "е")
+
+
+def _grams(text: str) -> Set[str]:
+    """Все подстроки text длиной от 1 до GRAM_SIZE."""
+    return {text[i : i + n] for n in range(1, GRAM_SIZE + 1) for i in range(len(text) - n + 1)}
+
+
+def _build_postings(texts: Sequence[str]) -> Dict[str, FrozenSet[int]]:
+    postings: Dict[str, Set[int]] = {}
+    for pos, text in enumerate(texts):
+        for gram in _grams(text):
+            postings.setdefault(gram, set()).add(pos)
+    return {gram: frozenset(items) for gram, items in postings.items()}
+
+
+class ChoiceIndex:
+    """Неизменяемый индекс списка вариантов (словари с id/title/description/...)."""
+
+    def __init__(self, items: Iterable[Dict[str, Any]]) -> None:
+        self.items: Tuple[Dict[str, Any], ...] = tuple(items)
+        self._titles: Tuple[str, ...] = tuple(normalize(item.get("title")) for item in self.items)
+        # Как и раньше, description ищется в склейке "title description"
+        self._texts: Tuple[str, ...] = tuple(
+            f"{title} {normalize(item.get('description'))}" for title, item in zip(self._titles, self.items)
+        )
+        self._title_words: Tuple[FrozenSet[str], ...] = tuple(
+            frozenset(_WORD_RE.findall(title)) for title in self._titles
+        )
+        self._title_postings = _build_postings(self._titles)
+        self._text_postings = _build_postings(self._texts)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _containing(self, token: str, texts: Sequence[str], postings: Dict[str, FrozenSet[int]]) -> FrozenSet[int]:
+        """Позиции вариантов, в тексте которых есть подстрока token."""
+        if len(token) <= GRAM_SIZE:
+            return postings.get(token, _EMPTY)
+        lists = sorted(
+            (postings.get(token[i : i + GRAM_SIZE], _EMPTY) for i in range(len(token) - GRAM_SIZE + 1)),
+            key=len,
+        )
+        candidates = set(lists[0])
+        for other in lists[1:]:
+            if not candidates:
+                break
+            candidates &= other
+        return frozenset(pos for pos in candidates if token in texts[pos])
+
+    def _match_all(
+        self, tokens: Sequence[str], texts: Sequence[str], postings: Dict[str, FrozenSet[int]]
+    ) -> Set[int]:
+        result: Optional[Set[int]] = None
+        for token in sorted(tokens, key=len, reverse=True):  # длинные токены отсекают больше
+            found = self._containing(token, texts, postings)
+            result = set(found) if result is None else result & found
+            if not result:
+                return set()
+        return result or set()
+
+    def _score(self, pos: int, tokens: Sequence[str], phrase: str) -> int:
+        title = self._titles[pos]
+        words = self._title_words[pos]
+        score = 0
+        for token in tokens:
+            if token in words:
+                score += 4
+            elif any(word.startswith(token) for word in words):
+                score += 3
+            elif token in title:
+                score += 2
+            else:
+                score += 1  # только в description
+        if title.startswith(phrase):
+            score += 2
+        return score
+
+    def search(
+        self,
+        query: Optional[str],
+        limit: int,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        До limit вариантов под запрос (без запроса — все в порядке каталога).
+
+        predicate — дополнительный фильтр (например, по толщине), применяется
+        до выбора между совпадениями по title и по title+description.
+        """
+        if not query:
+            return [item for item in self.items if predicate is None or predicate(item)][:limit]
+
+        tokens = [token for token in normalize(query).split() if token]
+        if not tokens:
+            return []
+
+        def accepted(positions: Set[int]) -> Set[int]:
+            if predicate is None:
+                return positions
+            return {pos for pos in positions if predicate(self.items[pos])}
+
+        positions = accepted(self._match_all(tokens, self._titles, self._title_postings))
+        if not positions:
+            positions = accepted(self._match_all(tokens, self._texts, self._text_postings))
+
+        phrase = " ".join(tokens)
+        ranked = sorted(positions, key=lambda pos: (-self._score(pos, tokens, phrase), pos))
+        return [self.items[pos] for pos in ranked[:limit]]
@@ -1,29 +1,27 @@
 """
 Курсы валют из data/common.json (USD, EUR).
-Загрузка через json5. reload() — перечитать из файла.
+Курсы берутся из текущего поколения данных (common.generation): currencies.USD_RATE.
+reload() — перечитать справочники.
 """
-import json5
-from pathlib import Path
-from typing import Union
+from typing import Any, Dict, Tuple, Union
 
-_DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "common.json"
+from common import generation
 
 
-def _load_rates() -> dict:
-    with open(_DATA_PATH, "r", encoding="utf-8") as f:
-        return json5.load(f)
-
-
-def _read_rates() -> tuple[float, float]:
-    data = _load_rates()
+def rates_from(data: Dict[str, Any]) -> Tuple[float, float]:
+    """Курсы (USD, EUR) из разобранного common.json."""
     usd = float(data.get("USD", 95))
     eur = float(data.get("EUR", 100))
     return usd, eur
 
 
-_usd, _eur = _read_rates()
-USD_RATE: float = _usd
-EUR_RATE: float = _eur
+def __getattr__(name: str) -> Any:
+    # USD_RATE / EUR_RATE — из текущего поколения данных
+    if name == "USD_RATE":
+        return generation.current().usd_rate
+    if name == "EUR_RATE":
+        return generation.current().eur_rate
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def parse_currency(value: Union[str, int, float]) -> float:
@@ -37,23 +35,22 @@ def parse_currency(value: Union[str, int, float]) -> float:
         return float(value)
     s = value.strip()
     if s.startswith("$"):
-        return float(s[1:].replace(" ", "")) * USD_RATE
+        return float(s[1:].replace(" ", "")) * generation.current().usd_rate
     if s.startswith("€"):
-        return float(s[1:].replace(" ", "")) * EUR_RATE
+        return float(s[1:].replace(" ", "")) * generation.current().eur_rate
     return float(s.replace(" ", "").replace(",", "."))
 
 
 def usd_to_rub(usd: float) -> float:
     """Доллары → рубли по текущему курсу."""
-    return usd * USD_RATE
+    return usd * generation.current().usd_rate
 
 
 def eur_to_rub(eur: float) -> float:
     """Евро → рубли по текущему курсу."""
-    return eur * EUR_RATE
+    return eur * generation.current().eur_rate
 
 
 def reload() -> None:
-    """Перечитать курсы USD и EUR из data/common.json."""
-    global USD_RATE, EUR_RATE
-    USD_RATE, EUR_RATE = _read_rates()
+    """Перечитать справочники data/ (курсы USD и EUR — из нового поколения данных)."""
+    generation.reload()
@@ -0,0 +1,176 @@
+"""
+Бинарный снапшот справочников data/ для быстрого старта.
+
+json5 разбирает ~330 КБ справочников несколько секунд, поэтому при деплое
+данные заранее собираются в один pickle-файл с хэшем исходников:
+
+    cd calc_service
+    python -m common.data_snapshot            # собрать (с проверкой)
+    python -m common.data_snapshot --check    # только проверить, без записи
+
+Сборка прогоняет все файлы через загрузчики materials / equipment и
+отказывается писать снапшот, если хоть один не проходит валидацию
+(в рантайме такие файлы молча превращаются в пустые каталоги).
+
+common.data_store при сборке поколения данных читает снапшот; если хэш исходников
+не совпадает (JSON поменяли после сборки) — работает по JSON, как раньше.
+Путь задаётся DATA_SNAPSHOT_PATH в config.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+
+class SnapshotError(ValueError):
+    """Справочники не прошли проверку — снапшот не собран."""
+
+    def __init__(self, errors: List[Tuple[str, str]]) -> None:
+        self.errors = errors
+        lines = "\n".join(f"  {relpath}: {message}" for relpath, message in errors)
+        super().__init__(f"Ошибки в справочниках data/:\n{lines}")
+
+
+def validate(files: Dict[str, Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """
+    Прогнать разобранные файлы через загрузчики каталогов.
+
+    Возвращает список (relpath, ошибка); пустой список — всё в порядке.
+    """
+    # Импорт здесь: загрузчики сами импортируют common.data_store
+    from equipment.loader import load_generic_catalog, load_laser_catalog
+    from materials.loader import load_catalog
+
+    errors: List[Tuple[str, str]] = []
+    for relpath, data in files.items():
+        folder, _, filename = relpath.rpartition("/")
+        try:
+            if folder == "materials":
+                load_catalog(filename, data=data)
+            elif folder == "equipment" and filename == "laser.json":
+                load_laser_catalog(data=data)
+            elif folder == "equipment":
+                load_generic_catalog(filename, data=data)
+        except Exception as exc:  # noqa: BLE001
+            errors.append((relpath, f"{type(exc).__name__}: {exc}"))
+    return errors
+
+
+def check_store(store: Any) -> List[Tuple[str, str]]:
+    """
+    Разобрать все файлы хранилища (common.data_store.DataStore) и проверить их загрузчиками.
+
+    Файлы разбираются через store.load(), поэтому после проверки они уже в хранилище.
+    Загрузчики работают внутри черновика поколения из этих же данных
+    (курсы валют — из проверяемого common.json).
+    """
+    from common.generation import draft_generation, pinned
+
+    files: Dict[str, Dict[str, Any]] = {}
+    errors: List[Tuple[str, str]] = []
+    for relpath in store.source_files():
+        try:
+            data = store.load(relpath)
+        except Exception as exc:  # noqa: BLE001
+            errors.append((relpath, f"ошибка разбора JSON: {exc}"))
+            continue
+        if not isinstance(data, dict):
+            errors.append((relpath, "на верхнем уровне ожидается объект"))
+            continue
+        files[relpath] = data
+    if "common.json" not in files:
+        if not errors:
+            errors.append(("common.json", "файл не найден"))
+        return errors
+    with pinned(draft_generation(store)):
+        errors.extend(validate(files))
+    return errors
+
+
+def build_snapshot(data_dir: Path, path: Path) -> Dict[str, Any]:
+    """
+    Собрать и записать снапшот data_dir в path.
+
+    Бросает SnapshotError (снапшот не пишется), если файлы не разбираются
+    или не проходят валидацию загрузчиков.
+    """
+    from common.data_store import DataStore
+
+    store = DataStore(data_dir)
+    source_hash = store.version
+    errors = check_store(store)
+    if errors:
+        raise SnapshotError(errors)
+    files = {relpath: store.load(relpath) for relpath in store.source_files()}
+    snapshot = {"format": SNAPSHOT_FORMAT, "source_hash": source_hash, "files": files}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def read_snapshot(path: Path, source_hash: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Прочитать снапшот, если он собран из тех же исходников (source_hash).
+
+    None — снапшота нет, он устарел или повреждён; тогда данные читаются из JSON.
+    """
+    if not path.is_file():
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Снапшот данных %s не читается (%s), используем JSON", path, exc)
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        logger.warning("Снапшот данных %s другого формата, используем JSON", path)
+        return None
+    if snapshot.get("source_hash") != source_hash:
+        logger.warning("Снапшот данных %s устарел (JSON изменены), используем JSON", path)
+        return None
+    return snapshot["files"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from common.data_store import DATA_DIR, DataStore
+    from config import DATA_SNAPSHOT_PATH
+
+    parser = argparse.ArgumentParser(description="Сборка бинарного снапшота справочников data/")
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--output", type=Path, default=Path(DATA_SNAPSHOT_PATH))
+    parser.add_argument("--check", action="store_true", help="только проверить файлы, не записывать снапшот")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        store = DataStore(args.data_dir)
+        errors = check_store(store)
+        if errors:
+            print(SnapshotError(errors), file=sys.stderr)
+            return 1
+        print(f"OK: {len(store.source_files())} файлов")
+        return 0
+
+    try:
+        snapshot = build_snapshot(args.data_dir, args.output)
+    except SnapshotError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"Снапшот {args.output}: {len(snapshot['files'])} файлов, хэш {snapshot['source_hash']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Общее хранилище разобранных справочников data/*.json.
+
+Каждый файл читается и разбирается json5 один раз на поколение данных
+(common.generation), дальше все модули (калькуляторы, загрузчики
+materials/equipment, common/*) получают один и тот же объект. Словари и списки
+отдаются как есть, без копирования и без заморозки (загрузчики проверяют
+isinstance(..., dict/list)): они общие для всех запросов поколения, поэтому
+вызывающий код их не изменяет — при слиянии с Default делается dict(default).
+
+Версия хранилища — хэш содержимого data/ (как в result_cache), считается лениво.
+
+Если собран бинарный снапшот (common/data_snapshot.py) и его хэш совпадает
+с текущими JSON, все файлы берутся из него без разбора json5.
+
+Для каждого файла запоминаются mtime и размер на момент чтения: changed_files()
+показывает, что поменялось на диске, fork() создаёт хранилище для следующего
+поколения, переиспользуя неизменившиеся файлы.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import json5
+
+from common.data_snapshot import read_snapshot
+from common.result_cache import compute_data_version
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+class DataStore:
+    """Потокобезопасный кэш разобранных json5-файлов из каталога data/."""
+
+    def __init__(self, data_dir: Path = DATA_DIR, snapshot_path: Optional[Path] = None) -> None:
+        self.data_dir = Path(data_dir)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+        self._files: Dict[str, Dict[str, Any]] = {}
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._snapshot_checked = False
+        self.from_snapshot = False
+        self.parses = 0
+
+    def path(self, relpath: str) -> Path:
+        return self.data_dir / relpath
+
+    def source_files(self) -> List[str]:
+        """Все JSON-файлы каталога data/ (относительные пути)."""
+        return [path.relative_to(self.data_dir).as_posix() for path in sorted(self.data_dir.rglob("*.json"))]
+
+    def load(self, relpath: str) -> Dict[str, Any]:
+        """
+        Разобранное содержимое data/{relpath}, например load("equipment/tools.json").
+
+        Файл разбирается при первом обращении; FileNotFoundError и ошибки
+        формата пробрасываются вызывающему (неудачный разбор не кэшируется).
+        """
+        data = self._files.get(relpath)
+        if data is not None:
+            return data
+        with self._lock:
+            if not self._snapshot_checked:
+                self._load_snapshot()
+            data = self._files.get(relpath)
+            if data is None:
+                stamp = self._stamp(relpath)
+                with open(self.path(relpath), "r", encoding="utf-8") as f:
+                    data = json5.load(f)
+                self._files[relpath] = data
+                self._stamps[relpath] = stamp
+                self.parses += 1
+        return data
+
+    def _stamp(self, relpath: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, размер) файла или None, если файла нет."""
+        try:
+            st = self.path(relpath).stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load_snapshot(self) -> None:
+        """Подхватить все файлы из снапшота, если он собран из текущих JSON (под self._lock)."""
+        self._snapshot_checked = True
+        if self.snapshot_path is None:
+            return
+        if self._version is None:
+            self._version = compute_data_version(self.data_dir)
+        files = read_snapshot(self.snapshot_path, self._version)
+        if files is not None:
+            self._files.update(files)
+            self._stamps.update({relpath: self._stamp(relpath) for relpath in files})
+            self.from_snapshot = True
+
+    @property
+    def version(self) -> str:
+        """Хэш содержимого data/, считается один раз на хранилище."""
+        if self._version is None:
+            self._version = compute_data_version(self.data_dir)
+        return self._version
+
+    def changed_files(self) -> List[str]:
+        """Прочитанные файлы, у которых на диске изменились mtime/размер, и новые JSON."""
+        with self._lock:
+            stamps = dict(self._stamps)
+        changed = [relpath for relpath, stamp in stamps.items() if self._stamp(relpath) != stamp]
+        if stamps:
+            changed.extend(relpath for relpath in self.source_files() if relpath not in stamps)
+        return sorted(changed)
+
+    def fork(self) -> "DataStore":
+        """
+        Новое хранилище того же каталога для следующего поколения.
+
+        Если снапшот актуален — данные берутся из него; иначе неизменившиеся
+        файлы переиспользуются, а изменённые будут разобраны заново при load().
+        """
+        store = DataStore(self.data_dir, snapshot_path=self.snapshot_path)
+        with store._lock:
+            store._load_snapshot()
+            if store.from_snapshot:
+                return store
+        with self._lock:
+            reusable = [
+                (relpath, data, self._stamps.get(relpath))
+                for relpath, data in self._files.items()
+                if self._stamps.get(relpath) is not None
+            ]
+        for relpath, data, stamp in reusable:
+            if store._stamp(relpath) == stamp:
+                store._files[relpath] = data
+                store._stamps[relpath] = stamp
+        return store
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self._version,
+                "parses": self.parses,
+                "from_snapshot": self.from_snapshot,
+                "files": sorted(self._files),
+            }
+
+
+def load_json(relpath: str) -> Dict[str, Any]:
+    """Разобранный файл data/{relpath} из текущего поколения данных (общий объект, не изменять)."""
+    # Импорт здесь: common.generation сам импортирует этот модуль
+    from common.generation import current
+
+    return current().store.load(relpath)
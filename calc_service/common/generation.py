@@ -0,0 +1,262 @@
+"""
+Поколения справочников (data generation) и горячая перезагрузка без простоя.
+
+Поколение — неизменяемый набор всего, что калькуляторы читают из data/:
+разобранные JSON (DataStore), наценки и курсы из common.json, календарь,
+каталоги материалов и оборудования (purchase_cost пересчитан по курсу этого же
+поколения). Все модули читают данные через current():
+
+    from common.generation import current
+    current().materials["hardsheet"]
+
+Модульные ссылки (materials.hardsheet, equipment.laser, ALL_MATERIALS,
+markups.MARGIN_MATERIAL, currencies.USD_RATE, ...) тоже смотрят в current().
+
+reload() собирает новое поколение в вызывающем потоке (старое продолжает
+обслуживать запросы) и атомарно подменяет ссылку. BaseCalculator.execute()
+закрепляет поколение на время расчёта (pinned()), поэтому запрос, начатый до
+подмены, досчитывается на старых данных целиком.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional
+
+from common.data_store import DATA_DIR, DataStore
+from config import DATA_SNAPSHOT_PATH
+
+
+@dataclass
+class DataGeneration:
+    """Один согласованный срез справочников. После сборки не изменяется."""
+
+    number: int
+    store: DataStore
+    common: Dict[str, Any]
+    markups: Dict[str, Any]
+    usd_rate: float
+    eur_rate: float
+    holidays: FrozenSet[str]
+    extra_work_days: FrozenSet[str]
+    materials: Dict[str, Any] = field(default_factory=dict)
+    equipment: Dict[str, Any] = field(default_factory=dict)
+    built_at: float = field(default_factory=time.time)
+    build_seconds: float = 0.0
+    # Производные данные, посчитанные по этому поколению (индексы, таблицы);
+    # RLock: фабрика может сама обращаться к memo()
+    _memo: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _memo_lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    @property
+    def version(self) -> str:
+        """Хэш содержимого data/, из которого собрано поколение."""
+        return self.store.version
+
+    def memo(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Значение, посчитанное один раз на поколение (factory вызывается при первом обращении)."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = factory()
+            return self._memo[key]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "generation": self.number,
+            "version": self.version,
+            "built_at": self.built_at,
+            "build_seconds": round(self.build_seconds, 3),
+            "from_snapshot": self.store.from_snapshot,
+            "materials": len(self.materials),
+            "equipment": len(self.equipment),
+        }
+
+
+_current: Optional[DataGeneration] = None
+_pinned: ContextVar[Optional[DataGeneration]] = ContextVar("data_generation", default=None)
+_init_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+
+def draft_generation(store: DataStore, number: int = 0) -> DataGeneration:
+    """
+    Поколение без каталогов: common.json, наценки, курсы и календарь из store.
+
+    Используется как основа build_generation() и для проверки файлов
+    (загрузчики каталогов пересчитывают валюту по курсу проверяемых данных).
+    """
+    from common import currencies, holidays, markups
+
+    common = store.load("common.json")
+    usd_rate, eur_rate = currencies.rates_from(common)
+    holiday_days, extra_work_days = holidays.calendar_from(common)
+    return DataGeneration(
+        number=number,
+        store=store,
+        common=common,
+        markups=markups.constants_from(common),
+        usd_rate=usd_rate,
+        eur_rate=eur_rate,
+        holidays=holiday_days,
+        extra_work_days=extra_work_days,
+    )
+
+
+def build_generation(
+    number: int,
+    previous: Optional[DataGeneration] = None,
+    strict: bool = False,
+    data_dir: Path = DATA_DIR,
+    snapshot_path: Optional[Path] = None,
+) -> DataGeneration:
+    """
+    Собрать поколение справочников.
+
+    previous — предыдущее поколение: неизменившиеся файлы не разбираются заново.
+    strict — сначала проверить все файлы (data_snapshot.check_store) и бросить
+    SnapshotError при ошибках. При старте невалидный файл оборудования даёт
+    пустой каталог, как раньше; при перезагрузке — отказ, старое поколение остаётся.
+    """
+    # Импорт здесь: модули ниже сами читают данные через current()
+    import equipment
+    import materials
+    from common.data_snapshot import SnapshotError, check_store
+
+    started = time.perf_counter()
+    if previous is not None:
+        store = previous.store.fork()
+    else:
+        store = DataStore(data_dir, snapshot_path=snapshot_path)
+    store.version  # хэш считаем до чтения файлов, чтобы он соответствовал данным
+
+    if strict:
+        errors = check_store(store)
+        if errors:
+            raise SnapshotError(errors)
+
+    generation = draft_generation(store, number)
+    # Каталоги строятся внутри нового поколения: load_json() и курсы валют
+    # в загрузчиках берутся из него, а не из текущего.
+    with pinned(generation):
+        generation.materials.update(materials.build_catalogs())
+        generation.equipment.update(equipment.build_catalogs())
+    generation.build_seconds = time.perf_counter() - started
+    return generation
+
+
+def current() -> DataGeneration:
+    """Поколение, закреплённое за текущим запросом, или последнее собранное."""
+    generation = _pinned.get()
+    if generation is not None:
+        return generation
+    generation = _current
+    if generation is None:
+        with _init_lock:
+            generation = _current
+            if generation is None:
+                generation = _install(build_generation(1, snapshot_path=Path(DATA_SNAPSHOT_PATH)))
+    return generation
+
+
+def _install(generation: DataGeneration) -> DataGeneration:
+    global _current
+    _current = generation
+    return generation
+
+
+@contextmanager
+def pinned(generation: Optional[DataGeneration] = None) -> Iterator[DataGeneration]:
+    """Закрепить поколение (по умолчанию текущее) за блоком кода и вложенными вызовами."""
+    if generation is None:
+        generation = current()
+    token = _pinned.set(generation)
+    try:
+        yield generation
+    finally:
+        _pinned.reset(token)
+
+
+def reload(strict: bool = True) -> DataGeneration:
+    """
+    Собрать новое поколение из data/ и атомарно сделать его текущим.
+
+    Параллельные reload() выполняются по очереди. Если данные не проходят
+    проверку (strict), бросается SnapshotError, текущее поколение не меняется.
+    """
+    from common import result_cache
+
+    with _reload_lock:
+        previous = _current or current()
+        generation = build_generation(previous.number + 1, previous=previous, strict=strict)
+        _install(generation)
+    # Закэшированные результаты посчитаны по предыдущему поколению
+    result_cache.clear()
+    return generation
+
+
+def changed_files() -> List[str]:
+    """Файлы data/, изменившиеся на диске после сборки текущего поколения."""
+    return current().store.changed_files()
+
+
+def reload_if_changed() -> Optional[DataGeneration]:
+    """reload(), если файлы в data/ изменились; иначе None (для фонового наблюдателя)."""
+    if not changed_files():
+        return None
+    return reload()
+
+
+class CatalogRef:
+    """
+    Ссылка на каталог текущего поколения по имени.
+
+    Позволяет сохранить привычный импорт `from materials import hardsheet`:
+    атрибуты (get, list_all, ...) каждый раз берутся у каталога из current().
+    """
+
+    __slots__ = ("_kind", "_name")
+
+    def __init__(self, kind: str, name: str) -> None:
+        self._kind = kind
+        self._name = name
+
+    def resolve(self) -> Any:
+        return getattr(current(), self._kind)[self._name]
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self) -> str:
+        return f"CatalogRef({self._kind}:{self._name})"
+
+
+class CatalogMap(Mapping):
+    """Словарь каталогов текущего поколения (ALL_MATERIALS / ALL_EQUIPMENT)."""
+
+    def __init__(self, kind: str) -> None:
+        self._kind = kind
+
+    def _catalogs(self) -> Dict[str, Any]:
+        return getattr(current(), self._kind)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._catalogs()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._catalogs())
+
+    def __len__(self) -> int:
+        return len(self._catalogs())
+
+    def __repr__(self) -> str:
+        return f"CatalogMap({self._kind})"
@@ -1,16 +1,91 @@
-from typing import Iterable, List, Sequence, Tuple
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
 
 
-def find_in_table(table: Sequence[Tuple[float, float]], value: float) -> float:
+class ThresholdTable:
+    """
+    Скомпилированная таблица порогов [(порог, значение, ...), ...].
+
+    Строки нормализуются во float и сортируются по порогу один раз при создании
+    (при загрузке справочников), поиск — бисекция по кортежу порогов.
+    После создания таблица не изменяется.
+    """
+
+    __slots__ = ("thresholds", "rows", "values")
+
+    def __init__(self, rows: Iterable[Sequence[float]]) -> None:
+        normalized = sorted(
+            (tuple(float(x) for x in row) for row in rows if len(row) > 0),
+            key=lambda row: row[0],
+        )
+        if not normalized:
+            raise ValueError("таблица порогов не должна быть пустой")
+        object.__setattr__(self, "rows", tuple(normalized))
+        object.__setattr__(self, "thresholds", tuple(row[0] for row in normalized))
+        # Второй столбец — самый частый случай find(), держим его отдельно
+        object.__setattr__(self, "values", tuple(row[1] if len(row) > 1 else row[0] for row in normalized))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ThresholdTable неизменяема")
+
+    def __len__(self) -> int:
+        return len(self.thresholds)
+
+    def __repr__(self) -> str:
+        return f"ThresholdTable({list(self.rows)!r})"
+
+    def position(self, value: float) -> int:
+        """Индекс первого порога ≥ value; len(table), если такого порога нет."""
+        return bisect_left(self.thresholds, value)
+
+    def find(self, value: float, col: int = 1) -> float:
+        """
+        Значение столбца col для первого порога ≥ value,
+        либо из последней строки, если подходящего порога нет.
+        Если в строке нет столбца col — возвращается сам порог.
+        """
+        i = bisect_left(self.thresholds, value)
+        if i == len(self.thresholds):
+            i -= 1
+        if col == 1:
+            return self.values[i]
+        row = self.rows[i]
+        return row[col] if col < len(row) else row[0]
+
+    def find_floor(self, value: float, default: Optional[float] = None) -> Optional[float]:
+        """Значение для наибольшего порога ≤ value; default, если все пороги больше value."""
+        i = bisect_right(self.thresholds, value)
+        if i == 0:
+            return default
+        return self.values[i - 1]
+
+
+def cached_table(key: str, rows: Iterable[Sequence[float]]) -> ThresholdTable:
+    """
+    ThresholdTable для таблицы из справочника data/, собранная один раз на поколение данных.
+
+    key должен однозначно определять rows в пределах поколения
+    (например, "tools.ManualRoll.rollPerHour"). rows читаются только при первом
+    обращении, поэтому можно передать генератор.
+    """
+    # Импорт здесь: common.generation импортирует загрузчики, которые используют этот модуль
+    from common.generation import current
+
+    return current().memo(f"table:{key}", lambda: ThresholdTable(rows))
+
+
+def find_in_table(table: Union[ThresholdTable, Sequence[Tuple[float, float]]], value: float) -> float:
     """
     Найти значение в таблице порогов.
 
-    :param table: последовательность кортежей (threshold, result_value),
+    :param table: ThresholdTable или последовательность кортежей (threshold, result_value),
                   отсортированная по threshold по возрастанию.
     :param value: искомое значение (например, тираж).
     :return: result_value для первого threshold >= value,
              либо последнее result_value, если подходящего порога нет.
     """
+    if isinstance(table, ThresholdTable):
+        return table.find(value)
     if not table:
         raise ValueError("таблица порогов не должна быть пустой")
 
@@ -1,29 +1,45 @@
 """
 Праздничные и рабочие дни из data/common.json.
+Календарь берётся из текущего поколения данных (common.generation).
+
+Рабочие дни предрасчитаны в WorkingCalendar: битовая карта и префиксные суммы
+на окне в несколько лет вокруг текущей даты, поэтому «дата через N рабочих
+дней/часов» и «рабочих дней между датами» считаются за O(1). Календарь строится
+один раз на поколение данных и год (окно сдвигается с годом); даты вне окна
+считаются перебором по дням.
 """
 
 from __future__ import annotations
 
+import math
+from array import array
 from datetime import date, timedelta
-from pathlib import Path
-from typing import Any, Dict, Set
-
-import json5
+from typing import AbstractSet, Any, Dict, FrozenSet, Optional, Tuple
 
-_DATA_PATH = Path(__file__).parent.parent / "data" / "common.json"
+from common import generation
 
+# Окно календаря: столько лет до текущего года и после него
+WINDOW_YEARS_BEFORE = 1
+WINDOW_YEARS_AFTER = 3
+# Пределы запросов к календарю через API (/api/v1/calendar/*): сдвиг в рабочих днях и
+# удалённость дат от сегодня, дней. Вне окна календарь считает перебором по дням.
+MAX_SHIFT_DAYS = 3650
+MAX_DISTANCE_DAYS = 3660
 
-def _load_calendar() -> Dict[str, Any]:
-    with open(_DATA_PATH, "r", encoding="utf-8") as f:
-        data = json5.load(f)
-    return data.get("calendar", {}) or {}
 
+def calendar_from(data: Dict[str, Any]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(праздники, рабочие выходные) из разобранного common.json; даты в формате "день.месяц", например "3.1"."""
+    calendar = data.get("calendar", {}) or {}
+    return frozenset(calendar.get("workingDays", [])), frozenset(calendar.get("weekEnd", []))
 
-_calendar_data: Dict[str, Any] = _load_calendar()
 
-# В JSON даты в формате "день.месяц", например "3.1"
-HOLIDAYS: Set[str] = set(_calendar_data.get("workingDays", []))
-EXTRA_WORK_DAYS: Set[str] = set(_calendar_data.get("weekEnd", []))
+def __getattr__(name: str) -> Any:
+    # HOLIDAYS / EXTRA_WORK_DAYS — из текущего поколения данных
+    if name == "HOLIDAYS":
+        return generation.current().holidays
+    if name == "EXTRA_WORK_DAYS":
+        return generation.current().extra_work_days
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _fmt(d: date) -> str:
@@ -31,6 +47,146 @@ def _fmt(d: date) -> str:
     return f"{d.day}.{d.month}"
 
 
+def _is_working(d: date, holidays: AbstractSet[str], extra_work_days: AbstractSet[str]) -> bool:
+    """Рабочий ли день d: рабочий выходной — рабочий, праздник, суббота и воскресенье — нет."""
+    key = _fmt(d)
+    if key in extra_work_days:
+        return True
+    if key in holidays:
+        return False
+    # 5 = суббота, 6 = воскресенье
+    return d.weekday() < 5
+
+
+class WorkingCalendar:
+    """
+    Рабочие дни на окне [first, last]: битовая карта, префиксные суммы и
+    номера рабочих дней.
+
+    _prefix[i] — число рабочих дней в [first, first + i), _working[k] — смещение
+    k-го рабочего дня окна от first. Запросы, выходящие за окно, считаются
+    перебором по дням по тем же правилам.
+    """
+
+    __slots__ = ("first", "last", "holidays", "extra_work_days", "_bitmap", "_prefix", "_working")
+
+    def __init__(
+        self,
+        holidays: AbstractSet[str],
+        extra_work_days: AbstractSet[str],
+        first: date,
+        last: date,
+    ) -> None:
+        if last < first:
+            raise ValueError("Конец окна календаря раньше начала")
+        self.first = first
+        self.last = last
+        self.holidays = frozenset(holidays)
+        self.extra_work_days = frozenset(extra_work_days)
+        size = (last - first).days + 1
+        self._bitmap = bytearray(size)
+        self._prefix = array("l", [0]) * (size + 1)
+        self._working = array("l")
+        count = 0
+        day = first
+        for offset in range(size):
+            if _is_working(day, self.holidays, self.extra_work_days):
+                self._bitmap[offset] = 1
+                self._working.append(offset)
+                count += 1
+            self._prefix[offset + 1] = count
+            day += timedelta(days=1)
+
+    @classmethod
+    def around(
+        cls,
+        today: date,
+        holidays: AbstractSet[str],
+        extra_work_days: AbstractSet[str],
+    ) -> WorkingCalendar:
+        """Календарь на окно с 1 января (год today − WINDOW_YEARS_BEFORE) по 31 декабря (год today + WINDOW_YEARS_AFTER)."""
+        return cls(
+            holidays,
+            extra_work_days,
+            date(today.year - WINDOW_YEARS_BEFORE, 1, 1),
+            date(today.year + WINDOW_YEARS_AFTER, 12, 31),
+        )
+
+    def _offset(self, d: date) -> Optional[int]:
+        offset = (d - self.first).days
+        return offset if 0 <= offset < len(self._bitmap) else None
+
+    def is_working_day(self, d: date) -> bool:
+        offset = self._offset(d)
+        if offset is None:
+            return _is_working(d, self.holidays, self.extra_work_days)
+        return bool(self._bitmap[offset])
+
+    def add_working_days(self, start: date, days: int) -> date:
+        """
+        Дата, на которую приходится days-й рабочий день после start (до start при days < 0);
+        0 → start. Сам start не считается.
+        """
+        if days == 0:
+            return start
+        offset = self._offset(start)
+        if offset is not None:
+            # Рабочих дней до start включительно; индекс искомого — со сдвигом на days
+            index = self._prefix[offset + 1] - 1 + days if days > 0 else self._prefix[offset] + days
+            if 0 <= index < len(self._working):
+                return self.first + timedelta(days=self._working[index])
+        return self._step_working_days(start, days)
+
+    def _step_working_days(self, start: date, days: int) -> date:
+        step = timedelta(days=1 if days > 0 else -1)
+        remaining = abs(days)
+        current = start
+        while remaining > 0:
+            current += step
+            if self.is_working_day(current):
+                remaining -= 1
+        return current
+
+    def next_working_day(self, d: date) -> date:
+        """Следующий рабочий день после d."""
+        return self.add_working_days(d, 1)
+
+    def working_days_between(self, start: date, end: date) -> int:
+        """Число рабочих дней в (start, end]; при end < start — со знаком минус."""
+        if end < start:
+            return -self.working_days_between(end, start)
+        start_offset, end_offset = self._offset(start), self._offset(end)
+        if start_offset is not None and end_offset is not None:
+            return self._prefix[end_offset + 1] - self._prefix[start_offset + 1]
+        count = 0
+        current = start
+        while current < end:
+            current += timedelta(days=1)
+            count += self.is_working_day(current)
+        return count
+
+    def add_working_hours(self, start: date, hours: float, hours_per_day: float = 8.0) -> date:
+        """
+        Дата готовности через hours рабочих часов: каждый рабочий день после start
+        даёт hours_per_day часов, неполный день считается целым; hours <= 0 → start.
+        """
+        if hours <= 0:
+            return start
+        if hours_per_day <= 0:
+            raise ValueError("Длительность рабочего дня должна быть положительной")
+        return self.add_working_days(start, math.ceil(hours / hours_per_day))
+
+
+def calendar() -> WorkingCalendar:
+    """Календарь рабочих дней текущего поколения данных (окно — вокруг текущего года)."""
+    current = generation.current()
+    year = date.today().year
+    return current.memo(
+        f"working_calendar:{year}",
+        lambda: WorkingCalendar.around(date(year, 1, 1), current.holidays, current.extra_work_days),
+    )
+
+
 def is_holiday(d: date) -> bool:
     """
     True если:
@@ -38,28 +194,27 @@ def is_holiday(d: date) -> bool:
       - суббота/воскресенье,
     False если дата в EXTRA_WORK_DAYS (выходной стал рабочим).
     """
-    key = _fmt(d)
-    if key in EXTRA_WORK_DAYS:
-        return False
-    if key in HOLIDAYS:
-        return True
-    # 5 = суббота, 6 = воскресенье
-    if d.weekday() >= 5:
-        return True
-    return False
+    return not calendar().is_working_day(d)
 
 
 def is_working_day(d: date) -> bool:
     """Обратная функция к is_holiday."""
-    return not is_holiday(d)
+    return calendar().is_working_day(d)
 
 
 def next_working_day(d: date) -> date:
     """Следующий рабочий день после d."""
-    current = d + timedelta(days=1)
-    while not is_working_day(current):
-        current += timedelta(days=1)
-    return current
+    return calendar().next_working_day(d)
+
+
+def add_working_days(start: date, days: int) -> date:
+    """Дата через days рабочих дней после start (start не считается); см. WorkingCalendar.add_working_days."""
+    return calendar().add_working_days(start, days)
+
+
+def working_days_between(start: date, end: date) -> int:
+    """Число рабочих дней в (start, end]."""
+    return calendar().working_days_between(start, end)
 
 
 def add_working_hours(start: date, hours: float, hours_per_day: float = 8.0) -> date:
@@ -68,27 +223,12 @@ def add_working_hours(start: date, hours: float, hours_per_day: float = 8.0) ->
 
     Логика:
       - 0 или отрицательное количество часов → вернуть start;
-      - каждое посещение рабочего дня вычитает hours_per_day из остатка;
+      - каждый рабочий день вычитает hours_per_day из остатка;
       - считаем только полные рабочие дни, начиная со следующего календарного дня.
     """
-    if hours <= 0:
-        return start
-
-    remaining = hours
-    current = start
-
-    while remaining > 0:
-        current += timedelta(days=1)
-        if is_working_day(current):
-            remaining -= hours_per_day
-
-    return current
+    return calendar().add_working_hours(start, hours, hours_per_day)
 
 
 def reload() -> None:
-    """Перечитать раздел calendar из common.json."""
-    global _calendar_data, HOLIDAYS, EXTRA_WORK_DAYS
-    _calendar_data = _load_calendar()
-    HOLIDAYS = set(_calendar_data.get("workingDays", []))
-    EXTRA_WORK_DAYS = set(_calendar_data.get("weekEnd", []))
-
+    """Перечитать справочники data/ (календарь — из нового поколения данных)."""
+    generation.reload()
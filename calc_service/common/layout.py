@@ -7,8 +7,11 @@
 
 from __future__ import annotations
 
+import functools
 import math
-from typing import Dict, Sequence
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+from common.trace import traced
 
 
 def _normalize_margins(margins: Sequence[float] | None) -> tuple[float, float, float, float]:
@@ -53,6 +56,7 @@ def _pack_on_sheet(
     return num, cols, rows
 
 
+@traced()
 def layout_on_sheet(
     item_size: Sequence[float],
     sheet_size: Sequence[float],
@@ -96,6 +100,7 @@ def layout_on_sheet(
     return {"num": num1, "cols": cols1, "rows": rows1}
 
 
+@traced()
 def layout_on_roll(
     quantity: int,
     item_size: Sequence[float],
@@ -159,6 +164,7 @@ def layout_on_roll(
     return {"num": int(quantity), "length": float(best_length)}
 
 
+@traced()
 def layout_on_roll_with_orientation(
     quantity: int,
     item_size: Sequence[float],
@@ -215,3 +221,238 @@ def layout_on_roll_with_orientation(
         return float(l1)
     return float(min(l1, l2))
 
+
+# ══════════════════════════════════════════════════════════════════════
+#  ПАКЕТНАЯ РАСКЛАДКА: все сочетания изделий и форматов за один вызов
+# ══════════════════════════════════════════════════════════════════════
+#
+# Калькуляторы подбирают формат материала перебором: раскладка изделия на каждом
+# листе/рулоне из material.sizes. layout_on_sheet_batch() и layout_on_roll_batch()
+# считают все сочетания (изделие × формат) сразу и с теми же результатами, что
+# layout_on_sheet() / layout_on_roll_with_orientation(). Результаты неизменяемы
+# (кортежи) и мемоизируются по входным размерам — одни и те же пары изделие/формат
+# повторяются от запроса к запросу. Большие пакеты (от NUMPY_MIN_CELLS сочетаний)
+# считаются через NumPy, если он установлен; на малых пакетах накладные расходы
+# NumPy больше выигрыша, там и без NumPy — чистый Python.
+
+# С какого числа сочетаний (изделий × форматов) считать через NumPy
+NUMPY_MIN_CELLS = 128
+# Размер кэша пакетных раскладок (число различных наборов входных размеров)
+LAYOUT_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy() -> Any:
+    """Модуль numpy или None. Импорт при первом большом пакете, а не при старте сервиса."""
+    try:
+        import numpy
+    except ImportError:  # NumPy — необязательная зависимость
+        return None
+    return numpy
+
+
+class SheetLayouts(NamedTuple):
+    """Раскладки на листах: num/cols/rows[i][j] — изделие i на листе j (как layout_on_sheet)."""
+
+    num: Tuple[Tuple[int, ...], ...]
+    cols: Tuple[Tuple[int, ...], ...]
+    rows: Tuple[Tuple[int, ...], ...]
+
+
+def _size_tuple(sizes: Iterable[Sequence[float]], what: str) -> Tuple[Tuple[float, float], ...]:
+    result = []
+    for size in sizes:
+        if len(size) < 2:
+            raise ValueError(f"{what} должны быть списками [width, height]")
+        result.append((float(size[0]), float(size[1])))
+    return tuple(result)
+
+
+@traced()
+def layout_on_sheet_batch(
+    item_sizes: Iterable[Sequence[float]],
+    sheet_sizes: Iterable[Sequence[float]],
+    margins: Sequence[float] | None = None,
+    gap: float = 0.0,
+) -> SheetLayouts:
+    """
+    Раскладка каждого изделия из item_sizes на каждом листе из sheet_sizes.
+
+    margins и gap — общие для всех сочетаний (как у одного вызова layout_on_sheet).
+    Лишние координаты размеров (толщина) не учитываются.
+    """
+    return _sheet_batch(
+        _size_tuple(item_sizes, "item_sizes"),
+        _size_tuple(sheet_sizes, "sheet_sizes"),
+        _normalize_margins(margins),
+        float(gap),
+    )
+
+
+@traced()
+def layout_on_roll_batch(
+    quantity: int,
+    item_sizes: Iterable[Sequence[float]],
+    roll_widths: Iterable[float],
+    gap: float = 0.0,
+    along_long: int = 0,
+) -> Tuple[Tuple[float, ...], ...]:
+    """
+    Длина отреза (мм) для quantity изделий: length[i][j] — изделие i на рулоне ширины j.
+
+    along_long — как в layout_on_roll_with_orientation(): -1 — короткой стороной по
+    ширине, 1 — длинной, 0 — лучший из двух (= layout_on_roll()["length"]).
+    0.0 — изделие не помещается.
+    """
+    if along_long not in (-1, 0, 1):
+        raise ValueError("along_long должен быть -1, 0 или 1")
+    return _roll_batch(
+        int(quantity),
+        _size_tuple(item_sizes, "item_sizes"),
+        tuple(float(w) for w in roll_widths),
+        float(gap),
+        along_long,
+    )
+
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _sheet_batch(
+    items: Tuple[Tuple[float, float], ...],
+    sheets: Tuple[Tuple[float, float], ...],
+    margins: Tuple[float, float, float, float],
+    gap: float,
+) -> SheetLayouts:
+    if len(items) * len(sheets) >= NUMPY_MIN_CELLS and _numpy() is not None:
+        return _sheet_batch_numpy(items, sheets, margins, gap)
+    top, right, bottom, left = margins
+    num: List[Tuple[int, ...]] = []
+    cols: List[Tuple[int, ...]] = []
+    rows: List[Tuple[int, ...]] = []
+    for item_w, item_h in items:
+        row_num, row_cols, row_rows = [], [], []
+        for sheet_w, sheet_h in sheets:
+            area_w = sheet_w - left - right
+            area_h = sheet_h - top - bottom
+            if area_w <= 0 or area_h <= 0:
+                best = (0, 0, 0)
+            else:
+                best = _pack_on_sheet(area_w, area_h, item_w, item_h, gap)
+                rotated = _pack_on_sheet(area_w, area_h, item_h, item_w, gap)
+                if rotated[0] > best[0]:
+                    best = rotated
+            row_num.append(best[0])
+            row_cols.append(best[1])
+            row_rows.append(best[2])
+        num.append(tuple(row_num))
+        cols.append(tuple(row_cols))
+        rows.append(tuple(row_rows))
+    return SheetLayouts(tuple(num), tuple(cols), tuple(rows))
+
+
+def _sheet_batch_numpy(
+    items: Tuple[Tuple[float, float], ...],
+    sheets: Tuple[Tuple[float, float], ...],
+    margins: Tuple[float, float, float, float],
+    gap: float,
+) -> SheetLayouts:
+    np = _numpy()
+    top, right, bottom, left = margins
+    item = np.asarray(items, dtype=np.float64).reshape(-1, 2)
+    sheet = np.asarray(sheets, dtype=np.float64).reshape(-1, 2)
+    area_w = (sheet[:, 0] - left - right)[np.newaxis, :]
+    area_h = (sheet[:, 1] - top - bottom)[np.newaxis, :]
+    area_ok = (area_w > 0) & (area_h > 0)
+
+    def pack(width: Any, height: Any):
+        step_w = (width + gap)[:, np.newaxis]
+        step_h = (height + gap)[:, np.newaxis]
+        ok = area_ok & (step_w > 0) & (step_h > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = np.where(ok, np.floor_divide(area_w + gap, np.where(step_w > 0, step_w, 1.0)), 0.0)
+            r = np.where(ok, np.floor_divide(area_h + gap, np.where(step_h > 0, step_h, 1.0)), 0.0)
+        ok &= (c > 0) & (r > 0)
+        c = np.where(ok, c, 0).astype(np.int64)
+        r = np.where(ok, r, 0).astype(np.int64)
+        return c * r, c, r
+
+    num1, cols1, rows1 = pack(item[:, 0], item[:, 1])
+    num2, cols2, rows2 = pack(item[:, 1], item[:, 0])
+    rotate = num2 > num1
+    return SheetLayouts(
+        tuple(map(tuple, np.where(rotate, num2, num1).tolist())),
+        tuple(map(tuple, np.where(rotate, cols2, cols1).tolist())),
+        tuple(map(tuple, np.where(rotate, rows2, rows1).tolist())),
+    )
+
+
+def _roll_length(quantity: int, width_item: float, height_item: float, roll_width: float, gap: float) -> float | None:
+    """Длина отреза при заданной ориентации или None, если изделие не помещается (как _length выше)."""
+    if width_item > roll_width:
+        return None
+    step = width_item + gap
+    if step <= 0:
+        return None
+    cols = int((roll_width + gap) // step)
+    if cols <= 0:
+        return None
+    rows = int(math.ceil(quantity / cols))
+    return rows * height_item + max(0, rows - 1) * gap
+
+
+@functools.lru_cache(maxsize=LAYOUT_CACHE_SIZE)
+def _roll_batch(
+    quantity: int,
+    items: Tuple[Tuple[float, float], ...],
+    roll_widths: Tuple[float, ...],
+    gap: float,
+    along_long: int,
+) -> Tuple[Tuple[float, ...], ...]:
+    if len(items) * len(roll_widths) >= NUMPY_MIN_CELLS and _numpy() is not None:
+        return _roll_batch_numpy(quantity, items, roll_widths, gap, along_long)
+    lengths: List[Tuple[float, ...]] = []
+    for item_w, item_h in items:
+        min_s, max_s = min(item_w, item_h), max(item_w, item_h)
+        variants = {-1: ((min_s, max_s),), 1: ((max_s, min_s),), 0: ((min_s, max_s), (max_s, min_s))}[along_long]
+        row: List[float] = []
+        for roll_width in roll_widths:
+            best: float | None = None
+            if quantity > 0 and roll_width > 0:
+                for width_item, height_item in variants:
+                    length = _roll_length(quantity, width_item, height_item, roll_width, gap)
+                    if length is not None and (best is None or length < best):
+                        best = length
+            row.append(float(best) if best is not None else 0.0)
+        lengths.append(tuple(row))
+    return tuple(lengths)
+
+
+def _roll_batch_numpy(
+    quantity: int,
+    items: Tuple[Tuple[float, float], ...],
+    roll_widths: Tuple[float, ...],
+    gap: float,
+    along_long: int,
+) -> Tuple[Tuple[float, ...], ...]:
+    np = _numpy()
+    item = np.asarray(items, dtype=np.float64).reshape(-1, 2)
+    roll = np.asarray(roll_widths, dtype=np.float64)[np.newaxis, :]
+    min_s = item.min(axis=1)[:, np.newaxis]
+    max_s = item.max(axis=1)[:, np.newaxis]
+
+    def length(width: Any, height: Any) -> Any:
+        step = width + gap
+        ok = (width <= roll) & (step > 0) & (roll > 0) & (quantity > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cols = np.where(ok, np.floor_divide(roll + gap, np.where(step > 0, step, 1.0)), 0.0)
+            ok &= cols > 0
+            rows = np.ceil(quantity / np.where(ok, cols, 1.0))
+        return np.where(ok, rows * height + np.maximum(rows - 1, 0) * gap, np.inf)
+
+    if along_long == -1:
+        best = length(min_s, max_s)
+    elif along_long == 1:
+        best = length(max_s, min_s)
+    else:
+        best = np.minimum(length(min_s, max_s), length(max_s, min_s))
+    best = np.where(np.isinf(best), 0.0, best)
+    return tuple(map(tuple, best.tolist()))
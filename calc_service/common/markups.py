@@ -1,38 +1,44 @@
 """
 Наценки и общие параметры из data/common.json.
 См. docs/common-json-reference.md.
+
+Значения берутся из текущего поколения данных (common.generation), поэтому
+обращаться к константам нужно через модуль: markups.MARGIN_MATERIAL
+(`from common.markups import MARGIN_MATERIAL` зафиксирует значение на момент импорта).
 """
 
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
-import json5
-
-_DATA_PATH = Path(__file__).parent.parent / "data" / "common.json"
-
-
-def _load_data() -> Dict[str, Any]:
-    with open(_DATA_PATH, "r", encoding="utf-8") as f:
-        return json5.load(f)
+from common import generation
 
 
-_data: Dict[str, Any] = _load_data()
+def constants_from(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Базовые константы (COST_OPERATOR, MARGIN_*, BASE_TIME_READY*) из разобранного common.json."""
+    base_time_ready: List[float] = list(data.get("baseTimeReady", [24, 8, 1]))
+    return {
+        "COST_OPERATOR": float(data.get("costOperator", 1400)),
+        "MARGIN_MATERIAL": float(data.get("marginMaterial", 0.6)),
+        "MARGIN_OPERATION": float(data.get("marginOperation", 0.55)),
+        "MARGIN_MIN": float(data.get("marginMin", 0.25)),
+        "BASE_TIME_READY": base_time_ready,
+        "BASE_TIME_READY_PRINT_SHEET": list(data.get("baseTimeReadyPrintSheet", base_time_ready)),
+        "BASE_TIME_READY_PRINT_OFFSET_PROMO": list(
+            data.get("baseTimeReadyPrintOffsetPromo", base_time_ready)
+        ),
+    }
 
-# Базовые константы
-COST_OPERATOR: float = float(_data.get("costOperator", 1400))
-MARGIN_MATERIAL: float = float(_data.get("marginMaterial", 0.6))
-MARGIN_OPERATION: float = float(_data.get("marginOperation", 0.55))
-MARGIN_MIN: float = float(_data.get("marginMin", 0.25))
 
-BASE_TIME_READY: List[float] = list(_data.get("baseTimeReady", [24, 8, 1]))
-BASE_TIME_READY_PRINT_SHEET: List[float] = list(
-    _data.get("baseTimeReadyPrintSheet", BASE_TIME_READY)
-)
-BASE_TIME_READY_PRINT_OFFSET_PROMO: List[float] = list(
-    _data.get("baseTimeReadyPrintOffsetPromo", BASE_TIME_READY)
-)
+def __getattr__(name: str) -> Any:
+    # COST_OPERATOR, MARGIN_MATERIAL, ... — из текущего поколения данных.
+    # Служебные имена (__path__ при `from common.markups import ...`) не должны собирать поколение.
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    constants = generation.current().markups
+    if name in constants:
+        return constants[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_margin(key: str) -> float:
@@ -41,7 +47,7 @@ def get_margin(key: str) -> float:
     Если ключа нет — вернуть 0.0.
     """
     try:
-        return float(_data.get(key, 0.0))
+        return float(generation.current().common.get(key, 0.0))
     except (TypeError, ValueError):
         return 0.0
 
@@ -51,39 +57,22 @@ def get_time_ready(key: str) -> List[float]:
     Вернуть массив сроков по ключу (например, \"baseTimeReadyPrintSheet\").
     Если ключ отсутствует — вернуть BASE_TIME_READY.
     """
-    value = _data.get(key)
+    current = generation.current()
+    value = current.common.get(key)
     if isinstance(value, Iterable):
         return list(value)
-    return list(BASE_TIME_READY)
+    return list(current.markups["BASE_TIME_READY"])
 
 
 def get_all_margins() -> Dict[str, Any]:
     """
     Вернуть словарь всех полей, начинающихся с \"margin\" (для отладки).
     """
-    return {k: v for k, v in _data.items() if k.startswith("margin")}
+    return {k: v for k, v in generation.current().common.items() if k.startswith("margin")}
 
 
 def reload() -> None:
     """
-    Перечитать common.json и обновить все константы.
+    Перечитать справочники data/ (новое поколение данных, см. common.generation.reload).
     """
-    global _data
-    global COST_OPERATOR, MARGIN_MATERIAL, MARGIN_OPERATION, MARGIN_MIN
-    global BASE_TIME_READY, BASE_TIME_READY_PRINT_SHEET, BASE_TIME_READY_PRINT_OFFSET_PROMO
-
-    _data = _load_data()
-
-    COST_OPERATOR = float(_data.get("costOperator", 1400))
-    MARGIN_MATERIAL = float(_data.get("marginMaterial", 0.6))
-    MARGIN_OPERATION = float(_data.get("marginOperation", 0.55))
-    MARGIN_MIN = float(_data.get("marginMin", 0.25))
-
-    BASE_TIME_READY = list(_data.get("baseTimeReady", [24, 8, 1]))
-    BASE_TIME_READY_PRINT_SHEET = list(
-        _data.get("baseTimeReadyPrintSheet", BASE_TIME_READY)
-    )
-    BASE_TIME_READY_PRINT_OFFSET_PROMO = list(
-        _data.get("baseTimeReadyPrintOffsetPromo", BASE_TIME_READY)
-    )
-
+    generation.reload()
@@ -0,0 +1,198 @@
+"""
+Метрики процесса в текстовом формате Prometheus (GET /metrics).
+
+Минимальная реализация счётчиков и гистограмм без внешних зависимостей:
+значения хранятся в памяти процесса и отдаются в формате exposition 0.0.4.
+Под server.py у каждого воркера свои метрики (ответ /metrics — от того
+воркера, который принял запрос); для сводки по воркерам Prometheus
+должен опрашивать их по отдельности или суммировать рядом с сервисом.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Границы корзин гистограмм длительности, сек.: от 0.1 мс до 5 с
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Монотонный счётчик с метками."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, labels)} {_number(value)}" for labels, value in items]
+
+
+class Gauge(Counter):
+    """Текущее значение с метками (может уменьшаться)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = float(value)
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Гистограмма с кумулятивными корзинами (le), суммой и числом наблюдений."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # метки → [счётчики по корзинам (последняя — +Inf), сумма]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._series.items())
+        lines: List[str] = []
+        for labels, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Набор метрик процесса."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Histogram] = {}
+
+    def register(self, metric: Counter | Histogram) -> Counter | Histogram:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name!r} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, label_names))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "calc_http_request_seconds", "Время обработки HTTP-запроса", ("method", "route", "status")
+)
+CALCULATION_SECONDS = REGISTRY.histogram(
+    "calc_calculation_seconds",
+    "Время расчёта BaseCalculator.execute() по калькуляторам (cache: hit/miss/coalesced/bypass)",
+    ("slug", "cache"),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "calc_stage_seconds", "Время этапа расчёта за запрос (по трассируемым запросам)", ("stage",)
+)
+STAGE_CALLS = REGISTRY.counter(
+    "calc_stage_calls_total", "Число вызовов этапа расчёта (по трассируемым запросам)", ("stage",)
+)
+TRACED_REQUESTS = REGISTRY.counter(
+    "calc_traced_requests_total", "Трассированные расчёты: явные (?trace=1) и выборочные", ("source",)
+)
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "calc_admission_in_flight", "Запросы, которые сейчас обрабатываются (заняли слот)", ("lane",)
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "calc_admission_queue_depth", "Запросы в очереди на свободный слот", ("lane",)
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "calc_admission_wait_seconds", "Время ожидания слота в очереди", ("lane",)
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "calc_admission_rejected_total",
+    "Отклонённые запросы (reason: rate_limited — 429, queue_full / queue_timeout — 503)",
+    ("lane", "reason"),
+)
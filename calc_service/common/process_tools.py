@@ -11,51 +11,36 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence
 
-import json5
-
-from common.helpers import find_in_table
+from common.data_store import load_json
+from common.generation import current
+from common.helpers import ThresholdTable, cached_table
 from common.layout import layout_on_roll, layout_on_sheet
-from common.markups import (
-    BASE_TIME_READY,
-    COST_OPERATOR,
-    MARGIN_MATERIAL,
-    MARGIN_OPERATION,
-    get_margin,
-)
+from common import markups
+from common.markups import get_margin
+from common.trace import traced
 
 # Ленивый импорт equipment и materials — чтобы не было циклических импортов
 # при загрузке модуля. Реальные каталоги берутся через _tools() / _get_material().
 
-_TOOLS_JSON = Path(__file__).parent.parent / "data" / "equipment" / "tools.json"
-_MATERIALS_DIR = Path(__file__).parent.parent / "data" / "materials"
-
-# ── Кэш сырых данных (загружается один раз) ──────────────────────────
-
-_raw_tools_cache: Dict[str, Any] | None = None
-_raw_materials_cache: Dict[str, Dict[str, Dict[str, Any]]] | None = None
+# ── Сырые данные (common.data_store, разбираются один раз на поколение данных) ──
 
 
 def _raw_tools() -> Dict[str, Any]:
-    global _raw_tools_cache
-    if _raw_tools_cache is None:
-        with open(_TOOLS_JSON, "r", encoding="utf-8") as f:
-            _raw_tools_cache = json5.load(f)
-    return _raw_tools_cache
+    return load_json("equipment/tools.json")
 
 
 def _raw_materials() -> Dict[str, Dict[str, Dict[str, Any]]]:
     """Все материалы из JSON с развёрнутым Default, индекс: {category: {code: {...}}}."""
-    global _raw_materials_cache
-    if _raw_materials_cache is not None:
-        return _raw_materials_cache
+    return current().memo("process_tools.raw_materials", _build_raw_materials)
+
+
+def _build_raw_materials() -> Dict[str, Dict[str, Dict[str, Any]]]:
     result: Dict[str, Dict[str, Dict[str, Any]]] = {}
-    for path in sorted(_MATERIALS_DIR.glob("*.json")):
+    for path in sorted(current().store.path("materials").glob("*.json")):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json5.load(f)
+            data = load_json(f"materials/{path.name}")
             category = path.stem
             flat: Dict[str, Dict[str, Any]] = {}
             for group_id, group_data in data.items():
@@ -72,7 +57,6 @@ def _raw_materials() -> Dict[str, Dict[str, Dict[str, Any]]]:
             result[category] = flat
         except Exception:
             continue
-    _raw_materials_cache = result
     return result
 
 
@@ -154,6 +138,7 @@ class ProcessResult:
 #  ПОСТПЕЧАТНАЯ ОБРАБОТКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_punching(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
     """
     Пробивка отверстий в листовой продукции.
@@ -170,11 +155,12 @@ def calc_punching(n: int, material_id: str = "", mode: int = 1) -> ProcessResult
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_rounding(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
     """
     Скругление углов листовой продукции.
@@ -193,11 +179,12 @@ def calc_rounding(n: int, material_id: str = "", mode: int = 1) -> ProcessResult
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_crease(
     n: int,
     crease: int,
@@ -230,11 +217,12 @@ def calc_crease(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_cutting_edge(
     n: int,
     size: Sequence[float],
@@ -267,11 +255,12 @@ def calc_cutting_edge(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_manual_press(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
     """
     Ручная вырубка на прессе.
@@ -287,11 +276,12 @@ def calc_manual_press(n: int, material_id: str = "", mode: int = 1) -> ProcessRe
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_press(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
     """
     Вырубка на прессе.
@@ -307,7 +297,7 @@ def calc_press(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
@@ -316,6 +306,7 @@ def calc_press(n: int, material_id: str = "", mode: int = 1) -> ProcessResult:
 #  ПЕРЕПЛЁТ И КРЕПЁЖ
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_binding(
     n: int,
     size: Sequence[float],
@@ -340,7 +331,7 @@ def calc_binding(
     tool = _get_tool(binding_id)
     raw_tool = _get_raw_tool(binding_id)
 
-    base_time_ready = tool.base_time_ready or BASE_TIME_READY
+    base_time_ready = tool.base_time_ready or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode)))
     ready_hours = float(base_time_ready[idx])
 
@@ -421,8 +412,8 @@ def calc_binding(
     margin_manual = get_margin("marginProcessManual")
     cost = cost_process + cost_operator + cost_material
     price = (
-        cost_material * (1 + MARGIN_MATERIAL + margin_manual)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL + margin_manual)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
 
     weight_kg = math.ceil(n * length_wire / 8.75) * wire_weight_per_unit / 1000
@@ -444,6 +435,7 @@ def calc_binding(
     )
 
 
+@traced()
 def calc_set_staples(n: int, options: Dict[str, Any] | None = None, mode: int = 1) -> ProcessResult:
     """
     Степлирование (скрепление скобами). 2 скобы на изделие.
@@ -468,8 +460,8 @@ def calc_set_staples(n: int, options: Dict[str, Any] | None = None, mode: int =
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(staples_weight * n, 2)
@@ -491,6 +483,7 @@ def calc_set_staples(n: int, options: Dict[str, Any] | None = None, mode: int =
 #  ЛЮВЕРСЫ
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_eyelet(
     n: int,
     size: Sequence[float],
@@ -527,7 +520,7 @@ def calc_eyelet(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
 
     materials_out = [{
@@ -537,6 +530,7 @@ def calc_eyelet(
     return ProcessResult(cost=cost, price=price, time_hours=time_hours, materials=materials_out)
 
 
+@traced()
 def calc_eyelet_sheet(n: int, mode: int = 1) -> ProcessResult:
     """
     Люверсовка полиграфической продукции (один люверс 4 мм на изделие).
@@ -552,7 +546,7 @@ def calc_eyelet_sheet(n: int, mode: int = 1) -> ProcessResult:
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
 
     materials_out = [{
@@ -566,6 +560,7 @@ def calc_eyelet_sheet(n: int, mode: int = 1) -> ProcessResult:
 #  ПРОКЛЕЙКА, НАКЛЕЙКА, НАКАТКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_gluing_banner(
     n: int,
     size: Sequence[float],
@@ -596,11 +591,12 @@ def calc_gluing_banner(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_set_sticker(n: int, size: Sequence[float] = (0, 0), mode: int = 1) -> ProcessResult:
     """
     Наклейка стикера на изделие.
@@ -616,11 +612,12 @@ def calc_set_sticker(n: int, size: Sequence[float] = (0, 0), mode: int = 1) -> P
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+    price = (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours, time_ready=time_hours)
 
 
+@traced()
 def calc_manual_roll(
     n: int,
     size: Sequence[float],
@@ -653,11 +650,9 @@ def calc_manual_roll(
             roll_per_hour = roll_per_hour_table[0][1]
         else:
             length = (size[0] + size[1]) * 2 / 1000
-            table = [(float(r[0]), float(r[1])) for r in roll_per_hour_table]
-            roll_per_hour = find_in_table(table, area)
+            roll_per_hour = cached_table("tools.ManualRoll.rollPerHour", roll_per_hour_table).find(area)
     else:
-        table = [(float(r[0]), float(r[1])) for r in roll_per_hour_table]
-        roll_per_hour = find_in_table(table, area * n)
+        roll_per_hour = cached_table("tools.ManualRoll.rollPerHour", roll_per_hour_table).find(area * n)
 
     sum_len = length * n
     sum_area = area * n
@@ -672,7 +667,7 @@ def calc_manual_roll(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
@@ -681,6 +676,7 @@ def calc_manual_roll(
 #  ПОЛИМЕРНАЯ ЗАЛИВКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_epoxy(
     n: int,
     size: Sequence[float],
@@ -714,7 +710,7 @@ def calc_epoxy(
     process_per_hour_arr = tool_raw.get("processPerHour", [4000, 2000, 1300])
     epoxy_per_cm2 = float(tool_raw.get("epoxyPerCM2", 0.16))
 
-    base_time_ready = tool.base_time_ready or BASE_TIME_READY
+    base_time_ready = tool.base_time_ready or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode)))
     ready_hours = float(base_time_ready[idx])
 
@@ -759,8 +755,8 @@ def calc_epoxy(
 
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION)
     )
 
     time_hours = math.ceil((time_mix + time_coating) * 100) / 100
@@ -784,6 +780,7 @@ def calc_epoxy(
 #  УФ-СКЛЕЙКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_uv_gluing(n: int, size: Sequence[float], mode: int = 1) -> ProcessResult:
     """
     УФ-склейка.
@@ -805,7 +802,7 @@ def calc_uv_gluing(n: int, size: Sequence[float], mode: int = 1) -> ProcessResul
     cost_operator = time_operator * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
@@ -814,6 +811,7 @@ def calc_uv_gluing(n: int, size: Sequence[float], mode: int = 1) -> ProcessResul
 #  УСТАНОВКА ЭЛЕМЕНТОВ
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_set_cursor(n: int, cursor_id: str, mode: int = 1) -> ProcessResult:
     """
     Установка курсора на квартальный календарь.
@@ -837,8 +835,8 @@ def calc_set_cursor(n: int, cursor_id: str, mode: int = 1) -> ProcessResult:
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(cursor_weight * n, 2)
@@ -856,6 +854,7 @@ def calc_set_cursor(n: int, cursor_id: str, mode: int = 1) -> ProcessResult:
     )
 
 
+@traced()
 def calc_set_rigel(
     n: int,
     width: float,
@@ -898,8 +897,8 @@ def calc_set_rigel(
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator + cost_punching.cost
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
         + cost_punching.price
     )
     time_hours = time_process + cost_punching.time_hours
@@ -918,6 +917,7 @@ def calc_set_rigel(
     )
 
 
+@traced()
 def calc_set_shaft(n: int, shaft_id: str, mode: int = 1) -> ProcessResult:
     """
     Установка пластиковой палочки (флажок).
@@ -946,8 +946,8 @@ def calc_set_shaft(n: int, shaft_id: str, mode: int = 1) -> ProcessResult:
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(shaft_weight * n, 2)
@@ -965,6 +965,7 @@ def calc_set_shaft(n: int, shaft_id: str, mode: int = 1) -> ProcessResult:
     )
 
 
+@traced()
 def calc_set_rope(n: int, rope_id: str, mode: int = 1) -> ProcessResult:
     """
     Установка шнура на вымпел.
@@ -993,8 +994,8 @@ def calc_set_rope(n: int, rope_id: str, mode: int = 1) -> ProcessResult:
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
     time_hours = time_process
     weight_kg = rope_weight * n / 1000
@@ -1012,6 +1013,7 @@ def calc_set_rope(n: int, rope_id: str, mode: int = 1) -> ProcessResult:
     )
 
 
+@traced()
 def calc_set_insert(n: int, mode: int = 1) -> ProcessResult:
     """
     Установка бумажной вставки в акриловую заготовку.
@@ -1026,12 +1028,13 @@ def calc_set_insert(n: int, mode: int = 1) -> ProcessResult:
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     return ProcessResult(
         cost=cost, price=price, time_hours=time_process, time_ready=time_process,
     )
 
 
+@traced()
 def calc_set_profile(
     n: int,
     segments: List[List[float]],
@@ -1082,8 +1085,8 @@ def calc_set_profile(
     margin_manual = get_margin("marginProcessManual")
     cost = cost_material + cost_process + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_manual)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_manual)
     )
     time_hours = time_process
     spring_weight = float(spring_raw.get("weight", 0))
@@ -1110,6 +1113,7 @@ def calc_set_profile(
 #  КРЕПЛЕНИЯ, КАРМАНЫ, УПАКОВКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_attachment(n: int, attachment_id: str, mode: int = 1) -> ProcessResult:
     """
     Установка крепления (булавка, магнит, цанга и т.п.).
@@ -1126,13 +1130,13 @@ def calc_attachment(n: int, attachment_id: str, mode: int = 1) -> ProcessResult:
     time_prepare = 0.1 * mode
     process_per_hour = 400
     time_process = n / process_per_hour + time_prepare
-    cost_operator = time_process * COST_OPERATOR
+    cost_operator = time_process * markups.COST_OPERATOR
     cost_material = n * attach_cost
 
     cost = cost_material + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + cost_operator * (1 + MARGIN_OPERATION)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + cost_operator * (1 + markups.MARGIN_OPERATION)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(n * attach_weight / 1000, 2)
@@ -1150,6 +1154,7 @@ def calc_attachment(n: int, attachment_id: str, mode: int = 1) -> ProcessResult:
     )
 
 
+@traced()
 def calc_pocket(n: int, pocket_id: str, mode: int = 1) -> ProcessResult:
     """
     Установка кармана.
@@ -1166,13 +1171,13 @@ def calc_pocket(n: int, pocket_id: str, mode: int = 1) -> ProcessResult:
     time_prepare = 0.1 * mode
     process_per_hour = 400
     time_process = n / process_per_hour + time_prepare
-    cost_operator = time_process * COST_OPERATOR
+    cost_operator = time_process * markups.COST_OPERATOR
     cost_material = n * pocket_cost
 
     cost = cost_material + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + cost_operator * (1 + MARGIN_OPERATION)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + cost_operator * (1 + markups.MARGIN_OPERATION)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(n * pocket_weight / 1000, 2)
@@ -1190,6 +1195,7 @@ def calc_pocket(n: int, pocket_id: str, mode: int = 1) -> ProcessResult:
     )
 
 
+@traced()
 def calc_packing(
     n: int,
     size: Sequence[float],
@@ -1246,13 +1252,13 @@ def calc_packing(
     time_prepare = 0.1 * mode
     process_per_hour = 400
     time_process = n / process_per_hour + time_prepare
-    cost_operator = time_process * COST_OPERATOR
+    cost_operator = time_process * markups.COST_OPERATOR
     cost_material = n * pack_cost
 
     cost = cost_material + cost_operator
     price = (
-        cost_material * (1 + MARGIN_MATERIAL)
-        + cost_operator * (1 + MARGIN_OPERATION)
+        cost_material * (1 + markups.MARGIN_MATERIAL)
+        + cost_operator * (1 + markups.MARGIN_OPERATION)
     )
     time_hours = math.ceil(time_process * 100) / 100
     weight_kg = round(n * pack_weight / 1000, 2)
@@ -1274,6 +1280,7 @@ def calc_packing(
 #  НАРЕЗКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_set_canvas_frame(
     n: int,
     size: Sequence[float],
@@ -1298,11 +1305,12 @@ def calc_set_canvas_frame(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     return ProcessResult(cost=cost, price=price, time_hours=time_hours)
 
 
+@traced()
 def calc_cut_profile(
     n: int,
     segments: List[List[float]],
@@ -1320,7 +1328,7 @@ def calc_cut_profile(
     tool = _get_tool(tool_id)
     num_cut = sum(2 * n * int(seg[1]) for seg in segments)
 
-    base_time_ready = tool.base_time_ready or BASE_TIME_READY
+    base_time_ready = tool.base_time_ready or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode)))
     ready_hours = float(base_time_ready[idx])
 
@@ -1330,12 +1338,13 @@ def calc_cut_profile(
     cost_operator = time_process * tool.operator_cost_per_hour
     cost = cost_process + cost_operator
     margin_manual = get_margin("marginProcessManual")
-    price = cost * (1 + MARGIN_OPERATION + margin_manual)
+    price = cost * (1 + markups.MARGIN_OPERATION + margin_manual)
     time_hours = math.ceil(time_process * 100) / 100
     time_ready = time_hours + ready_hours
     return ProcessResult(cost=cost, price=price, time_hours=time_hours, time_ready=time_ready)
 
 
+@traced()
 def calc_cut_saber(
     num_sheet: int,
     size: Sequence[float],
@@ -1387,7 +1396,7 @@ def calc_cut_saber(
 
     cost = math.ceil(cost_cut + cost_operator)
     margin_guillotine = get_margin("marginCutGuillotine")
-    price = math.ceil(cost * (1 + MARGIN_OPERATION + margin_guillotine))
+    price = math.ceil(cost * (1 + markups.MARGIN_OPERATION + margin_guillotine))
     time_hours = math.ceil(time_cut * 100) / 100
     return ProcessResult(cost=float(cost), price=float(price), time_hours=time_hours)
 
@@ -1396,6 +1405,7 @@ def calc_cut_saber(
 #  ПОШИВ
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_sewing_covers(
     n: int,
     size: Sequence[float],
@@ -1413,7 +1423,7 @@ def calc_sewing_covers(
     tool = _get_tool("Sewing")
     material = _get_material("presswall", material_id)
 
-    base_time_ready = tool.base_time_ready or BASE_TIME_READY
+    base_time_ready = tool.base_time_ready or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready) - 1, math.ceil(mode)))
     ready_hours = float(base_time_ready[idx])
 
@@ -1436,8 +1446,8 @@ def calc_sewing_covers(
 
     cost = cost_material + cost_process + cost_operator
     price = (
-        (cost_process + cost_operator) * (1 + MARGIN_OPERATION)
-        + cost_material * (1 + MARGIN_MATERIAL)
+        (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION)
+        + cost_material * (1 + markups.MARGIN_MATERIAL)
     )
     time_hours = math.ceil(time_process * 100) / 100
     time_ready = time_hours + ready_hours
@@ -1462,6 +1472,7 @@ def calc_sewing_covers(
 #  ДОСТАВКА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_shipment(
     n: int,
     size: Sequence[float],
@@ -1485,7 +1496,7 @@ def calc_shipment(
 
     if cargo_id == "Dellin":
         result.cost = 1000 + n * weight * 30
-        result.price = result.cost * (1 + MARGIN_MATERIAL)
+        result.price = result.cost * (1 + markups.MARGIN_MATERIAL)
         result.time_hours = 0.5
         result.time_ready = 40.0
 
@@ -1506,7 +1517,7 @@ def calc_shipment(
             if weight <= t[0] and vol_shipment <= t[1] and n <= t[2]:
                 break
         result.cost = cost_shipment
-        result.price = result.cost * (1 + MARGIN_MATERIAL)
+        result.price = result.cost * (1 + markups.MARGIN_MATERIAL)
         result.time_hours = 0.5
         result.time_ready = 16.0
 
@@ -1527,7 +1538,7 @@ def calc_shipment(
                     if cost_shipment == 0 or cost_shipment > params[3]:
                         cost_shipment = params[3]
         result.cost = cost_shipment
-        result.price = result.cost * (1 + MARGIN_MATERIAL)
+        result.price = result.cost * (1 + markups.MARGIN_MATERIAL)
         result.time_hours = 0.5
         result.time_ready = 40.0
 
@@ -1538,6 +1549,7 @@ def calc_shipment(
 #  ВЫРУБНАЯ ФОРМА
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_form(
     size_item: Sequence[float],
     num_items: int,
@@ -1563,7 +1575,7 @@ def calc_form(
     cost_ship = calc_shipment(1, [200, 300, 20], 1.0, "Own")
 
     cost = cost_form + cost_ship.cost
-    price = cost_form * (1 + MARGIN_OPERATION) + cost_ship.price
+    price = cost_form * (1 + markups.MARGIN_OPERATION) + cost_ship.price
     time_ready = base_time_ready[min(mode, len(base_time_ready) - 1)] + cost_ship.time_ready
 
     return ProcessResult(
@@ -1575,6 +1587,13 @@ def calc_form(
 #  ШЕЛКОГРАФИЯ
 # ══════════════════════════════════════════════════════════════════════
 
+# Доля листа переноса по площади изделия, м² (шелкография с трансфером)
+_SILK_PART_PAPER = ThresholdTable([
+    (0.015, 1 / 6), (0.0315, 0.5), (0.0609, 1.0), (0.1218, 0.2), (1.0, 2.0),
+])
+
+
+@traced()
 def calc_silk_print(
     n: int,
     size: Sequence[float],
@@ -1625,7 +1644,7 @@ def calc_silk_print(
         is_packing_indiv = False
         is_unpacking_indiv = False
 
-    base_time_ready_arr = tool.base_time_ready or BASE_TIME_READY
+    base_time_ready_arr = tool.base_time_ready or markups.BASE_TIME_READY
     idx = max(0, min(len(base_time_ready_arr) - 1, math.ceil(mode)))
     ready_hours = float(base_time_ready_arr[idx])
 
@@ -1670,10 +1689,7 @@ def calc_silk_print(
     if has_paper:
         cost_paper_arr = raw["costPaper"]
         cost_paper = num_silk * area * cost_paper_arr[0] * cost_paper_arr[1]
-        part_paper: List[Tuple[float, float]] = [
-            (0.015, 1 / 6), (0.0315, 0.5), (0.0609, 1.0), (0.1218, 0.2), (1.0, 2.0),
-        ]
-        num_sheet = num_silk * find_in_table(part_paper, area)
+        num_sheet = num_silk * _SILK_PART_PAPER.find(area)
         if color == 1:
             cost_paint = 0.0
 
@@ -1705,9 +1721,7 @@ def calc_silk_print(
     time_transfer = 0.0
     if has_paper:
         pph_trans_table = raw.get("processPerHourTrans", [[1, 10]])
-        pph_trans = find_in_table(
-            [(float(r[0]), float(r[1])) for r in pph_trans_table], area
-        )
+        pph_trans = cached_table(f"tools.{tool_code}.processPerHourTrans", pph_trans_table).find(area)
         time_transfer = num_silk / pph_trans if pph_trans > 0 else 0
         pph_glue = float(raw.get("processPerHourGlue", 250))
         time_put_glue = num_sheet / pph_glue if pph_glue > 0 else 0
@@ -1719,19 +1733,17 @@ def calc_silk_print(
     time_prepare = tool.time_prepare * mode
 
     cost_process = tool.depreciation_per_hour * (time_adjustment + time_silk_print + time_mix)
-    op_silk = cost_operator_silk if cost_operator_silk > 0 else COST_OPERATOR
-    op_pack = cost_operator_pack if cost_operator_pack > 0 else COST_OPERATOR
+    op_silk = cost_operator_silk if cost_operator_silk > 0 else markups.COST_OPERATOR
+    op_pack = cost_operator_pack if cost_operator_pack > 0 else markups.COST_OPERATOR
     cost_operator = time_operator_silk * op_silk + time_operator_pack * op_pack
 
-    coeff_soulfly = find_in_table(
-        [(float(r[0]), float(r[1])) for r in coeff_soulfly_table], float(n)
-    )
+    coeff_soulfly = cached_table(f"tools.{tool_code}.coeffSoulfly", coeff_soulfly_table).find(float(n))
 
     cost = (
         (cost_material + cost_process + cost_operator * (1 + coeff_overhead))
         * coeff_raster * (1 + coeff_soulfly)
     )
-    price = cost * (1 + MARGIN_OPERATION)
+    price = cost * (1 + markups.MARGIN_OPERATION)
     cost *= (1 + margin_tool)
 
     time_hours = math.ceil((time_operator_pack + time_operator_silk + time_prepare) * 100) / 100
@@ -1747,6 +1759,7 @@ def calc_silk_print(
 #  ЗАКАТНЫЕ ЗНАЧКИ
 # ══════════════════════════════════════════════════════════════════════
 
+@traced()
 def calc_button_pins(
     n: int,
     pin_id: str,
@@ -1768,7 +1781,7 @@ def calc_button_pins(
     В текущей версии стоимость вставок не включена — будет добавлена после миграции
     калькулятора calcSticker.js (Батч B, Фаза 2).
     """
-    base_time_ready = BASE_TIME_READY
+    base_time_ready = markups.BASE_TIME_READY
     result = ProcessResult()
     pin_size: List[float] = []
 
@@ -1810,8 +1823,8 @@ def calc_button_pins(
 
         result.cost = cost_material + cost_process + cost_operator + cost_insert
         result.price = (
-            cost_material * (1 + MARGIN_MATERIAL + margin_button)
-            + (cost_process + cost_operator) * (1 + MARGIN_OPERATION + margin_button)
+            cost_material * (1 + markups.MARGIN_MATERIAL + margin_button)
+            + (cost_process + cost_operator) * (1 + markups.MARGIN_OPERATION + margin_button)
             + price_insert * (1 + margin_button)
         )
         result.time_hours = time_press + time_insert
@@ -1858,7 +1871,7 @@ def calc_button_pins(
         cost_ship = calc_shipment(num_shipment, [cube_side, cube_side, cube_side], weight_per_place)
 
         result.cost = cost_material + cost_ship.cost
-        result.price = cost_material * (1 + MARGIN_MATERIAL) + cost_ship.price
+        result.price = cost_material * (1 + markups.MARGIN_MATERIAL) + cost_ship.price
         result.time_hours = time_press + cost_ship.time_hours
         result.time_ready = cost_ship.time_ready
 
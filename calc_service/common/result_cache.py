@@ -0,0 +1,197 @@
+"""
+Кэш результатов расчёта (LRU + TTL) для BaseCalculator.execute().
+
+Ключ — (slug, каноническая форма параметров, версия данных):
+  - порядок ключей не важен, 100 и 100.0 — одно и то же, а True и 1 — разное;
+  - строка "30,40" (так make_share_url кодирует списки) равна [30, 40]
+    для параметров-массивов калькулятора;
+  - версия данных — хэш data/ текущего поколения (common.generation),
+    при смене справочников ключи меняются.
+
+Кэш сбрасывается при смене поколения данных (generation.reload(), markups.reload(), ...).
+Размер и TTL задаются в config.py (CALC_CACHE_SIZE, CALC_CACHE_TTL; 0 — кэш выключен).
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Collection, Dict, Hashable, Mapping, Optional, Tuple
+
+from config import CALC_CACHE_SIZE, CALC_CACHE_TTL
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+
+def compute_data_version(data_dir: Path = DATA_DIR) -> str:
+    """Хэш содержимого всех файлов справочников (пути + байты), 16 hex-символов."""
+    digest = hashlib.sha1()
+    for path in sorted(data_dir.rglob("*.json")):
+        digest.update(path.relative_to(data_dir).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _canon_number(value: float) -> Hashable:
+    """100.0 → 100, 0.5 → 0.5."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _split_number_list(value: str) -> Optional[Tuple[Hashable, ...]]:
+    """"30,40" → (30, 40); None, если строка не список чисел через запятую."""
+    if "," not in value:
+        return None
+    parts = value.split(",")
+    try:
+        return tuple(_canon_number(float(p)) for p in parts)
+    except ValueError:
+        return None
+
+
+def canonicalize(value: Any, list_keys: Collection[str] = (), key: Optional[str] = None) -> Hashable:
+    """
+    Каноническая хэшируемая форма значения параметра.
+
+    list_keys — имена параметров-массивов (только для них "30,40" ≡ [30, 40]).
+    """
+    if value is None:
+        return value
+    if isinstance(value, bool):
+        # True == 1 == 1.0 и у них один hash — без метки флаг и число 1 делили бы запись.
+        # Метка — сам тип bool: из списка параметров такой кортеж не получить.
+        return (bool, value)
+    if isinstance(value, (int, float)):
+        return _canon_number(value)
+    if isinstance(value, str):
+        if key is not None and key in list_keys:
+            as_list = _split_number_list(value)
+            if as_list is not None:
+                return as_list
+        return value
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(k), canonicalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(canonicalize(v) for v in value)
+    return repr(value)
+
+
+def expand_list_params(params: Mapping[str, Any], list_keys: Collection[str]) -> Dict[str, Any]:
+    """
+    Развернуть строки-списки "30,40" в [30, 40] для параметров-массивов.
+
+    Нужно, чтобы расчёт по ссылке share_url давал тот же результат,
+    что и исходный расчёт (и совпадал с закэшированным по тому же ключу).
+    """
+    result = dict(params)
+    for key in list_keys:
+        value = result.get(key)
+        if isinstance(value, str):
+            as_list = _split_number_list(value)
+            if as_list is not None:
+                result[key] = list(as_list)
+    return result
+
+
+class ResultCache:
+    """
+    Потокобезопасный LRU-кэш с TTL для результатов расчёта.
+
+    Хранит глубокие копии, get() тоже возвращает копию — вызывающий код
+    может изменять результат, не портя кэш.
+    """
+
+    def __init__(self, max_size: int = CALC_CACHE_SIZE, ttl: float = CALC_CACHE_TTL) -> None:
+        self.max_size = int(max_size)
+        self.ttl = float(ttl)
+        self._items: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self.flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @property
+    def data_version(self) -> str:
+        """Версия данных — хэш data/ текущего (закреплённого за запросом) поколения."""
+        # Импорт здесь: common.generation импортирует этот модуль через data_store
+        from common.generation import current
+
+        return current().version
+
+    def make_key(
+        self, slug: str, params: Mapping[str, Any], list_keys: Collection[str] = ()
+    ) -> Hashable:
+        canon = tuple(sorted((str(k), canonicalize(v, list_keys, str(k))) for k, v in params.items()))
+        return (slug, canon, self.data_version)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._items[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._items[key] = (time.monotonic(), stored)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Сбросить все записи."""
+        with self._lock:
+            self._items.clear()
+            self.flushes += 1
+
+    def stats(self) -> Dict[str, Any]:
+        data_version = self.data_version
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "flushes": self.flushes,
+                "data_version": data_version,
+            }
+
+
+RESULT_CACHE = ResultCache()
+
+
+def clear() -> None:
+    """Сбросить общий кэш результатов (вызывается при смене поколения данных)."""
+    RESULT_CACHE.clear()
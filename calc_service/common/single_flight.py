@@ -0,0 +1,89 @@
+"""
+Склейка одинаковых одновременных расчётов (single-flight).
+
+Форма на сайте шлёт дубли (двойной клик, несработавший debounce, несколько
+вкладок): одинаковые POST /api/v1/calc/{slug} приходят одновременно, и каждый
+считался бы целиком в своём потоке пула. BaseCalculator.execute() пропускает
+промах кэша результатов через SINGLE_FLIGHT по ключу кэша (slug, канонические
+параметры, версия данных): первый запрос считает, одновременные дубли ждут
+его результат и получают копию. Исключение расчёта получают все ожидающие.
+
+В отличие от кэша результатов (common.result_cache), здесь ничего не хранится
+после расчёта — склеиваются только запросы, пришедшие, пока расчёт идёт;
+склейка работает и с выключенным кэшем. Счётчики — в /api/v1/cache/stats
+(ключ single_flight) и в метрике calc_calculation_seconds{cache="coalesced"}.
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Потокобезопасная склейка одновременных вызовов с одинаковым ключом."""
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        (результат func(), склеен ли вызов). Если вызов с тем же ключом уже идёт —
+        дождаться его и вернуть глубокую копию результата (или поднять его исключение).
+
+        Первому вызывающему возвращается поверхностная копия: сам результат
+        остаётся нетронутым для копирования ожидающими.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+                leader = True
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return dict(flight.result), False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+                "waiting": sum(f.waiters for f in self._flights.values()),
+            }
+
+
+SINGLE_FLIGHT = SingleFlight()
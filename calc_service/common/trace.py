@@ -0,0 +1,185 @@
+"""
+Трассировка этапов расчёта: дерево этапов с временем и числом вызовов.
+
+Трассировка включается на один расчёт:
+- явно — POST /api/v1/calc/{slug}?trace=1 (дерево возвращается в ответе);
+- выборочно — доля CALC_TRACE_SAMPLE_RATE расчётов на реальном трафике.
+
+Этапы — вложенные калькуляторы (calculator:<slug>), операции common.process_tools
+(calc_binding, calc_packing, ...), раскладки layout_on_* и поиск в каталогах
+(MaterialCatalog.get, EquipmentCatalog.get). Функции отмечаются декоратором
+@traced(), участки кода — `with stage(name)`. Повторные вызовы одного этапа под
+одним родителем складываются в один узел (calls, ms).
+
+По закрытии трассировки время этапов за запрос попадает в гистограммы
+calc_stage_seconds (GET /metrics). Без активной трассировки этап стоит одно
+чтение ContextVar.
+"""
+
+from __future__ import annotations
+
+import functools
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from common import metrics
+from config import CALC_TRACE_SAMPLE_RATE
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Stage:
+    """Узел дерева: этап, число вызовов и суммарное время."""
+
+    __slots__ = ("name", "calls", "seconds", "children")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.children: Dict[str, Stage] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        node: Dict[str, Any] = {"stage": self.name, "calls": self.calls, "ms": round(self.seconds * 1000, 3)}
+        if self.children:
+            node["children"] = [child.to_dict() for child in self.children.values()]
+        return node
+
+
+class _StageTimer:
+    __slots__ = ("tracer", "name", "node", "started")
+
+    def __init__(self, tracer: Tracer, name: str) -> None:
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self) -> Stage:
+        stack = self.tracer._stack
+        children = stack[-1].children
+        node = children.get(self.name)
+        if node is None:
+            node = children[self.name] = Stage(self.name)
+        stack.append(node)
+        self.node = node
+        self.started = perf_counter()
+        return node
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.node.seconds += perf_counter() - self.started
+        self.node.calls += 1
+        self.tracer._stack.pop()
+
+
+class Tracer:
+    """Трассировка одного расчёта (не потокобезопасна: один запрос — один поток)."""
+
+    def __init__(self, name: str = "request") -> None:
+        self.root = Stage(name)
+        self._stack: List[Stage] = [self.root]
+
+    def stage(self, name: str) -> _StageTimer:
+        return _StageTimer(self, name)
+
+    def totals(self) -> Dict[str, Stage]:
+        """Суммы по имени этапа по всему дереву (без корня)."""
+        totals: Dict[str, Stage] = {}
+        pending = [(child, frozenset()) for child in self.root.children.values()]
+        while pending:
+            node, ancestors = pending.pop()
+            total = totals.get(node.name)
+            if total is None:
+                total = totals[node.name] = Stage(node.name)
+            total.calls += node.calls
+            # Этап внутри одноимённого (калькулятор в том же калькуляторе) уже учтён во внешнем
+            if node.name not in ancestors:
+                total.seconds += node.seconds
+            inner = ancestors | {node.name}
+            pending.extend((child, inner) for child in node.children.values())
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.root.to_dict()
+
+
+_active: ContextVar[Optional[Tracer]] = ContextVar("calc_tracer", default=None)
+
+
+def active() -> Optional[Tracer]:
+    """Трассировка текущего расчёта или None."""
+    return _active.get()
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str) -> _StageTimer | _NoStage:
+    """Контекст этапа: при активной трассировке замеряет время блока."""
+    tracer = _active.get()
+    return _NO_STAGE if tracer is None else tracer.stage(name)
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Декоратор: вызов функции — этап трассировки (по умолчанию имя — __qualname__)."""
+
+    def decorator(func: F) -> F:
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _active.get()
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _record(tracer: Tracer) -> None:
+    for name, total in tracer.totals().items():
+        metrics.STAGE_SECONDS.observe(total.seconds, name)
+        metrics.STAGE_CALLS.inc(name, amount=total.calls)
+
+
+@contextmanager
+def tracing(force: bool = False) -> Iterator[Optional[Tracer]]:
+    """
+    Открыть трассировку расчёта: при force=True — всегда, иначе с вероятностью
+    CALC_TRACE_SAMPLE_RATE. Если трассировка уже открыта — использовать её.
+
+    Отдаёт Tracer или None (расчёт не трассируется); по закрытии открытой здесь
+    трассировки её этапы попадают в метрики.
+    """
+    tracer = _active.get()
+    if tracer is not None:
+        yield tracer
+        return
+    if not force and (CALC_TRACE_SAMPLE_RATE <= 0 or random.random() >= CALC_TRACE_SAMPLE_RATE):
+        yield None
+        return
+    tracer = Tracer()
+    token = _active.set(tracer)
+    started = perf_counter()
+    try:
+        yield tracer
+    finally:
+        tracer.root.seconds = perf_counter() - started
+        tracer.root.calls = 1
+        _active.reset(token)
+        _record(tracer)
+        metrics.TRACED_REQUESTS.inc("explicit" if force else "sampled")
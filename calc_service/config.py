@@ -14,3 +14,57 @@ load_dotenv(dotenv_path=ENV_PATH)
 # Базовый URL сайта. По умолчанию — https://insain.ru
 SITE_URL: str = os.getenv("SITE_URL", "https://insain.ru")
 
+# Пакетный расчёт (/api/v1/calc_batch): размер пула потоков и лимит позиций в запросе.
+CALC_BATCH_WORKERS: int = max(1, int(os.getenv("CALC_BATCH_WORKERS", "4")))
+CALC_BATCH_MAX_ITEMS: int = max(1, int(os.getenv("CALC_BATCH_MAX_ITEMS", "100")))
+
+# Кэш результатов расчёта (common/result_cache.py): число записей и время жизни, сек. 0 — выключен.
+CALC_CACHE_SIZE: int = max(0, int(os.getenv("CALC_CACHE_SIZE", "2048")))
+CALC_CACHE_TTL: float = max(0.0, float(os.getenv("CALC_CACHE_TTL", "600")))
+
+# Бинарный снапшот справочников data/ (common/data_snapshot.py). Собирается командой
+# `python -m common.data_snapshot`; устаревший или отсутствующий снапшот — читаем JSON.
+DATA_SNAPSHOT_PATH: str = os.getenv(
+    "DATA_SNAPSHOT_PATH", str(Path(__file__).resolve().parent / "data" / "snapshot.pkl")
+)
+
+# Горячая перезагрузка справочников (common/generation.py): период проверки mtime файлов data/, сек.
+# 0 — наблюдатель выключен (перезагрузка только через POST /api/v1/data/reload).
+DATA_WATCH_INTERVAL: float = max(0.0, float(os.getenv("DATA_WATCH_INTERVAL", "0")))
+# Токен для POST /api/v1/data/reload (заголовок X-Admin-Token). Пусто — перезагрузка доступна
+# только внутренним клиентам (CALC_INTERNAL_IPS / X-Internal-Token, см. common/admission.py).
+ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+# Метаданные калькуляторов (/calculators, /options, /param_schema, /tool_schema, /llm_prompt):
+# max-age для Cache-Control, сек. Клиент после него перепроверяет ответ по ETag (304 без тела).
+METADATA_MAX_AGE: int = max(0, int(os.getenv("METADATA_MAX_AGE", "60")))
+# Версия кода для ETag (например, git sha при деплое). Пусто — хэш исходников calc_service.
+CODE_VERSION: str = os.getenv("CODE_VERSION", "")
+
+# Продакшен-запуск (server.py): адрес и число воркеров, которые fork'аются от мастера
+# с предзагруженными справочниками.
+CALC_HOST: str = os.getenv("CALC_HOST", "127.0.0.1")
+CALC_PORT: int = int(os.getenv("CALC_PORT", "8001"))
+CALC_WORKERS: int = max(1, int(os.getenv("CALC_WORKERS", "2")))
+
+# Трассировка этапов расчёта (common/trace.py): доля расчётов, трассируемых выборочно на реальном
+# трафике (0…1); их этапы попадают в гистограммы GET /metrics. 0 — только явный ?trace=1.
+CALC_TRACE_SAMPLE_RATE: float = min(1.0, max(0.0, float(os.getenv("CALC_TRACE_SAMPLE_RATE", "0"))))
+
+# Допуск запросов к /api/v1/* (common/admission.py), на процесс-воркер.
+# Токен-бакет на IP клиента: запросов в секунду и запас на всплеск. 0 — без ограничения
+# (за NAT офиса или провайдера много пользователей сайта делят один IP — включать осознанно).
+CALC_RATE_LIMIT: float = max(0.0, float(os.getenv("CALC_RATE_LIMIT", "0")))
+CALC_RATE_BURST: int = max(1, int(os.getenv("CALC_RATE_BURST", "20")))
+# Одновременно обрабатываемые запросы; CALC_INTERNAL_RESERVED из них — только для внутренних клиентов (бот).
+CALC_MAX_CONCURRENT: int = max(1, int(os.getenv("CALC_MAX_CONCURRENT", "8")))
+CALC_INTERNAL_RESERVED: int = max(0, int(os.getenv("CALC_INTERNAL_RESERVED", "2")))
+# Очереди ожидания слота (публичная и внутренняя) и время ожидания, сек.: переполнение и таймаут → 503.
+CALC_QUEUE_SIZE: int = max(0, int(os.getenv("CALC_QUEUE_SIZE", "32")))
+CALC_INTERNAL_QUEUE_SIZE: int = max(0, int(os.getenv("CALC_INTERNAL_QUEUE_SIZE", "64")))
+CALC_QUEUE_TIMEOUT: float = max(0.0, float(os.getenv("CALC_QUEUE_TIMEOUT", "10")))
+# Внутренние клиенты: IP через запятую или заголовок X-Internal-Token (если токен задан).
+CALC_INTERNAL_IPS: str = os.getenv("CALC_INTERNAL_IPS", "127.0.0.1,::1")
+CALC_INTERNAL_TOKEN: str = os.getenv("CALC_INTERNAL_TOKEN", "")
+# Прокси (nginx), от которых IP клиента берётся из X-Forwarded-For.
+CALC_TRUSTED_PROXIES: str = os.getenv("CALC_TRUSTED_PROXIES", "127.0.0.1,::1")
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Mapping
 
+from common.generation import CatalogMap, CatalogRef
 from .base import EquipmentCatalog, EquipmentSpec
 from .loader import load_generic_catalog, load_laser_catalog
 
 
+# Каталоги data/equipment/{name}.json с базовой моделью EquipmentSpec (laser.json — отдельно)
+GENERIC_CATALOGS = (
+    "printer",
+    "plotter",
+    "cutter",
+    "laminator",
+    "milling",
+    "heatpress",
+    "cards",
+    "metalpins",
+    "design",
+    "tools",
+)
+
+
 def _safe_load_generic(filename: str) -> EquipmentCatalog:
     """
     Загрузить каталог оборудования, отлавливая ошибки формата JSON.
@@ -21,39 +37,43 @@ def _safe_load_generic(filename: str) -> EquipmentCatalog:
         return EquipmentCatalog(category=category)
 
 
-# Лазеры — отдельная функция загрузчика
-try:
-    laser: EquipmentCatalog = load_laser_catalog()
-except Exception as exc:  # noqa: BLE001
-    print(f"[equipment] предупреждение: не удалось загрузить laser.json: {exc}")
-    laser = EquipmentCatalog(category="laser")
-
-
-printer: EquipmentCatalog = _safe_load_generic("printer.json")
-plotter: EquipmentCatalog = _safe_load_generic("plotter.json")
-cutter: EquipmentCatalog = _safe_load_generic("cutter.json")
-laminator: EquipmentCatalog = _safe_load_generic("laminator.json")
-milling: EquipmentCatalog = _safe_load_generic("milling.json")
-heatpress: EquipmentCatalog = _safe_load_generic("heatpress.json")
-cards: EquipmentCatalog = _safe_load_generic("cards.json")
-metalpins: EquipmentCatalog = _safe_load_generic("metalpins.json")
-design: EquipmentCatalog = _safe_load_generic("design.json")
-tools: EquipmentCatalog = _safe_load_generic("tools.json")
-
-
-ALL_EQUIPMENT: Dict[str, EquipmentCatalog] = {
-    "laser": laser,
-    "printer": printer,
-    "plotter": plotter,
-    "cutter": cutter,
-    "laminator": laminator,
-    "milling": milling,
-    "heatpress": heatpress,
-    "cards": cards,
-    "metalpins": metalpins,
-    "design": design,
-    "tools": tools,
-}
+def _safe_load_laser() -> EquipmentCatalog:
+    # Лазеры — отдельная функция загрузчика
+    try:
+        return load_laser_catalog()
+    except Exception as exc:  # noqa: BLE001
+        print(f"[equipment] предупреждение: не удалось загрузить laser.json: {exc}")
+        return EquipmentCatalog(category="laser")
+
+
+def build_catalogs() -> Dict[str, EquipmentCatalog]:
+    """Загрузить все каталоги оборудования (вызывается при сборке поколения данных)."""
+    catalogs: Dict[str, EquipmentCatalog] = {"laser": _safe_load_laser()}
+    for name in GENERIC_CATALOGS:
+        catalogs[name] = _safe_load_generic(f"{name}.json")
+    return catalogs
+
+
+def _ref(name: str) -> EquipmentCatalog:
+    return CatalogRef("equipment", name)  # type: ignore[return-value]
+
+
+# Каталоги текущего поколения данных (common.generation): после горячей
+# перезагрузки `from equipment import laser` видит уже новые данные.
+laser: EquipmentCatalog = _ref("laser")
+printer: EquipmentCatalog = _ref("printer")
+plotter: EquipmentCatalog = _ref("plotter")
+cutter: EquipmentCatalog = _ref("cutter")
+laminator: EquipmentCatalog = _ref("laminator")
+milling: EquipmentCatalog = _ref("milling")
+heatpress: EquipmentCatalog = _ref("heatpress")
+cards: EquipmentCatalog = _ref("cards")
+metalpins: EquipmentCatalog = _ref("metalpins")
+design: EquipmentCatalog = _ref("design")
+tools: EquipmentCatalog = _ref("tools")
+
+
+ALL_EQUIPMENT: Mapping[str, EquipmentCatalog] = CatalogMap("equipment")  # type: ignore[assignment]
 
 
 def get_equipment(category: str, code: str) -> EquipmentSpec:
@@ -2,36 +2,19 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional, Sequence, Tuple, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from common.markups import BASE_TIME_READY, COST_OPERATOR
+from common import markups
+from common.helpers import ThresholdTable
+from common.trace import traced
 
 
-class LookupTable:
-    """
-    Таблица вида [(порог, значение), ...] с поиском по первому порогу ≥ value.
-    """
+def _compile(table: Optional[Sequence[Sequence[float]]]) -> Optional[ThresholdTable]:
+    return ThresholdTable(table) if table else None
 
-    def __init__(self, data: Sequence[Sequence[float]]) -> None:
-        if not data:
-            raise ValueError("данные для LookupTable не должны быть пустыми")
-        # Нормализуем кортежи и сортируем по порогу
-        self._data: List[Tuple[float, float]] = sorted(
-            [(float(th), float(val)) for th, val in data],
-            key=lambda pair: pair[0],
-        )
 
-    def find(self, value: float) -> float:
-        """
-        Вернуть значение для первого порога ≥ value.
-        Если такого порога нет — вернуть последнее значение.
-        """
-        x = float(value)
-        last_val = self._data[-1][1]
-        for threshold, val in self._data:
-            if x <= threshold:
-                return val
-        return last_val
+# Прежнее имя: таблица вида [(порог, значение), ...] с поиском по первому порогу ≥ value
+LookupTable = ThresholdTable
 
 
 class EquipmentSpec(BaseModel):
@@ -94,38 +77,52 @@ class EquipmentSpec(BaseModel):
     cost_prepare_cut: float = 0.0  # стоимость подготовки к резке
     cost_cut_offset: float = 0.0  # стоимость резки пачки
 
+    # Скомпилированные таблицы и ставки в час: считаются один раз при создании
+    # спецификации (каталоги собираются заново для каждого поколения данных).
+    _defects: Optional[ThresholdTable] = PrivateAttr(default=None)
+    _process_speed: Optional[ThresholdTable] = PrivateAttr(default=None)
+    _meter_speed: Optional[ThresholdTable] = PrivateAttr(default=None)
+    _sheet_speed: Optional[ThresholdTable] = PrivateAttr(default=None)
+    _depreciation_per_hour: float = PrivateAttr(default=0.0)
+    _operator_cost_per_hour: float = PrivateAttr(default=0.0)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._defects = _compile(self.defect_table)
+        self._process_speed = _compile(self.process_per_hour_table)
+        self._meter_speed = _compile(self.meter_per_hour_table)
+        self._sheet_speed = _compile(self.sheets_per_hour_table)
+
+        denom = float(self.depreciation_years) * float(self.work_days_year) * float(self.hours_per_day)
+        self._depreciation_per_hour = float(self.purchase_cost) / denom if denom > 0 else 0.0
+        if self.cost_operator > 0:
+            self._operator_cost_per_hour = float(self.cost_operator)
+        else:
+            self._operator_cost_per_hour = float(markups.COST_OPERATOR)
+
     @property
     def depreciation_per_hour(self) -> float:
         """
         Амортизация оборудования в руб./час.
         """
-        years = float(self.depreciation_years)
-        days = float(self.work_days_year)
-        hours = float(self.hours_per_day)
-        denom = years * days * hours
-        if denom <= 0:
-            return 0.0
-        return float(self.purchase_cost) / denom
+        return self._depreciation_per_hour
 
     @property
     def operator_cost_per_hour(self) -> float:
         """
         Стоимость часа оператора.
-        Если cost_operator == 0, берём глобальное значение из common.markups.
+        Если cost_operator == 0, берётся глобальное значение из common.markups
+        (того поколения данных, в котором собрана спецификация).
         """
-        if self.cost_operator > 0:
-            return float(self.cost_operator)
-        return float(COST_OPERATOR)
+        return self._operator_cost_per_hour
 
     def get_defect_rate(self, quantity: float) -> float:
         """
         Вернуть процент брака для заданного тиража.
         Если таблица не задана — 0.0.
         """
-        if not self.defect_table:
+        if self._defects is None:
             return 0.0
-        table = LookupTable(self.defect_table)
-        return float(table.find(float(quantity)))
+        return self._defects.find(float(quantity))
 
     def get_time_ready(self, mode: int) -> float:
         """
@@ -134,7 +131,7 @@ class EquipmentSpec(BaseModel):
         mode: 1 — экономичный, 2 — стандартный, 3 — экспресс (индекс в baseTimeReady).
         При 0 трактуется как 1. Индекс зажимается в пределах массива.
         """
-        times = self.base_time_ready or BASE_TIME_READY
+        times = self.base_time_ready or markups.BASE_TIME_READY
         if not times:
             return 0.0
         m = max(1, int(mode))
@@ -146,18 +143,16 @@ class EquipmentSpec(BaseModel):
         Скорость резки/обработки (м/час) по толщине материала.
         Если задана таблица process_per_hour_table — поиск по порогу, иначе process_per_hour.
         """
-        if self.process_per_hour_table:
-            table = LookupTable(self.process_per_hour_table)
-            return float(table.find(float(thickness_um)))
+        if self._process_speed is not None:
+            return self._process_speed.find(float(thickness_um))
         return float(self.process_per_hour or 0.0)
 
     def get_meter_per_hour(self, density_um: float = 0.0) -> float:
         """
         Скорость ламинации (м/час). Если задана таблица — по плотности пленки, иначе meter_per_hour.
         """
-        if self.meter_per_hour_table:
-            table = LookupTable(self.meter_per_hour_table)
-            return float(table.find(float(density_um)))
+        if self._meter_speed is not None:
+            return self._meter_speed.find(float(density_um))
         return float(self.meter_per_hour or 0.0)
 
     def get_sheets_per_hour(self, density: float = 0.0) -> float:
@@ -165,9 +160,8 @@ class EquipmentSpec(BaseModel):
         Скорость печати принтера (листов/час) по плотности бумаги.
         Если задана таблица sheets_per_hour_table — поиск по порогу, иначе process_per_hour.
         """
-        if self.sheets_per_hour_table:
-            table = LookupTable(self.sheets_per_hour_table)
-            return float(table.find(float(density)))
+        if self._sheet_speed is not None:
+            return self._sheet_speed.find(float(density))
         return float(self.process_per_hour or 0.0)
 
 
@@ -188,26 +182,33 @@ class LaserSpec(EquipmentSpec):
     cost_cut_extra: float = 0.0
     cost_grave_extra: float = 0.0
 
+    _cut_speed: Optional[ThresholdTable] = PrivateAttr(default=None)
+    _consumables_per_hour: float = PrivateAttr(default=0.0)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._cut_speed = _compile(self.cut_speed_table)
+        tube_part = 0.0
+        if self.laser_tube_life_hours > 0:
+            tube_part = self.laser_tube_cost / self.laser_tube_life_hours
+        power_part = self.power_cost_per_kwh * self.power_consumption_kwh
+        self._consumables_per_hour = float(tube_part + power_part)
+
     @property
     def consumables_per_hour(self) -> float:
         """
         Себестоимость расходников в руб./час:
         трубка + электроэнергия.
         """
-        tube_part = 0.0
-        if self.laser_tube_life_hours > 0:
-            tube_part = self.laser_tube_cost / self.laser_tube_life_hours
-        power_part = self.power_cost_per_kwh * self.power_consumption_kwh
-        return float(tube_part + power_part)
+        return self._consumables_per_hour
 
     def get_cut_speed(self, thickness_mm: float) -> float:
         """
-        Скорость резки (м/час) в зависимости от толщины, через LookupTable.
+        Скорость резки (м/час) в зависимости от толщины, по скомпилированной таблице.
         """
-        if not self.cut_speed_table:
+        if self._cut_speed is None:
             return 0.0
-        table = LookupTable(self.cut_speed_table)
-        return float(table.find(float(thickness_mm)))
+        return self._cut_speed.find(float(thickness_mm))
 
     def get_grave_speed(self, resolution_index: int) -> float:
         """
@@ -234,6 +235,7 @@ class EquipmentCatalog:
     def add(self, spec: EquipmentSpec) -> None:
         self._items[spec.code] = spec
 
+    @traced()
     def get(self, code: str) -> EquipmentSpec:
         try:
             return self._items[code]
@@ -3,9 +3,8 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import json5
-
 from common.currencies import parse_currency
+from common.data_store import load_json
 from .base import EquipmentCatalog, EquipmentSpec, LaserSpec
 
 
@@ -13,8 +12,7 @@ DATA_DIR = Path(__file__).parent.parent / "data" / "equipment"
 
 
 def _load_json(path: Path) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json5.load(f)
+    return load_json(f"equipment/{path.name}")
 
 
 def _first_process_per_hour(value: Any) -> float:
@@ -86,12 +84,13 @@ def _parse_pairs(value: Any) -> Optional[List[Tuple[float, float]]]:
     return pairs or None
 
 
-def load_laser_catalog() -> EquipmentCatalog:
+def load_laser_catalog(data: Optional[Dict[str, Any]] = None) -> EquipmentCatalog:
     """
     Загрузить каталог лазеров из data/equipment/laser.json.
+    data — уже разобранное содержимое файла (по умолчанию из common.data_store).
     """
-    path = DATA_DIR / "laser.json"
-    data = _load_json(path)
+    if data is None:
+        data = _load_json(DATA_DIR / "laser.json")
 
     catalog = EquipmentCatalog(category="laser")
 
@@ -145,13 +144,15 @@ def load_laser_catalog() -> EquipmentCatalog:
     return catalog
 
 
-def load_generic_catalog(filename: str) -> EquipmentCatalog:
+def load_generic_catalog(filename: str, data: Optional[Dict[str, Any]] = None) -> EquipmentCatalog:
     """
     Загрузить каталог произвольного оборудования из data/equipment/{filename}.
     Использует базовую модель EquipmentSpec.
+    data — уже разобранное содержимое файла (по умолчанию из common.data_store).
     """
     path = DATA_DIR / filename
-    data = _load_json(path)
+    if data is None:
+        data = _load_json(path)
 
     category = path.stem
     catalog = EquipmentCatalog(category=category)
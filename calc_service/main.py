@@ -1,21 +1,52 @@
 """
 FastAPI-сервис калькуляторов.
 
-Эндпоинты: список калькуляторов, расчёт по slug, опции для формы.
-CORS для insain.ru. Ошибки: 404 (неизвестный slug), 400 (ValueError), 500.
+Эндпоинты: список калькуляторов, расчёт по slug (в т.ч. пакетный), опции для формы.
+CORS для insain.ru. Ошибки: 404 (неизвестный slug), 400 (ValueError), 500;
+429 / 503 — лимит запросов по IP и перегрузка (common/admission.py).
 """
 
 from __future__ import annotations
 
+import hmac
 import logging
+import os
+import signal
 import sys
-from typing import Any, Dict, List, Optional
-
-from fastapi import FastAPI, Request, HTTPException
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from fastapi import FastAPI, Header, Query, Request, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
-from calculators import CALCULATORS, get_calculator
+from calculators import CALCULATORS, get_calculator, schema_registry
+from common import admission, calc_context, generation, holidays, metrics
+from common.choice_index import ChoiceIndex
+from common.result_cache import RESULT_CACHE, expand_list_params
+from common.single_flight import SINGLE_FLIGHT
+from common.trace import tracing
+from config import (
+    ADMIN_TOKEN,
+    CALC_BATCH_MAX_ITEMS,
+    CALC_BATCH_WORKERS,
+    CALC_INTERNAL_IPS,
+    CALC_INTERNAL_QUEUE_SIZE,
+    CALC_INTERNAL_RESERVED,
+    CALC_INTERNAL_TOKEN,
+    CALC_MAX_CONCURRENT,
+    CALC_QUEUE_SIZE,
+    CALC_QUEUE_TIMEOUT,
+    CALC_RATE_BURST,
+    CALC_RATE_LIMIT,
+    CALC_TRUSTED_PROXIES,
+    DATA_WATCH_INTERVAL,
+    METADATA_MAX_AGE,
+)
 from materials import ALL_MATERIALS, MaterialCatalog, MaterialSpec
 
 logging.basicConfig(
@@ -25,10 +56,74 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _warm_schemas(gen: generation.DataGeneration) -> None:
+    """Построить схемы всех калькуляторов для поколения gen (см. calculators.schema_registry)."""
+    started = time.perf_counter()
+    with generation.pinned(gen):
+        errors = schema_registry.warm(CALCULATORS.values())
+    logger.info(
+        "Схемы калькуляторов построены для поколения %s за %.2f с (ошибок: %s)",
+        gen.number,
+        time.perf_counter() - started,
+        len(errors),
+    )
+
+
+def _watch_data(interval: float) -> None:
+    """Фоновый наблюдатель: перезагрузить справочники, если файлы data/ изменились."""
+    while True:
+        time.sleep(interval)
+        try:
+            new = generation.reload_if_changed()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Перезагрузка справочников не удалась, остаётся текущее поколение: %s", exc)
+            continue
+        if new is not None:
+            logger.info("Справочники перезагружены (наблюдатель): поколение %s", new.number)
+            _warm_schemas(new)
+
+
+def _master_pid() -> Optional[int]:
+    """PID мастера server.py, если процесс — его воркер (иначе None)."""
+    return getattr(app.state, "master_pid", None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Собрать первое поколение справочников и схемы калькуляторов до первого запроса
+    _warm_schemas(generation.current())
+    # Под server.py справочники перезагружает мастер (воркеры заменяются целиком)
+    if DATA_WATCH_INTERVAL > 0 and _master_pid() is None:
+        threading.Thread(
+            target=_watch_data, args=(DATA_WATCH_INTERVAL,), name="data-watcher", daemon=True
+        ).start()
+    yield
+
+
 app = FastAPI(
     title="Калькуляторы Insain",
     description="API расчёта стоимости продукции (печать, резка, ламинация и др.)",
     version="1.0",
+    lifespan=lifespan,
+)
+
+# Лимит запросов по IP и очередь с приоритетом бота (common/admission.py). Добавлен до CORS,
+# чтобы ответы 429/503 тоже шли с CORS-заголовками и сайт видел статус, а не ошибку CORS.
+RATE_LIMITER = admission.RateLimiter(CALC_RATE_LIMIT, CALC_RATE_BURST)
+ADMISSION_QUEUE = admission.AdmissionQueue(
+    CALC_MAX_CONCURRENT,
+    reserved=CALC_INTERNAL_RESERVED,
+    queue_sizes={admission.INTERNAL: CALC_INTERNAL_QUEUE_SIZE, admission.PUBLIC: CALC_QUEUE_SIZE},
+    timeout=CALC_QUEUE_TIMEOUT,
+)
+app.add_middleware(
+    admission.AdmissionMiddleware,
+    limiter=RATE_LIMITER,
+    queue=ADMISSION_QUEUE,
+    internal_ips=CALC_INTERNAL_IPS,
+    internal_token=CALC_INTERNAL_TOKEN,
+    trusted_proxies=CALC_TRUSTED_PROXIES,
 )
 
 app.add_middleware(
@@ -42,66 +137,351 @@ app.add_middleware(
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Логирование запросов в stdout."""
+    """Логирование запросов в stdout и время обработки по маршрутам (метрика calc_http_request_seconds)."""
     logger.info("%s %s", request.method, request.url.path)
-    response = await call_next(request)
-    return response
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Шаблон маршрута (/api/v1/calc/{slug}), а не путь — число серий метрики ограничено
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, request.method, route, str(status))
+
+
+def _metadata_response(
+    schema: schema_registry.FrozenSchema,
+    if_none_match: Optional[str],
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Готовый JSON из реестра схем с ETag и Cache-Control.
+
+    Если If-None-Match совпадает с ETag — 304 без тела.
+    """
+    headers = {"ETag": schema.etag, "Cache-Control": f"public, max-age={METADATA_MAX_AGE}"}
+    headers.update(extra_headers or {})
+    if if_none_match is not None and _etag_matches(if_none_match, schema.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=schema.json, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Слабое сравнение If-None-Match (RFC 9110): список тегов через запятую или "*"."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
 
 
 @app.get("/api/v1/calculators")
-def list_calculators() -> list[Dict[str, Any]]:
+def list_calculators(if_none_match: Optional[str] = Header(default=None)) -> Response:
     """Список калькуляторов: slug, name, description, keywords."""
-    return [
-        {
-            "slug": calc.slug,
-            "name": calc.name,
-            "description": calc.description,
-            # Ключевые слова используются агентом/фронтом как подсказки при выборе калькулятора.
-            # Поле опциональное, поэтому возвращаем только строковые значения.
-            "keywords": list(getattr(calc, "keywords", []) or []),
-        }
-        for calc in CALCULATORS.values()
-        if getattr(calc, "is_public", True)
-    ]
+    return _metadata_response(schema_registry.calculator_list(CALCULATORS.values()), if_none_match)
+
+
+def _schema_response(slug: str, part: str, if_none_match: Optional[str]) -> Response:
+    """Схема из реестра (строится один раз на поколение данных)."""
+    calc = get_calculator(slug)  # KeyError → 404
+    return _metadata_response(schema_registry.get_schema(calc, part), if_none_match)
 
 
 @app.get("/api/v1/options/{slug}")
-def get_options(slug: str) -> Dict[str, Any]:
+def get_options(slug: str, if_none_match: Optional[str] = Header(default=None)) -> Response:
     """Опции для формы калькулятора (материалы, режимы и т.д.)."""
-    calc = get_calculator(slug)  # KeyError → 404
-    return calc.get_options()
+    return _schema_response(slug, "options", if_none_match)
 
 
 @app.get("/api/v1/param_schema/{slug}")
-def get_param_schema(slug: str) -> Dict[str, Any]:
+def get_param_schema(slug: str, if_none_match: Optional[str] = Header(default=None)) -> Response:
     """
     Детальная схема параметров калькулятора для агента / фронтенда.
 
     Возвращает структуру с описанием параметров (обязательность, дефолты, источники).
     """
-    calc = get_calculator(slug)  # KeyError → 404
-    return calc.get_param_schema()
+    return _schema_response(slug, "param_schema", if_none_match)
 
 
 @app.get("/api/v1/tool_schema/{slug}")
-def get_tool_schema(slug: str) -> Dict[str, Any]:
+def get_tool_schema(slug: str, if_none_match: Optional[str] = Header(default=None)) -> Response:
     """Схема инструмента для function calling (name, description, parameters)."""
-    calc = get_calculator(slug)  # KeyError → 404
-    return calc.get_tool_schema()
+    return _schema_response(slug, "tool_schema", if_none_match)
 
 
 @app.get("/api/v1/llm_prompt/{slug}")
-def get_llm_prompt(slug: str) -> Dict[str, str]:
+def get_llm_prompt(slug: str, if_none_match: Optional[str] = Header(default=None)) -> Response:
     """Дополнительный промпт-алгоритм расчёта для LLM (пусто, если не задан)."""
-    calc = get_calculator(slug)  # KeyError → 404
-    return {"slug": slug, "prompt": calc.get_llm_prompt()}
+    return _schema_response(slug, "llm_prompt", if_none_match)
+
+
+@app.get("/api/v1/bundle")
+def get_bundle(
+    accept_encoding: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    """
+    Все метаданные публичных калькуляторов одним ответом: slug, name, description,
+    keywords, param_schema, options, tool_schema, llm_prompt.
+
+    Агент загружает его при старте вместо 4 запросов на калькулятор.
+    Клиентам с Accept-Encoding: gzip отдаётся заранее сжатый вариант.
+    """
+    if _accepts_gzip(accept_encoding):
+        schema = schema_registry.bundle_gzip(CALCULATORS.values())
+        extra = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    else:
+        schema = schema_registry.bundle(CALCULATORS.values())
+        extra = {"Vary": "Accept-Encoding"}
+    return _metadata_response(schema, if_none_match, extra)
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Разрешён ли gzip по Accept-Encoding (gzip или *, без q=0)."""
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        name, _, value = params.strip().partition("=")
+        try:
+            if name.strip().lower() == "q" and float(value) <= 0:
+                continue
+        except ValueError:
+            continue
+        return True
+    return False
 
 
 @app.post("/api/v1/calc/{slug}")
-def calc(slug: str, body: Dict[str, Any]) -> Dict[str, Any]:
-    """Расчёт: JSON body с параметрами, возврат результата (cost, price, time_hours, ...)."""
+def calc(
+    slug: str,
+    body: Dict[str, Any],
+    trace: bool = Query(default=False, description="Вернуть дерево этапов расчёта с временем (ключ trace)"),
+) -> Dict[str, Any]:
+    """
+    Расчёт: JSON body с параметрами, возврат результата (cost, price, time_hours, ...).
+
+    ?trace=1 — расчёт без кэша результатов с трассировкой (common.trace): в ответ
+    добавляется "trace" — дерево этапов (вложенные калькуляторы, операции
+    process_tools, раскладки, поиск в каталогах) с числом вызовов и временем, мс.
+    """
     calculator = get_calculator(slug)  # KeyError → 404
-    return calculator.execute(body)  # ValueError → 400
+    if not trace:
+        return calculator.execute(body)  # ValueError → 400
+    with tracing(force=True) as tracer:
+        result = calculator.execute(body, use_cache=False)
+    return {**result, "trace": tracer.to_dict()}
+
+
+@app.get("/metrics")
+def prometheus_metrics() -> Response:
+    """
+    Метрики процесса в текстовом формате Prometheus: время HTTP-запросов по маршрутам,
+    время расчётов по калькуляторам (с признаком попадания в кэш) и гистограммы
+    этапов трассируемых расчётов (?trace=1 и выборка CALC_TRACE_SAMPLE_RATE).
+    """
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/api/v1/cache/stats")
+def cache_stats() -> Dict[str, Any]:
+    """
+    Счётчики кэша результатов расчёта (hits, misses, evictions, размер, версия данных),
+    мемоизации вложенных вызовов в пределах запроса (request_memo) и склейки
+    одинаковых одновременных расчётов (single_flight: leaders, coalesced, in_flight).
+    """
+    return {
+        **RESULT_CACHE.stats(),
+        "request_memo": calc_context.STATS.snapshot(),
+        "single_flight": SINGLE_FLIGHT.stats(),
+    }
+
+
+@app.get("/api/v1/data/generation")
+def data_generation() -> Dict[str, Any]:
+    """Текущее поколение справочников: номер, хэш data/, время сборки, источник (снапшот/JSON)."""
+    return {**generation.current().info(), "changed_files": generation.changed_files()}
+
+
+def _admin_allowed(request: Request, token: Optional[str]) -> bool:
+    """С ADMIN_TOKEN — только совпадающий X-Admin-Token; без него — только внутренние клиенты."""
+    if ADMIN_TOKEN:
+        return token is not None and hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+    return admission.request_lane(request) == admission.INTERNAL
+
+
+@app.post("/api/v1/data/reload")
+def data_reload(request: Request, x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    """
+    Горячая перезагрузка справочников data/ без рестарта.
+
+    Новое поколение собирается, пока текущее обслуживает запросы, затем
+    подменяется атомарно. Невалидные файлы → 400, остаётся старое поколение.
+
+    Под server.py перезагрузку выполняет мастер (SIGHUP): он собирает поколение
+    и заменяет воркеров; ответ — текущее поколение с "reload": "scheduled".
+
+    Перезагрузка сбрасывает кэш расчётов (а под server.py — перезапускает воркеров),
+    поэтому публичным клиентам без X-Admin-Token отвечает 403.
+    """
+    if not _admin_allowed(request, x_admin_token):
+        raise HTTPException(status_code=403, detail="Неверный X-Admin-Token")
+    master_pid = _master_pid()
+    if master_pid is not None:
+        os.kill(master_pid, signal.SIGHUP)
+        return {**generation.current().info(), "reload": "scheduled"}
+    previous = generation.current().number
+    new = generation.reload()  # SnapshotError (ValueError) → 400
+    logger.info("Справочники перезагружены: поколение %s → %s (%.2f с)", previous, new.number, new.build_seconds)
+    _warm_schemas(new)
+    return new.info()
+
+
+class CalcBatchItem(BaseModel):
+    slug: str                                              # калькулятор
+    params: Dict[str, Any] = Field(default_factory=dict)   # параметры, как в /calc/{slug}
+
+
+class CalcBatchRequest(BaseModel):
+    items: List[CalcBatchItem] = Field(min_length=1, max_length=CALC_BATCH_MAX_ITEMS)
+
+
+# Общий пул для пакетных расчётов: ограничивает число параллельных расчётов
+# одного запроса и не даёт пачке занять весь пул потоков FastAPI.
+_batch_executor = ThreadPoolExecutor(
+    max_workers=CALC_BATCH_WORKERS,
+    thread_name_prefix="calc-batch",
+)
+
+
+def _calc_batch_item(item: CalcBatchItem) -> Dict[str, Any]:
+    """
+    Один элемент пакета: результат execute() или ошибка с HTTP-статусом,
+    который вернул бы одиночный /api/v1/calc/{slug}.
+    """
+    try:
+        calculator = get_calculator(item.slug)
+        result = calculator.execute(item.params)
+    except KeyError as exc:
+        return {"slug": item.slug, "status": 404, "error": str(exc)}
+    except ValueError as exc:
+        return {"slug": item.slug, "status": 400, "error": str(exc)}
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Unhandled error in batch item %s: %s", item.slug, exc)
+        return {"slug": item.slug, "status": 500, "error": "Внутренняя ошибка сервера"}
+    return {"slug": item.slug, "status": 200, "result": result}
+
+
+@app.post("/api/v1/calc_batch")
+def calc_batch(request: CalcBatchRequest) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Пакетный расчёт: список {slug, params} → список результатов в том же порядке.
+
+    Каждый элемент считается независимо (ошибка одного не влияет на остальные):
+        {"slug": "laser", "status": 200, "result": {...как в /calc/{slug}...}}
+        {"slug": "laser", "status": 400, "error": "..."}
+    """
+    results = list(_batch_executor.map(_calc_batch_item, request.items))
+    return {"items": results}
+
+
+class PriceLadderRequest(BaseModel):
+    params: Dict[str, Any] = Field(default_factory=dict)  # параметры изделия, как в /calc/{slug}
+    quantities: List[int] = Field(min_length=1, max_length=50)  # тиражи, например [50, 100, 250]
+
+
+@app.post("/api/v1/price_ladder/{slug}")
+def price_ladder(slug: str, request: PriceLadderRequest) -> Dict[str, Any]:
+    """
+    Ценовая лестница: cost, price, unit_price и time_ready для списка тиражей.
+
+    Тиражонезависимая часть (подбор формата, раскладка, оборудование)
+    считается один раз — см. BaseCalculator.calculate_ladder().
+    """
+    if any(q < 1 for q in request.quantities):
+        raise ValueError("Тиражи должны быть положительными")
+    calculator = get_calculator(slug)  # KeyError → 404
+    with generation.pinned(), calc_context.request_context():
+        # Строки-списки "30,40" (как из share_url) — в массивы, как в BaseCalculator.execute()
+        params = expand_list_params(request.params, schema_registry.list_param_names(calculator))
+        results = calculator.calculate_ladder(params, request.quantities)  # ValueError → 400
+    return {
+        "slug": slug,
+        "items": [
+            {
+                "quantity": q,
+                "cost": r.get("cost"),
+                "price": r.get("price"),
+                "unit_price": r.get("unit_price"),
+                "time_ready": r.get("time_ready"),
+            }
+            for q, r in zip(request.quantities, results)
+        ],
+    }
+
+
+def _calendar_date(d: Optional[date]) -> date:
+    """Дата запроса к календарю (по умолчанию сегодня); дальше MAX_DISTANCE_DAYS от сегодня — 400."""
+    today = date.today()
+    if d is None:
+        return today
+    if abs((d - today).days) > holidays.MAX_DISTANCE_DAYS:
+        raise ValueError(f"Дата {d.isoformat()} дальше {holidays.MAX_DISTANCE_DAYS} дней от сегодня")
+    return d
+
+
+@app.get("/api/v1/calendar/ready_date")
+def calendar_ready_date(
+    days: Optional[int] = Query(
+        default=None,
+        ge=-holidays.MAX_SHIFT_DAYS,
+        le=holidays.MAX_SHIFT_DAYS,
+        description="Рабочих дней (отрицательное — назад)",
+    ),
+    hours: Optional[float] = Query(
+        default=None,
+        le=holidays.MAX_SHIFT_DAYS * 24,
+        allow_inf_nan=False,
+        description="Рабочих часов (неполный день — целый)",
+    ),
+    hours_per_day: float = Query(default=8.0, gt=0, le=24, allow_inf_nan=False),
+    start: Optional[date] = Query(default=None, description="Дата отсчёта, по умолчанию сегодня"),
+) -> Dict[str, Any]:
+    """
+    Дата готовности по производственному календарю (common.json, секция calendar):
+    через days рабочих дней или hours рабочих часов после start (start не считается).
+    """
+    if (days is None) == (hours is None):
+        raise ValueError("Укажите ровно один параметр: days или hours")
+    start = _calendar_date(start)
+    if hours is not None:
+        if hours / hours_per_day > holidays.MAX_SHIFT_DAYS:
+            raise ValueError(f"Больше {holidays.MAX_SHIFT_DAYS} рабочих дней")
+        ready = holidays.add_working_hours(start, hours, hours_per_day)
+    else:
+        ready = holidays.add_working_days(start, days)
+    return {
+        "start": start.isoformat(),
+        "ready_date": ready.isoformat(),
+        "working_days": holidays.working_days_between(start, ready),
+    }
+
+
+@app.get("/api/v1/calendar/working_days")
+def calendar_working_days(
+    end: date,
+    start: Optional[date] = Query(default=None, description="Дата отсчёта, по умолчанию сегодня"),
+) -> Dict[str, Any]:
+    """Число рабочих дней в (start, end] по производственному календарю (при end < start — отрицательное)."""
+    start = _calendar_date(start)
+    end = _calendar_date(end)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "working_days": holidays.working_days_between(start, end),
+    }
 
 
 class ChoicesRequest(BaseModel):
@@ -140,48 +520,30 @@ def search_choices(request: ChoicesRequest) -> Dict[str, List[ChoiceItem]]:
 
     calc = get_calculator(request.slug)  # KeyError → 404
 
-    # Получить param_schema и описание параметра
-    param_schema = calc.get_param_schema()
-    params: List[Dict[str, Any]] = param_schema.get("params") or []
-    param_def = next((p for p in params if p.get("name") == request.param), None)
-
-    if not param_def:
-        raise HTTPException(status_code=404, detail=f"Parameter not found: {request.param}")
-
-    choices_config: Dict[str, Any] = param_def.get("choices") or {}
-
-    if "inline" in choices_config:
-        # Статические choices (например, режимы производства).
-        items_raw: List[Dict[str, Any]] = choices_config["inline"]
-    elif "source" in choices_config:
-        source = str(choices_config["source"])
-        items_raw = _resolve_choices_source(source, request.query, request.filters)
-    else:
-        raise HTTPException(status_code=400, detail="No choices defined for this parameter")
-
-    # Фильтр по query по title и description (поиск по токенам).
-    if request.query:
-        # Разбиваем запрос на токены по пробелам и ищем каждый токен
-        # сперва только в title, затем (если пусто) в title+description.
-        tokens = [t for t in request.query.lower().split() if t]
-        filtered_title: List[Dict[str, Any]] = []
-        filtered_all: List[Dict[str, Any]] = []
-        for item in items_raw:
-            title = str(item.get("title") or "").lower()
-            desc = str(item.get("description") or "").lower()
-            if not tokens:
-                continue
-            if all(token in title for token in tokens):
-                filtered_title.append(item)
-            haystack = f"{title} {desc}"
-            if all(token in haystack for token in tokens):
-                filtered_all.append(item)
-        # Если есть точные совпадения только по title — используем их,
-        # иначе fallback к более широкому совпадению по title+description.
-        items_raw = filtered_title or filtered_all
-
-    # Лимит
-    items_raw = items_raw[: max(1, request.limit)]
+    # Схема, источник и индекс — из одного поколения: перезагрузка посреди запроса
+    # не должна запомнить индекс нового поколения в старом (и наоборот).
+    with generation.pinned() as current:
+        choices_config = schema_registry.choices_by_param(calc).get(request.param)
+        if choices_config is None:
+            raise HTTPException(status_code=404, detail=f"Parameter not found: {request.param}")
+
+        predicate = None
+        if "inline" in choices_config:
+            # Статические choices (например, режимы производства).
+            index = current.memo(
+                f"choices_index:{calc.slug}:{request.param}",
+                lambda: ChoiceIndex(choices_config["inline"]),
+            )
+        elif "source" in choices_config:
+            source = str(choices_config["source"])
+            index = current.memo(f"choices_index:{source}", lambda: _resolve_choices_source(source))
+            predicate = _choices_filter(request.filters)
+        else:
+            raise HTTPException(status_code=400, detail="No choices defined for this parameter")
+
+        # Поиск по токенам запроса: сперва в title, затем (если пусто) в title+description;
+        # результат отсортирован по релевантности.
+        items_raw = index.search(request.query, max(1, request.limit), predicate)
 
     items: List[ChoiceItem] = []
     for item in items_raw:
@@ -202,13 +564,9 @@ def search_choices(request: ChoicesRequest) -> Dict[str, List[ChoiceItem]]:
     return {"items": items}
 
 
-def _resolve_choices_source(
-    source: str,
-    query: Optional[str],
-    filters: Optional[Dict[str, Any]],
-) -> List[Dict[str, Any]]:
+def _resolve_choices_source(source: str) -> ChoiceIndex:
     """
-    Резолвинг source в список вариантов.
+    Поисковый индекс для source.
 
     Поддерживаемые источники:
     - "materials:hardsheet" → все материалы из каталога hardsheet
@@ -226,28 +584,13 @@ def _resolve_choices_source(
         if not catalog:
             raise HTTPException(status_code=400, detail=f"Unknown material catalog: {catalog_name}")
 
-        all_materials: Dict[str, MaterialSpec] = catalog.list_all()
-        materials: List[MaterialSpec] = list(all_materials.values())
+        materials: Iterable[MaterialSpec] = catalog.list_all().values()
 
         # Фильтрация по "секции", если указана: используем поле category.
         if section:
             materials = [m for m in materials if getattr(m, "category", None) == section]
 
-        # Дополнительные фильтры (например, max_thickness_mm).
-        if filters:
-            max_thickness = filters.get("max_thickness_mm")
-            if max_thickness is not None:
-                try:
-                    limit = float(max_thickness)
-                    materials = [
-                        m
-                        for m in materials
-                        if m.thickness is not None and m.thickness <= limit
-                    ]
-                except Exception:
-                    pass
-
-        return [
+        return ChoiceIndex(
             {
                 "id": m.code,
                 "title": m.title,
@@ -256,12 +599,26 @@ def _resolve_choices_source(
                 "thickness": m.thickness,
             }
             for m in materials
-        ]
+        )
 
     # Заглушка для будущих типов источников (например, presswall:variants).
     raise HTTPException(status_code=400, detail=f"Unknown source: {source}")
 
 
+def _choices_filter(filters: Optional[Dict[str, Any]]) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """Дополнительные фильтры вариантов (например, max_thickness_mm)."""
+    if not filters:
+        return None
+    max_thickness = filters.get("max_thickness_mm")
+    if max_thickness is None:
+        return None
+    try:
+        limit = float(max_thickness)
+    except Exception:
+        return None
+    return lambda item: item.get("thickness") is not None and item["thickness"] <= limit
+
+
 @app.exception_handler(ValueError)
 def value_error_handler(request: Request, exc: ValueError):
     """Ошибка расчёта или неизвестный slug → 400."""
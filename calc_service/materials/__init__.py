@@ -1,61 +1,76 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, Mapping
 
+from common.generation import CatalogMap, CatalogRef
 from .base import MaterialCatalog, MaterialSpec
 from .loader import load_catalog
 
-# Загружаем все каталоги материалов при импорте модуля.
-hardsheet: MaterialCatalog = load_catalog("hardsheet.json")
-roll: MaterialCatalog = load_catalog("roll.json")
-sheet: MaterialCatalog = load_catalog("sheet.json")
-offset_promo: MaterialCatalog = load_catalog("offset_promo.json")
-laminat: MaterialCatalog = load_catalog("laminat.json")
-profile: MaterialCatalog = load_catalog("profile.json")
-presswall: MaterialCatalog = load_catalog("presswall.json")
-calendar: MaterialCatalog = load_catalog("calendar.json")
-magnet: MaterialCatalog = load_catalog("magnet.json")
-keychain: MaterialCatalog = load_catalog("keychain.json")
-mug: MaterialCatalog = load_catalog("mug.json")
-misc: MaterialCatalog = load_catalog("misc.json")
-epoxy: MaterialCatalog = load_catalog("epoxy.json")
-attachment: MaterialCatalog = load_catalog("attachment.json")
-pack: MaterialCatalog = load_catalog("pack.json")
-pocket: MaterialCatalog = load_catalog("pocket.json")
-flag: MaterialCatalog = load_catalog("flag.json")
-pins: MaterialCatalog = load_catalog("pins.json")
-tape: MaterialCatalog = load_catalog("tape.json")
-plaque: MaterialCatalog = load_catalog("plaque.json")
-puzzle: MaterialCatalog = load_catalog("puzzle.json")
-pennant: MaterialCatalog = load_catalog("pennant.json")
-
-
-ALL_MATERIALS: Dict[str, MaterialCatalog] = {
-    "hardsheet": hardsheet,
-    "roll": roll,
-    "sheet": sheet,
-    "offset_promo": offset_promo,
-    "laminat": laminat,
-    "profile": profile,
-    "presswall": presswall,
-    "calendar": calendar,
-    "magnet": magnet,
-    "keychain": keychain,
-    "mug": mug,
-    "misc": misc,
-    "epoxy": epoxy,
-    "attachment": attachment,
-    "pack": pack,
-    "pocket": pocket,
-    "flag": flag,
-    "pins": pins,
-    "tape": tape,
-    "plaque": plaque,
-    "puzzle": puzzle,
-    "pennant": pennant,
+# Категория → файл data/materials/*.json
+CATALOG_FILES: Dict[str, str] = {
+    "hardsheet": "hardsheet.json",
+    "roll": "roll.json",
+    "sheet": "sheet.json",
+    "offset_promo": "offset_promo.json",
+    "laminat": "laminat.json",
+    "profile": "profile.json",
+    "presswall": "presswall.json",
+    "calendar": "calendar.json",
+    "magnet": "magnet.json",
+    "keychain": "keychain.json",
+    "mug": "mug.json",
+    "misc": "misc.json",
+    "epoxy": "epoxy.json",
+    "attachment": "attachment.json",
+    "pack": "pack.json",
+    "pocket": "pocket.json",
+    "flag": "flag.json",
+    "pins": "pins.json",
+    "tape": "tape.json",
+    "plaque": "plaque.json",
+    "puzzle": "puzzle.json",
+    "pennant": "pennant.json",
 }
 
 
+def build_catalogs() -> Dict[str, MaterialCatalog]:
+    """Загрузить все каталоги материалов (вызывается при сборке поколения данных)."""
+    return {name: load_catalog(filename) for name, filename in CATALOG_FILES.items()}
+
+
+def _ref(name: str) -> MaterialCatalog:
+    return CatalogRef("materials", name)  # type: ignore[return-value]
+
+
+# Каталоги текущего поколения данных (common.generation): после горячей
+# перезагрузки `from materials import hardsheet` видит уже новые данные.
+hardsheet: MaterialCatalog = _ref("hardsheet")
+roll: MaterialCatalog = _ref("roll")
+sheet: MaterialCatalog = _ref("sheet")
+offset_promo: MaterialCatalog = _ref("offset_promo")
+laminat: MaterialCatalog = _ref("laminat")
+profile: MaterialCatalog = _ref("profile")
+presswall: MaterialCatalog = _ref("presswall")
+calendar: MaterialCatalog = _ref("calendar")
+magnet: MaterialCatalog = _ref("magnet")
+keychain: MaterialCatalog = _ref("keychain")
+mug: MaterialCatalog = _ref("mug")
+misc: MaterialCatalog = _ref("misc")
+epoxy: MaterialCatalog = _ref("epoxy")
+attachment: MaterialCatalog = _ref("attachment")
+pack: MaterialCatalog = _ref("pack")
+pocket: MaterialCatalog = _ref("pocket")
+flag: MaterialCatalog = _ref("flag")
+pins: MaterialCatalog = _ref("pins")
+tape: MaterialCatalog = _ref("tape")
+plaque: MaterialCatalog = _ref("plaque")
+puzzle: MaterialCatalog = _ref("puzzle")
+pennant: MaterialCatalog = _ref("pennant")
+
+
+ALL_MATERIALS: Mapping[str, MaterialCatalog] = CatalogMap("materials")  # type: ignore[assignment]
+
+
 def get_material(category: str, code: str) -> MaterialSpec:
     """
     Получить материал по категории и коду.
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
-from common.helpers import find_in_table
+from common.helpers import ThresholdTable
+from common.trace import traced
 
 
 class MaterialSpec(BaseModel):
@@ -41,6 +42,13 @@ class MaterialSpec(BaseModel):
 
     available: bool = True
 
+    # cost_tiers, скомпилированные при создании спецификации
+    _cost_table: Optional[ThresholdTable] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.cost_tiers:
+            self._cost_table = ThresholdTable(self.cost_tiers)
+
     @property
     def name(self) -> str:
         """
@@ -53,11 +61,11 @@ class MaterialSpec(BaseModel):
         """
         Вернуть стоимость единицы (материала или площади) с учётом градаций.
 
-        Если заданы cost_tiers, используется find_in_table([(порог, цена), ...], quantity_or_area).
+        Если заданы cost_tiers, цена берётся по первому порогу ≥ quantity_or_area.
         Иначе возвращается фиксированная cost (или 0.0, если она не указана).
         """
-        if self.cost_tiers:
-            return float(find_in_table(self.cost_tiers, float(quantity_or_area)))
+        if self._cost_table is not None:
+            return self._cost_table.find(float(quantity_or_area))
         if self.cost is not None:
             return float(self.cost)
         return 0.0
@@ -81,6 +89,7 @@ class MaterialCatalog:
         self._items[spec.code] = spec
         self._groups.setdefault(spec.group, []).append(spec)
 
+    @traced()
     def get(self, code: str) -> MaterialSpec:
         """
         Найти материал по коду. Бросает KeyError, если не найден.
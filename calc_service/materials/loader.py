@@ -3,8 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import json5
-
+from common.data_store import load_json
 from .base import MaterialCatalog, MaterialSpec
 
 
@@ -79,7 +78,7 @@ def parse_cost(raw_cost: Any) -> Tuple[Optional[float], Optional[List[Tuple[floa
     raise TypeError("cost должен быть числом или списком [threshold, value]")
 
 
-def load_catalog(filename: str) -> MaterialCatalog:
+def load_catalog(filename: str, data: Optional[Dict[str, Any]] = None) -> MaterialCatalog:
     """
     Загрузить каталог материалов из файла data/materials/{filename}.
 
@@ -100,13 +99,15 @@ def load_catalog(filename: str) -> MaterialCatalog:
             ...
         }
       В этом случае description берётся из name, а title формируется автоматически.
+
+    data — уже разобранное содержимое файла (сборка снапшота данных);
+    по умолчанию берётся из common.data_store.
     """
     path = DATA_DIR / filename
-    if not path.is_file():
-        raise FileNotFoundError(path)
-
-    with open(path, "r", encoding="utf-8") as f:
-        data: Dict[str, Any] = json5.load(f)
+    if data is None:
+        if not path.is_file():
+            raise FileNotFoundError(path)
+        data = load_json(f"materials/{filename}")
 
     # Имя категории — имя JSON-файла без расширения
     category = path.stem
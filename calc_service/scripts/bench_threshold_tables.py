@@ -0,0 +1,99 @@
+"""
+Микро-бенчмарк пороговых таблиц: прежний поиск (сортировка таблицы и линейный
+проход на каждый вызов) против ThresholdTable, скомпилированной при загрузке.
+
+Запуск: из корня calc_service: python scripts/bench_threshold_tables.py [--number 200000]
+
+Таблицы берутся из реальных справочников (брак лазера, скорость резки плоттера,
+листы/час принтера, ценовые градации материалов).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.helpers import ThresholdTable  # noqa: E402
+from equipment import ALL_EQUIPMENT  # noqa: E402
+from materials import ALL_MATERIALS  # noqa: E402
+
+
+def _linear_find(data: Sequence[Sequence[float]], value: float) -> float:
+    """Поиск как в прежнем LookupTable: нормализация и сортировка на каждый вызов."""
+    table: List[Tuple[float, float]] = sorted(
+        [(float(th), float(val)) for th, val in data],
+        key=lambda pair: pair[0],
+    )
+    last_val = table[-1][1]
+    for threshold, val in table:
+        if value <= threshold:
+            return val
+    return last_val
+
+
+def _collect_tables() -> List[Tuple[str, Sequence[Sequence[float]]]]:
+    tables: List[Tuple[str, Sequence[Sequence[float]]]] = []
+    for category, catalog in ALL_EQUIPMENT.items():
+        for code, spec in catalog._items.items():  # type: ignore[attr-defined]
+            for field in ("defect_table", "process_per_hour_table", "meter_per_hour_table", "sheets_per_hour_table"):
+                table = getattr(spec, field, None)
+                if table:
+                    tables.append((f"{category}.{code}.{field}", table))
+            if getattr(spec, "cut_speed_table", None):
+                tables.append((f"{category}.{code}.cut_speed_table", spec.cut_speed_table))
+    for category, catalog in ALL_MATERIALS.items():
+        for spec in catalog.list_all().values():
+            if spec.cost_tiers:
+                tables.append((f"{category}.{spec.code}.cost_tiers", spec.cost_tiers))
+    return tables
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Сравнение линейного и бисекционного поиска в таблицах порогов")
+    parser.add_argument("--number", type=int, default=200_000, help="число поисков на вариант")
+    args = parser.parse_args(argv)
+
+    tables = _collect_tables()
+    if not tables:
+        print("В справочниках нет таблиц порогов")
+        return 1
+    compiled = [ThresholdTable(rows) for _, rows in tables]
+    # Значения по всему диапазону порогов каждой таблицы, включая выход за последний
+    probes = [
+        (i, rows[j][0] * k)
+        for i, (_, rows) in enumerate(tables)
+        for j in range(len(rows))
+        for k in (0.5, 1.0, 1.5)
+    ]
+
+    for i, value in probes:
+        assert compiled[i].find(value) == _linear_find(tables[i][1], value), (tables[i][0], value)
+
+    n_probes = len(probes)
+
+    def run_linear() -> None:
+        for n in range(args.number):
+            i, value = probes[n % n_probes]
+            _linear_find(tables[i][1], value)
+
+    def run_compiled() -> None:
+        for n in range(args.number):
+            i, value = probes[n % n_probes]
+            compiled[i].find(value)
+
+    linear = min(timeit.repeat(run_linear, number=1, repeat=3))
+    bisect = min(timeit.repeat(run_compiled, number=1, repeat=3))
+    print(f"Таблиц: {len(tables)}, проб: {n_probes}, поисков: {args.number}")
+    print(f"  линейный (сортировка на вызов): {linear * 1e9 / args.number:8.0f} нс/поиск")
+    print(f"  ThresholdTable (бисекция):      {bisect * 1e9 / args.number:8.0f} нс/поиск")
+    print(f"  ускорение: ×{linear / bisect:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
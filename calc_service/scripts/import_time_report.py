@@ -0,0 +1,101 @@
+"""
+Отчёт о времени импорта (python -X importtime) для оператора запуска.
+
+Запускает оператор в отдельном интерпретаторе с -X importtime, разбирает вывод
+и печатает: общее время импортов, самые долгие модули (собственное время),
+модули верхнего уровня по накопленному времени и сводку по пакетам.
+
+Запуск (из каталога calc_service):
+
+    python scripts/import_time_report.py "import main" [--top 15]
+
+Используется тестом бюджета старта (tests/test_startup.py).
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int  # 0 — импорт верхнего уровня в операторе
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Записи из вывода -X importtime (строки заголовка и прочий вывод пропускаются)."""
+    records: List[ImportRecord] = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def run_importtime(statement: str, cwd: Path = ROOT) -> Tuple[List[ImportRecord], str]:
+    """Выполнить statement в новом интерпретаторе с -X importtime; вернуть (записи, stdout)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{statement!r} завершился с кодом {proc.returncode}:\n{proc.stderr[-2000:]}")
+    return parse_importtime(proc.stderr), proc.stdout
+
+
+def cumulative_ms(records: Sequence[ImportRecord], module: str) -> float:
+    """Накопленное время импорта модуля, мс (0, если модуль не импортировался)."""
+    return max((r.cumulative_us for r in records if r.module == module), default=0) / 1000
+
+
+def summary(records: Sequence[ImportRecord], top: int = 15) -> str:
+    total_us = sum(r.self_us for r in records)
+    by_package: Dict[str, int] = defaultdict(int)
+    for r in records:
+        by_package[r.module.split(".", 1)[0]] += r.self_us
+
+    lines = [f"Импортировано модулей: {len(records)}, время импортов: {total_us / 1000:.1f} мс"]
+    lines.append(f"Самые долгие модули (собственное время), топ {top}:")
+    for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+        lines.append(f"  {r.self_us / 1000:8.1f} мс  {r.module}")
+    lines.append("Импорты верхнего уровня (накопленное время):")
+    for r in sorted((r for r in records if r.depth == 0), key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {r.cumulative_us / 1000:8.1f} мс  {r.module}")
+    lines.append(f"По пакетам, топ {top}:")
+    for package, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"  {us / 1000:8.1f} мс  {package}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Отчёт python -X importtime")
+    parser.add_argument("statement", nargs="?", default="import main", help='оператор, например "import main"')
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    records, _ = run_importtime(args.statement)
+    print(f"$ python -X importtime -c {args.statement!r}")
+    print(summary(records, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
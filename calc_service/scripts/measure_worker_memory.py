@@ -0,0 +1,157 @@
+"""
+Замер памяти воркеров calc_service: uvicorn --workers N (каждый воркер сам
+загружает справочники) против server.py (pre-fork: справочники загружены в
+мастере, воркеры делят их через copy-on-write).
+
+Для каждого режима сервер запускается на свободном порту, получает прогревочные
+запросы (схемы, бандл, поиск вариантов, расчёты по всем калькуляторам), затем
+для каждого процесса читается /proc/<pid>/smaps_rollup:
+
+- RSS — резидентная память процесса (общие страницы считаются в каждом);
+- PSS — общие страницы поделены между процессами, сумма PSS = реальный расход;
+- USS — только собственные страницы процесса (Private_Clean + Private_Dirty).
+
+Запуск (Linux, из каталога calc_service):
+
+    python scripts/measure_worker_memory.py --workers 4 [--rounds 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES: Dict[str, Sequence[str]] = {
+    "uvicorn --workers": (sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--workers"),
+    "server.py (pre-fork)": (sys.executable, "server.py", "--host", "127.0.0.1", "--workers"),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _descendants(pid: int) -> List[int]:
+    children: Dict[int, List[int]] = {}
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(stat.parent.name))
+    result: List[int] = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    values: Dict[str, int] = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        key, _, rest = line.partition(":")
+        values[key] = int(rest.split()[0])
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "uss": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def _wait_ready(client: httpx.Client, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if client.get("/api/v1/data/generation").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("сервер не поднялся")
+
+
+def _warm_up(client: httpx.Client, rounds: int) -> int:
+    """Прогревочные запросы; новое соединение на каждый запрос, чтобы нагрузить всех воркеров."""
+    calculators = client.get("/api/v1/calculators").json()
+    requests = 0
+    for _ in range(rounds):
+        for calc in calculators:
+            slug = calc["slug"]
+            with httpx.Client(base_url=client.base_url, timeout=30.0) as conn:
+                conn.get("/api/v1/bundle")
+                conn.get(f"/api/v1/param_schema/{slug}")
+                defaults = {
+                    p["name"]: p["default"]
+                    for p in conn.get(f"/api/v1/param_schema/{slug}").json().get("params", [])
+                    if p.get("default") is not None
+                }
+                conn.post(f"/api/v1/calc/{slug}", json={"quantity": 100, **defaults})
+                conn.post("/api/v1/choices", json={"slug": slug, "param": "material", "query": "а", "limit": 5})
+                requests += 5
+    return requests
+
+
+def measure(mode: str, workers: int, rounds: int) -> Dict[str, object]:
+    port = _free_port()
+    cmd = [*MODES[mode], str(workers), "--port", str(port)]
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30.0) as client:
+            _wait_ready(client)
+            ready = time.perf_counter() - started
+            time.sleep(1.0)  # остальные воркеры
+            requests = _warm_up(client, rounds)
+        pids = [proc.pid, *_descendants(proc.pid)]
+        processes = {pid: _memory_kb(pid) for pid in pids}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+    return {"mode": mode, "ready_seconds": round(ready, 2), "requests": requests, "processes": processes}
+
+
+def _print(report: Dict[str, object]) -> None:
+    processes: Dict[int, Dict[str, int]] = report["processes"]  # type: ignore[assignment]
+    print(f"\n{report['mode']}: готов за {report['ready_seconds']} с, прогрев {report['requests']} запросов")
+    print(f"  {'pid':>7} {'RSS, МБ':>9} {'PSS, МБ':>9} {'USS, МБ':>9}")
+    for pid, mem in processes.items():
+        print(f"  {pid:>7} {mem['rss'] / 1024:9.1f} {mem['pss'] / 1024:9.1f} {mem['uss'] / 1024:9.1f}")
+    total_pss = sum(mem["pss"] for mem in processes.values()) / 1024
+    print(f"  всего (сумма PSS): {total_pss:.1f} МБ")
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Память воркеров: uvicorn --workers против server.py")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=3, help="проходов прогрева по всем калькуляторам")
+    parser.add_argument("--json", action="store_true", help="вывести отчёт в JSON")
+    args = parser.parse_args(argv)
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("Нужен Linux с /proc/<pid>/smaps_rollup")
+        return 1
+    reports = [measure(mode, args.workers, args.rounds) for mode in MODES]
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        for report in reports:
+            _print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
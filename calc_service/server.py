@@ -0,0 +1,257 @@
+"""
+Продакшен-запуск calc_service: мастер с предзагрузкой справочников и N воркеров uvicorn (pre-fork).
+
+Мастер один раз импортирует main — собирает поколение данных (DataStore, каталоги
+материалов и оборудования, калькуляторы) и схемы калькуляторов, — замораживает
+кучу (gc.freeze) и открывает слушающий сокет. Затем через fork() запускает
+воркеров: они получают все эти объекты как общие страницы памяти (copy-on-write)
+и не разбирают json5 заново. gc.freeze() переносит объекты в постоянное
+поколение сборщика мусора, и сборки в воркерах не пишут в их заголовки, т.е. не
+копируют общие страницы.
+
+Запуск (из каталога calc_service):
+
+    python server.py --workers 4 --host 0.0.0.0 --port 8001
+
+Сигналы мастеру:
+- SIGTERM / SIGINT — плавная остановка воркеров;
+- SIGHUP — пересобрать справочники в мастере и плавно заменить воркеров
+  (так же работают DATA_WATCH_INTERVAL и POST /api/v1/data/reload в этом режиме).
+
+Упавший воркер перезапускается. Если воркеры падают сразу после старта (битые данные,
+занятый порт), перезапуск откладывается с экспоненциальной паузой, а после
+MAX_STARTUP_CRASHES таких падений подряд мастер сдаётся и завершается с кодом 1. Только POSIX: на Windows — обычный uvicorn.
+Замер памяти воркеров: scripts/measure_worker_memory.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional, Set
+
+import uvicorn
+
+from config import CALC_HOST, CALC_PORT, CALC_WORKERS, DATA_WATCH_INTERVAL
+
+logger = logging.getLogger("calc_service.server")
+
+# Сколько ждать плавной остановки воркера, прежде чем послать SIGKILL, сек.
+GRACEFUL_TIMEOUT = 30.0
+# Воркер, проживший меньше WORKER_MIN_UPTIME сек., считается упавшим при старте.
+WORKER_MIN_UPTIME = 10.0
+# Пауза перед перезапуском после n-го падения подряд: RESPAWN_BACKOFF * 2**(n-1), не больше RESPAWN_BACKOFF_MAX.
+RESPAWN_BACKOFF = 0.5
+RESPAWN_BACKOFF_MAX = 30.0
+MAX_STARTUP_CRASHES = 10
+
+
+def _bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _freeze_heap() -> None:
+    """Собрать мусор и заморозить все живые объекты перед fork()."""
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+
+class Master:
+    """Мастер-процесс: держит сокет и предзагруженные данные, запускает и заменяет воркеров."""
+
+    def __init__(self, sock: socket.socket, workers: int) -> None:
+        self.sock = sock
+        self.workers = workers
+        self.children: Dict[int, int] = {}  # pid → номер поколения данных воркера
+        self._started: Dict[int, float] = {}  # pid → время запуска (monotonic)
+        self._crashes = 0  # падений при старте подряд
+        self._next_spawn = 0.0  # раньше этого времени упавших воркеров не перезапускать
+        self._retiring: Set[int] = set()  # воркеры, которым отправлен SIGTERM
+        self._stopping = False
+        self._gave_up = False
+        self._reload_requested = False
+
+    # --- воркеры ---------------------------------------------------------
+
+    def _spawn(self) -> int:
+        from common import generation
+
+        gen_number = generation.current().number
+        pid = os.fork()
+        if pid:
+            self.children[pid] = gen_number
+            self._started[pid] = time.monotonic()
+            return pid
+        # Воркер: сигналы обрабатывает uvicorn, SIGHUP адресован только мастеру
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        code = 0
+        try:
+            import main
+
+            config = uvicorn.Config(main.app, lifespan="on", log_config=None, access_log=False)
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException:  # noqa: BLE001
+            logger.exception("Воркер %s завершился с ошибкой", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, pids: List[int]) -> None:
+        for pid in pids:
+            self._retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self) -> List[int]:
+        """Собрать завершившихся воркеров; вернуть их pid."""
+        exited: List[int] = []
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self.children.pop(pid, None) is not None:
+                exited.append(pid)
+                started = self._started.pop(pid, None)
+                if pid in self._retiring:
+                    self._retiring.discard(pid)
+                else:
+                    logger.warning("Воркер %s завершился (код %s)", pid, os.waitstatus_to_exitcode(status))
+                    uptime = time.monotonic() - started if started is not None else WORKER_MIN_UPTIME
+                    self._note_crash(uptime)
+        return exited
+
+    def _note_crash(self, uptime: float) -> None:
+        """Учесть неожиданное завершение воркера: падение при старте откладывает перезапуск."""
+        if uptime >= WORKER_MIN_UPTIME:
+            self._crashes = 0
+            return
+        self._crashes += 1
+        delay = min(RESPAWN_BACKOFF_MAX, RESPAWN_BACKOFF * 2 ** (self._crashes - 1))
+        self._next_spawn = time.monotonic() + delay
+        if self._crashes >= MAX_STARTUP_CRASHES:
+            logger.critical(
+                "Воркеры падают при старте %s раз подряд — мастер останавливается, см. ошибки выше",
+                self._crashes,
+            )
+            self._stopping = True
+            self._gave_up = True
+        else:
+            logger.warning("Воркер упал при старте (%s подряд): перезапуск через %.1f с", self._crashes, delay)
+
+    def _settled(self) -> None:
+        """Все воркеры прожили WORKER_MIN_UPTIME — счётчик падений при старте сбрасывается."""
+        now = time.monotonic()
+        if self._crashes and len(self.children) >= self.workers and all(
+            now - started >= WORKER_MIN_UPTIME for started in self._started.values()
+        ):
+            self._crashes = 0
+
+    # --- перезагрузка справочников --------------------------------------
+
+    def _rollover(self, force: bool) -> None:
+        """Пересобрать поколение в мастере и заменить воркеров на новых."""
+        from common import generation
+        import main
+
+        try:
+            new = generation.reload() if force else generation.reload_if_changed()
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Перезагрузка справочников не удалась, воркеры не заменены: %s", exc)
+            return
+        if new is None:
+            return
+        main._warm_schemas(new)
+        _freeze_heap()
+        old = list(self.children)
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info("Поколение %s: запущены новые воркеры, останавливаю прежние %s", new.number, old)
+        self._stop(old)
+
+    # --- главный цикл ----------------------------------------------------
+
+    def _on_stop(self, signum: int, frame: object) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum: int, frame: object) -> None:
+        self._reload_requested = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        _freeze_heap()
+        for _ in range(self.workers):
+            self._spawn()
+        logger.info("Мастер %s: %s воркеров на %s", os.getpid(), self.workers, self.sock.getsockname())
+
+        next_check = time.monotonic() + DATA_WATCH_INTERVAL
+        while not self._stopping:
+            time.sleep(0.2)
+            self._reap()
+            if self._reload_requested:
+                self._reload_requested = False
+                self._rollover(force=True)
+            elif DATA_WATCH_INTERVAL > 0 and time.monotonic() >= next_check:
+                next_check = time.monotonic() + DATA_WATCH_INTERVAL
+                self._rollover(force=False)
+            if time.monotonic() >= self._next_spawn:
+                while not self._stopping and len(self.children) < self.workers:
+                    self._spawn()
+            self._settled()
+
+        self._stop(list(self.children))
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.children and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self._reap()
+        for pid in list(self.children):
+            os.kill(pid, signal.SIGKILL)
+        self.sock.close()
+        return 1 if self._gave_up else 0
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="calc_service: мастер с предзагрузкой и N воркеров uvicorn")
+    parser.add_argument("--host", default=CALC_HOST)
+    parser.add_argument("--port", type=int, default=CALC_PORT)
+    parser.add_argument("--workers", type=int, default=CALC_WORKERS, help="число воркеров (по умолчанию CALC_WORKERS)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        print("fork() недоступен (Windows): запуск одного процесса uvicorn", file=sys.stderr)
+        uvicorn.run("main:app", host=args.host, port=args.port)
+        return 0
+
+    # Предзагрузка: поколение данных и схемы собираются один раз, до fork()
+    import main
+    from common import generation
+
+    main.app.state.master_pid = os.getpid()
+    main._warm_schemas(generation.current())
+    sock = _bind(args.host, args.port)
+    return Master(sock, max(1, args.workers)).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import date
 from fastapi.testclient import TestClient
 import sys
 from pathlib import Path
@@ -36,3 +37,356 @@ def test_param_schema_endpoint() -> None:
         assert isinstance(schema["params"], list)
         assert len(schema["params"]) > 0
 
+
+
+def test_calc_batch_matches_single_calls() -> None:
+    """Пакетный расчёт возвращает те же результаты (включая share_url), что и /calc/{slug}."""
+    params_a = {"quantity": 50, "width": 40, "height": 80, "material_id": "AcrylColor3", "mode": 1}
+    params_b = dict(params_a, quantity=100)
+
+    response = client.post(
+        "/api/v1/calc_batch",
+        json={
+            "items": [
+                {"slug": "laser", "params": params_a},
+                {"slug": "laser", "params": params_b},
+                {"slug": "no_such_calc", "params": {}},
+                {"slug": "laser", "params": {"quantity": 1, "width": 0, "height": 0}},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [i["status"] for i in items] == [200, 200, 404, 400]
+
+    for item, params in zip(items[:2], (params_a, params_b)):
+        single = client.post("/api/v1/calc/laser", json=params)
+        assert single.status_code == 200
+        assert item["result"] == single.json()
+        assert "share_url" in item["result"]
+
+
+def test_calc_trace_returns_stage_tree_and_metrics() -> None:
+    """?trace=1: дерево этапов (вложенные калькуляторы, process_tools, раскладки) и гистограммы /metrics."""
+    params = {"quantity": 100, "width_mm": 100, "height_mm": 150, "material_id": "PaperCoated115M", "color": "4+0", "mode": 1}
+    plain = client.post("/api/v1/calc/flag", json=params).json()
+    response = client.post("/api/v1/calc/flag?trace=1", json=params)
+    assert response.status_code == 200
+    traced = response.json()
+    tree = traced.pop("trace")
+    assert traced == plain
+
+    def names(node):
+        yield node["stage"]
+        for child in node.get("children", []):
+            assert child["calls"] >= 1 and child["ms"] >= 0
+            yield from names(child)
+
+    assert tree["stage"] == "request" and tree["calls"] == 1
+    assert [child["stage"] for child in tree["children"]] == ["calculator:flag"]
+    stages = set(names(tree))
+    assert {"calculator:print_sheet", "calculator:cut_guillotine", "calc_set_shaft", "layout_on_sheet", "MaterialCatalog.get"} <= stages
+    assert "trace" not in client.post("/api/v1/calc/flag", json=params).json()
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert "# TYPE calc_stage_seconds histogram" in text
+    assert 'calc_stage_seconds_bucket{stage="calc_set_shaft",le="+Inf"}' in text
+    assert 'calc_calculation_seconds_count{slug="flag",cache="bypass"}' in text
+    assert 'calc_http_request_seconds_count{method="POST",route="/api/v1/calc/{slug}",status="200"}' in text
+
+
+def test_calc_batch_rejects_empty() -> None:
+    response = client.post("/api/v1/calc_batch", json={"items": []})
+    assert response.status_code == 422
+
+
+def test_price_ladder_endpoint() -> None:
+    """Лестница тиражей: по позиции на тираж, цены совпадают с /calc/{slug}."""
+    params = {"width": 40, "height": 80, "material_id": "AcrylColor3", "mode": 1}
+    quantities = [50, 100, 250]
+    response = client.post("/api/v1/price_ladder/laser", json={"params": params, "quantities": quantities})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [i["quantity"] for i in items] == quantities
+
+    for item in items:
+        single = client.post("/api/v1/calc/laser", json={**params, "quantity": item["quantity"]}).json()
+        for key in ("cost", "price", "unit_price", "time_ready"):
+            assert item[key] == single[key]
+
+
+def test_price_ladder_list_param_as_string() -> None:
+    """Параметр-массив строкой "30,40" (как в share_url) считается так же, как [30, 40]."""
+    params = {"width": 40, "height": 80, "material_id": "AcrylColor3", "mode": 1, "is_grave": 1}
+    quantities = [50, 100]
+    as_list = client.post(
+        "/api/v1/price_ladder/laser", json={"params": {**params, "is_grave_fill": [30, 40]}, "quantities": quantities}
+    )
+    as_string = client.post(
+        "/api/v1/price_ladder/laser", json={"params": {**params, "is_grave_fill": "30,40"}, "quantities": quantities}
+    )
+    assert as_list.status_code == as_string.status_code == 200
+    assert as_string.json()["items"] == as_list.json()["items"]
+    plain = client.post("/api/v1/price_ladder/laser", json={"params": params, "quantities": quantities}).json()
+    assert as_list.json()["items"][0]["cost"] > plain["items"][0]["cost"]
+
+
+def test_price_ladder_errors() -> None:
+    assert client.post("/api/v1/price_ladder/nope", json={"quantities": [1]}).status_code == 404
+    bad = client.post("/api/v1/price_ladder/laser", json={"params": {}, "quantities": [0]})
+    assert bad.status_code == 400
+
+
+def test_choices_search_ranked() -> None:
+    response = client.post("/api/v1/choices", json={"slug": "laser", "param": "material", "query": "акрил 3"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items and all("акрил" in item["title"].lower() for item in items)
+    assert items[0]["title"].lower().endswith(" 3мм")  # "3мм" выше "30мм"
+
+    response = client.post(
+        "/api/v1/choices",
+        json={"slug": "laser", "param": "material", "query": "акрил", "filters": {"max_thickness_mm": 3}},
+    )
+    assert response.status_code == 200
+    assert all(float(item["hint"].split()[0]) <= 3 for item in response.json()["items"])
+
+    response = client.post("/api/v1/choices", json={"slug": "laser", "param": "no_such_param"})
+    assert response.status_code == 404
+
+
+def test_choices_index_built_from_request_generation(monkeypatch) -> None:
+    """Перезагрузка посреди поиска не смешивает поколения: индекс строится из закреплённого."""
+    import main
+    from common import generation
+
+    started = generation.reload()  # свежее поколение: индексов choices в нём ещё нет
+    built_from = []
+    resolve = main._resolve_choices_source
+
+    def reload_midway(source):
+        generation.reload()
+        built_from.append(generation.current())
+        return resolve(source)
+
+    monkeypatch.setattr(main, "_resolve_choices_source", reload_midway)
+    response = client.post("/api/v1/choices", json={"slug": "laser", "param": "material", "query": "акрил"})
+    assert response.status_code == 200 and response.json()["items"]
+    assert built_from == [started]
+
+
+def test_schema_registry_serves_frozen_schemas() -> None:
+    import dataclasses
+    import json
+
+    import pytest
+
+    from calculators import get_calculator, schema_registry
+    from common import generation
+
+    calc = get_calculator("magnet_acrylic")
+    for part, endpoint in (("param_schema", "param_schema"), ("tool_schema", "tool_schema"), ("options", "options")):
+        response = client.get(f"/api/v1/{endpoint}/{calc.slug}")
+        assert response.status_code == 200
+        assert response.json() == json.loads(json.dumps(getattr(calc, f"get_{part}")()))
+    assert client.get(f"/api/v1/llm_prompt/{calc.slug}").json() == {"slug": calc.slug, "prompt": calc.get_llm_prompt()}
+    assert client.get("/api/v1/param_schema/no_such_calc").status_code == 404
+
+    schema = schema_registry.param_schema(calc)
+    assert schema is schema_registry.param_schema(calc)  # строится один раз на поколение
+    with pytest.raises(TypeError):
+        schema["params"] = []  # type: ignore[index]
+    assert calc.get_required_params() == [p["name"] for p in calc.get_param_schema()["params"] if p.get("required")]
+
+    # Новое поколение данных — схемы строятся заново
+    current = generation.current()
+    fresh = dataclasses.replace(current, number=current.number + 1, _memo={})
+    with generation.pinned(fresh):
+        assert schema_registry.param_schema(calc) is not schema
+
+
+def test_metadata_endpoints_etag_and_304() -> None:
+    etags = set()
+    for path in ("/api/v1/calculators", "/api/v1/options/laser", "/api/v1/param_schema/laser",
+                 "/api/v1/tool_schema/laser", "/api/v1/llm_prompt/laser"):
+        response = client.get(path)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('"') and "max-age=" in response.headers["Cache-Control"]
+        etags.add(etag)
+
+        cached = client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["ETag"] == etag
+        assert client.get(path, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+        assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+    assert len(etags) == 5
+
+
+def test_bundle_endpoint() -> None:
+    response = client.get("/api/v1/bundle", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    etag = response.headers["ETag"]
+    entries = {entry["slug"]: entry for entry in response.json()["calculators"]}
+    assert list(entries) == [calc["slug"] for calc in client.get("/api/v1/calculators").json()]
+
+    laser = entries["laser"]
+    assert laser["param_schema"] == client.get("/api/v1/param_schema/laser").json()
+    assert laser["options"] == client.get("/api/v1/options/laser").json()
+    assert laser["tool_schema"] == client.get("/api/v1/tool_schema/laser").json()
+    assert laser["llm_prompt"] == client.get("/api/v1/llm_prompt/laser").json()["prompt"]
+
+    cached = client.get("/api/v1/bundle", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+
+    plain = client.get("/api/v1/bundle", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] != etag
+    assert plain.json() == response.json()
+
+
+def test_cache_stats_endpoint() -> None:
+    response = client.get("/api/v1/cache/stats")
+    assert response.status_code == 200
+    stats = response.json()
+    for key in ("hits", "misses", "evictions", "size", "data_version"):
+        assert key in stats
+    assert {"contexts", "hits", "misses", "by_kind"} <= set(stats["request_memo"])
+    assert {"leaders", "coalesced", "in_flight"} <= set(stats["single_flight"])
+
+
+def test_data_generation_and_reload(monkeypatch) -> None:
+    import main
+
+    info = client.get("/api/v1/data/generation").json()
+    assert info["generation"] >= 1 and info["version"]
+    assert info["changed_files"] == []
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/v1/data/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    resp = client.post("/api/v1/data/reload", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.json()["generation"] == info["generation"] + 1
+    assert resp.json()["version"] == info["version"]
+
+
+def test_data_reload_under_prefork_master_signals_master(monkeypatch) -> None:
+    import signal
+
+    import main
+
+    sent = []
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(main.app.state, "master_pid", 12345, raising=False)
+    monkeypatch.setattr(main.os, "kill", lambda pid, sig: sent.append((pid, sig)))
+    number = client.get("/api/v1/data/generation").json()["generation"]
+
+    resp = client.post("/api/v1/data/reload", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
+    assert resp.json()["reload"] == "scheduled"
+    assert resp.json()["generation"] == number  # воркер сам не перезагружает
+    assert sent == [(12345, signal.SIGHUP)]
+
+
+def test_data_reload_without_admin_token_only_for_internal_clients(monkeypatch) -> None:
+    from starlette.requests import Request
+
+    import main
+    from common import admission
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "")
+    number = client.get("/api/v1/data/generation").json()["generation"]
+    # TestClient — публичный клиент (не из CALC_INTERNAL_IPS): без токена перезагрузка запрещена
+    resp = client.post("/api/v1/data/reload", headers={"X-Admin-Token": ""})
+    assert resp.status_code == 403
+    assert client.get("/api/v1/data/generation").json()["generation"] == number
+
+    def request(lane):
+        return Request({"type": "http", "headers": [], "state": {admission.LANE_STATE: lane}})
+
+    assert main._admin_allowed(request(admission.INTERNAL), None)
+    assert not main._admin_allowed(request(admission.PUBLIC), None)
+    assert not main._admin_allowed(Request({"type": "http", "headers": []}), None)
+
+
+def test_calendar_endpoints() -> None:
+    """Дата готовности и число рабочих дней по календарю common.json."""
+    from common import holidays
+
+    response = client.get("/api/v1/calendar/ready_date", params={"start": "2025-12-31", "days": 3})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ready_date"] == holidays.add_working_days(date(2025, 12, 31), 3).isoformat()
+    assert data["working_days"] == 3
+
+    response = client.get("/api/v1/calendar/ready_date", params={"start": "2025-12-31", "hours": 20})
+    assert response.json()["ready_date"] == data["ready_date"]
+
+    response = client.get("/api/v1/calendar/working_days", params={"start": "2025-12-31", "end": data["ready_date"]})
+    assert response.json()["working_days"] == 3
+
+    assert client.get("/api/v1/calendar/ready_date", params={"days": 1, "hours": 8}).status_code == 400
+    assert client.get("/api/v1/calendar/ready_date").status_code == 400
+
+
+def test_calendar_endpoints_reject_unbounded_requests() -> None:
+    """Огромные сдвиги, inf/nan и даты далеко от сегодня отклоняются сразу, без перебора по дням."""
+    import time
+
+    started = time.perf_counter()
+    for params in ({"days": 100_000_000}, {"days": -100_000}, {"hours": "1e300"}, {"hours": "inf"}, {"hours": "nan"}):
+        assert client.get("/api/v1/calendar/ready_date", params=params).status_code == 422, params
+    assert client.get("/api/v1/calendar/ready_date", params={"hours": 3000, "hours_per_day": 0.01}).status_code == 400
+    assert client.get("/api/v1/calendar/ready_date", params={"hours": 80_000, "hours_per_day": 1}).status_code == 400
+    assert client.get("/api/v1/calendar/ready_date", params={"days": 1, "start": "0001-01-01"}).status_code == 400
+    response = client.get("/api/v1/calendar/working_days", params={"start": "0001-01-01", "end": "9999-12-31"})
+    assert response.status_code == 400
+    # На пределах — успешно и быстро
+    assert client.get("/api/v1/calendar/ready_date", params={"days": 3650}).status_code == 200
+    assert client.get("/api/v1/calendar/ready_date", params={"hours": 3650 * 24, "hours_per_day": 24}).status_code == 200
+    assert time.perf_counter() - started < 2.0
+
+
+def test_admission_middleware_rate_limit_and_lanes() -> None:
+    """429 для публичных клиентов сверх лимита; бот (внутренний IP или токен) — без лимита."""
+    from fastapi import FastAPI as _FastAPI
+
+    from common import admission
+
+    inner = _FastAPI()
+
+    @inner.get("/api/v1/ping")
+    def ping() -> dict:
+        return {"ok": "1"}
+
+    limiter = admission.RateLimiter(rate=0.001, burst=2)
+    inner.add_middleware(
+        admission.AdmissionMiddleware,
+        limiter=limiter,
+        queue=admission.AdmissionQueue(2, reserved=1, queue_sizes={"internal": 1, "public": 1}),
+        internal_ips="10.0.0.5",
+        internal_token="secret",
+        trusted_proxies="testclient",
+    )
+    test_client = TestClient(inner)
+
+    def get(ip: str, **headers: str):
+        return test_client.get("/api/v1/ping", headers={"X-Forwarded-For": ip, **headers})
+
+    assert [get("1.1.1.1").status_code for _ in range(3)] == [200, 200, 429]
+    rejected = get("1.1.1.1")
+    assert rejected.status_code == 429 and int(rejected.headers["Retry-After"]) >= 1
+    assert get("2.2.2.2").status_code == 200  # свой бакет у каждого IP за прокси
+    assert all(get("10.0.0.5").status_code == 200 for _ in range(5))
+    assert all(get("1.1.1.1", **{"X-Internal-Token": "secret"}).status_code == 200 for _ in range(3))
+    assert get("1.1.1.1", **{"X-Internal-Token": "wrong"}).status_code == 429
+
+
+def test_admission_metrics_exposed() -> None:
+    text = client.get("/metrics").text
+    assert "# TYPE calc_admission_queue_depth gauge" in text
+    assert "# TYPE calc_admission_rejected_total counter" in text
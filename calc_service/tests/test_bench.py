@@ -0,0 +1,47 @@
+"""Бенчмарк-харнесс (bench/): наборы параметров, замер и сравнение с базовым отчётом."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+_calc_service = Path(__file__).resolve().parent.parent
+if str(_calc_service) not in sys.path:
+    sys.path.insert(0, str(_calc_service))
+
+from bench import harness  # noqa: E402
+from calculators import CALCULATORS  # noqa: E402
+
+
+def test_cases_cover_every_calculator() -> None:
+    cases = harness.load_cases()
+    assert set(cases) == set(CALCULATORS)
+    benchmarks = dict(harness.calculator_benchmarks(cases))
+    assert len(benchmarks) == len(CALCULATORS)
+    for slug in ("laser", "badge", "metal_pins"):
+        for call in benchmarks[f"calc:{slug}"]:
+            assert call()["price"] > 0
+
+
+def test_measure_reports_percentiles_and_errors() -> None:
+    result = harness.measure("noop", [lambda: [0] * 1000], min_time=0.0, min_calls=50)
+    assert result.error is None and result.calls >= 50
+    assert 0 < result.p50_us <= result.p95_us <= result.p99_us
+    assert result.ops_per_sec > 0 and result.alloc_peak_kib > 0
+
+    failed = harness.measure("boom", [lambda: 1 / 0], min_time=0.0)
+    assert failed.error and failed.error.startswith("ZeroDivisionError")
+    assert harness.percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+
+
+def test_compare_flags_regressions_beyond_threshold() -> None:
+    def result(name: str, p50: float) -> harness.BenchResult:
+        return harness.BenchResult(name, 100, 1e6 / p50, p50, p50, p50, 1.0)
+
+    baseline = harness.to_report([result("calc:a", 100.0), result("calc:b", 100.0), result("calc:c", 2.0)])
+    current = [result("calc:a", 120.0), result("calc:b", 200.0), result("calc:c", 4.0), result("calc:new", 1.0)]
+    regressions, problems = harness.compare(baseline, current, threshold=0.25)
+    # calc:a в пределах порога, calc:c вырос вдвое, но меньше MIN_REGRESSION_US
+    assert [(r.name, r.ratio) for r in regressions] == [("calc:b", 2.0)]
+    assert problems == ["calc:new: нет в базовом отчёте"]
+    assert "p50/база" in harness.format_table(current, baseline)
@@ -286,3 +286,11 @@ def test_get_tool_schema(calc):
     schema = calc.get_tool_schema()
     assert schema.get("name") == "calc_cut_plotter"
     assert "parameters" in schema
+
+
+def test_calculate_ladder_matches_calculate(calc, base_params):
+    """Ценовая лестница совпадает с отдельными calculate() по каждому тиражу."""
+    params = dict(base_params)
+    quantities = [1, 50, 100, 250, 1000]
+    ladder = calc.calculate_ladder(params, quantities)
+    assert ladder == [calc.calculate({**params, "quantity": q}) for q in quantities]
@@ -245,3 +245,11 @@ def test_laser_real_nomerki_high(nomerki_high_result):
     assert ok_time, "time_hours: got %s, expected ~%s" % (r["time_hours"], e["time_hours"])
     assert ok_ready, "time_ready: got %s, expected ~%s" % (r["time_ready"], e["time_ready"])
     assert ok_weight, "weight_kg: got %s, expected ~%s" % (r["weight_kg"], e["weight_kg"])
+
+
+def test_calculate_ladder_matches_calculate(laser_calc: LaserCalculator) -> None:
+    """Ценовая лестница совпадает с отдельными calculate() по каждому тиражу."""
+    params = _nomerki_params()
+    quantities = [1, 50, 100, 250, 1000]
+    ladder = laser_calc.calculate_ladder(params, quantities)
+    assert ladder == [laser_calc.calculate({**params, "quantity": q}) for q in quantities]
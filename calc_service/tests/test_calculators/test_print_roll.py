@@ -539,3 +539,11 @@ def test_empty_result_on_invalid_material(calc):
     assert r["cost"] == 0.0
     assert r["price"] == 0.0
     assert r["materials"] == []
+
+
+def test_calculate_ladder_matches_calculate(calc, base_params):
+    """Ценовая лестница совпадает с отдельными calculate() по каждому тиражу."""
+    params = dict(base_params)
+    quantities = [1, 50, 100, 250, 1000]
+    ladder = calc.calculate_ladder(params, quantities)
+    assert ladder == [calc.calculate({**params, "quantity": q}) for q in quantities]
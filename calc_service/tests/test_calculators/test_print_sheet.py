@@ -437,3 +437,11 @@ def test_expected_values_print_sheet_lamination(ref_result_3):
     assert "title" in lam
     assert ok_paper_q, f"paper quantity: got {paper.get('quantity')}, expected ~{em_paper['quantity_approx']}"
     assert ok_lam_q, f"lamination quantity: got {lam.get('quantity')}, expected ~{em_lam['quantity_approx']}"
+
+
+def test_calculate_ladder_matches_calculate(calc, base_params):
+    """Ценовая лестница совпадает с отдельными calculate() по каждому тиражу."""
+    params = dict(base_params)
+    quantities = [1, 50, 100, 250, 1000]
+    ladder = calc.calculate_ladder(params, quantities)
+    assert ladder == [calc.calculate({**params, "quantity": q}) for q in quantities]
@@ -4,10 +4,17 @@ from math import isclose
 
 import pytest
 
-from common.helpers import calc_weight, find_in_table
+from common.choice_index import ChoiceIndex
+from common.holidays import WorkingCalendar
+from common.helpers import ThresholdTable, calc_weight, find_in_table
 from common.currencies import parse_currency
+from common.data_snapshot import SnapshotError, build_snapshot, read_snapshot
+from common.data_store import DataStore, load_json
+from common.generation import current
 from common.layout import layout_on_roll, layout_on_sheet
 from common.markups import BASE_TIME_READY, get_margin
+from common.result_cache import RESULT_CACHE, ResultCache, canonicalize
+from common.single_flight import SingleFlight
 
 
 def test_find_in_table():
@@ -18,6 +25,53 @@ def test_find_in_table():
     assert find_in_table(table, 999) == 60  # выше последнего порога
 
 
+def test_threshold_table_matches_linear_search():
+    rows = [(100, 60), (10, 100), (50, 80)]  # порядок строк не важен
+    table = ThresholdTable(rows)
+
+    for value in (0, 5, 10, 10.5, 30, 50, 99, 100, 999):
+        assert table.find(value) == find_in_table(sorted(rows), value)
+    assert find_in_table(table, 30) == 80
+    assert table.position(50) == 1 and table.position(101) == 3
+    assert table.find_floor(5) is None and table.find_floor(5, 0.0) == 0.0
+    assert table.find_floor(50) == 80 and table.find_floor(999) == 60
+
+    wide = ThresholdTable([[30, 1.0, 2.0], [60, 3.0]])
+    assert wide.find(40, col=2) == 60  # нет столбца — порог строки
+    assert wide.find(20, col=2) == 2.0
+
+    with pytest.raises(AttributeError):
+        table.rows = ()
+    with pytest.raises(ValueError):
+        ThresholdTable([])
+
+
+def test_choice_index_search_and_ranking():
+    index = ChoiceIndex(
+        [
+            {"id": "Pet", "title": "Плёнка ПЭТ прозрачная", "description": "для ламинации"},
+            {"id": "Acryl30", "title": "Акриловое стекло 30мм", "description": "литой", "thickness": 30},
+            {"id": "Acryl3", "title": "Акрил 3мм", "description": "литой", "thickness": 3},
+            {"id": "Pvc", "title": "ПВХ 3 мм", "description": "вспененный акрил-совместимый", "thickness": 3},
+        ]
+    )
+    ids = lambda items: [item["id"] for item in items]  # noqa: E731
+
+    # Слово целиком выше совпадения по началу слова, порядок каталога — при равенстве
+    assert ids(index.search("акрил", 10)) == ["Acryl3", "Acryl30"]
+    assert ids(index.search("акрил 3", 10)) == ["Acryl3", "Acryl30"]
+    assert ids(index.search("пленка", 10)) == ["Pet"]  # ё = е
+    # Нет совпадений в title — ищем в title+description
+    assert ids(index.search("литой", 10)) == ["Acryl30", "Acryl3"]
+    assert ids(index.search("вспененный", 10)) == ["Pvc"]
+    # Фильтр применяется до выбора между title и description
+    thin = lambda item: (item.get("thickness") or 0) <= 3  # noqa: E731
+    assert ids(index.search("акрил", 10, thin)) == ["Acryl3"]
+    assert ids(index.search("акрил", 1)) == ["Acryl3"]
+    assert ids(index.search(None, 2)) == ["Pet", "Acryl30"]
+    assert index.search("   ", 10) == [] and index.search("нет такого", 10) == []
+
+
 def test_calc_weight_gsm3():
     # ПВХ 3 мм, лист 3050x2050, плотность 0.55 г/см³, 1 лист
     w_kg = calc_weight(
@@ -82,3 +136,473 @@ def test_layout_on_roll_basic():
     assert r["num"] == 25
     assert r["length"] == pytest.approx(700.0)
 
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_layout_batch_matches_single_layouts(engine, monkeypatch):
+    from common import layout
+
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(layout, "NUMPY_MIN_CELLS", 1)
+    else:
+        monkeypatch.setattr(layout, "NUMPY_MIN_CELLS", 10**9)
+    layout._sheet_batch.cache_clear()
+    layout._roll_batch.cache_clear()
+
+    items = [[100, 100], [40, 80], [80, 40], [0, 50], [310, 20], [1000, 1500], [99.9, 33.3]]
+    sheets = [[1000, 500], [320, 450], [3050, 2050], [20, 20], [0, 300], [1500, 1000]]
+    for margins, gap in ((None, 0.0), ([5, 5, 5, 5], 4.0), ([10, 0, 3, 2], 2.5)):
+        batch = layout.layout_on_sheet_batch(items, sheets, margins, gap)
+        for i, item in enumerate(items):
+            for j, sheet in enumerate(sheets):
+                single = layout_on_sheet(item, sheet, margins, gap)
+                assert (batch.num[i][j], batch.cols[i][j], batch.rows[i][j]) == (single["num"], single["cols"], single["rows"])
+        assert layout.layout_on_sheet_batch(items, sheets, margins, gap) is batch  # мемоизация
+
+    widths = [sheet[0] for sheet in sheets]
+    for quantity in (0, 1, 25, 1001):
+        for along_long in (-1, 0, 1):
+            lengths = layout.layout_on_roll_batch(quantity, items, widths, 2.0, along_long)
+            for i, item in enumerate(items):
+                for j, width in enumerate(widths):
+                    expected = layout.layout_on_roll_with_orientation(quantity, item, width, 2.0, along_long)
+                    assert lengths[i][j] == expected
+                    if along_long == 0:
+                        assert expected == layout_on_roll(quantity, item, [width, 0], 2.0)["length"]
+
+    with pytest.raises(ValueError):
+        layout.layout_on_sheet_batch([[100]], sheets)
+    with pytest.raises(ValueError):
+        layout.layout_on_roll_batch(1, items, widths, along_long=2)
+
+
+def test_working_calendar_matches_day_stepping():
+    from datetime import date, timedelta
+
+    holidays, extra = frozenset({"1.1", "2.1", "8.3"}), frozenset({"5.3"})
+    cal = WorkingCalendar(holidays, extra, date(2025, 1, 1), date(2025, 12, 31))
+
+    def working(d):
+        key = f"{d.day}.{d.month}"
+        return key in extra or (key not in holidays and d.weekday() < 5)
+
+    def step(start, days):
+        current, remaining = start, abs(days)
+        while remaining:
+            current += timedelta(days=1 if days > 0 else -1)
+            remaining -= working(current)
+        return current
+
+    assert not cal.is_working_day(date(2025, 3, 8)) and cal.is_working_day(date(2025, 3, 5))
+    assert cal.next_working_day(date(2024, 12, 31)) == date(2025, 1, 3)
+    # Запросы у краёв и за пределами окна — перебором по дням
+    for start in (date(2024, 12, 20), date(2025, 1, 1), date(2025, 3, 7), date(2025, 12, 30)):
+        for days in (-30, -1, 0, 1, 2, 5, 40):
+            ready = cal.add_working_days(start, days)
+            assert ready == step(start, days)
+            if days >= 0:
+                assert cal.working_days_between(start, ready) == days
+    assert cal.add_working_hours(date(2025, 3, 6), 8.5) == date(2025, 3, 10)
+    assert cal.add_working_hours(date(2025, 3, 6), 0) == date(2025, 3, 6)
+
+
+def test_result_cache_key_canonical():
+    cache = ResultCache(max_size=10, ttl=60)
+    list_keys = {"is_grave_fill"}
+    a = cache.make_key("laser", {"quantity": 100, "width": 40.0, "is_grave_fill": [30, 40]}, list_keys)
+    b = cache.make_key("laser", {"is_grave_fill": "30,40", "width": 40, "quantity": 100.0}, list_keys)
+    c = cache.make_key("laser", {"quantity": 101, "width": 40, "is_grave_fill": [30, 40]}, list_keys)
+    assert a == b
+    assert a != c
+    # Для обычных строковых параметров запятая ничего не значит
+    assert canonicalize("4,0", list_keys, "color") == "4,0"
+    # Флаг и число 1 — разные записи
+    assert canonicalize(True) != canonicalize(1) and canonicalize(True) != canonicalize(1.0)
+    assert cache.make_key("laser", {"x": True}) != cache.make_key("laser", {"x": 1})
+    assert canonicalize(True) != canonicalize(["b", 1])
+
+
+def test_result_cache_lru_ttl_and_counters():
+    cache = ResultCache(max_size=2, ttl=60)
+    cache.put("a", {"price": 1})
+    cache.put("b", {"price": 2})
+    assert cache.get("a") == {"price": 1}
+    cache.put("c", {"price": 3})  # вытесняет "b" (давно не использовался)
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+    # Изменение возвращённого результата не портит кэш
+    got = cache.get("a")
+    got["price"] = 100
+    assert cache.get("a") == {"price": 1}
+
+    cache.ttl = 0.0001
+    import time
+    time.sleep(0.001)
+    assert cache.enabled and cache.get("a") is None
+
+
+def test_execute_uses_result_cache_and_reload_flushes():
+    from calculators import get_calculator
+    from common import markups
+
+    calc = get_calculator("laser")
+    params = {"quantity": 7, "width": 40, "height": 80, "material_id": "AcrylColor3", "is_grave": 1, "is_grave_fill": [30, 40]}
+    first = calc.execute(params)
+    hits = RESULT_CACHE.hits
+    again = calc.execute({**params, "width": 40.0, "is_grave_fill": "30,40"})
+    assert RESULT_CACHE.hits == hits + 1
+    assert {k: v for k, v in again.items() if k != "share_url"} == {
+        k: v for k, v in first.items() if k != "share_url"
+    }
+    assert "is_grave_fill=30%2C40" in again["share_url"]
+
+    markups.reload()
+    assert RESULT_CACHE.stats()["size"] == 0
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"price": 10, "materials": [{"code": "A"}]}
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(flight.do, "k", compute)
+        started.wait(5)
+        followers = [pool.submit(flight.do, "k", compute) for _ in range(3)]
+        while flight.stats()["waiting"] < 3:
+            pass
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert [coalesced for _, coalesced in results] == [False, True, True, True]
+    assert all(r == {"price": 10, "materials": [{"code": "A"}]} for r, _ in results)
+    # Каждый получил свою копию
+    results[1][0]["materials"].append("x")
+    assert results[2][0]["materials"] == [{"code": "A"}]
+    assert flight.stats() == {"leaders": 1, "coalesced": 3, "in_flight": 0, "waiting": 0}
+
+    # Ошибка не запоминается: следующий вызов считает заново
+    def fail():
+        raise ValueError("bad")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.do("k", lambda: {"price": 1}) == ({"price": 1}, False)
+
+
+def test_rate_limiter_token_bucket():
+    from common.admission import RateLimiter
+
+    now = [0.0]
+    limiter = RateLimiter(rate=2, burst=3, max_clients=2, clock=lambda: now[0])
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    assert limiter.acquire("b") == 0.0  # у каждого IP свой бакет
+    now[0] = 0.5
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+    # Вытеснение самого давнего IP: "a" вернётся с полным бакетом
+    limiter.acquire("c")
+    limiter.acquire("b")
+    limiter.acquire("c")
+    assert limiter.acquire("a") == 0.0
+    assert RateLimiter(rate=0, burst=1).acquire("a") == 0.0
+
+
+def test_admission_queue_priority_and_rejections():
+    import asyncio
+
+    from common.admission import INTERNAL, PUBLIC, AdmissionQueue, Rejected
+
+    async def scenario():
+        queue = AdmissionQueue(2, reserved=1, queue_sizes={INTERNAL: 2, PUBLIC: 1}, timeout=5)
+        await queue.acquire(PUBLIC)  # публичным доступен один слот из двух
+        public = asyncio.ensure_future(queue.acquire(PUBLIC))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as full:
+            await queue.acquire(PUBLIC)
+        assert (full.value.status, full.value.reason) == (503, "queue_full")
+
+        await queue.acquire(INTERNAL)  # резервный слот
+        internal = asyncio.ensure_future(queue.acquire(INTERNAL))
+        await asyncio.sleep(0)
+        assert queue.stats()["waiting"] == {INTERNAL: 1, PUBLIC: 1}
+
+        queue.release(PUBLIC)  # слот получает внутренняя очередь
+        await internal
+        assert not public.done()
+        queue.release(INTERNAL)
+        queue.release(INTERNAL)
+        await public
+        assert queue.stats()["active"] == {INTERNAL: 0, PUBLIC: 1}
+
+        queue.timeout = 0.01
+        await queue.acquire(INTERNAL)
+        with pytest.raises(Rejected) as timeout:
+            await queue.acquire(INTERNAL)
+        assert timeout.value.reason == "queue_timeout"
+        assert queue.stats()["waiting"] == {INTERNAL: 0, PUBLIC: 0}
+
+    asyncio.run(scenario())
+
+
+def test_request_context_memoizes_nested_calls():
+    from calculators.base import BaseCalculator
+    from common import calc_context
+
+    calls = []
+
+    class Inner(BaseCalculator):
+        slug = "test_inner"
+
+        def calculate(self, params):
+            calls.append(dict(params))
+            return {"cost": params["quantity"] * 2.0, "materials": []}
+
+        def get_options(self):
+            return {}
+
+        def get_tool_schema(self):
+            return {}
+
+    class Outer(Inner):
+        slug = "test_outer"
+
+        def calculate(self, params):
+            inner = Inner()
+            first = inner.calculate({"quantity": params["quantity"]})
+            second = inner.calculate({"quantity": float(params["quantity"])})
+            first["cost"] = -1  # верхний уровень результата — копия, мемо не портится
+            return {"cost": second["cost"] + inner.calculate({"quantity": 1})["cost"]}
+
+    # Вне контекста мемоизации нет
+    assert Outer().calculate({"quantity": 5}) == {"cost": 12.0}
+    assert len(calls) == 3
+
+    calls.clear()
+    before = calc_context.STATS.snapshot()
+    with calc_context.request_context() as context:
+        assert Outer().calculate({"quantity": 5}) == {"cost": 12.0}
+        assert Outer().calculate({"quantity": 5}) == {"cost": 12.0}
+        with calc_context.request_context() as nested:
+            assert nested is context
+    assert calls == [{"quantity": 5}, {"quantity": 1}]
+    assert context.hits["calc:test_inner"] == 4 and context.misses["calc:test_inner"] == 2
+    assert "calc:test_outer" not in context.misses  # вызов верхнего уровня не мемоизируется
+    after = calc_context.STATS.snapshot()
+    assert after["contexts"] == before["contexts"] + 1
+    assert after["hits"] == before["hits"] + 4
+    assert calc_context.active() is None
+
+
+def test_metrics_histogram_exposition():
+    from common.metrics import Registry
+
+    registry = Registry()
+    histogram = registry.histogram("t_seconds", "Тест", ("stage",), buckets=(0.01, 0.1))
+    counter = registry.counter("t_total", "Тест", ("stage",))
+    histogram.observe(0.005, 'a"b')
+    histogram.observe(0.05, 'a"b')
+    histogram.observe(3.0, 'a"b')
+    counter.inc("x", amount=2)
+    lines = registry.render().splitlines()
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{stage="a\\"b",le="0.01"} 1' in lines
+    assert 't_seconds_bucket{stage="a\\"b",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{stage="a\\"b",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="a\\"b"} 3' in lines
+    assert 't_total{stage="x"} 2' in lines
+    with pytest.raises(ValueError):
+        registry.counter("t_total", "повтор")
+
+
+def test_trace_tree_merges_calls_and_totals():
+    from common import trace
+
+    @trace.traced()
+    def leaf():
+        return 1
+
+    assert trace.active() is None and leaf() == 1  # без трассировки — просто вызов
+    with trace.tracing(force=True) as tracer:
+        with trace.stage("outer"):
+            leaf()
+            leaf()
+            with trace.stage("outer"):
+                leaf()
+    assert trace.active() is None
+    tree = tracer.to_dict()
+    outer = tree["children"][0]
+    assert outer["stage"] == "outer" and outer["calls"] == 1
+    assert [(c["stage"], c["calls"]) for c in outer["children"]] == [(leaf.__qualname__, 2), ("outer", 1)]
+    totals = tracer.totals()
+    assert totals[leaf.__qualname__].calls == 3
+    # Вложенный одноимённый этап не удваивает время
+    assert totals["outer"].calls == 2 and totals["outer"].seconds == tracer.root.children["outer"].seconds
+
+
+def test_data_store_parses_each_file_once(tmp_path):
+    (tmp_path / "equipment").mkdir()
+    (tmp_path / "equipment" / "tools.json").write_text('{Cliche: {cost: 50,},}', encoding="utf-8")
+    (tmp_path / "equipment" / "cutter.json").write_text('{Ideal: {cost: 1}}', encoding="utf-8")
+    store = DataStore(tmp_path)
+    version = store.version
+
+    first = store.load("equipment/tools.json")
+    cutter = store.load("equipment/cutter.json")
+    assert first == {"Cliche": {"cost": 50}}
+    assert store.load("equipment/tools.json") is first
+    assert store.parses == 2
+    assert store.changed_files() == []
+
+    (tmp_path / "equipment" / "tools.json").write_text('{Cliche: {cost: 60}}', encoding="utf-8")
+    assert store.load("equipment/tools.json") is first  # хранилище не перечитывает файл само
+    assert store.changed_files() == ["equipment/tools.json"]
+
+    # Следующее хранилище переиспользует неизменившиеся файлы и перечитывает изменённые
+    forked = store.fork()
+    assert forked.load("equipment/cutter.json") is cutter
+    assert forked.load("equipment/tools.json")["Cliche"]["cost"] == 60
+    assert forked.parses == 1
+    assert forked.version != version
+
+    with pytest.raises(FileNotFoundError):
+        store.load("equipment/missing.json")
+
+
+def test_data_store_shared_and_not_mutated_by_calculators():
+    import json5
+
+    from calculators import get_calculator
+
+    tools = load_json("equipment/tools.json")
+    store = current().store
+    parses = store.parses
+    get_calculator("embossing").get_options()
+    get_calculator("pad_print").get_options()
+    assert load_json("equipment/tools.json") is tools
+    assert store.parses == parses
+
+    get_calculator("presswall").get_options()
+    with open(store.path("materials/presswall.json"), "r", encoding="utf-8") as f:
+        assert load_json("materials/presswall.json") == json5.load(f)
+
+
+def _write_data(root, printer: str = '{Xerox: {name: "Xerox", maxSize: [320, 450]}}') -> None:
+    (root / "equipment").mkdir(exist_ok=True)
+    (root / "materials").mkdir(exist_ok=True)
+    (root / "common.json").write_text("{USD: 90}", encoding="utf-8")
+    (root / "equipment" / "printer.json").write_text(printer, encoding="utf-8")
+    (root / "materials" / "sheet.json").write_text(
+        '{Paper: {Default: {size: [320, 450]}, P80: {title: "Бумага 80", cost: 2}}}', encoding="utf-8"
+    )
+
+
+def test_data_snapshot_roundtrip_and_stale(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    _write_data(data_dir)
+    snapshot_path = tmp_path / "snapshot.pkl"
+    snapshot = build_snapshot(data_dir, snapshot_path)
+    assert sorted(snapshot["files"]) == ["common.json", "equipment/printer.json", "materials/sheet.json"]
+
+    store = DataStore(data_dir, snapshot_path=snapshot_path)
+    assert store.load("equipment/printer.json")["Xerox"]["maxSize"] == [320, 450]
+    assert store.from_snapshot and store.parses == 0
+
+    # JSON поменяли после сборки — снапшот игнорируется, читаем исходники
+    (data_dir / "common.json").write_text("{USD: 95}", encoding="utf-8")
+    assert read_snapshot(snapshot_path, DataStore(data_dir).version) is None
+    store = DataStore(data_dir, snapshot_path=snapshot_path)
+    assert store.load("common.json") == {"USD": 95}
+    assert not store.from_snapshot and store.parses == 1
+
+
+def test_data_snapshot_rejects_invalid_equipment(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    _write_data(data_dir, printer='{Xerox: {name: "Xerox", maxSize: "A3"}}')
+    snapshot_path = tmp_path / "snapshot.pkl"
+    with pytest.raises(SnapshotError) as exc_info:
+        build_snapshot(data_dir, snapshot_path)
+    assert [relpath for relpath, _ in exc_info.value.errors] == ["equipment/printer.json"]
+    assert not snapshot_path.exists()
+
+
+def _hot_copy_of_data(tmp_path, monkeypatch):
+    """Копия data/ и поколение из неё, подставленное как текущее."""
+    import pickle
+    import shutil
+
+    from common import generation
+    from common.data_snapshot import SNAPSHOT_FORMAT
+
+    data_dir = tmp_path / "data"
+    store = current().store
+    shutil.copytree(store.data_dir, data_dir)
+    # Снапшот из уже разобранных данных, чтобы не разбирать json5 заново
+    snapshot_path = tmp_path / "snapshot.pkl"
+    copy = DataStore(data_dir)
+    files = {relpath: store.load(relpath) for relpath in copy.source_files()}
+    snapshot_path.write_bytes(
+        pickle.dumps({"format": SNAPSHOT_FORMAT, "source_hash": copy.version, "files": files})
+    )
+    old = generation.build_generation(1, data_dir=data_dir, snapshot_path=snapshot_path)
+    assert old.store.from_snapshot
+    monkeypatch.setattr(generation, "_current", old)
+    return data_dir, old
+
+
+def test_generation_hot_reload_swaps_atomically(tmp_path, monkeypatch):
+    import json
+
+    from common import currencies, generation, markups
+    from equipment import cutter
+
+    data_dir, old = _hot_copy_of_data(tmp_path, monkeypatch)
+    code = next(c for c, raw in old.store.load("equipment/cutter.json").items() if str(raw.get("cost", "")).startswith("$"))
+    old_cost = cutter.get(code).purchase_cost
+    old_depreciation = cutter.get(code).depreciation_per_hour
+
+    common = dict(old.common)
+    common["marginMaterial"] = old.markups["MARGIN_MATERIAL"] + 0.1
+    common["USD"] = old.usd_rate * 2
+    (data_dir / "common.json").write_text(json.dumps(common, ensure_ascii=False), encoding="utf-8")
+    assert generation.changed_files() == ["common.json"]
+
+    with generation.pinned():
+        new = generation.reload()
+        # Запрос, начатый до подмены, досчитывается на старом поколении
+        assert markups.MARGIN_MATERIAL == old.markups["MARGIN_MATERIAL"]
+        assert cutter.get(code).purchase_cost == old_cost
+
+    assert new.number == 2 and new.store.parses == 1  # перечитан только common.json
+    assert markups.MARGIN_MATERIAL == pytest.approx(old.markups["MARGIN_MATERIAL"] + 0.1)
+    assert currencies.USD_RATE == old.usd_rate * 2
+    assert cutter.get(code).purchase_cost == pytest.approx(old_cost * 2)
+    # Ставки в час посчитаны при сборке каталога нового поколения
+    assert cutter.get(code).depreciation_per_hour == pytest.approx(old_depreciation * 2)
+    assert generation.changed_files() == []
+
+
+def test_generation_reload_rejects_invalid_data(tmp_path, monkeypatch):
+    from common import generation
+
+    data_dir, old = _hot_copy_of_data(tmp_path, monkeypatch)
+    (data_dir / "equipment" / "printer.json").write_text('{Xerox: {name: "Xerox", maxSize: "A3"}}', encoding="utf-8")
+    with pytest.raises(SnapshotError):
+        generation.reload()
+    assert generation.current() is old
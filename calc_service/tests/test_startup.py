@@ -0,0 +1,100 @@
+"""
+Бюджет времени старта и ленивый реестр калькуляторов.
+
+Импорты меряются в отдельном интерпретаторе (python -X importtime), отчёт
+(scripts/import_time_report.py) печатается в выводе теста и попадает в сообщение
+при превышении бюджета. Бюджеты с запасом ×3–5 к замеру на dev-машине.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+_calc_service = Path(__file__).resolve().parent.parent
+if str(_calc_service) not in sys.path:
+    sys.path.insert(0, str(_calc_service))
+sys.path.insert(0, str(_calc_service / "scripts"))
+
+from calculators import CALCULATOR_INFO, CALCULATORS, public_slugs  # noqa: E402
+from import_time_report import cumulative_ms, run_importtime, summary  # noqa: E402
+
+# Импорт реестра: только статические метаданные, без модулей калькуляторов и справочников
+REGISTRY_IMPORT_BUDGET_MS = 50
+# Импорт приложения (FastAPI, модели, реестр) без сборки поколения данных
+MAIN_IMPORT_BUDGET_MS = 2500
+# Импорт приложения и создание всех калькуляторов (как при прогреве схем)
+ALL_CALCULATORS_BUDGET_MS = 4000
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = (time.perf_counter() - started) * 1000
+generation = sys.modules.get("common.generation")
+print(json.dumps({{
+    "elapsed_ms": elapsed,
+    "modules": sorted(sys.modules),
+    "generation_built": bool(generation and generation._current is not None),
+}}))
+"""
+
+
+def _probe(statement: str):
+    records, stdout = run_importtime(_PROBE.format(statement=statement))
+    report = summary(records, top=10)
+    print(f"\n{statement}\n{report}")
+    return records, json.loads(stdout.strip().splitlines()[-1]), report
+
+
+def test_registry_import_is_lazy_and_within_budget() -> None:
+    records, info, report = _probe("import calculators; slugs = list(calculators.CALCULATORS)")
+    loaded = [m for m in info["modules"] if m.startswith(("materials", "equipment", "calculators."))]
+    assert loaded == [], report
+    assert not info["generation_built"]
+    assert cumulative_ms(records, "calculators") < REGISTRY_IMPORT_BUDGET_MS, report
+
+
+def test_main_import_within_budget_without_data_build() -> None:
+    records, info, report = _probe("import main")
+    assert not info["generation_built"], "импорт не должен разбирать справочники data/"
+    assert info["elapsed_ms"] < MAIN_IMPORT_BUDGET_MS, report
+
+
+def test_all_calculators_load_within_budget() -> None:
+    _, info, report = _probe("import main\nfrom calculators import CALCULATORS\nlist(CALCULATORS.values())")
+    assert not info["generation_built"]
+    assert info["elapsed_ms"] < ALL_CALCULATORS_BUDGET_MS, report
+
+
+def test_static_registry_matches_calculator_classes() -> None:
+    assert list(CALCULATORS) == list(CALCULATOR_INFO)
+    for slug, entry in CALCULATOR_INFO.items():
+        calc = CALCULATORS[slug]
+        assert CALCULATORS[slug] is calc
+        assert calc.slug == slug
+        assert type(calc).__name__ == entry.class_name
+        assert calc.is_public == entry.is_public
+    assert public_slugs() == [slug for slug, calc in CALCULATORS.items() if calc.is_public]
+    assert "unknown" not in CALCULATORS
+
+
+def test_server_backs_off_and_gives_up_on_startup_crashes(monkeypatch) -> None:
+    """Воркеры, падающие сразу после старта, перезапускаются с растущей паузой, потом мастер сдаётся."""
+    import server
+
+    monkeypatch.setattr(server.time, "monotonic", lambda: 1000.0)
+    master = server.Master(sock=None, workers=2)
+    delays = []
+    for _ in range(server.MAX_STARTUP_CRASHES - 1):
+        master._note_crash(uptime=0.1)
+        delays.append(master._next_spawn - 1000.0)
+    assert delays[:3] == [0.5, 1.0, 2.0] and max(delays) == server.RESPAWN_BACKOFF_MAX
+    assert not master._stopping
+
+    master._note_crash(uptime=server.WORKER_MIN_UPTIME)  # проработал долго — не падение при старте
+    assert master._crashes == 0
+    for _ in range(server.MAX_STARTUP_CRASHES):
+        master._note_crash(uptime=0.1)
+    assert master._stopping and master._gave_up
@@ -142,6 +142,11 @@ def cmd_start_calc() -> None:
         return
 
     cwd = ROOT / "calc_service"
+    # Снапшот справочников: быстрый старт + проверка JSON до запуска API
+    build = subprocess.run([sys.executable, "-m", "common.data_snapshot"], cwd=cwd)
+    if build.returncode != 0:
+        print("calc: справочники data/ не прошли проверку, API не запущен.")
+        return
     cmd = [
         sys.executable,
         "-m",